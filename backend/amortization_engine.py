@@ -0,0 +1,340 @@
+"""
+Amortization_Engine - Vectorized EMI amortization schedules for loans
+Builds full schedules (due dates, principal, interest, outstanding balance) as
+NumPy arrays for one loan or many at once, and caches them per loan
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# Schedules kept in memory (one per loan); 0 disables caching
+CACHE_SIZE = int(os.environ.get('AMORTIZATION_CACHE_SIZE', 4096))
+
+
+def parse_start_date(loan_start_date: str) -> np.datetime64:
+    """
+    Calendar date of an ISO 8601 loan start, as datetime64[D]
+
+    Offsets are kept rather than converted to UTC, so '2024-01-15T00:00:00+05:30'
+    is the 15th, matching how due dates have always been derived.
+    """
+    parsed = datetime.fromisoformat(loan_start_date.replace('Z', '+00:00'))
+    return np.datetime64(parsed.date(), 'D')
+
+
+def due_dates(start: np.ndarray, payment_numbers: np.ndarray) -> np.ndarray:
+    """
+    Due dates of EMIs by 1-based payment number
+
+    EMIs fall on the start date's day of month, beginning in the start month;
+    days that do not exist in a month (e.g. Feb 31st) use its last day.
+    Broadcasts, so a column of start dates against a row of payment numbers
+    yields one row of due dates per loan.
+
+    Args:
+        start: Loan start date(s) as datetime64[D]
+        payment_numbers: Payment numbers (1 = first EMI)
+
+    Returns:
+        Array of datetime64[D] due dates
+    """
+    start = np.asarray(start, dtype='datetime64[D]')
+    start_month = start.astype('datetime64[M]')
+    day = (start - start_month.astype('datetime64[D]')).astype(np.int64) + 1
+
+    months = start_month + (np.asarray(payment_numbers, dtype=np.int64) - 1)
+    month_start = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    return month_start + (np.minimum(day, days_in_month) - 1)
+
+
+class AmortizationSchedule:
+    """
+    Full EMI schedule of one loan
+
+    Arrays are indexed by payment number - 1: due_dates, payment, principal,
+    interest and balance (outstanding principal after that payment).
+    """
+
+    def __init__(self, loan_amount: float, start: np.datetime64, monthly_emi: float,
+                 due_dates: np.ndarray, principal: np.ndarray, interest: np.ndarray,
+                 balance: np.ndarray):
+        self.loan_amount = loan_amount
+        self.start = start
+        self.monthly_emi = monthly_emi
+        self.due_dates = due_dates
+        self.principal = principal
+        self.interest = interest
+        self.balance = balance
+        self.payment = principal + interest
+
+    def __len__(self) -> int:
+        return len(self.due_dates)
+
+    @property
+    def total_interest(self) -> float:
+        """Interest paid over the full term"""
+        return float(self.interest.sum())
+
+    def due_date(self, payment_number: int) -> date:
+        """
+        Due date of the n-th EMI (1-based), extrapolated past the term if needed
+
+        Args:
+            payment_number: Position of the payment in the loan's schedule
+
+        Returns:
+            Due date (datetime.date)
+        """
+        if 1 <= payment_number <= len(self.due_dates):
+            return self.due_dates[payment_number - 1].item()
+        return due_dates(self.start, payment_number).item()
+
+    def balance_after(self, payments_made: int) -> float:
+        """Scheduled outstanding principal after a number of EMIs"""
+        if payments_made <= 0:
+            return float(self.loan_amount)
+        return float(self.balance[min(payments_made, len(self.balance)) - 1])
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Schedule as JSON-ready rows rounded to 2 decimals"""
+        return [
+            {
+                'payment_number': n,
+                'due_date': due.isoformat(),
+                'payment': round(payment, 2),
+                'principal': round(principal, 2),
+                'interest': round(interest, 2),
+                'balance': round(balance, 2)
+            }
+            for n, due, payment, principal, interest, balance in zip(
+                range(1, len(self) + 1),
+                self.due_dates.tolist(),
+                self.payment.tolist(),
+                self.principal.tolist(),
+                self.interest.tolist(),
+                self.balance.tolist()
+            )
+        ]
+
+
+def build_schedules(loans: List[Dict[str, Any]]) -> List[AmortizationSchedule]:
+    """
+    Build amortization schedules for many loans in one vectorized pass
+
+    Loans are laid out as rows of (n_loans, max_tenure) arrays; balances use
+    the closed form B_k = P(1+r)^k - EMI((1+r)^k - 1)/r, so no per-month loop
+    is needed. Zero-rate loans repay principal evenly.
+
+    Args:
+        loans: Dictionaries with loan_amount, interest_rate (annual %),
+            loan_tenure (months) and loan_start_date (ISO 8601)
+
+    Returns:
+        One AmortizationSchedule per loan, in input order
+    """
+    if not loans:
+        return []
+
+    amount = np.array([float(loan['loan_amount']) for loan in loans])[:, None]
+    rate = np.array([float(loan['interest_rate']) for loan in loans])[:, None] / 100 / 12
+    tenure = np.array([int(loan['loan_tenure']) for loan in loans])[:, None]
+    start = np.array([parse_start_date(loan['loan_start_date']) for loan in loans])
+
+    k = np.arange(1, int(tenure.max()) + 1)[None, :]
+    has_rate = rate > 0
+    safe_rate = np.where(has_rate, rate, 1.0)
+
+    growth_n = (1 + rate) ** tenure
+    emi = np.where(has_rate, amount * rate * growth_n / np.where(has_rate, growth_n - 1, 1.0), amount / tenure)
+
+    growth_prev = (1 + rate) ** (k - 1)
+    opening = np.where(has_rate, amount * growth_prev - emi * (growth_prev - 1) / safe_rate, amount - emi * (k - 1))
+    interest = opening * rate
+    principal = emi - interest
+
+    # The final EMI clears whatever float residue is left
+    last = k == tenure
+    principal = np.where(last, opening, principal)
+    balance = np.where(last, 0.0, np.maximum(opening - principal, 0.0))
+
+    dates = due_dates(start[:, None], k)
+
+    schedules = []
+    for i in range(len(loans)):
+        n = int(tenure[i, 0])
+        schedules.append(AmortizationSchedule(
+            loan_amount=float(amount[i, 0]),
+            start=start[i],
+            monthly_emi=float(emi[i, 0]),
+            due_dates=dates[i, :n],
+            principal=principal[i, :n],
+            interest=interest[i, :n],
+            balance=balance[i, :n]
+        ))
+    return schedules
+
+
+def build_schedule(loan: Dict[str, Any]) -> AmortizationSchedule:
+    """Build the amortization schedule of a single loan"""
+    return build_schedules([loan])[0]
+
+
+def project_schedules(schedules: List[AmortizationSchedule], from_date: date,
+                      months: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Month-by-month projection of EMIs and outstanding principal across loans
+
+    Args:
+        schedules: Schedules to combine
+        from_date: First month of the projection is the month of this date
+        months: Number of months to project (defaults to the last scheduled EMI)
+
+    Returns:
+        Dictionary of equal-length lists: months ('YYYY-MM'), payment,
+        principal, interest and outstanding_balance (scheduled principal left
+        at the end of each month)
+    """
+    from_month = np.datetime64(from_date, 'M')
+    offsets = [(s.due_dates.astype('datetime64[M]') - from_month).astype(np.int64) for s in schedules]
+
+    horizon = max((int(o[-1]) + 1 for o in offsets if len(o)), default=0)
+    if months is not None:
+        horizon = min(horizon, months)
+    horizon = max(horizon, 0)
+
+    principal = np.zeros(horizon)
+    interest = np.zeros(horizon)
+    outstanding = np.zeros(horizon)
+    month_index = np.arange(horizon)
+
+    for schedule, offset in zip(schedules, offsets):
+        keep = (offset >= 0) & (offset < horizon)
+        np.add.at(principal, offset[keep], schedule.principal[keep])
+        np.add.at(interest, offset[keep], schedule.interest[keep])
+
+        # Last EMI due on or before each projected month (-1: none yet)
+        last_paid = np.searchsorted(offset, month_index, side='right') - 1
+        outstanding += np.where(last_paid >= 0, schedule.balance[np.maximum(last_paid, 0)], schedule.loan_amount)
+
+    return {
+        'months': [str(m) for m in from_month + month_index],
+        'payment': np.round(principal + interest, 2).tolist(),
+        'principal': np.round(principal, 2).tolist(),
+        'interest': np.round(interest, 2).tolist(),
+        'outstanding_balance': np.round(outstanding, 2).tolist()
+    }
+
+
+def _signature(loan: Dict[str, Any]):
+    """The loan fields a schedule depends on"""
+    return (
+        float(loan['loan_amount']),
+        float(loan['interest_rate']),
+        int(loan['loan_tenure']),
+        loan['loan_start_date']
+    )
+
+
+class ScheduleCache:
+    """
+    Thread-safe LRU cache of schedules keyed by loan_id
+
+    Each entry remembers the loan fields it was built from, so a loan edited
+    behind the cache's back is rebuilt rather than served stale.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """
+        Initialize ScheduleCache
+
+        Args:
+            max_size: Maximum cached schedules (0 disables caching)
+        """
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, loan: Dict[str, Any]) -> Optional[AmortizationSchedule]:
+        entry = self._entries.get(loan['loan_id'])
+        if entry is not None and entry[0] == _signature(loan):
+            self._entries.move_to_end(loan['loan_id'])
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def _store(self, loan: Dict[str, Any], schedule: AmortizationSchedule) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[loan['loan_id']] = (_signature(loan), schedule)
+        self._entries.move_to_end(loan['loan_id'])
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_schedule(self, loan: Dict[str, Any]) -> AmortizationSchedule:
+        """
+        Cached schedule for a loan, built on a miss
+
+        Args:
+            loan: Loan dictionary including loan_id
+
+        Returns:
+            AmortizationSchedule
+        """
+        return self.get_schedules([loan])[0]
+
+    def get_schedules(self, loans: Iterable[Dict[str, Any]]) -> List[AmortizationSchedule]:
+        """
+        Cached schedules for several loans; all misses are built in one batch
+
+        Args:
+            loans: Loan dictionaries including loan_id
+
+        Returns:
+            Schedules in input order
+        """
+        loans = list(loans)
+        with self._lock:
+            schedules = [self._lookup(loan) for loan in loans]
+
+        missing = [i for i, schedule in enumerate(schedules) if schedule is None]
+        if missing:
+            built = build_schedules([loans[i] for i in missing])
+            with self._lock:
+                for i, schedule in zip(missing, built):
+                    schedules[i] = schedule
+                    self._store(loans[i], schedule)
+        return schedules
+
+    def invalidate(self, loan_id: str) -> None:
+        """Drop a loan's cached schedule (after it is updated or deleted)"""
+        with self._lock:
+            self._entries.pop(loan_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached schedules"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+
+# Shared by every service in the process
+schedule_cache = ScheduleCache()
@@ -3,14 +3,16 @@ SmartFin - Flask Backend
 Main application file for financial health scoring and guidance
 """
 
-from flask import Flask, request, jsonify, g
+from flask import Blueprint, Flask, current_app, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import (
+    JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity,
+    verify_jwt_in_request
+)
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
-import joblib
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta, timezone
 import os
 import sqlite3
@@ -18,61 +20,31 @@ import json
 import uuid
 import logging
 
-# Configure logging - MUST be before Flask app creation
-import sys
-
-# Ensure unbuffered output
-sys.stdout = sys.__stdout__
-sys.stderr = sys.__stderr__
-
-# Create custom formatter
-log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-
-# Console handler with immediate flushing
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)
-console_handler.setFormatter(logging.Formatter(log_format))
-
-# File handler with immediate flushing
-file_handler = logging.FileHandler('backend.log', mode='a')
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(logging.Formatter(log_format))
-
-# Configure root logger
-logging.basicConfig(
-    level=logging.DEBUG,
-    handlers=[console_handler, file_handler],
-    force=True
-)
-
-logger = logging.getLogger(__name__)
-
-# Ensure handlers flush immediately
-for handler in logging.root.handlers:
-    handler.flush()
-
-# Force print to console
-print("\n" + "="*80, file=sys.stdout, flush=True)
-print("SMARTFIN BACKEND LOGGING INITIALIZED", file=sys.stdout, flush=True)
-print("="*80 + "\n", file=sys.stdout, flush=True)
-sys.stdout.flush()
-
-# Load environment variables
+# Load environment variables (LOG_* settings are read when logging is configured)
 load_dotenv()
 
-# Custom logger class that flushes after every message
-class FlushingLogger(logging.Logger):
-    def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=None):
-        super()._log(level, msg, args, exc_info, extra, stack_info)
-        for handler in self.handlers:
-            handler.flush()
-        for handler in logging.root.handlers:
-            handler.flush()
+import sys
+import threading
+import time
+from structured_logging import configure_logging
 
-logging.setLoggerClass(FlushingLogger)
 logger = logging.getLogger(__name__)
 
+# Per-request access records (sampled by level, see ACCESS_LOG_SAMPLE_RATE)
+access_logger = logging.getLogger('smartfin.access')
+
 # Import validation schemas
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, canonical_key, model_version_for
+from prediction_coalescer import PredictionCoalescer
+from connection_pool import get_connection, get_pool_stats
+from json_provider import FastJSONProvider
+from request_scope import begin_request, current_scope, end_request, get_request_stats
+from write_queue import get_write_queue_stats, run_write
+from migrations import migrate
+from score_history import score_history_writer
+from pagination import parse_page_args
+
 from validation_schemas import (
     profile_create_schema,
     profile_update_schema,
@@ -81,210 +53,110 @@ from validation_schemas import (
     validate_request_data
 )
 
-app = Flask(__name__)
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'smartfin-secret-key-change-in-production')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+# Every route and request hook is registered on the app by create_app()
+bp = Blueprint('smartfin', __name__)
 
-# File upload configuration
-app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'profile_pictures')
-app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
-app.config['ALLOWED_EXTENSIONS'] = {'jpg', 'jpeg', 'png', 'webp'}
 
-jwt = JWTManager(app)
+def app_service(name):
+    """Proxy to a service that create_app() built for the current app"""
+    return LocalProxy(lambda: current_app.extensions['smartfin'][name])
 
-CORS(app, 
-     origins=["https://saumye0106.github.io", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:3000"],
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-     allow_headers=["Content-Type", "Authorization"],
-     supports_credentials=True)
 
 # Handle CORS preflight requests
-@app.before_request
+@bp.before_app_request
 def handle_preflight():
-    # Log every request
-    msg = f"\n>>> REQUEST: {request.method} {request.path}"
-    print(msg, file=sys.stdout, flush=True)
-    sys.stdout.flush()
-    
-    msg = f"    Origin: {request.headers.get('Origin', 'N/A')}"
-    print(msg, file=sys.stdout, flush=True)
-    sys.stdout.flush()
-    
-    msg = f"    Authorization: {request.headers.get('Authorization', 'N/A')[:50]}..."
-    print(msg, file=sys.stdout, flush=True)
-    sys.stdout.flush()
+    g._request_started = time.perf_counter()
     
     if request.method == "OPTIONS":
-        response = app.make_default_options_response()
+        response = current_app.make_default_options_response()
         headers = response.headers
         headers["Access-Control-Allow-Origin"] = request.headers.get("Origin", "*")
         headers["Access-Control-Allow-Headers"] = request.headers.get("Access-Control-Request-Headers", "Content-Type,Authorization")
         headers["Access-Control-Allow-Methods"] = "GET,PUT,POST,DELETE,OPTIONS"
         headers["Access-Control-Allow-Credentials"] = "true"
-        msg = f"    [PREFLIGHT] Returning 200 OK"
-        print(msg, file=sys.stdout, flush=True)
-        sys.stdout.flush()
         return response
 
-@app.after_request
+@bp.after_app_request
 def log_response(response):
-    msg = f"<<< RESPONSE: {response.status_code} {request.method} {request.path}"
-    print(msg, file=sys.stdout, flush=True)
-    sys.stdout.flush()
+    # 5xx -> ERROR, 4xx -> WARNING, otherwise INFO (which is sampled)
+    if response.status_code >= 500:
+        level = logging.ERROR
+    elif response.status_code >= 400:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+    
+    started = getattr(g, '_request_started', None)
+    scope = current_scope()
+    access_logger.log(level, f"{request.method} {request.path} {response.status_code}", extra={
+        'sampled': True,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2) if started is not None else None,
+        'sql_statements': scope.sql_statements if scope is not None else None,
+        'origin': request.headers.get('Origin')
+    })
+    return response
+
+# Per-request identity map for loan/profile rows, and SQL statement counting
+@bp.before_app_request
+def open_request_scope():
+    # Statistics are keyed by view name, without the blueprint prefix
+    begin_request(request.endpoint.rpartition('.')[2] if request.endpoint else request.path)
+
+@bp.after_app_request
+def add_sql_statement_count(response):
+    scope = current_scope()
+    if scope is not None:
+        response.headers['X-SQL-Statements'] = str(scope.sql_statements)
     return response
 
+@bp.teardown_app_request
+def close_request_scope(exception):
+    end_request()
+
 # Database setup
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'auth.db')
 
 def get_db():
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DB_PATH)
-        db.row_factory = sqlite3.Row
+        # Same pooled connection the services use
+        db = g._database = get_connection(DB_PATH)
     return db
 
-@app.teardown_appcontext
 def close_connection(exception):
     db = getattr(g, '_database', None)
     if db is not None:
         db.close()
 
 def init_db():
-    """Initialize the database with required tables"""
-    db = sqlite3.connect(DB_PATH)
-    cur = db.cursor()
-    
-    # Users table (existing)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            phone TEXT,
-            email_verified INTEGER DEFAULT 0,
-            email_verification_token TEXT,
-            email_verification_expires TEXT,
-            created_at TEXT NOT NULL
-        )
-    ''')
-    
-    # Password reset tokens table (new)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS password_reset_tokens (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            reset_code TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            used INTEGER DEFAULT 0,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # User profiles table (new)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS users_profile (
-            user_id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            age INTEGER NOT NULL CHECK (age >= 18 AND age <= 120),
-            location TEXT NOT NULL,
-            risk_tolerance INTEGER CHECK (risk_tolerance >= 1 AND risk_tolerance <= 10),
-            profile_picture_url TEXT,
-            notification_preferences TEXT DEFAULT '{"email": true, "push": false, "in_app": true, "frequency": "daily"}',
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Financial goals table (new)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS financial_goals (
-            id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            goal_type TEXT NOT NULL CHECK (goal_type IN ('short-term', 'long-term')),
-            target_amount REAL NOT NULL CHECK (target_amount > 0),
-            target_date TEXT NOT NULL,
-            priority TEXT NOT NULL CHECK (priority IN ('low', 'medium', 'high')),
-            status TEXT DEFAULT 'active' CHECK (status IN ('active', 'completed', 'cancelled')),
-            description TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users_profile(user_id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Loans table (loan history enhancement)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS loans (
-            loan_id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            loan_type TEXT NOT NULL CHECK (loan_type IN ('personal', 'home', 'auto', 'education')),
-            loan_amount REAL NOT NULL CHECK (loan_amount > 0),
-            loan_tenure INTEGER NOT NULL CHECK (loan_tenure > 0),
-            monthly_emi REAL NOT NULL CHECK (monthly_emi > 0),
-            interest_rate REAL NOT NULL CHECK (interest_rate >= 0 AND interest_rate <= 50),
-            loan_start_date TEXT NOT NULL,
-            loan_maturity_date TEXT NOT NULL,
-            default_status INTEGER DEFAULT 0,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            deleted_at TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Loan payments table (loan history enhancement)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS loan_payments (
-            payment_id TEXT PRIMARY KEY,
-            loan_id TEXT NOT NULL,
-            payment_date TEXT NOT NULL,
-            payment_amount REAL NOT NULL CHECK (payment_amount > 0),
-            payment_status TEXT NOT NULL CHECK (payment_status IN ('on-time', 'late', 'missed')),
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (loan_id) REFERENCES loans(loan_id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Loan metrics table (loan history enhancement - for caching)
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS loan_metrics (
-            user_id INTEGER PRIMARY KEY,
-            loan_diversity_score REAL CHECK (loan_diversity_score >= 0 AND loan_diversity_score <= 100),
-            payment_history_score REAL CHECK (payment_history_score >= 0 AND payment_history_score <= 100),
-            loan_maturity_score REAL CHECK (loan_maturity_score >= 0 AND loan_maturity_score <= 100),
-            payment_statistics TEXT,
-            loan_statistics TEXT,
-            calculated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Create indexes for better query performance
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_users_profile_user_id ON users_profile(user_id)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_financial_goals_user_id ON financial_goals(user_id)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_financial_goals_priority ON financial_goals(priority)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_financial_goals_status ON financial_goals(status)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_user_id ON password_reset_tokens(user_id)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_code ON password_reset_tokens(reset_code)')
-    
-    # Loan-related indexes
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loans_user_id ON loans(user_id)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loans_loan_type ON loans(loan_type)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loans_default_status ON loans(default_status)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loans_deleted_at ON loans(deleted_at)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_loan_id ON loan_payments(loan_id)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_date ON loan_payments(payment_date)')
-    cur.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_status ON loan_payments(payment_status)')
-    
-    db.commit()
-    db.close()
+    """
+    Bring the database up to the latest schema version
+    Pending migrations (see migrations.py) are applied in order; once the
+    database is current this is a single PRAGMA user_version read
+    """
+    migrate(DB_PATH)
 
-# Initialize database
-init_db()
+
+# The schema is checked once per process: by create_app(), or on the first request
+_schema_lock = threading.Lock()
+_schema_checked = False
+
+def ensure_schema():
+    """Run init_db() once per process"""
+    global _schema_checked
+    if _schema_checked:
+        return
+    with _schema_lock:
+        if not _schema_checked:
+            init_db()
+            _schema_checked = True
+
+@bp.before_app_request
+def check_schema():
+    ensure_schema()
 
 # ==================== DATABASE HELPER FUNCTIONS ====================
 
@@ -305,10 +177,9 @@ def execute_query(query, params=(), fetch_one=False, fetch_all=False, commit=Fal
     db = get_db()
     cur = db.cursor()
     try:
-        cur.execute(query, params)
         if commit:
-            db.commit()
-            return cur.lastrowid
+            return run_write(DB_PATH, lambda conn: conn.execute(query, params).lastrowid)
+        cur.execute(query, params)
         if fetch_one:
             return cur.fetchone()
         if fetch_all:
@@ -332,18 +203,15 @@ def rows_to_list(rows):
     return [dict(row) for row in rows]
 
 # ==================== LOAD ML MODEL ====================
-print("Loading ML model...")
 # Get the absolute path to the data directory for enhanced model
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 
-# Load enhanced model
-model_data = joblib.load(os.path.join(DATA_DIR, 'enhanced_model.pkl'))
-model = model_data['model']
-feature_names = model_data['feature_cols']
-model_metadata = model_data['metrics']
-print(f"Model loaded: {model_data['model_type']}")
-print(f"Model R2 Score: {model_metadata['r2_test']:.4f} (95.85% - Enhanced 8-Factor Model)")
+# Built per app by create_app(): the prediction cache, the lazily loaded model
+# and the micro-batcher in front of it
+prediction_cache = app_service('prediction_cache')
+model_registry = app_service('model_registry')
+prediction_coalescer = app_service('prediction_coalescer')
 
 # ==================== HELPER FUNCTIONS ====================
 
@@ -659,19 +527,128 @@ def get_investment_advice(score):
 
 # ==================== API ENDPOINTS ====================
 
-@app.route('/')
+@bp.route('/')
 def home():
     """Health check endpoint"""
     return jsonify({
         'status': 'online',
         'service': 'SmartFin Financial Health API',
         'version': '1.0',
-        'model': model_data['model_type'],
-        'model_accuracy': f"{model_metadata['r2_test']:.2%}"
+        'model': model_registry.model_data['model_type'],
+        'model_accuracy': f"{model_registry.metadata['r2_test']:.2%}"
     })
 
 
-@app.route('/api/predict', methods=['POST'])
+def validate_prediction_input(data):
+    """
+    Validate a single financial record for scoring
+
+    Returns:
+        Error message string, or None if the record is valid
+    """
+    if not isinstance(data, dict):
+        return 'Each record must be a JSON object'
+
+    # Validate input - new enhanced model requires different fields
+    required_fields = ['income', 'emi', 'savings']
+    for field in required_fields:
+        if field not in data:
+            return f'Missing required field: {field}'
+        if not isinstance(data[field], (int, float)) or data[field] < 0:
+            return f'Invalid value for {field}. Must be non-negative number.'
+
+    return None
+
+
+def calculate_expenses(data):
+    """Calculate expenses from individual categories if not provided directly"""
+    expenses = data.get('expenses', 0)
+    if expenses == 0 and any(k in data for k in ['rent', 'food', 'travel', 'shopping']):
+        expenses = (data.get('rent', 0) + data.get('food', 0) +
+                    data.get('travel', 0) + data.get('shopping', 0))
+    return expenses
+
+
+def build_feature_row(data):
+    """
+    Build a model feature row for a financial record, in feature_names order
+    Optional fields fall back to the same defaults as the single-record endpoints
+    """
+    values = {
+        'income': data.get('income', 0),
+        'expenses': calculate_expenses(data),
+        'savings': data.get('savings', 0),
+        'emi': data.get('emi', 0),
+        'age': data.get('age', 30),
+        'has_loan_numeric': int(data.get('has_loan', False)),
+        'loan_amount_filled': data.get('loan_amount', 0),
+        'interest_rate_filled': data.get('interest_rate', 0)
+    }
+    return [values[name] for name in model_registry.feature_names]
+
+
+def clamp_score(raw_score):
+    """Round a raw model output and clamp it between 0-100"""
+    return max(0, min(100, round(float(raw_score), 2)))
+
+
+# Inputs read by the rule pipeline beyond the model features
+RULE_INPUT_FIELDS = ['income', 'rent', 'food', 'travel', 'shopping', 'emi', 'savings']
+
+
+def predict_cached_scores(rows):
+    """
+    Score feature rows through the prediction cache
+    Rows that miss the cache are predicted together in one call, batched with
+    other requests' misses when predictions are running concurrently
+
+    Returns:
+        List of clamped scores, one per row
+    """
+    keys = [canonical_key('score', row) for row in rows]
+    scores = [prediction_cache.get(key) for key in keys]
+
+    missing = [i for i, score in enumerate(scores) if score is None]
+    if missing:
+        predictions = prediction_coalescer.predict([rows[i] for i in missing])
+        for i, raw in zip(missing, predictions):
+            scores[i] = clamp_score(raw)
+            prediction_cache.put(keys[i], scores[i])
+
+    return scores
+
+
+def build_prediction_result(data, predicted_score):
+    """
+    Run the rule-based analysis pipeline for a scored record
+    Returns score, classification, patterns, guidance, anomalies and investments
+    """
+    patterns = analyze_spending_patterns(data)
+
+    return {
+        'score': predicted_score,
+        'classification': classify_score(predicted_score),
+        'patterns': patterns,
+        'guidance': generate_guidance(data, predicted_score, patterns),
+        'anomalies': detect_anomalies(data, patterns),
+        'investments': suggest_investments(predicted_score, data, patterns)
+    }
+
+
+def optional_user_id():
+    """
+    ID of the caller if the request carries a valid access token, else None
+    Missing, expired or malformed tokens are treated as anonymous, never as 401
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        return int(identity) if identity is not None else None
+    except Exception:
+        return None
+
+
+@bp.route('/api/predict', methods=['POST'])
 def predict_score():
     """
     Main prediction endpoint
@@ -680,71 +657,41 @@ def predict_score():
     try:
         data = request.get_json()
 
-        # Validate input - new enhanced model requires different fields
-        required_fields = ['income', 'emi', 'savings']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-            if not isinstance(data[field], (int, float)) or data[field] < 0:
-                return jsonify({'error': f'Invalid value for {field}. Must be non-negative number.'}), 400
-
-        # Calculate expenses from individual categories if provided
-        expenses = data.get('expenses', 0)
-        if expenses == 0 and any(k in data for k in ['rent', 'food', 'travel', 'shopping']):
-            expenses = (data.get('rent', 0) + data.get('food', 0) + 
-                       data.get('travel', 0) + data.get('shopping', 0))
-
-        # Get optional fields with defaults
-        age = data.get('age', 30)
-        has_loan = data.get('has_loan', False)
-        loan_amount = data.get('loan_amount', 0)
-        interest_rate = data.get('interest_rate', 0)
-
-        # Prepare features for enhanced model prediction
-        features = pd.DataFrame([[
-            data['income'],           # income
-            expenses,                 # expenses
-            data['savings'],          # savings
-            data['emi'],              # emi
-            age,                      # age
-            int(has_loan),            # has_loan_numeric
-            loan_amount,              # loan_amount_filled
-            interest_rate             # interest_rate_filled
-        ]], columns=feature_names)
-
-        # Predict score
-        predicted_score = float(model.predict(features)[0])
-        predicted_score = max(0, min(100, round(predicted_score, 2)))  # Clamp between 0-100
-
-        # Get classification
-        classification = classify_score(predicted_score)
-
-        # Analyze spending patterns
-        patterns = analyze_spending_patterns(data)
-
-        # Generate guidance
-        guidance = generate_guidance(data, predicted_score, patterns)
-
-        # Detect anomalies
-        anomalies = detect_anomalies(data, patterns)
-
-        # Suggest investments
-        investments = suggest_investments(predicted_score, data, patterns)
+        error = validate_prediction_input(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        features = build_feature_row(data)
+
+        # Identical payloads reuse the cached score and rule-pipeline output
+        cache_key = None
+        if all(field in data for field in RULE_INPUT_FIELDS):
+            cache_key = canonical_key('result', features + [data[field] for field in RULE_INPUT_FIELDS])
+        result = prediction_cache.get(cache_key) if cache_key else None
+
+        if result is None:
+            # Predict score from the enhanced model features
+            predicted_score = predict_cached_scores([features])[0]
+
+            # Classification, patterns, guidance, anomalies and investments
+            result = build_prediction_result(data, predicted_score)
+            if cache_key:
+                prediction_cache.put(cache_key, result)
+
+        # Authenticated callers get the score added to their history (written in the background)
+        user_id = optional_user_id()
+        if user_id is not None:
+            score_history_writer.append(DB_PATH, user_id, {'overall_score': result['score']}, source='predict')
 
         # Build response
         response = {
             'success': True,
             'timestamp': datetime.now().isoformat(),
-            'score': predicted_score,
-            'classification': classification,
-            'patterns': patterns,
-            'guidance': guidance,
-            'anomalies': anomalies,
-            'investments': investments,
+            **result,
             'model_info': {
-                'model_type': model_data['model_type'],
-                'accuracy': f"{model_metadata['r2_test']:.2%}",
-                'average_error': f"±{model_metadata['mae_test']:.1f} points"
+                'model_type': model_registry.model_data['model_type'],
+                'accuracy': f"{model_registry.metadata['r2_test']:.2%}",
+                'average_error': f"±{model_registry.metadata['mae_test']:.1f} points"
             }
         }
 
@@ -757,7 +704,112 @@ def predict_score():
         }), 500
 
 
-@app.route('/api/whatif', methods=['POST'])
+class ParseFailure:
+    """Placeholder for an NDJSON line that could not be decoded"""
+    def __init__(self, message):
+        self.message = message
+
+
+def _iter_batch_records(key='records'):
+    """
+    Yield records from a batch request body
+    Accepts a JSON array, a {key: [...]} object, or NDJSON (one object per line)
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ParseFailure(f'Invalid JSON line: {e.msg}')
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list):
+        raise ValueError(f'Request body must be a JSON array of {key}, a {{"{key}": [...]}} object, or NDJSON')
+    yield from data
+
+
+def _score_batch_chunk(chunk, start_index):
+    """
+    Score a chunk of records with a single vectorized prediction call
+    Yields one result dictionary per record, in input order
+    """
+    errors = {}
+    valid_positions = []
+    rows = []
+    for position, record in enumerate(chunk):
+        if isinstance(record, ParseFailure):
+            errors[position] = record.message
+            continue
+        error = validate_prediction_input(record)
+        if error:
+            errors[position] = error
+            continue
+        # Optional fields are not validated above; a bad one fails only its own record
+        try:
+            rows.append(np.asarray(build_feature_row(record), dtype=np.float64))
+        except (TypeError, ValueError):
+            errors[position] = 'Invalid value for an optional field. Must be a number.'
+            continue
+        valid_positions.append(position)
+
+    scores = {}
+    if valid_positions:
+        matrix = np.vstack(rows)
+        predictions = model_registry.predict(matrix)
+        scores = {p: clamp_score(raw) for p, raw in zip(valid_positions, predictions)}
+
+    for position, record in enumerate(chunk):
+        index = start_index + position
+        if position in errors:
+            yield {'index': index, 'success': False, 'error': errors[position]}
+            continue
+        try:
+            yield {'index': index, 'success': True, **build_prediction_result(record, scores[position])}
+        except Exception as e:
+            yield {'index': index, 'success': False, 'error': str(e)}
+
+
+@bp.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint
+    Accepts an array of financial records (JSON or NDJSON) and streams back one
+    NDJSON result line per record. Records are scored in chunks so memory stays
+    bounded regardless of batch size.
+    """
+    chunk_size = current_app.config['PREDICT_BATCH_CHUNK_SIZE']
+    records = _iter_batch_records()
+
+    # Pull the first record eagerly so malformed bodies fail with a normal 400
+    try:
+        first = next(records, None)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def generate():
+        chunk = [] if first is None else [first]
+        start_index = 0
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                for result in _score_batch_chunk(chunk, start_index):
+                    yield json.dumps(result) + '\n'
+                start_index += len(chunk)
+                chunk = []
+        if chunk:
+            for result in _score_batch_chunk(chunk, start_index):
+                yield json.dumps(result) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@bp.route('/api/whatif', methods=['POST'])
 def what_if_simulation():
     """
     What-if simulation endpoint
@@ -772,45 +824,10 @@ def what_if_simulation():
         # Modified scenario
         modified_data = data.get('modified', {})
 
-        # Helper function to calculate expenses
-        def get_expenses(scenario_data):
-            expenses = scenario_data.get('expenses', 0)
-            if expenses == 0 and any(k in scenario_data for k in ['rent', 'food', 'travel', 'shopping']):
-                expenses = (scenario_data.get('rent', 0) + scenario_data.get('food', 0) + 
-                           scenario_data.get('travel', 0) + scenario_data.get('shopping', 0))
-            return expenses
-
-        # Predict current score
-        current_expenses = get_expenses(current_data)
-        current_features = pd.DataFrame([[
-            current_data.get('income', 0),
-            current_expenses,
-            current_data.get('savings', 0),
-            current_data.get('emi', 0),
-            current_data.get('age', 30),
-            int(current_data.get('has_loan', False)),
-            current_data.get('loan_amount', 0),
-            current_data.get('interest_rate', 0)
-        ]], columns=feature_names)
-
-        current_score = float(model.predict(current_features)[0])
-        current_score = max(0, min(100, round(current_score, 2)))
-
-        # Predict modified score
-        modified_expenses = get_expenses(modified_data)
-        modified_features = pd.DataFrame([[
-            modified_data.get('income', 0),
-            modified_expenses,
-            modified_data.get('savings', 0),
-            modified_data.get('emi', 0),
-            modified_data.get('age', 30),
-            int(modified_data.get('has_loan', False)),
-            modified_data.get('loan_amount', 0),
-            modified_data.get('interest_rate', 0)
-        ]], columns=feature_names)
-
-        modified_score = float(model.predict(modified_features)[0])
-        modified_score = max(0, min(100, round(modified_score, 2)))
+        # Score both scenarios with at most one prediction call
+        current_score, modified_score = predict_cached_scores(
+            [build_feature_row(current_data), build_feature_row(modified_data)]
+        )
 
         # Calculate impact
         score_change = modified_score - current_score
@@ -834,23 +851,194 @@ def what_if_simulation():
         }), 500
 
 
-@app.route('/api/model-info', methods=['GET'])
+# Request fields that can be swept, mapped to the model feature they set
+SWEEP_FIELDS = {
+    'income': 'income',
+    'expenses': 'expenses',
+    'savings': 'savings',
+    'emi': 'emi',
+    'age': 'age',
+    'has_loan': 'has_loan_numeric',
+    'loan_amount': 'loan_amount_filled',
+    'interest_rate': 'interest_rate_filled'
+}
+
+
+def parse_sweep_axis(spec, base, max_points):
+    """
+    Turn one sweep parameter into its feature name and array of values
+
+    A parameter is either {"field", "values": [...]} or {"field", "start",
+    "stop", "step"} (stop inclusive). With "relative_to": "income" the values
+    are fractions of that base field, e.g. savings 0-0.4 of income.
+
+    Raises:
+        ValueError: If the parameter is malformed or has more than max_points values
+    """
+    if not isinstance(spec, dict):
+        raise ValueError('Each sweep parameter must be a JSON object')
+
+    field = spec.get('field')
+    if field not in SWEEP_FIELDS:
+        raise ValueError(f"Invalid sweep field: {field}. Must be one of: {', '.join(SWEEP_FIELDS)}")
+
+    if 'values' in spec:
+        values = spec['values']
+        if not isinstance(values, list) or not values:
+            raise ValueError(f'{field}: values must be a non-empty list')
+        if len(values) > max_points:
+            raise ValueError(f'{field}: {len(values)} values exceeds the sweep limit of {max_points} points')
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            raise ValueError(f'{field}: values must be numbers')
+        axis = np.array(values, dtype=np.float64)
+    else:
+        try:
+            start, stop, step = (float(spec[key]) for key in ('start', 'stop', 'step'))
+        except KeyError as e:
+            raise ValueError(f'{field}: missing {e.args[0]} (or provide values)')
+        except (TypeError, ValueError):
+            raise ValueError(f'{field}: start, stop and step must be numbers')
+        if not step > 0 or stop < start:
+            raise ValueError(f'{field}: step must be positive and stop must not be below start')
+
+        # Size the axis before allocating it so huge ranges are rejected cheaply
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        if count > max_points:
+            raise ValueError(f'{field}: {count} values exceeds the sweep limit of {max_points} points')
+        axis = np.round(start + step * np.arange(count), 10)
+
+    relative_to = spec.get('relative_to')
+    if relative_to is not None:
+        if relative_to not in SWEEP_FIELDS or not isinstance(base.get(relative_to), (int, float)):
+            raise ValueError(f'{field}: relative_to must name a numeric field of the base scenario')
+        axis = axis * base[relative_to]
+
+    if np.any(axis < 0) or not np.all(np.isfinite(axis)):
+        raise ValueError(f'{field}: sweep values must be finite and non-negative')
+
+    return field, axis
+
+
+def score_sweep_grid(base, axes):
+    """
+    Score the Cartesian product of sweep axes around a base scenario
+
+    Args:
+        base: Base financial record
+        axes: List of (field, values) pairs from parse_sweep_axis
+
+    Returns:
+        Array of clamped scores shaped by the axis lengths
+    """
+    shape = tuple(len(values) for _, values in axes)
+    matrix = np.tile(np.array(build_feature_row(base), dtype=np.float64), (int(np.prod(shape)), 1))
+
+    grids = np.meshgrid(*(values for _, values in axes), indexing='ij')
+    for (field, _), grid in zip(axes, grids):
+        matrix[:, model_registry.feature_names.index(SWEEP_FIELDS[field])] = grid.ravel()
+
+    # Same rounding and 0-100 clamp as clamp_score, applied to the whole grid
+    scores = np.clip(np.round(model_registry.predict(matrix), 2), 0, 100)
+    return scores.reshape(shape)
+
+
+@bp.route('/api/whatif/sweep', methods=['POST'])
+def what_if_sweep():
+    """
+    What-if sensitivity sweep endpoint
+    Scores a base scenario across a grid of parameter values in one batched
+    prediction, e.g. savings 0-40% of income x EMI 0-50% of income
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+
+    base = data.get('base', {})
+    parameters = data.get('parameters')
+    max_points = current_app.config['WHATIF_SWEEP_MAX_POINTS']
+
+    try:
+        if not isinstance(base, dict):
+            raise ValueError('base must be a JSON object')
+        if not isinstance(parameters, list) or not parameters:
+            raise ValueError('parameters must be a non-empty list')
+
+        # Swept fields may be omitted from the base scenario
+        error = validate_prediction_input({**{p.get('field'): 0 for p in parameters if isinstance(p, dict)}, **base})
+        if error:
+            raise ValueError(error)
+
+        axes = []
+        grid_size = 1
+        for spec in parameters:
+            field, values = parse_sweep_axis(spec, base, max_points)
+            if any(field == existing for existing, _ in axes):
+                raise ValueError(f'Duplicate sweep field: {field}')
+            grid_size *= len(values)
+            if grid_size > max_points:
+                raise ValueError(f'Sweep grid exceeds the limit of {max_points} points')
+            axes.append((field, values))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        base_score = clamp_score(model_registry.predict_one(build_feature_row(base)))
+        scores = score_sweep_grid(base, axes)
+        best = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        worst = np.unravel_index(int(np.argmin(scores)), scores.shape)
+
+        def grid_point(position):
+            return {field: float(values[i]) for (field, values), i in zip(axes, position)}
+
+        return jsonify({
+            'success': True,
+            'base_score': base_score,
+            'axes': [{'field': field, 'values': values.tolist()} for field, values in axes],
+            'shape': list(scores.shape),
+            'scores': scores.tolist(),
+            'best': {'score': float(scores[best]), 'point': grid_point(best)},
+            'worst': {'score': float(scores[worst]), 'point': grid_point(worst)}
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/model-info', methods=['GET'])
 def model_info():
     """Get information about the ML model"""
     return jsonify({
-        'model_type': model_data['model_type'],
-        'features': feature_names,
+        'model_type': model_registry.model_data['model_type'],
+        'features': model_registry.feature_names,
         'performance': {
-            'r2_score': model_metadata['r2_test'],
-            'mae': model_metadata['mae_test'],
-            'rmse': model_metadata['rmse_test']
-        }
+            'r2_score': model_registry.metadata['r2_test'],
+            'mae': model_registry.metadata['mae_test'],
+            'rmse': model_registry.metadata['rmse_test']
+        },
+        'model_load': model_registry.stats(),
+        'prediction_cache': prediction_cache.stats(),
+        'prediction_coalescer': prediction_coalescer.stats()
+    })
+
+
+@bp.route('/api/db/pool-stats', methods=['GET'])
+def db_pool_stats():
+    """Get shared SQLite connection pool, per-request SQL statement, write queue and score history statistics"""
+    return jsonify({
+        'success': True,
+        'pool': get_pool_stats(),
+        'requests': get_request_stats(),
+        'write_queue': get_write_queue_stats(),
+        'score_history': score_history_writer.stats()
     })
 
 
 # ==================== AUTH ENDPOINTS ====================
 
-@app.route('/register', methods=['POST'])
+@bp.route('/register', methods=['POST'])
 def register():
     """Register a new user and send email verification"""
     try:
@@ -883,27 +1071,21 @@ def register():
 
         # Create user (email_verified defaults to 0)
         password_hash = generate_password_hash(password)
-        cur.execute(
+        user_id = run_write(DB_PATH, lambda conn: conn.execute(
             'INSERT INTO users (username, password_hash, created_at, email_verified) VALUES (?, ?, ?, 0)',
             (username, password_hash, datetime.utcnow().isoformat())
-        )
-        db.commit()
-        
-        # Get the new user's ID
-        user_id = cur.lastrowid
+        ).lastrowid)
 
         # Send email verification OTP
-        from twilio_service import twilio_verify
         verification_result = twilio_verify.send_otp(username, 'email')
         
         if verification_result['success']:
             # Store verification expiry
             expires_at = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
-            cur.execute(
+            run_write(DB_PATH, lambda conn: conn.execute(
                 'UPDATE users SET email_verification_expires = ? WHERE id = ?',
                 (expires_at, user_id)
-            )
-            db.commit()
+            ))
 
         # Create tokens (user can login but will be prompted to verify email)
         access_token = create_access_token(identity=str(user_id))
@@ -925,7 +1107,7 @@ def register():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/login', methods=['POST'])
+@bp.route('/login', methods=['POST'])
 def login():
     """Login user and return JWT tokens"""
     try:
@@ -970,7 +1152,7 @@ def login():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/protected', methods=['GET'])
+@bp.route('/protected', methods=['GET'])
 @jwt_required()
 def protected():
     """Protected endpoint - requires valid JWT"""
@@ -978,7 +1160,7 @@ def protected():
     return jsonify({'message': 'Access granted', 'user_id': current_user_id}), 200
 
 
-@app.route('/refresh', methods=['POST'])
+@bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
     """Refresh access token"""
@@ -987,7 +1169,7 @@ def refresh():
     return jsonify({'token': new_access_token}), 200
 
 
-@app.route('/update-phone', methods=['POST'])
+@bp.route('/update-phone', methods=['POST'])
 @jwt_required()
 def update_phone():
     """
@@ -1012,13 +1194,10 @@ def update_phone():
                 return jsonify({'error': 'Invalid or expired OTP'}), 400
             
             # Update phone in database
-            db = get_db()
-            cur = db.cursor()
-            cur.execute(
+            run_write(DB_PATH, lambda conn: conn.execute(
                 'UPDATE users SET phone = ? WHERE id = ?',
                 (phone, current_user_id)
-            )
-            db.commit()
+            ))
             
             return jsonify({
                 'message': 'Phone number updated successfully',
@@ -1040,7 +1219,7 @@ def update_phone():
         return jsonify({'error': f'Failed to update phone: {str(e)}'}), 500
 
 
-@app.route('/get-phone', methods=['GET'])
+@bp.route('/get-phone', methods=['GET'])
 @jwt_required()
 def get_phone():
     """Get user's current phone number"""
@@ -1065,7 +1244,7 @@ def get_phone():
 
 # ==================== EMAIL VERIFICATION ENDPOINTS ====================
 
-@app.route('/send-email-verification', methods=['POST'])
+@bp.route('/send-email-verification', methods=['POST'])
 def send_email_verification():
     """
     Send email verification OTP to user's email
@@ -1101,17 +1280,15 @@ def send_email_verification():
             user_id = user['id']
         
         # Send OTP via Twilio Verify (email channel)
-        from twilio_service import twilio_verify
         result = twilio_verify.send_otp(email, 'email')
         
         if result['success']:
             # Store verification attempt timestamp
             expires_at = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
-            cur.execute(
+            run_write(DB_PATH, lambda conn: conn.execute(
                 'UPDATE users SET email_verification_expires = ? WHERE id = ?',
                 (expires_at, user_id)
-            )
-            db.commit()
+            ))
             
             return jsonify({
                 'message': 'Verification code sent to your email',
@@ -1125,7 +1302,7 @@ def send_email_verification():
         return jsonify({'error': f'Failed to send verification: {str(e)}'}), 500
 
 
-@app.route('/verify-email', methods=['POST'])
+@bp.route('/verify-email', methods=['POST'])
 def verify_email():
     """
     Verify email using OTP code
@@ -1163,16 +1340,14 @@ def verify_email():
                 return jsonify({'error': 'Verification code expired. Please request a new one.'}), 400
         
         # Verify OTP via Twilio
-        from twilio_service import twilio_verify
         result = twilio_verify.verify_otp(email, code)
         
         if result['success']:
             # Mark email as verified
-            cur.execute(
+            run_write(DB_PATH, lambda conn: conn.execute(
                 'UPDATE users SET email_verified = 1, email_verification_token = NULL, email_verification_expires = NULL WHERE id = ?',
                 (user['id'],)
-            )
-            db.commit()
+            ))
             
             return jsonify({
                 'message': 'Email verified successfully',
@@ -1185,7 +1360,7 @@ def verify_email():
         return jsonify({'error': f'Verification failed: {str(e)}'}), 500
 
 
-@app.route('/check-email-verification', methods=['GET'])
+@bp.route('/check-email-verification', methods=['GET'])
 @jwt_required()
 def check_email_verification():
     """Check if current user's email is verified"""
@@ -1211,7 +1386,7 @@ def check_email_verification():
 
 # ==================== PASSWORD RESET ENDPOINTS ====================
 
-@app.route('/forgot-password', methods=['POST'])
+@bp.route('/forgot-password', methods=['POST'])
 def forgot_password():
     """
     Generate a password reset code for the user
@@ -1250,21 +1425,22 @@ def forgot_password():
         created_at = datetime.utcnow()
         expires_at = created_at + timedelta(minutes=15)
         
-        # Invalidate any existing unused tokens for this user
-        cur.execute(
-            'UPDATE password_reset_tokens SET used = 1 WHERE user_id = ? AND used = 0',
-            (user_id,)
-        )
-        
-        # Insert new reset token
-        cur.execute(
-            '''INSERT INTO password_reset_tokens 
-               (user_id, reset_code, created_at, expires_at, used) 
-               VALUES (?, ?, ?, ?, 0)''',
-            (user_id, reset_code, created_at.isoformat(), expires_at.isoformat())
-        )
+        def write(conn):
+            # Invalidate any existing unused tokens for this user
+            conn.execute(
+                'UPDATE password_reset_tokens SET used = 1 WHERE user_id = ? AND used = 0',
+                (user_id,)
+            )
+            
+            # Insert new reset token
+            conn.execute(
+                '''INSERT INTO password_reset_tokens 
+                   (user_id, reset_code, created_at, expires_at, used) 
+                   VALUES (?, ?, ?, ?, 0)''',
+                (user_id, reset_code, created_at.isoformat(), expires_at.isoformat())
+            )
         
-        db.commit()
+        run_write(DB_PATH, write)
         
         # In a real app, send email here
         # For educational purposes, return the code
@@ -1278,7 +1454,7 @@ def forgot_password():
         return jsonify({'error': f'Failed to generate reset code: {str(e)}'}), 500
 
 
-@app.route('/verify-reset-code', methods=['POST'])
+@bp.route('/verify-reset-code', methods=['POST'])
 def verify_reset_code():
     """Verify if a reset code is valid"""
     try:
@@ -1326,7 +1502,7 @@ def verify_reset_code():
         return jsonify({'error': f'Verification failed: {str(e)}'}), 500
 
 
-@app.route('/reset-password', methods=['POST'])
+@bp.route('/reset-password', methods=['POST'])
 def reset_password():
     """Reset password using a valid reset code"""
     try:
@@ -1371,18 +1547,20 @@ def reset_password():
         
         # Update password
         new_password_hash = generate_password_hash(new_password)
-        cur.execute(
-            'UPDATE users SET password_hash = ? WHERE id = ?',
-            (new_password_hash, user_id)
-        )
         
-        # Mark token as used
-        cur.execute(
-            'UPDATE password_reset_tokens SET used = 1 WHERE id = ?',
-            (token['id'],)
-        )
+        def write(conn):
+            conn.execute(
+                'UPDATE users SET password_hash = ? WHERE id = ?',
+                (new_password_hash, user_id)
+            )
+            
+            # Mark token as used
+            conn.execute(
+                'UPDATE password_reset_tokens SET used = 1 WHERE id = ?',
+                (token['id'],)
+            )
         
-        db.commit()
+        run_write(DB_PATH, write)
         
         return jsonify({
             'message': 'Password reset successfully',
@@ -1398,12 +1576,11 @@ def reset_password():
 from profile_service import ProfileService
 from goals_service import GoalsService
 
-# Initialize services
-profile_service = ProfileService(DB_PATH)
-goals_service = GoalsService(DB_PATH)
+profile_service = app_service('profile_service')
+goals_service = app_service('goals_service')
 
 
-@app.route('/api/profile/create', methods=['POST'])
+@bp.route('/api/profile/create', methods=['POST'])
 @jwt_required()
 def create_profile():
     """
@@ -1438,7 +1615,7 @@ def create_profile():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
-@app.route('/api/profile', methods=['GET'])
+@bp.route('/api/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     """
@@ -1462,7 +1639,7 @@ def get_profile():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
-@app.route('/api/profile/update', methods=['PUT'])
+@bp.route('/api/profile/update', methods=['PUT'])
 @jwt_required()
 def update_profile():
     """
@@ -1497,10 +1674,10 @@ def update_profile():
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
 
-@app.route('/api/profile/upload-picture', methods=['POST'])
+@bp.route('/api/profile/upload-picture', methods=['POST'])
 @jwt_required()
 def upload_profile_picture():
     """
@@ -1528,16 +1705,16 @@ def upload_profile_picture():
         # Generate unique filename
         file_extension = file.filename.rsplit('.', 1)[1].lower()
         filename = f"user_{user_id}_{uuid.uuid4().hex}.{file_extension}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         
         # Ensure upload directory exists
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
         
         # Delete old profile picture if exists
         profile = profile_service.get_profile(user_id)
         if profile and profile.get('profile_picture_url'):
             old_filename = profile['profile_picture_url'].split('/')[-1]
-            old_filepath = os.path.join(app.config['UPLOAD_FOLDER'], old_filename)
+            old_filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], old_filename)
             if os.path.exists(old_filepath):
                 os.remove(old_filepath)
         
@@ -1559,7 +1736,7 @@ def upload_profile_picture():
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
 
-@app.route('/api/profile/delete-picture', methods=['DELETE'])
+@bp.route('/api/profile/delete-picture', methods=['DELETE'])
 @jwt_required()
 def delete_profile_picture():
     """
@@ -1577,7 +1754,7 @@ def delete_profile_picture():
         
         # Delete file from filesystem
         filename = profile['profile_picture_url'].split('/')[-1]
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         if os.path.exists(filepath):
             os.remove(filepath)
         
@@ -1592,14 +1769,14 @@ def delete_profile_picture():
         return jsonify({'error': f'Delete failed: {str(e)}'}), 500
 
 
-@app.route('/uploads/profile_pictures/<filename>')
+@bp.route('/uploads/profile_pictures/<filename>')
 def serve_profile_picture(filename):
     """Serve profile picture files"""
     from flask import send_from_directory
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
 
 
-@app.route('/api/profile/goals', methods=['POST'])
+@bp.route('/api/profile/goals', methods=['POST'])
 @jwt_required()
 def create_goal():
     """
@@ -1630,13 +1807,14 @@ def create_goal():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
-@app.route('/api/profile/goals', methods=['GET'])
+@bp.route('/api/profile/goals', methods=['GET'])
 @jwt_required()
 def get_goals():
     """
     Get all financial goals for the authenticated user
     Requires: JWT authentication
-    Query params: status (optional filter)
+    Query params: status (optional filter), limit + cursor (keyset pagination),
+    fields (comma-separated projection)
     """
     try:
         user_id = int(get_jwt_identity())
@@ -1644,20 +1822,27 @@ def get_goals():
         # Get optional status filter
         status = request.args.get('status')
         filters = {'status': status} if status else None
+        limit, cursor, fields = parse_page_args(request.args, GoalsService.GOAL_LIST_FIELDS)
         
         # Get goals
-        goals = goals_service.get_goals(user_id, filters)
+        page = goals_service.get_goals_page(user_id, limit, cursor, filters, fields)
+        goals = page['goals']
         
-        return jsonify({
+        response = {
             'goals': goals,
             'count': len(goals)
-        }), 200
+        }
+        if limit is not None:
+            response['next_cursor'] = page['next_cursor']
+        return jsonify(response), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
-@app.route('/api/profile/goals/<goal_id>', methods=['PUT'])
+@bp.route('/api/profile/goals/<goal_id>', methods=['PUT'])
 @jwt_required()
 def update_goal(goal_id):
     """
@@ -1686,14 +1871,14 @@ def update_goal(goal_id):
         error_msg = str(e)
         if 'not found' in error_msg.lower():
             return jsonify({'error': error_msg}), 404
-        elif 'not authorized' in error_msg.lower() or 'does not belong' in error_msg.lower():
+        elif any(s in error_msg.lower() for s in ('not authorized', 'does not belong', 'does not own')):
             return jsonify({'error': 'Not authorized to update this goal'}), 403
         return jsonify({'error': error_msg}), 400
     except Exception as e:
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
-@app.route('/api/profile/goals/<goal_id>', methods=['DELETE'])
+@bp.route('/api/profile/goals/<goal_id>', methods=['DELETE'])
 @jwt_required()
 def delete_goal(goal_id):
     """
@@ -1715,7 +1900,7 @@ def delete_goal(goal_id):
         
     except ValueError as e:
         error_msg = str(e)
-        if 'not authorized' in error_msg.lower() or 'does not belong' in error_msg.lower():
+        if any(s in error_msg.lower() for s in ('not authorized', 'does not belong', 'does not own')):
             return jsonify({'error': 'Not authorized to delete this goal'}), 403
         return jsonify({'error': error_msg}), 400
     except Exception as e:
@@ -1724,7 +1909,7 @@ def delete_goal(goal_id):
 
 # ==================== INVESTMENT CALCULATORS ====================
 
-@app.route('/api/sip-calculator', methods=['POST'])
+@bp.route('/api/sip-calculator', methods=['POST'])
 def calculate_sip():
     """
     Calculate SIP (Systematic Investment Plan) returns
@@ -1810,7 +1995,7 @@ def calculate_sip():
         return jsonify({'error': f'Calculation error: {str(e)}'}), 500
 
 
-@app.route('/api/lumpsum-calculator', methods=['POST'])
+@bp.route('/api/lumpsum-calculator', methods=['POST'])
 def calculate_lumpsum():
     """
     Calculate Lumpsum investment returns
@@ -1888,9 +2073,10 @@ def calculate_lumpsum():
 
 # ==================== TWILIO OTP ENDPOINTS ====================
 
-from twilio_service import twilio_verify
+# Also used by the login, phone and email verification endpoints above
+twilio_verify = app_service('twilio_verify')
 
-@app.route('/send-otp', methods=['POST'])
+@bp.route('/send-otp', methods=['POST'])
 def send_otp():
     """
     Send OTP via Twilio Verify
@@ -1927,7 +2113,7 @@ def send_otp():
         return jsonify({'error': f'Failed to send OTP: {str(e)}'}), 500
 
 
-@app.route('/verify-otp', methods=['POST'])
+@bp.route('/verify-otp', methods=['POST'])
 def verify_otp():
     """
     Verify OTP code via Twilio Verify
@@ -1959,7 +2145,7 @@ def verify_otp():
         return jsonify({'error': f'Failed to verify OTP: {str(e)}'}), 500
 
 
-@app.route('/register-with-otp', methods=['POST'])
+@bp.route('/register-with-otp', methods=['POST'])
 def register_with_otp():
     """
     Register a new user with OTP verification
@@ -1997,13 +2183,10 @@ def register_with_otp():
         
         # Create user
         password_hash = generate_password_hash(password)
-        cur.execute(
+        user_id = run_write(DB_PATH, lambda conn: conn.execute(
             'INSERT INTO users (username, password_hash) VALUES (?, ?)',
             (email, password_hash)
-        )
-        db.commit()
-        
-        user_id = cur.lastrowid
+        ).lastrowid)
         
         # Generate tokens
         access_token = create_access_token(identity=user_id)
@@ -2024,7 +2207,7 @@ def register_with_otp():
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
 
 
-@app.route('/forgot-password-otp', methods=['POST'])
+@bp.route('/forgot-password-otp', methods=['POST'])
 def forgot_password_otp():
     """
     SECURE Password reset with Twilio OTP
@@ -2065,11 +2248,10 @@ def forgot_password_otp():
             
             # Reset password
             password_hash = generate_password_hash(new_password)
-            cur.execute(
+            run_write(DB_PATH, lambda conn: conn.execute(
                 'UPDATE users SET password_hash = ? WHERE id = ?',
                 (password_hash, user['id'])
-            )
-            db.commit()
+            ))
             
             return jsonify({'message': 'Password reset successfully'}), 200
         
@@ -2097,13 +2279,12 @@ from loan_history_service import LoanHistoryService, ValidationError as LoanVali
 from loan_metrics_engine import LoanMetricsEngine
 from loan_data_serializer import LoanDataSerializer, ParseError
 
-# Initialize loan services
-loan_service = LoanHistoryService(DB_PATH)
-loan_metrics = LoanMetricsEngine(DB_PATH)
-loan_serializer = LoanDataSerializer()
+loan_service = app_service('loan_service')
+loan_metrics = app_service('loan_metrics')
+loan_serializer = app_service('loan_serializer')
 
 
-@app.route('/api/loans', methods=['POST'])
+@bp.route('/api/loans', methods=['POST'])
 @jwt_required()
 def create_loan():
     """
@@ -2158,12 +2339,13 @@ def create_loan():
         }), 500
 
 
-@app.route('/api/loans/user/<int:user_id>', methods=['GET'])
+@bp.route('/api/loans/user/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user_loans(user_id):
     """
-    Get all loans for a specific user
+    Get all loans for a specific user, newest first
     Requires: JWT authentication + ownership check
+    Query: limit + cursor (keyset pagination), fields (comma-separated projection)
     """
     try:
         current_user_id = int(get_jwt_identity())
@@ -2176,15 +2358,26 @@ def get_user_loans(user_id):
                 'message': 'Not authorized to access this user\'s loans'
             }), 403
         
+        limit, cursor, fields = parse_page_args(request.args, LoanHistoryService.LOAN_LIST_FIELDS)
+        
         # Get loans
-        loans = loan_service.getLoansByUser(user_id)
+        page = loan_service.getLoansPage(user_id, limit, cursor, fields)
+        loans = page['loans']
         
         logger.info(f"Retrieved {len(loans)} loans for user {user_id}")
-        return jsonify({
+        response = {
             'loans': loans,
             'count': len(loans)
-        }), 200
+        }
+        if limit is not None:
+            response['next_cursor'] = page['next_cursor']
+        return jsonify(response), 200
         
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad request',
+            'message': str(e)
+        }), 400
     except sqlite3.Error as e:
         logger.error(f"Database error retrieving loans for user {user_id}: {str(e)}")
         return jsonify({
@@ -2199,7 +2392,7 @@ def get_user_loans(user_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>', methods=['GET'])
+@bp.route('/api/loans/<loan_id>', methods=['GET'])
 @jwt_required()
 def get_loan(loan_id):
     """
@@ -2252,7 +2445,7 @@ def get_loan(loan_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>', methods=['PUT'])
+@bp.route('/api/loans/<loan_id>', methods=['PUT'])
 @jwt_required()
 def update_loan(loan_id):
     """
@@ -2327,7 +2520,7 @@ def update_loan(loan_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>', methods=['DELETE'])
+@bp.route('/api/loans/<loan_id>', methods=['DELETE'])
 @jwt_required()
 def delete_loan(loan_id):
     """
@@ -2379,7 +2572,7 @@ def delete_loan(loan_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>/payments', methods=['POST'])
+@bp.route('/api/loans/<loan_id>/payments', methods=['POST'])
 @jwt_required()
 def record_payment(loan_id):
     """
@@ -2401,24 +2594,8 @@ def record_payment(loan_id):
                 'message': 'Please provide payment data in JSON format'
             }), 400
         
-        # Check loan exists and user owns it
-        loan = loan_service.getLoan(loan_id)
-        if loan is None:
-            logger.warning(f"Loan not found for payment: {loan_id}")
-            return jsonify({
-                'error': 'Not found',
-                'message': 'Loan not found'
-            }), 404
-        
-        if loan['user_id'] != current_user_id:
-            logger.warning(f"User {current_user_id} attempted to record payment for loan {loan_id} owned by user {loan['user_id']}")
-            return jsonify({
-                'error': 'Forbidden',
-                'message': 'Not authorized to record payment for this loan'
-            }), 403
-        
-        # Record payment
-        payment = loan_service.recordPayment(loan_id, data)
+        # Record payment (ownership is checked on the loan row the service already reads)
+        payment = loan_service.recordPayment(loan_id, data, current_user_id)
         
         logger.info(f"Payment recorded successfully: {payment['payment_id']} for loan {loan_id}")
         return jsonify({
@@ -2435,10 +2612,17 @@ def record_payment(loan_id):
             'code': e.code
         }), 400
     except ValueError as e:
-        logger.error(f"Value error recording payment for loan {loan_id}: {str(e)}")
+        error_msg = str(e)
+        if 'does not own' in error_msg.lower():
+            logger.warning(f"User {current_user_id} attempted to record payment for loan {loan_id} without ownership")
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Not authorized to record payment for this loan'
+            }), 403
+        logger.error(f"Value error recording payment for loan {loan_id}: {error_msg}")
         return jsonify({
             'error': 'Not found',
-            'message': str(e)
+            'message': error_msg
         }), 404
     except sqlite3.Error as e:
         logger.error(f"Database error recording payment for loan {loan_id}: {str(e)}")
@@ -2454,41 +2638,120 @@ def record_payment(loan_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>/payments', methods=['GET'])
+@bp.route('/api/loans/payments/bulk', methods=['POST'])
 @jwt_required()
-def get_payment_history(loan_id):
+def record_payments_bulk():
     """
-    Get payment history for a loan
-    Requires: JWT authentication + loan ownership check
+    Bulk payment import for one or more loans
+    Requires: JWT authentication; every loan must belong to the caller
+    Body: JSON array, {"payments": [...]} object, or NDJSON, one payment per
+          item with loan_id, payment_date, payment_amount
+    Valid rows are inserted in one transaction; invalid rows are reported by
+    index without aborting the batch
     """
     try:
         current_user_id = int(get_jwt_identity())
+        max_rows = current_app.config['BULK_PAYMENT_MAX_ROWS']
         
-        # Check loan exists and user owns it
-        loan = loan_service.getLoan(loan_id)
-        if loan is None:
-            logger.warning(f"Loan not found for payment history: {loan_id}")
+        rows = []
+        parse_errors = {}
+        for index, record in enumerate(_iter_batch_records('payments')):
+            if index >= max_rows:
+                return jsonify({
+                    'error': 'Too many payments',
+                    'message': f'A bulk import is limited to {max_rows} payments'
+                }), 400
+            if isinstance(record, ParseFailure):
+                parse_errors[index] = record.message
+                record = None
+            rows.append(record)
+        
+        if not rows:
             return jsonify({
-                'error': 'Not found',
-                'message': 'Loan not found'
-            }), 404
+                'error': 'Request body is required',
+                'message': 'Please provide at least one payment'
+            }), 400
         
-        if loan['user_id'] != current_user_id:
-            logger.warning(f"User {current_user_id} attempted to access payment history for loan {loan_id} owned by user {loan['user_id']}")
+        result = loan_service.recordPaymentsBulk(current_user_id, rows)
+        
+        # Undecodable NDJSON lines reach the service as empty rows
+        for error in result['errors']:
+            if error['index'] in parse_errors:
+                error.update(field='payment', message=parse_errors[error['index']], code='INVALID_JSON')
+        
+        logger.info(f"Bulk payment import for user {current_user_id}: "
+                    f"{result['inserted']} inserted, {result['failed']} failed")
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid request body',
+            'message': str(e)
+        }), 400
+    except sqlite3.Error as e:
+        logger.error(f"Database error in bulk payment import: {str(e)}")
+        return jsonify({
+            'error': 'Database error',
+            'message': 'Failed to import payments. No payments were recorded.'
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in bulk payment import: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred. Please try again later.'
+        }), 500
+
+
+@bp.route('/api/loans/<loan_id>/payments', methods=['GET'])
+@jwt_required()
+def get_payment_history(loan_id):
+    """
+    Get payment history for a loan, oldest first
+    Requires: JWT authentication + loan ownership check
+    Query: limit + cursor (keyset pagination), fields (comma-separated projection)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        try:
+            limit, cursor, fields = parse_page_args(request.args, LoanHistoryService.PAYMENT_LIST_FIELDS)
+        except ValueError as e:
             return jsonify({
-                'error': 'Forbidden',
-                'message': 'Not authorized to access payment history for this loan'
-            }), 403
+                'error': 'Bad request',
+                'message': str(e)
+            }), 400
         
-        # Get payment history
-        payments = loan_service.getPaymentHistory(loan_id)
+        # Get payment history (the owner is read in the same query)
+        page = loan_service.getPaymentHistoryPage(loan_id, limit, cursor, current_user_id, fields)
+        payments = page['payments']
         
         logger.info(f"Retrieved {len(payments)} payments for loan {loan_id}")
-        return jsonify({
+        response = {
             'payments': payments,
             'count': len(payments)
-        }), 200
+        }
+        if limit is not None:
+            response['next_cursor'] = page['next_cursor']
+        return jsonify(response), 200
         
+    except ValueError as e:
+        error_msg = str(e)
+        if error_msg == 'Invalid cursor':
+            return jsonify({
+                'error': 'Bad request',
+                'message': error_msg
+            }), 400
+        if 'does not own' in error_msg.lower():
+            logger.warning(f"User {current_user_id} attempted to access payment history for loan {loan_id} without ownership")
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Not authorized to access payment history for this loan'
+            }), 403
+        logger.warning(f"Loan not found for payment history: {loan_id}")
+        return jsonify({
+            'error': 'Not found',
+            'message': 'Loan not found'
+        }), 404
     except sqlite3.Error as e:
         logger.error(f"Database error retrieving payment history for loan {loan_id}: {str(e)}")
         return jsonify({
@@ -2503,34 +2766,105 @@ def get_payment_history(loan_id):
         }), 500
 
 
-@app.route('/api/loans/<loan_id>/payments/<payment_id>', methods=['DELETE'])
+@bp.route('/api/loans/<loan_id>/schedule', methods=['GET'])
 @jwt_required()
-def delete_payment(loan_id, payment_id):
+def get_amortization_schedule(loan_id):
     """
-    Delete a payment record
+    Get the amortization schedule of a loan with its payment progress
     Requires: JWT authentication + loan ownership check
     """
     try:
         current_user_id = int(get_jwt_identity())
         
-        # Check loan exists and user owns it
-        loan = loan_service.getLoan(loan_id)
-        if loan is None:
-            logger.warning(f"Loan not found for payment deletion: {loan_id}")
+        schedule = loan_service.getAmortizationSchedule(loan_id, current_user_id)
+        if schedule is None:
+            logger.warning(f"Loan not found for schedule: {loan_id}")
             return jsonify({
                 'error': 'Not found',
                 'message': 'Loan not found'
             }), 404
         
-        if loan['user_id'] != current_user_id:
-            logger.warning(f"User {current_user_id} attempted to delete payment for loan {loan_id} owned by user {loan['user_id']}")
+        logger.info(f"Retrieved {len(schedule['schedule'])}-month schedule for loan {loan_id}")
+        return jsonify(schedule), 200
+        
+    except ValueError as e:
+        logger.warning(f"User {current_user_id} attempted to access schedule for loan {loan_id} without ownership")
+        return jsonify({
+            'error': 'Forbidden',
+            'message': 'Not authorized to access the schedule for this loan'
+        }), 403
+    except sqlite3.Error as e:
+        logger.error(f"Database error retrieving schedule for loan {loan_id}: {str(e)}")
+        return jsonify({
+            'error': 'Database error',
+            'message': 'Failed to retrieve schedule. Please try again later.'
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error retrieving schedule for loan {loan_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred. Please try again later.'
+        }), 500
+
+
+@bp.route('/api/loans/user/<int:user_id>/projection', methods=['GET'])
+@jwt_required()
+def get_loan_projection(user_id):
+    """
+    Project combined EMIs and outstanding principal across a user's loans
+    Requires: JWT authentication + ownership check
+    Query: months (optional, 1-600; defaults to the last scheduled EMI)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        # Check ownership - users can only access their own loans
+        if current_user_id != user_id:
+            logger.warning(f"User {current_user_id} attempted to access loan projection for user {user_id}")
             return jsonify({
                 'error': 'Forbidden',
-                'message': 'Not authorized to delete payment for this loan'
+                'message': 'Not authorized to access this user\'s loans'
             }), 403
         
-        # Delete the payment
-        deleted = loan_service.deletePayment(payment_id, loan_id)
+        months = request.args.get('months', type=int)
+        if 'months' in request.args and (months is None or not 1 <= months <= 600):
+            return jsonify({
+                'error': 'Validation failed',
+                'field': 'months',
+                'message': 'months must be an integer between 1 and 600'
+            }), 400
+        
+        projection = loan_service.getLoanProjection(user_id, months)
+        
+        logger.info(f"Projected {len(projection['months'])} months across {projection['loan_count']} loans for user {user_id}")
+        return jsonify(projection), 200
+        
+    except sqlite3.Error as e:
+        logger.error(f"Database error projecting loans for user {user_id}: {str(e)}")
+        return jsonify({
+            'error': 'Database error',
+            'message': 'Failed to project loans. Please try again later.'
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error projecting loans for user {user_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred. Please try again later.'
+        }), 500
+
+
+@bp.route('/api/loans/<loan_id>/payments/<payment_id>', methods=['DELETE'])
+@jwt_required()
+def delete_payment(loan_id, payment_id):
+    """
+    Delete a payment record
+    Requires: JWT authentication + loan ownership check
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        # Delete the payment (loan ownership is part of the DELETE)
+        deleted = loan_service.deletePayment(payment_id, loan_id, current_user_id)
         
         if not deleted:
             logger.warning(f"Payment not found for deletion: {payment_id}")
@@ -2546,10 +2880,23 @@ def delete_payment(loan_id, payment_id):
         }), 200
         
     except ValueError as e:
-        logger.warning(f"Validation error deleting payment {payment_id}: {str(e)}")
+        error_msg = str(e)
+        if 'does not own' in error_msg.lower():
+            logger.warning(f"User {current_user_id} attempted to delete payment for loan {loan_id} without ownership")
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Not authorized to delete payment for this loan'
+            }), 403
+        if 'not found' in error_msg.lower():
+            logger.warning(f"Loan not found for payment deletion: {loan_id}")
+            return jsonify({
+                'error': 'Not found',
+                'message': 'Loan not found'
+            }), 404
+        logger.warning(f"Validation error deleting payment {payment_id}: {error_msg}")
         return jsonify({
             'error': 'Validation error',
-            'message': str(e)
+            'message': error_msg
         }), 400
     except sqlite3.Error as e:
         logger.error(f"Database error deleting payment {payment_id}: {str(e)}")
@@ -2565,12 +2912,12 @@ def delete_payment(loan_id, payment_id):
         }), 500
 
 
-@app.route('/api/loans/metrics/<int:user_id>', methods=['GET'])
+@bp.route('/api/loans/metrics/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_loan_metrics(user_id):
     """
     Get calculated loan metrics for a user
-    Uses cached metrics if available and recent (within 5 minutes)
+    Computed from running counters kept current on every loan/payment write
     Requires: JWT authentication + ownership check
     Returns: loan_diversity_score, payment_history_score, loan_maturity_score,
              payment_statistics, loan_statistics
@@ -2586,90 +2933,17 @@ def get_loan_metrics(user_id):
                 'message': 'Not authorized to access this user\'s metrics'
             }), 403
         
-        # Check if cached metrics exist and are recent (within 5 minutes)
-        db = get_db()
-        cur = db.cursor()
-        
-        cur.execute('''
-            SELECT loan_diversity_score, payment_history_score, loan_maturity_score,
-                   payment_statistics, loan_statistics, calculated_at
-            FROM loan_metrics
-            WHERE user_id = ?
-        ''', (user_id,))
-        
-        cached_row = cur.fetchone()
-        
-        if cached_row:
-            cached_data = row_to_dict(cached_row)
-            calculated_at = datetime.fromisoformat(cached_data['calculated_at'].replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            
-            # If cache is less than 5 minutes old, use it
-            if (now - calculated_at).total_seconds() < 300:
-                logger.info(f"Using cached metrics for user {user_id}")
-                
-                # Parse JSON fields
-                payment_stats = json.loads(cached_data['payment_statistics']) if cached_data['payment_statistics'] else {}
-                loan_stats = json.loads(cached_data['loan_statistics']) if cached_data['loan_statistics'] else {}
-                
-                metrics = {
-                    'loan_diversity_score': cached_data['loan_diversity_score'],
-                    'payment_history_score': cached_data['payment_history_score'],
-                    'loan_maturity_score': cached_data['loan_maturity_score'],
-                    'payment_statistics': payment_stats,
-                    'loan_statistics': loan_stats,
-                    'calculated_at': cached_data['calculated_at'],
-                    'cached': True
-                }
-                
-                return jsonify({
-                    'metrics': metrics
-                }), 200
-        
-        # Cache is stale or doesn't exist, recalculate
-        logger.info(f"Recalculating metrics for user {user_id}")
-        
-        loan_diversity_score = loan_metrics.calculateLoanDiversityScore(user_id)
-        payment_history_score = loan_metrics.calculatePaymentHistoryScore(user_id)
-        loan_maturity_score = loan_metrics.calculateLoanMaturityScore(user_id)
-        
-        # Get statistics
-        payment_statistics = loan_metrics.getPaymentStatistics(user_id)
-        loan_statistics = loan_metrics.getLoanStatistics(user_id)
-        
-        # Store in cache
-        now = datetime.now(timezone.utc).isoformat()
-        payment_stats_json = json.dumps(payment_statistics)
-        loan_stats_json = json.dumps(loan_statistics)
-        
-        try:
-            cur.execute('''
-                INSERT OR REPLACE INTO loan_metrics
-                (user_id, loan_diversity_score, payment_history_score, loan_maturity_score,
-                 payment_statistics, loan_statistics, calculated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id,
-                loan_diversity_score,
-                payment_history_score,
-                loan_maturity_score,
-                payment_stats_json,
-                loan_stats_json,
-                now
-            ))
-            db.commit()
-            logger.info(f"Cached metrics for user {user_id}")
-        except sqlite3.Error as e:
-            logger.warning(f"Failed to cache metrics for user {user_id}: {str(e)}")
-            # Continue anyway, just don't cache
+        # Scores and statistics read from the trigger-maintained counters, so
+        # they are always current without a TTL cache
+        all_metrics = loan_metrics.computeAllMetrics(user_id)
         
         metrics = {
-            'loan_diversity_score': loan_diversity_score,
-            'payment_history_score': payment_history_score,
-            'loan_maturity_score': loan_maturity_score,
-            'payment_statistics': payment_statistics,
-            'loan_statistics': loan_statistics,
-            'calculated_at': now,
+            'loan_diversity_score': all_metrics['loan_diversity_score'],
+            'payment_history_score': all_metrics['payment_history_score'],
+            'loan_maturity_score': all_metrics['loan_maturity_score'],
+            'payment_statistics': all_metrics['payment_statistics'],
+            'loan_statistics': all_metrics['loan_statistics'],
+            'calculated_at': datetime.now(timezone.utc).isoformat(),
             'cached': False
         }
         
@@ -2692,15 +2966,270 @@ def get_loan_metrics(user_id):
         }), 500
 
 
+# ==================== FINANCIAL HEALTH SCORE ENDPOINTS ====================
+
+from financial_health_scorer import FinancialHealthScorer
+
+health_scorer = app_service('health_scorer')
+
+
+@bp.route('/api/score/history/<int:user_id>', methods=['GET'])
+@jwt_required()
+def get_score_history(user_id):
+    """
+    Get a user's score history, newest first
+    Requires: JWT authentication + ownership check
+    Query: limit (optional, 1-100, default 10)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        # Check ownership - users can only access their own history
+        if current_user_id != user_id:
+            logger.warning(f"User {current_user_id} attempted to access score history for user {user_id}")
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Not authorized to access this user\'s score history'
+            }), 403
+        
+        limit = request.args.get('limit', 10, type=int)
+        if not 1 <= limit <= 100:
+            return jsonify({
+                'error': 'Validation failed',
+                'field': 'limit',
+                'message': 'limit must be an integer between 1 and 100'
+            }), 400
+        
+        history = health_scorer.getScoreHistory(user_id, limit)
+        
+        logger.info(f"Retrieved {len(history)} score history entries for user {user_id}")
+        return jsonify({
+            'history': history,
+            'count': len(history)
+        }), 200
+        
+    except sqlite3.Error as e:
+        logger.error(f"Database error retrieving score history for user {user_id}: {str(e)}")
+        return jsonify({
+            'error': 'Database error',
+            'message': 'Failed to retrieve score history. Please try again later.'
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error retrieving score history for user {user_id}: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred. Please try again later.'
+        }), 500
+
+
+
+@bp.route('/api/score/full', methods=['POST'])
+@jwt_required()
+def get_full_score():
+    """
+    Score the current user once and return score, breakdown and loan delta
+    Requires: JWT authentication
+    Body: income, emi, savings (required); rent, food, travel, shopping, age (optional)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True)
+        
+        error = validate_prediction_input(data)
+        if error is None:
+            for field in ['rent', 'food', 'travel', 'shopping', 'age']:
+                if field in data and (not isinstance(data[field], (int, float)) or data[field] < 0):
+                    error = f'Invalid value for {field}. Must be non-negative number.'
+                    break
+        if error:
+            return jsonify({'error': 'Validation failed', 'message': error}), 400
+        
+        financial_data = {
+            field: data.get(field, default)
+            for field, default in FinancialHealthScorer.FINANCIAL_DEFAULTS.items()
+        }
+        
+        # One scoring pass; breakdown and delta are derived from the same factors
+        result = health_scorer.scoreUser(current_user_id, financial_data)
+        
+        logger.info(f"Calculated full financial health score for user {current_user_id}")
+        return jsonify({
+            'score': result.to_dict(),
+            'breakdown': result.breakdown(),
+            'delta': result.delta()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Unexpected error calculating full score: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred. Please try again later.'
+        }), 500
+
+# ==================== DATA EXPORT ENDPOINTS ====================
+
+from export_service import ExportService, gzip_stream
+
+export_service = app_service('export_service')
+
+
+@bp.route('/api/export', methods=['GET'])
+@jwt_required()
+def export_user_data():
+    """
+    Stream the caller's profile, loans, payments and goals
+    Requires: JWT authentication
+    Query: format (ndjson or csv, default ndjson), sections (comma-separated;
+    default all, exactly one for csv), compress=gzip (also used when the
+    client sends Accept-Encoding: gzip)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        fmt = request.args.get('format', 'ndjson')
+        sections = export_service.parse_sections(request.args.get('sections'), fmt)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad request',
+            'message': str(e)
+        }), 400
+    
+    if fmt == 'csv':
+        chunks = export_service.iter_csv(current_user_id, sections[0])
+        mimetype, filename = 'text/csv', f'smartfin-{sections[0]}-{current_user_id}.csv'
+    else:
+        chunks = export_service.iter_ndjson(current_user_id, sections)
+        mimetype, filename = 'application/x-ndjson', f'smartfin-export-{current_user_id}.ndjson'
+    
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"', 'Vary': 'Accept-Encoding'}
+    if request.args.get('compress') == 'gzip' or request.accept_encodings['gzip'] > 0:
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    logger.info(f"Streaming {fmt} export of {', '.join(sections)} for user {current_user_id}")
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+# ==================== APP FACTORY ====================
+
+def create_app(config=None, preload_model=None):
+    """
+    Create and configure a SmartFin Flask app
+
+    Importing this module only defines the routes; logging, the services, the
+    schema check and the model load are all set up here (the model otherwise
+    loads lazily on first use). With preload_model the model is loaded before
+    returning, so a pre-forking server that calls create_app() in its master
+    process shares the model's pages with every worker.
+
+    Args:
+        config: Optional overrides applied to app.config
+        preload_model: Load the model now (defaults to SMARTFIN_PRELOAD_MODEL=1)
+
+    Returns:
+        A new Flask app
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)  # orjson-encoded responses when available (JSON_BACKEND)
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'smartfin-secret-key-change-in-production')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+
+    # Log calls only enqueue; a listener thread writes JSON lines to the console
+    # and LOG_FILE, flushing every LOG_FLUSH_INTERVAL seconds
+    app.config['LOG_FILE'] = 'backend.log'
+
+    # File upload configuration
+    app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'profile_pictures')
+    app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
+    app.config['ALLOWED_EXTENSIONS'] = {'jpg', 'jpeg', 'png', 'webp'}
+
+    # Batch prediction configuration
+    app.config['PREDICT_BATCH_CHUNK_SIZE'] = int(os.environ.get('PREDICT_BATCH_CHUNK_SIZE', 1000))  # records per prediction call
+    app.config['WHATIF_SWEEP_MAX_POINTS'] = int(os.environ.get('WHATIF_SWEEP_MAX_POINTS', 10000))  # grid cells per sweep
+    app.config['PREDICTION_CACHE_SIZE'] = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))  # 0 disables the cache
+    app.config['PREDICTION_CACHE_TTL'] = float(os.environ.get('PREDICTION_CACHE_TTL', 300))  # seconds
+    app.config['PREDICTION_COALESCE_WINDOW_MS'] = float(os.environ.get('PREDICTION_COALESCE_WINDOW_MS', 2.0))  # 0 disables coalescing
+    app.config['PREDICTION_COALESCE_MAX_BATCH'] = int(os.environ.get('PREDICTION_COALESCE_MAX_BATCH', 256))  # rows per coalesced call
+    app.config['BULK_PAYMENT_MAX_ROWS'] = int(os.environ.get('BULK_PAYMENT_MAX_ROWS', 50000))  # payments per bulk import
+
+    if config:
+        app.config.update(config)
+
+    configure_logging(app.config['LOG_FILE'])
+
+    # Force print to console
+    print("\n" + "="*80, file=sys.stdout, flush=True)
+    print("SMARTFIN BACKEND LOGGING INITIALIZED", file=sys.stdout, flush=True)
+    print("="*80 + "\n", file=sys.stdout, flush=True)
+
+    JWTManager(app)
+
+    CORS(app,
+         origins=["https://saumye0106.github.io", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:3000"],
+         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+         allow_headers=["Content-Type", "Authorization"],
+         supports_credentials=True)
+
+    app.register_blueprint(bp)
+    app.teardown_appcontext(close_connection)
+
+    # Repeated dashboard payloads skip inference and the rule pipeline; entries
+    # are tied to the content hash of the loaded model file
+    cache = PredictionCache(max_size=app.config['PREDICTION_CACHE_SIZE'],
+                            ttl_seconds=app.config['PREDICTION_CACHE_TTL'])
+
+    # The model is loaded on first use (or by preload_model) from the sklearn
+    # pkl; SMARTFIN_MODEL_FORMAT=compiled opts into the flat-array artifact,
+    # which is faster for single rows but slower for batches
+    registry = ModelRegistry(
+        DATA_DIR, on_load=lambda loaded: cache.set_model_version(model_version_for(loaded.model_path))
+    )
+
+    # Concurrent cache misses are scored together in micro-batches; a lone
+    # request is predicted directly on its own thread
+    coalescer = PredictionCoalescer(registry.predict, registry.predict_one,
+                                    window_ms=app.config['PREDICTION_COALESCE_WINDOW_MS'],
+                                    max_batch=app.config['PREDICTION_COALESCE_MAX_BATCH'])
+
+    # twilio.rest pulls in requests/urllib3, so the client is only built here
+    from twilio_service import twilio_verify
+
+    # Looked up by the app_service() proxies the routes use
+    app.extensions['smartfin'] = {
+        'prediction_cache': cache,
+        'model_registry': registry,
+        'prediction_coalescer': coalescer,
+        'profile_service': ProfileService(DB_PATH),
+        'goals_service': GoalsService(DB_PATH),
+        'loan_service': LoanHistoryService(DB_PATH),
+        'loan_metrics': LoanMetricsEngine(DB_PATH),
+        'loan_serializer': LoanDataSerializer(),
+        'health_scorer': FinancialHealthScorer(DB_PATH),
+        'export_service': ExportService(DB_PATH),
+        'twilio_verify': twilio_verify
+    }
+
+    ensure_schema()
+
+    if preload_model is None:
+        preload_model = os.environ.get('SMARTFIN_PRELOAD_MODEL', '0') == '1'
+    if preload_model:
+        registry.preload_for_fork()
+
+    return app
+
+
 # ==================== RUN SERVER ====================
 if __name__ == '__main__':
+    app = create_app(preload_model=True)
+    registry = app.extensions['smartfin']['model_registry']
+
     print("\n" + "="*60)
     print("SmartFin Backend Server Starting...")
     print("="*60)
-    print(f"Model: {model_data['model_type']}")
-    print(f"Accuracy: {model_metadata['r2_test']:.2%}")
+    print(f"Model: {registry.model_data['model_type']}")
+    print(f"Accuracy: {registry.metadata['r2_test']:.2%}")
     print("="*60 + "\n")
-
     # Configure all loggers to output to console
     import logging as werkzeug_logging
     
@@ -0,0 +1,447 @@
+"""
+Baseline_Schema - The schema of version 1 (the 'baseline' migration), frozen
+Literal copies of the DDL that create_loan_schema and the old init_db ran when
+versioned migrations were introduced. Applied migrations must never change, so
+later schema work goes into new migrations and db_utils, never into this module
+"""
+
+
+# User, profile, password reset and goal tables with their single-column indexes
+USER_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        phone TEXT,
+        email_verified INTEGER DEFAULT 0,
+        email_verification_token TEXT,
+        email_verification_expires TEXT,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS password_reset_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        reset_code TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        used INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users_profile (
+        user_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL CHECK (age >= 18 AND age <= 120),
+        location TEXT NOT NULL,
+        risk_tolerance INTEGER CHECK (risk_tolerance >= 1 AND risk_tolerance <= 10),
+        profile_picture_url TEXT,
+        notification_preferences TEXT DEFAULT '{"email": true, "push": false, "in_app": true, "frequency": "daily"}',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS financial_goals (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        goal_type TEXT NOT NULL CHECK (goal_type IN ('short-term', 'long-term')),
+        target_amount REAL NOT NULL CHECK (target_amount > 0),
+        target_date TEXT NOT NULL,
+        priority TEXT NOT NULL CHECK (priority IN ('low', 'medium', 'high')),
+        status TEXT DEFAULT 'active' CHECK (status IN ('active', 'completed', 'cancelled')),
+        description TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users_profile(user_id) ON DELETE CASCADE
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_users_profile_user_id ON users_profile(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_id ON financial_goals(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_priority ON financial_goals(priority)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_status ON financial_goals(status)',
+    'CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_user_id ON password_reset_tokens(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_code ON password_reset_tokens(reset_code)'
+]
+
+
+# Columns added to users by the old misc/migrate_add_*.py scripts
+USERS_ADDED_COLUMNS = [
+    ('phone', 'TEXT'),
+    ('email_verified', 'INTEGER DEFAULT 0'),
+    ('email_verification_token', 'TEXT'),
+    ('email_verification_expires', 'TEXT')
+]
+
+
+# Loan tables and their single-column indexes
+LOAN_TABLE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS loans (
+        loan_id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        loan_type TEXT NOT NULL CHECK (loan_type IN ('personal', 'home', 'auto', 'education')),
+        loan_amount REAL NOT NULL CHECK (loan_amount > 0),
+        loan_tenure INTEGER NOT NULL CHECK (loan_tenure > 0),
+        monthly_emi REAL NOT NULL CHECK (monthly_emi > 0),
+        interest_rate REAL NOT NULL CHECK (interest_rate >= 0 AND interest_rate <= 50),
+        loan_start_date TEXT NOT NULL,
+        loan_maturity_date TEXT NOT NULL,
+        default_status INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        deleted_at TEXT,
+        total_paid REAL NOT NULL DEFAULT 0,
+        payments_count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_payments (
+        payment_id TEXT PRIMARY KEY,
+        loan_id TEXT NOT NULL,
+        payment_date TEXT NOT NULL,
+        payment_amount REAL NOT NULL CHECK (payment_amount > 0),
+        payment_status TEXT NOT NULL CHECK (payment_status IN ('on-time', 'late', 'missed')),
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (loan_id) REFERENCES loans(loan_id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_metrics (
+        user_id INTEGER PRIMARY KEY,
+        loan_diversity_score REAL CHECK (loan_diversity_score >= 0 AND loan_diversity_score <= 100),
+        payment_history_score REAL CHECK (payment_history_score >= 0 AND payment_history_score <= 100),
+        loan_maturity_score REAL CHECK (loan_maturity_score >= 0 AND loan_maturity_score <= 100),
+        payment_statistics TEXT,
+        loan_statistics TEXT,
+        calculated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_loans_user_id ON loans(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_loans_loan_type ON loans(loan_type)',
+    'CREATE INDEX IF NOT EXISTS idx_loans_default_status ON loans(default_status)',
+    'CREATE INDEX IF NOT EXISTS idx_loans_deleted_at ON loans(deleted_at)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_loan_id ON loan_payments(loan_id)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_date ON loan_payments(payment_date)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_status ON loan_payments(payment_status)'
+]
+
+
+# Running payment totals on loans, for tables created before the columns existed
+LOANS_ADDED_COLUMNS = [
+    ('total_paid', 'REAL NOT NULL DEFAULT 0'),
+    ('payments_count', 'INTEGER NOT NULL DEFAULT 0')
+]
+
+LOAN_PAYMENT_TOTAL_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_insert
+    AFTER INSERT ON loan_payments
+    BEGIN
+        UPDATE loans SET
+            total_paid = total_paid + NEW.payment_amount,
+            payments_count = payments_count + 1
+        WHERE loan_id = NEW.loan_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_delete
+    AFTER DELETE ON loan_payments
+    BEGIN
+        UPDATE loans SET
+            total_paid = CASE WHEN payments_count <= 1 THEN 0 ELSE total_paid - OLD.payment_amount END,
+            payments_count = payments_count - 1
+        WHERE loan_id = OLD.loan_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_update
+    AFTER UPDATE OF loan_id, payment_amount ON loan_payments
+    WHEN OLD.loan_id IS NOT NEW.loan_id OR OLD.payment_amount IS NOT NEW.payment_amount
+    BEGIN
+        UPDATE loans SET
+            total_paid = CASE WHEN payments_count <= 1 THEN 0 ELSE total_paid - OLD.payment_amount END,
+            payments_count = payments_count - 1
+        WHERE loan_id = OLD.loan_id;
+        UPDATE loans SET
+            total_paid = total_paid + NEW.payment_amount,
+            payments_count = payments_count + 1
+        WHERE loan_id = NEW.loan_id;
+    END
+    """
+]
+
+PAYMENT_TOTALS_BACKFILL = """
+    UPDATE loans SET
+        total_paid = (SELECT COALESCE(SUM(payment_amount), 0)
+                      FROM loan_payments p WHERE p.loan_id = loans.loan_id),
+        payments_count = (SELECT COUNT(*)
+                          FROM loan_payments p WHERE p.loan_id = loans.loan_id)
+    """
+
+
+# Per-user loan metric counters and the triggers that keep them current
+LOAN_METRIC_COUNTER_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS loan_metric_counters (
+        user_id INTEGER PRIMARY KEY,
+        active_loan_count INTEGER NOT NULL DEFAULT 0,
+        total_loan_amount REAL NOT NULL DEFAULT 0,
+        tenure_sum INTEGER NOT NULL DEFAULT 0,
+        weighted_tenure_sum REAL NOT NULL DEFAULT 0,
+        soonest_maturity_date TEXT,
+        latest_maturity_date TEXT,
+        on_time_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        missed_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_type_totals (
+        user_id INTEGER NOT NULL,
+        loan_type TEXT NOT NULL,
+        loan_count INTEGER NOT NULL DEFAULT 0,
+        total_amount REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, loan_type)
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_loans_user_maturity ON loans(user_id, loan_maturity_date)',
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_insert
+    AFTER INSERT ON loans
+    WHEN NEW.deleted_at IS NULL
+    BEGIN
+        INSERT INTO loan_metric_counters (user_id) VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count + 1,
+            total_loan_amount = total_loan_amount + NEW.loan_amount,
+            tenure_sum = tenure_sum + NEW.loan_tenure,
+            weighted_tenure_sum = weighted_tenure_sum + NEW.loan_amount * NEW.loan_tenure,
+            soonest_maturity_date = MIN(COALESCE(soonest_maturity_date, NEW.loan_maturity_date), NEW.loan_maturity_date),
+            latest_maturity_date = MAX(COALESCE(latest_maturity_date, NEW.loan_maturity_date), NEW.loan_maturity_date),
+            on_time_count = on_time_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'on-time'),
+            late_count = late_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'late'),
+            missed_count = missed_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'missed'),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+        INSERT INTO loan_type_totals (user_id, loan_type, loan_count, total_amount)
+            VALUES (NEW.user_id, NEW.loan_type, 1, NEW.loan_amount)
+            ON CONFLICT (user_id, loan_type) DO UPDATE SET
+                loan_count = loan_count + 1,
+                total_amount = total_amount + excluded.total_amount;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_update_remove
+    AFTER UPDATE ON loans
+    WHEN OLD.deleted_at IS NULL AND (OLD.loan_id IS NOT NEW.loan_id OR OLD.user_id IS NOT NEW.user_id OR OLD.loan_type IS NOT NEW.loan_type OR OLD.loan_amount IS NOT NEW.loan_amount OR OLD.loan_tenure IS NOT NEW.loan_tenure OR OLD.loan_maturity_date IS NOT NEW.loan_maturity_date OR OLD.deleted_at IS NOT NEW.deleted_at)
+    BEGIN
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count - 1,
+            total_loan_amount = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE total_loan_amount - OLD.loan_amount END,
+            tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE tenure_sum - OLD.loan_tenure END,
+            weighted_tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE weighted_tenure_sum - OLD.loan_amount * OLD.loan_tenure END,
+            soonest_maturity_date = (SELECT MIN(loan_maturity_date) FROM loans
+                                     WHERE user_id = OLD.user_id AND deleted_at IS NULL),
+            latest_maturity_date = (SELECT MAX(loan_maturity_date) FROM loans
+                                    WHERE user_id = OLD.user_id AND deleted_at IS NULL),
+            on_time_count = on_time_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'on-time'),
+            late_count = late_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'late'),
+            missed_count = missed_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'missed'),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = OLD.user_id;
+        UPDATE loan_type_totals SET
+            loan_count = loan_count - 1,
+            total_amount = CASE WHEN loan_count <= 1 THEN 0 ELSE total_amount - OLD.loan_amount END
+        WHERE user_id = OLD.user_id AND loan_type = OLD.loan_type;
+        DELETE FROM loan_type_totals
+        WHERE user_id = OLD.user_id AND loan_type = OLD.loan_type AND loan_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_update_add
+    AFTER UPDATE ON loans
+    WHEN NEW.deleted_at IS NULL AND (OLD.loan_id IS NOT NEW.loan_id OR OLD.user_id IS NOT NEW.user_id OR OLD.loan_type IS NOT NEW.loan_type OR OLD.loan_amount IS NOT NEW.loan_amount OR OLD.loan_tenure IS NOT NEW.loan_tenure OR OLD.loan_maturity_date IS NOT NEW.loan_maturity_date OR OLD.deleted_at IS NOT NEW.deleted_at)
+    BEGIN
+        INSERT INTO loan_metric_counters (user_id) VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count + 1,
+            total_loan_amount = total_loan_amount + NEW.loan_amount,
+            tenure_sum = tenure_sum + NEW.loan_tenure,
+            weighted_tenure_sum = weighted_tenure_sum + NEW.loan_amount * NEW.loan_tenure,
+            soonest_maturity_date = MIN(COALESCE(soonest_maturity_date, NEW.loan_maturity_date), NEW.loan_maturity_date),
+            latest_maturity_date = MAX(COALESCE(latest_maturity_date, NEW.loan_maturity_date), NEW.loan_maturity_date),
+            on_time_count = on_time_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'on-time'),
+            late_count = late_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'late'),
+            missed_count = missed_count + (SELECT COUNT(*) FROM loan_payments WHERE loan_id = NEW.loan_id AND payment_status = 'missed'),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+        INSERT INTO loan_type_totals (user_id, loan_type, loan_count, total_amount)
+            VALUES (NEW.user_id, NEW.loan_type, 1, NEW.loan_amount)
+            ON CONFLICT (user_id, loan_type) DO UPDATE SET
+                loan_count = loan_count + 1,
+                total_amount = total_amount + excluded.total_amount;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_delete_payments
+    BEFORE DELETE ON loans
+    WHEN OLD.deleted_at IS NULL
+    BEGIN
+        UPDATE loan_metric_counters SET
+            on_time_count = on_time_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'on-time'),
+            late_count = late_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'late'),
+            missed_count = missed_count - (SELECT COUNT(*) FROM loan_payments WHERE loan_id = OLD.loan_id AND payment_status = 'missed')
+        WHERE user_id = OLD.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_delete
+    AFTER DELETE ON loans
+    WHEN OLD.deleted_at IS NULL
+    BEGIN
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count - 1,
+            total_loan_amount = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE total_loan_amount - OLD.loan_amount END,
+            tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE tenure_sum - OLD.loan_tenure END,
+            weighted_tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE weighted_tenure_sum - OLD.loan_amount * OLD.loan_tenure END,
+            soonest_maturity_date = (SELECT MIN(loan_maturity_date) FROM loans
+                                     WHERE user_id = OLD.user_id AND deleted_at IS NULL),
+            latest_maturity_date = (SELECT MAX(loan_maturity_date) FROM loans
+                                    WHERE user_id = OLD.user_id AND deleted_at IS NULL),
+
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = OLD.user_id;
+        UPDATE loan_type_totals SET
+            loan_count = loan_count - 1,
+            total_amount = CASE WHEN loan_count <= 1 THEN 0 ELSE total_amount - OLD.loan_amount END
+        WHERE user_id = OLD.user_id AND loan_type = OLD.loan_type;
+        DELETE FROM loan_type_totals
+        WHERE user_id = OLD.user_id AND loan_type = OLD.loan_type AND loan_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_insert
+    AFTER INSERT ON loan_payments
+    BEGIN
+        UPDATE loan_metric_counters SET
+            on_time_count = on_time_count + (NEW.payment_status = 'on-time'),
+            late_count = late_count + (NEW.payment_status = 'late'),
+            missed_count = missed_count + (NEW.payment_status = 'missed')
+        WHERE user_id = (SELECT user_id FROM loans WHERE loan_id = NEW.loan_id AND deleted_at IS NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_delete
+    AFTER DELETE ON loan_payments
+    BEGIN
+        UPDATE loan_metric_counters SET
+            on_time_count = on_time_count - (OLD.payment_status = 'on-time'),
+            late_count = late_count - (OLD.payment_status = 'late'),
+            missed_count = missed_count - (OLD.payment_status = 'missed')
+        WHERE user_id = (SELECT user_id FROM loans WHERE loan_id = OLD.loan_id AND deleted_at IS NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_update
+    AFTER UPDATE OF loan_id, payment_status ON loan_payments
+    WHEN OLD.loan_id IS NOT NEW.loan_id OR OLD.payment_status IS NOT NEW.payment_status
+    BEGIN
+        UPDATE loan_metric_counters SET
+            on_time_count = on_time_count - (OLD.payment_status = 'on-time'),
+            late_count = late_count - (OLD.payment_status = 'late'),
+            missed_count = missed_count - (OLD.payment_status = 'missed')
+        WHERE user_id = (SELECT user_id FROM loans WHERE loan_id = OLD.loan_id AND deleted_at IS NULL);
+        UPDATE loan_metric_counters SET
+            on_time_count = on_time_count + (NEW.payment_status = 'on-time'),
+            late_count = late_count + (NEW.payment_status = 'late'),
+            missed_count = missed_count + (NEW.payment_status = 'missed')
+        WHERE user_id = (SELECT user_id FROM loans WHERE loan_id = NEW.loan_id AND deleted_at IS NULL);
+    END
+    """
+]
+
+# Fills the counters when loan_metric_counters is created on a database with loans
+COUNTER_BACKFILL = [
+    """
+    INSERT INTO loan_metric_counters
+        (user_id, active_loan_count, total_loan_amount, tenure_sum, weighted_tenure_sum,
+         soonest_maturity_date, latest_maturity_date,
+         on_time_count, late_count, missed_count, updated_at)
+    SELECT l.user_id, COUNT(*), SUM(l.loan_amount), SUM(l.loan_tenure),
+           SUM(l.loan_amount * l.loan_tenure),
+           MIN(l.loan_maturity_date), MAX(l.loan_maturity_date),
+           COALESCE(SUM(p.on_time_count), 0), COALESCE(SUM(p.late_count), 0),
+           COALESCE(SUM(p.missed_count), 0), CURRENT_TIMESTAMP
+    FROM loans l
+    LEFT JOIN (
+        SELECT loan_id, SUM(payment_status = 'on-time') AS on_time_count,
+               SUM(payment_status = 'late') AS late_count, SUM(payment_status = 'missed') AS missed_count
+        FROM loan_payments
+        GROUP BY loan_id
+    ) p ON p.loan_id = l.loan_id
+    WHERE l.deleted_at IS NULL
+    GROUP BY l.user_id
+    """,
+    """
+    INSERT INTO loan_type_totals (user_id, loan_type, loan_count, total_amount)
+    SELECT l.user_id, l.loan_type, COUNT(*), SUM(l.loan_amount)
+    FROM loans l
+    WHERE l.deleted_at IS NULL
+    GROUP BY l.user_id, l.loan_type
+    """
+]
+
+
+SCORE_HISTORY_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS score_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        overall_score REAL NOT NULL CHECK (overall_score >= 0 AND overall_score <= 100),
+        savings_score REAL,
+        debt_score REAL,
+        expense_score REAL,
+        balance_score REAL,
+        life_stage_score REAL,
+        loan_diversity_score REAL,
+        payment_history_score REAL,
+        loan_maturity_score REAL,
+        calculated_at TEXT NOT NULL,
+        source TEXT NOT NULL DEFAULT 'health' CHECK (source IN ('health', 'predict')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_score_history_user_time ON score_history (
+        user_id, calculated_at, overall_score, source,
+        savings_score, debt_score, expense_score, balance_score, life_stage_score,
+        loan_diversity_score, payment_history_score, loan_maturity_score
+    )
+    """
+]
+
+
+# Composite indexes behind the keyset-paginated loan, payment and goal listings
+LISTING_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_loans_user_created ON loans(user_id, created_at, loan_id)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_loan_date ON loan_payments(loan_id, payment_date, payment_id)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_rank ON financial_goals('
+    "user_id, (CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END), target_date, id)"
+]
@@ -0,0 +1,140 @@
+"""
+Population Rescoring Benchmark
+Compares rescoring every user with calculateFinancialHealthScore (one call per
+user) against one calculateFinancialHealthScoresBatch call, on synthetic
+populations of loans and payments
+
+Usage:
+    cd backend
+    python benchmarks/bench_batch_scorer.py [--users 100000 1000000] [--sample 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections, get_connection
+from db_utils import init_loan_tables
+from financial_health_scorer import FinancialHealthScorer
+
+LOAN_TYPES = np.array(['personal', 'home', 'auto', 'education'])
+STATUSES = np.array(['on-time', 'on-time', 'on-time', 'late', 'missed'])
+
+
+def populate(db_path, users, rng):
+    """Insert ~1.5 loans and ~2 payments per loan per user; triggers fill the counters"""
+    loan_owner = np.repeat(np.arange(1, users + 1), rng.integers(0, 4, users))
+    count = len(loan_owner)
+    start = np.datetime64('2015-01-10') + rng.integers(0, 12 * 365, count).astype('timedelta64[D]')
+    tenure = rng.choice([12, 24, 60, 120, 240], count)
+    maturity = (start.astype('datetime64[M]') + tenure).astype('datetime64[D]') + 9
+    loan_ids = [str(uuid.uuid4()) for _ in range(count)]
+
+    conn = get_connection(db_path)
+    conn.executemany('''
+        INSERT INTO loans (loan_id, user_id, loan_type, loan_amount, loan_tenure, monthly_emi,
+                           interest_rate, loan_start_date, loan_maturity_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', zip(
+        loan_ids, loan_owner.tolist(), rng.choice(LOAN_TYPES, count).tolist(),
+        (rng.integers(10, 500, count) * 1000.0).tolist(), tenure.tolist(),
+        np.full(count, 1000.0).tolist(), np.full(count, 9.0).tolist(),
+        start.astype(str).tolist(), maturity.astype(str).tolist()
+    ))
+
+    paid_loan = np.repeat(np.arange(count), rng.integers(0, 5, count))
+    conn.executemany('''
+        INSERT INTO loan_payments (payment_id, loan_id, payment_date, payment_amount, payment_status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', zip(
+        (str(uuid.uuid4()) for _ in range(len(paid_loan))),
+        (loan_ids[i] for i in paid_loan.tolist()),
+        start[paid_loan].astype(str).tolist(),
+        np.full(len(paid_loan), 100.0).tolist(),
+        rng.choice(STATUSES, len(paid_loan)).tolist()
+    ))
+    conn.commit()
+    conn.close()
+    return count, len(paid_loan)
+
+
+def financial_columns(users, rng):
+    """Synthetic per-user financial data as columns"""
+    income = rng.integers(20000, 200000, users).astype(float)
+    return {
+        'income': income,
+        'savings': income * rng.uniform(0, 0.4, users),
+        'rent': income * rng.uniform(0.1, 0.4, users),
+        'food': income * rng.uniform(0.05, 0.2, users),
+        'travel': income * rng.uniform(0, 0.1, users),
+        'shopping': income * rng.uniform(0, 0.15, users),
+        'emi': income * rng.uniform(0, 0.5, users),
+        'age': rng.integers(18, 80, users).astype(float)
+    }
+
+
+def run(users, sample):
+    rng = np.random.default_rng(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        init_loan_tables(db_path)
+
+        start = time.perf_counter()
+        loans, payments = populate(db_path, users, rng)
+        print(f"\n   {users:,} users, {loans:,} loans, {payments:,} payments "
+              f"(generated in {time.perf_counter() - start:.1f} s)")
+
+        scorer = FinancialHealthScorer(db_path)
+        user_ids = np.arange(1, users + 1)
+        columns = financial_columns(users, rng)
+
+        # Per-user path, timed on a sample and extrapolated
+        sample = min(sample, users)
+        start = time.perf_counter()
+        for i in range(sample):
+            scorer.calculateFinancialHealthScore(
+                int(user_ids[i]), {field: float(values[i]) for field, values in columns.items()}
+            )
+        per_user = (time.perf_counter() - start) / sample
+        print(f"   {'calculateFinancialHealthScore':<36} {1 / per_user:>12,.0f} users/s"
+              f"   (~{per_user * users:,.1f} s for everyone)")
+
+        start = time.perf_counter()
+        scorer.calculateFinancialHealthScoresBatch(user_ids, columns, persist=False)
+        compute = time.perf_counter() - start
+        print(f"   {'batch, compute only':<36} {users / compute:>12,.0f} users/s   ({compute:.2f} s)")
+
+        start = time.perf_counter()
+        scorer.calculateFinancialHealthScoresBatch(user_ids, columns)
+        total = time.perf_counter() - start
+        print(f"   {'batch + score_history write':<36} {users / total:>12,.0f} users/s   ({total:.2f} s)")
+        print(f"   Speedup (compute): {per_user * users / compute:.0f}x")
+
+        close_thread_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--sample', type=int, default=2000,
+                        help='users timed through the per-user path')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("POPULATION RESCORING (8-factor financial health score)")
+    print("=" * 70)
+    for users in args.users:
+        run(users, args.sample)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Bulk Payment Import Benchmark
+Compares payment import throughput (rows per second) of one recordPayment call
+per row against a single recordPaymentsBulk call
+
+Usage:
+    cd backend
+    python benchmarks/bench_bulk_payments.py [--loans 10] [--installments 360]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from loan_history_service import LoanHistoryService
+
+LOAN_AMOUNT = 3600000.0
+INTEREST_RATE = 8.5
+
+
+def make_loans(service, count, installments):
+    """Create count home loans and return their IDs"""
+    monthly_rate = INTEREST_RATE / 100 / 12
+    growth = pow(1 + monthly_rate, installments)
+    emi = round(LOAN_AMOUNT * monthly_rate * growth / (growth - 1), 2)
+    end_year, end_month = divmod(2000 * 12 + installments, 12)
+    return [
+        service.createLoan(1, {
+            'loan_type': 'home',
+            'loan_amount': LOAN_AMOUNT,
+            'loan_tenure': installments,
+            'monthly_emi': emi,
+            'interest_rate': INTEREST_RATE,
+            'loan_start_date': '2000-01-05',
+            'loan_maturity_date': f'{end_year:04d}-{end_month + 1:02d}-05'
+        })['loan_id']
+        for _ in range(count)
+    ]
+
+
+def history(loan_ids, installments):
+    """One EMI per month per loan; principal split evenly so balances stay valid"""
+    amount = round(LOAN_AMOUNT / installments, 2)
+    rows = []
+    for loan_id in loan_ids:
+        for n in range(installments):
+            year, month = divmod(2000 * 12 + n, 12)
+            rows.append({
+                'loan_id': loan_id,
+                'payment_date': f'{year:04d}-{month + 1:02d}-0{1 + n % 9}',
+                'payment_amount': amount
+            })
+    return rows
+
+
+def run(label, loans, installments, import_fn):
+    """Import a fresh history with import_fn and print rows per second"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        init_loan_tables(db_path)
+        service = LoanHistoryService(db_path)
+        rows = history(make_loans(service, loans, installments), installments)
+
+        start = time.perf_counter()
+        import_fn(service, rows)
+        elapsed = time.perf_counter() - start
+        close_thread_connections()
+
+    print(f"   {label:<30} {len(rows):>7,} rows in {elapsed:7.3f} s   {len(rows) / elapsed:>10,.0f} rows/s")
+    return len(rows) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--loans', type=int, default=10)
+    parser.add_argument('--installments', type=int, default=360)
+    args = parser.parse_args()
+
+    # Per-payment INFO logs would dominate the sequential timing
+    logging.disable(logging.INFO)
+
+    def sequential(service, rows):
+        for row in rows:
+            service.recordPayment(row['loan_id'], row)
+
+    def bulk(service, rows):
+        result = service.recordPaymentsBulk(1, rows)
+        assert result['failed'] == 0, result['errors'][:3]
+
+    print("=" * 70)
+    print(f"BULK PAYMENT IMPORT ({args.loans} loans x {args.installments} installments)")
+    print("=" * 70)
+    seq_rate = run('recordPayment per row', args.loans, args.installments, sequential)
+    bulk_rate = run('recordPaymentsBulk', args.loans, args.installments, bulk)
+    print(f"\n   Speedup: {bulk_rate / seq_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
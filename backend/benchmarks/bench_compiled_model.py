@@ -0,0 +1,101 @@
+"""
+Compiled Model Benchmark
+Compares the flat-array CompiledTreeEnsemble with sklearn's GradientBoosting
+predict for artifact load time, single-row latency and batch throughput
+
+Usage:
+    cd backend
+    python benchmarks/bench_compiled_model.py [--iterations 2000] [--batch-rows 10000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiled_model import CompiledTreeEnsemble, compile_gradient_boosting
+from model_inference import ModelInference
+from benchmarks.bench_inference import MODEL_PATH, SAMPLE_ROW, measure, report
+
+
+def random_rows(n):
+    """Generate n plausible feature rows in feature_cols order"""
+    rng = np.random.default_rng(7)
+    income = rng.uniform(10000, 300000, n)
+    return np.column_stack([
+        income,
+        income * rng.uniform(0.2, 1.1, n),
+        income * rng.uniform(0.0, 0.4, n),
+        income * rng.uniform(0.0, 0.5, n),
+        rng.integers(18, 75, n),
+        rng.integers(0, 2, n),
+        rng.uniform(0, 2e6, n),
+        rng.uniform(0, 20, n)
+    ])
+
+
+def time_once(fn, repeats=5):
+    """Return the best wall-clock time of fn over several runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--batch-rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    model_data = joblib.load(MODEL_PATH)
+    feature_names = model_data['feature_cols']
+    compiled = compile_gradient_boosting(model_data['model'], model_data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, 'compiled.npz')
+        compiled.save(artifact)
+        pkl_ms = time_once(lambda: joblib.load(MODEL_PATH))
+        npz_ms = time_once(lambda: CompiledTreeEnsemble.load(artifact))
+
+    sklearn_path = ModelInference(model_data['model'], feature_names)
+    compiled_path = ModelInference(compiled, feature_names)
+
+    batch = random_rows(args.batch_rows)
+    max_error = np.max(np.abs(sklearn_path.predict(batch) - compiled_path.predict(batch)))
+    assert max_error < 1e-9, f"Compiled model disagrees with sklearn by {max_error}"
+
+    print("=" * 70)
+    print(f"COMPILED MODEL ({compiled.n_trees} trees, {compiled.n_nodes:,} nodes, depth {compiled.max_depth})")
+    print("=" * 70)
+    print(f"\n   Max abs difference vs sklearn: {max_error:.2e}")
+
+    print("\n   Artifact load (best of 5)")
+    print(f"   {'joblib enhanced_model.pkl':<28} {pkl_ms:9.1f} ms")
+    print(f"   {'CompiledTreeEnsemble.load':<28} {npz_ms:9.1f} ms")
+
+    print(f"\n   Single row ({args.iterations:,} iterations)")
+    sk_p50, _ = report('sklearn _raw_predict', measure(lambda: sklearn_path.predict_one(SAMPLE_ROW), args.iterations))
+    cm_p50, _ = report('CompiledTreeEnsemble', measure(lambda: compiled_path.predict_one(SAMPLE_ROW), args.iterations))
+    print(f"   Speedup p50: {sk_p50 / cm_p50:.2f}x")
+
+    print(f"\n   Batch throughput (best of 5)")
+    for rows in (16, 256, args.batch_rows):
+        subset = batch[:rows]
+        sk_ms = time_once(lambda: sklearn_path.predict(subset))
+        cm_ms = time_once(lambda: compiled_path.predict(subset))
+        print(f"   {rows:>7,} rows   sklearn: {sk_ms:9.2f} ms   compiled: {cm_ms:9.2f} ms   "
+              f"speedup: {sk_ms / cm_ms:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Data Export Benchmark
+Compares exporting one user's record through the list services (every loan's
+payment history built in memory, then serialized as one JSON document) against
+the streaming ExportService: peak Python memory, time to first byte and total time.
+Memory is traced with tracemalloc, which slows both paths alike
+
+Usage:
+    cd backend
+    python benchmarks/bench_export.py [--payments 10000 100000] [--loans 50]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from export_service import ExportService
+from loan_history_service import LoanHistoryService
+
+
+def fill(db_path, loans, payments):
+    """One user with `loans` loans and `payments` payments spread across them"""
+    init_loan_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO loans (loan_id, user_id, loan_type, loan_amount, loan_tenure, monthly_emi,
+                           interest_rate, loan_start_date, loan_maturity_date, created_at)
+        VALUES (?, 1, 'home', 1e9, 600, 1000, 8.5, '2000-01-05', '2050-01-05', ?)
+    ''', [(f'loan-{i:04d}', f'2020-01-01T00:00:{i % 60:02d}') for i in range(loans)])
+    conn.executemany('''
+        INSERT INTO loan_payments (payment_id, loan_id, payment_date, payment_amount, payment_status)
+        VALUES (?, ?, ?, 1000, 'on-time')
+    ''', [(f'pay-{i:07d}', f'loan-{i % loans:04d}', f'{2000 + i // 12 % 50}-{i % 12 + 1:02d}-05')
+          for i in range(payments)])
+    conn.commit()
+    conn.close()
+
+
+def measure(produce):
+    """Run a chunk generator to the end; returns (first byte s, total s, peak MiB, bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return first, total, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--payments', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--loans', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print("=" * 78)
+    print(f"USER DATA EXPORT ({args.loans} loans)")
+    print("=" * 78)
+    print(f"   {'':<34}{'first byte':>12}{'total':>10}{'peak mem':>12}{'size':>10}")
+
+    for payments in args.payments:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.db')
+            fill(db_path, args.loans, payments)
+            loans = LoanHistoryService(db_path)
+            exporter = ExportService(db_path)
+
+            def list_services():
+                # What a client had to assemble before: every list built in full, then dumped
+                user_loans = loans.getLoansByUser(1, include_deleted=True)
+                record = {
+                    'loans': user_loans,
+                    'payments': [p for loan in user_loans for p in loans.getPaymentHistory(loan['loan_id'])]
+                }
+                yield json.dumps(record)
+
+            def streaming():
+                return exporter.iter_ndjson(1, ['loans', 'payments'])
+
+            print(f"\n   {payments:,} payments")
+            for label, produce in [('list services + json.dumps', list_services),
+                                   ('ExportService NDJSON stream', streaming)]:
+                first, total, peak, size = measure(produce)
+                print(f"   {label:<34}{first * 1000:>9.1f} ms{total * 1000:>7.0f} ms{peak:>8.1f} MiB"
+                      f"{size / 2 ** 20:>6.1f} MiB")
+            close_thread_connections()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Inference Micro-Benchmark
+Compares p50/p99 single-row latency of the per-request pandas DataFrame path
+against the ModelInference NumPy path
+
+Usage:
+    cd backend
+    python benchmarks/bench_inference.py [--iterations 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_inference import ModelInference
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data', 'enhanced_model.pkl'
+)
+
+SAMPLE_ROW = [75000.0, 38000.0, 15000.0, 9000.0, 32.0, 1.0, 500000.0, 9.5]
+
+
+def measure(fn, iterations):
+    """Run fn repeatedly and return per-call latencies in microseconds"""
+    for _ in range(min(100, iterations)):
+        fn()  # warm-up
+
+    timings = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(label, timings):
+    """Print p50/p99/mean latency for one path"""
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"   {label:<28} p50: {p50:9.1f} µs   p99: {p99:9.1f} µs   mean: {timings.mean():9.1f} µs")
+    return p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    model_data = joblib.load(MODEL_PATH)
+    model = model_data['model']
+    feature_names = model_data['feature_cols']
+    inference = ModelInference(model, feature_names)
+
+    def dataframe_path():
+        features = pd.DataFrame([SAMPLE_ROW], columns=feature_names)
+        return float(model.predict(features)[0])
+
+    def numpy_path():
+        return inference.predict_one(SAMPLE_ROW)
+
+    assert abs(dataframe_path() - numpy_path()) < 1e-9, "Paths disagree"
+
+    print("=" * 70)
+    print(f"SINGLE-ROW INFERENCE LATENCY ({args.iterations:,} iterations)")
+    print("=" * 70)
+    df_p50, df_p99 = report('pandas DataFrame + predict', measure(dataframe_path, args.iterations))
+    np_p50, np_p99 = report('ModelInference (NumPy)', measure(numpy_path, args.iterations))
+    print(f"\n   Speedup  p50: {df_p50 / np_p50:.2f}x   p99: {df_p99 / np_p99:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
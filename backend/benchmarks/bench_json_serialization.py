@@ -0,0 +1,116 @@
+"""
+JSON Serialization Benchmark
+Times a 5,000-payment history response two ways: the full
+GET /api/loans/<id>/payments request with Flask's default (stdlib) JSON provider
+vs FastJSONProvider, and LoanDataSerializer.serializePayment per payment vs the
+bulk serializePayments over the sqlite3.Row objects from the cursor
+
+Usage:
+    cd backend
+    python benchmarks/bench_json_serialization.py [--payments 5000] [--repeat 20]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended import create_access_token
+
+from connection_pool import close_thread_connections, get_connection
+from db_utils import init_loan_tables
+from json_provider import FastJSONProvider, backend_name
+from loan_data_serializer import LoanDataSerializer
+from loan_history_service import LoanHistoryService
+
+
+def fill(db_path, payments):
+    """One loan for user 1 with `payments` payments; returns the loan ID"""
+    init_loan_tables(db_path)
+    conn = get_connection(db_path)
+    conn.execute('''
+        INSERT INTO loans (loan_id, user_id, loan_type, loan_amount, loan_tenure, monthly_emi,
+                           interest_rate, loan_start_date, loan_maturity_date)
+        VALUES ('loan-1', 1, 'home', 1e9, 600, 1000, 8.5, '2000-01-05', '2050-01-05')
+    ''')
+    conn.executemany('''
+        INSERT INTO loan_payments (payment_id, loan_id, payment_date, payment_amount, payment_status)
+        VALUES (?, 'loan-1', ?, 1000.25, 'on-time')
+    ''', [(f'pay-{i:06d}', f'{2000 + i // 12}-{i % 12 + 1:02d}-05') for i in range(payments)])
+    conn.commit()
+    conn.close()
+    return 'loan-1'
+
+
+def timed(fn, repeat):
+    """Median wall time of fn in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--payments', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        loan_id = fill(db_path, args.payments)
+        flask_app = app_module.create_app({'LOG_FILE': os.path.join(tmp, 'app.log')})
+        flask_app.extensions['smartfin']['loan_service'] = LoanHistoryService(db_path)
+        with flask_app.app_context():
+            token = create_access_token(identity='1')
+
+        results = {}
+        with flask_app.test_client() as client:
+            client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+            def request_history():
+                response = client.get(f'/api/loans/{loan_id}/payments')
+                assert response.status_code == 200
+
+            for label, provider in [('default provider (json)', DefaultJSONProvider(flask_app)),
+                                    (f'FastJSONProvider ({backend_name()})', FastJSONProvider(flask_app))]:
+                flask_app.json = provider
+                request_history()  # warm up
+                results[label] = timed(request_history, args.repeat)
+            flask_app.json = FastJSONProvider(flask_app)
+
+        conn = get_connection(db_path)
+        rows = conn.execute('SELECT * FROM loan_payments WHERE loan_id = ? ORDER BY payment_date', (loan_id,)).fetchall()
+        conn.close()
+        serializer_results = {
+            'serializePayment per payment': timed(
+                lambda: [LoanDataSerializer.serializePayment(dict(row)) for row in rows], args.repeat),
+            'serializePayments (bulk)': timed(lambda: LoanDataSerializer.serializePayments(rows), args.repeat)
+        }
+        close_thread_connections()
+
+    print("=" * 70)
+    print(f"PAYMENT HISTORY SERIALIZATION ({args.payments:,} payments, median of {args.repeat})")
+    print("=" * 70)
+    for title, table in [('GET /api/loans/<id>/payments', results),
+                         ('LoanDataSerializer', serializer_results)]:
+        print(f"\n   {title}")
+        baseline = next(iter(table.values()))
+        for label, ms in table.items():
+            print(f"   {label:<36} {ms:>8.2f} ms   {baseline / ms:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Prediction Coalescer Benchmark
+N threads each scoring one row at a time through PredictionCoalescer with the
+real model: coalescing off (window 0, every request predicted on its own
+thread) vs micro-batching windows. Reports throughput, p50/p99 request latency
+and the coalescer's batch sizes
+
+Usage:
+    cd backend
+    python benchmarks/bench_prediction_coalescer.py [--threads 1 8 32] [--seconds 3] [--windows 0 1 2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_inference import ModelInference
+from prediction_coalescer import PredictionCoalescer
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data', 'enhanced_model.pkl'
+)
+
+SAMPLE_ROW = [75000.0, 38000.0, 15000.0, 9000.0, 32.0, 1.0, 500000.0, 9.5]
+
+
+def run(coalescer, threads, seconds):
+    """Drive coalescer.predict from `threads` threads; returns (requests/s, latencies in ms)"""
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+
+    def worker(samples, seed):
+        row = [SAMPLE_ROW[:-1] + [SAMPLE_ROW[-1] + seed]]
+        while not stop.is_set():
+            start = time.perf_counter()
+            coalescer.predict(row)
+            samples.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(latencies[i], i)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = np.array([s for per_thread in latencies for s in per_thread]) * 1000
+    return len(samples) / elapsed, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 1, 2])
+    args = parser.parse_args()
+
+    model_data = joblib.load(MODEL_PATH)
+    inference = ModelInference(model_data['model'], model_data['feature_cols'])
+
+    print("=" * 78)
+    print(f"CONCURRENT SINGLE-ROW PREDICTIONS ({args.seconds:g} s per run)")
+    print("=" * 78)
+    print(f"   {'':<20}{'req/s':>10}{'p50':>10}{'p99':>10}{'mean batch':>13}{'direct':>10}")
+
+    for threads in args.threads:
+        print(f"\n   {threads} threads")
+        for window in args.windows:
+            coalescer = PredictionCoalescer(inference.predict, inference.predict_one, window_ms=window)
+            throughput, samples = run(coalescer, threads, args.seconds)
+            stats = coalescer.stats()
+            p50, p99 = np.percentile(samples, [50, 99])
+            mean_batch = stats['rows_predicted'] / stats['batches'] if stats['batches'] else 1.0
+            direct = stats['direct_requests'] / max(1, stats['direct_requests'] + stats['coalesced_requests'])
+            label = 'coalescing off' if window == 0 else f'window {window:g} ms'
+            print(f"   {label:<20}{throughput:>10,.0f}{p50:>7.2f} ms{p99:>7.2f} ms{mean_batch:>13.1f}"
+                  f"{direct:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
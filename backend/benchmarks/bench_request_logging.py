@@ -0,0 +1,200 @@
+"""
+Request Logging Benchmark
+Compares loan endpoint throughput with the previous synchronous logging (print
+and flush per request, every handler flushed after every record) against the
+queue-based JSON pipeline in structured_logging, at full and sampled access logs.
+Each flush can be given an artificial latency to model a slow disk or a
+blocked console pipe (0 ms = page cache)
+
+Usage:
+    cd backend
+    python benchmarks/bench_request_logging.py [--requests 2000] [--latency-ms 0 1] [--repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from flask import request
+from flask_jwt_extended import create_access_token
+
+from amortization_engine import build_schedule
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from loan_history_service import LoanHistoryService
+from structured_logging import configure_logging, shutdown_logging
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+LOAN_DATA['monthly_emi'] = round(build_schedule({**LOAN_DATA, 'loan_id': ''}).monthly_emi, 2)
+
+
+class SlowStream:
+    """File wrapper whose flush() takes an extra latency, like a slow device"""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        return self.stream.write(text)
+
+    def flush(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+class FlushingHandler(logging.Handler):
+    """The removed FlushingLogger behaviour: flush every root handler after each record"""
+
+    def emit(self, record):
+        for handler in logging.root.handlers:
+            handler.flush()
+
+
+def legacy_request_log():
+    for line in (f"\n>>> REQUEST: {request.method} {request.path}",
+                 f"    Origin: {request.headers.get('Origin', 'N/A')}",
+                 f"    Authorization: {request.headers.get('Authorization', 'N/A')[:50]}..."):
+        print(line, file=sys.stdout, flush=True)
+        sys.stdout.flush()
+
+
+def legacy_response_log(response):
+    print(f"<<< RESPONSE: {response.status_code} {request.method} {request.path}", file=sys.stdout, flush=True)
+    sys.stdout.flush()
+    return response
+
+
+def configure_legacy_logging(log_path, latency):
+    """Synchronous handlers as configured before: console + file, flushed per record"""
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for handler in (logging.StreamHandler(sys.stdout), logging.FileHandler(log_path, mode='a')):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.handlers[1].stream = SlowStream(root.handlers[1].stream, latency)
+    root.addHandler(FlushingHandler())
+    root.setLevel(logging.DEBUG)
+
+
+def configure_queued_logging(log_path, latency, rate):
+    """The structured_logging pipeline, with the same slow file"""
+    listener = configure_logging(log_path, flush_interval=1.0, access_sample_rate=rate)
+    file_handler = listener.handlers[1]
+    file_handler.stream = SlowStream(file_handler.stream, latency)
+
+
+def run_requests(client, loan_ids, count):
+    """Round-robin over the loan read and update endpoints; returns requests/s"""
+    paths = []
+    for loan_id in loan_ids:
+        paths += [('get', f'/api/loans/{loan_id}', None),
+                  ('get', f'/api/loans/{loan_id}/payments', None),
+                  ('get', '/api/loans/user/1', None),
+                  ('put', f'/api/loans/{loan_id}', {'loan_type': 'home'})]
+
+    start = time.perf_counter()
+    for i in range(count):
+        method, path, body = paths[i % len(paths)]
+        response = getattr(client, method)(path, json=body)
+        assert response.status_code == 200, (path, response.status_code)
+    return count / (time.perf_counter() - start)
+
+
+def measure(client, loan_ids, tmp, latency, requests):
+    """Throughput of each pipeline at one flush latency"""
+    results = {}
+
+    # Before: print/flush hooks, per-record flushing handlers, no structured access log
+    configure_legacy_logging(os.path.join(tmp, 'legacy.log'), latency)
+    app_module.access_logger.disabled = True
+    client.application.before_request_funcs.setdefault(None, []).insert(0, legacy_request_log)
+    client.application.after_request_funcs.setdefault(None, []).append(legacy_response_log)
+    try:
+        results['synchronous print + flush (before)'] = run_requests(client, loan_ids, requests)
+    finally:
+        client.application.before_request_funcs[None].remove(legacy_request_log)
+        client.application.after_request_funcs[None].remove(legacy_response_log)
+        app_module.access_logger.disabled = False
+
+    # After: queue + listener thread, JSON lines, interval flush
+    for label, rate in [('queued JSON, all access logs', 1.0), ('queued JSON, 10% INFO sampled', 0.1)]:
+        configure_queued_logging(os.path.join(tmp, 'json.log'), latency, rate)
+        results[label] = run_requests(client, loan_ids, requests)
+        shutdown_logging()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--loans', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[0, 1],
+                        help='extra latency per flush of the console and log file')
+    parser.add_argument('--repeat', type=int, default=3, help='interleaved runs; the median is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        init_loan_tables(db_path)
+        service = LoanHistoryService(db_path)
+        loan_ids = [service.createLoan(1, LOAN_DATA)['loan_id'] for _ in range(args.loans)]
+        flask_app = app_module.create_app({'LOG_FILE': os.path.join(tmp, 'app.log')})
+        flask_app.extensions['smartfin']['loan_service'] = service
+        with flask_app.app_context():
+            token = create_access_token(identity='1')
+
+        # Console output goes to a real (equally slow) file so both pipelines pay for actual writes
+        console = sys.stdout
+        table = {}
+
+        try:
+            with flask_app.test_client() as client:
+                client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+                for latency_ms in args.latency_ms:
+                    sys.stdout = SlowStream(open(os.path.join(tmp, 'console.log'), 'w'), latency_ms / 1000)
+                    run_requests(client, loan_ids, min(200, args.requests))  # warm up
+                    runs = [measure(client, loan_ids, tmp, latency_ms / 1000, args.requests)
+                            for _ in range(args.repeat)]
+                    table[latency_ms] = {label: statistics.median(run[label] for run in runs) for label in runs[0]}
+                    sys.stdout.close()
+                    sys.stdout = console
+        finally:
+            sys.stdout = console
+            close_thread_connections()
+
+    print("=" * 70)
+    print(f"LOAN ENDPOINT THROUGHPUT BY LOGGING PIPELINE ({args.requests:,} requests, median of {args.repeat})")
+    print("=" * 70)
+    for latency_ms, results in table.items():
+        print(f"\n   Flush latency {latency_ms:g} ms")
+        baseline = results['synchronous print + flush (before)']
+        for label, throughput in results.items():
+            print(f"   {label:<38} {throughput:>8,.0f} req/s   {throughput / baseline:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
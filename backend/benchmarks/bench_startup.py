@@ -0,0 +1,140 @@
+"""
+Startup Benchmark
+Measures what a worker pays before serving: cold `import app` (in a fresh
+interpreter), the latency of the first /api/predict request, and the memory of
+pre-forked workers. "eager" reproduces the old import-time work (schema DDL
+and model load, via create_app(preload_model=True)); "lazy" is create_app()
+without preloading.
+Worker memory compares forking after create_app(preload_model=True) against
+each worker loading the model itself; PSS counts shared pages once across
+processes, so it is the per-worker cost. Linux only for the memory part
+
+Usage:
+    cd backend
+    python benchmarks/bench_startup.py [--runs 5] [--workers 4] [--format compiled sklearn]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAYLOAD = {'income': 100000, 'rent': 20000, 'food': 10000, 'travel': 5000,
+           'shopping': 5000, 'emi': 10000, 'savings': 40000}
+
+# Runs in a fresh interpreter; prints its timings after RESULT
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+if sys.argv[1] == 'eager':
+    flask_app = app.create_app(preload_model=True)
+else:
+    flask_app = app.create_app()
+imported = time.perf_counter()
+with flask_app.test_client() as client:
+    response = client.post('/api/predict', json=json.loads(sys.argv[2]))
+    assert response.status_code == 200, response.status_code
+first = time.perf_counter()
+print('RESULT', json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (first - imported) * 1000}))
+'''
+
+# Forks workers that each serve one prediction, then report their memory
+WORKER_SCRIPT = '''
+import json, os, sys
+import app
+preload = sys.argv[1] == 'preload'
+if preload:
+    flask_app = app.create_app(preload_model=True)
+
+def memory_kib():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields
+
+read_fd, write_fd = os.pipe()
+go_read, go_write = os.pipe()
+children = []
+for _ in range(int(sys.argv[3])):
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        if not preload:
+            flask_app = app.create_app(preload_model=True)
+        with flask_app.test_client() as client:
+            client.post('/api/predict', json=json.loads(sys.argv[2]))
+        os.read(go_read, 1)  # measure once every worker is up, so PSS splits shared pages fairly
+        os.write(write_fd, (json.dumps(memory_kib()) + '\\n').encode())
+        os._exit(0)
+    children.append(pid)
+
+os.write(go_write, b'x' * len(children))
+with os.fdopen(read_fd) as results:
+    os.close(write_fd)
+    lines = [json.loads(results.readline()) for _ in children]
+for pid in children:
+    os.waitpid(pid, 0)
+print('RESULT', json.dumps(lines))
+'''
+
+
+def run_script(script, args, model_format, db_dir):
+    """Run a script in a fresh interpreter; returns the JSON it printed after RESULT"""
+    env = {**os.environ, 'SMARTFIN_MODEL_FORMAT': model_format, 'TWILIO_ACCOUNT_SID': ''}
+    result = subprocess.run([sys.executable, '-c', script, *args], cwd=db_dir, env=env,
+                            capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    line = next(line for line in result.stdout.splitlines() if line.startswith('RESULT '))
+    return json.loads(line[len('RESULT '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--format', nargs='+', default=['compiled', 'sklearn'])
+    args = parser.parse_args()
+
+    payload = json.dumps(PAYLOAD)
+    # Scripts import app from the backend directory but run with a scratch cwd,
+    # so backend.log is written there; auth.db is the backend's own
+    os.environ['PYTHONPATH'] = os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get('PYTHONPATH')]))
+
+    print("=" * 74)
+    print(f"STARTUP (median of {args.runs} fresh interpreters)")
+    print("=" * 74)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for model_format in args.format:
+            print(f"\n   model format: {model_format}")
+            print(f"   {'':<10}{'import':>12}{'first request':>16}{'import + first':>17}")
+            for mode in ('eager', 'lazy'):
+                runs = [run_script(STARTUP_SCRIPT, [mode, payload], model_format, tmp) for _ in range(args.runs)]
+                imported = statistics.median(r['import_ms'] for r in runs)
+                first = statistics.median(r['first_request_ms'] for r in runs)
+                print(f"   {mode:<10}{imported:>9.0f} ms{first:>13.1f} ms{imported + first:>14.0f} ms")
+
+            if not os.path.exists('/proc/self/smaps_rollup'):
+                continue
+            print(f"\n   {args.workers} forked workers (per worker, KiB)")
+            print(f"   {'':<26}{'RSS':>10}{'PSS':>10}{'private':>10}")
+            for mode, label in (('preload', 'model loaded before fork'), ('per-worker', 'model loaded per worker')):
+                workers = run_script(WORKER_SCRIPT, [mode, payload, str(args.workers)], model_format, tmp)
+                rss = statistics.mean(w['Rss'] for w in workers)
+                pss = statistics.mean(w['Pss'] for w in workers)
+                private = statistics.mean(w['Private_Clean'] + w['Private_Dirty'] for w in workers)
+                print(f"   {label:<26}{rss:>10,.0f}{pss:>10,.0f}{private:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
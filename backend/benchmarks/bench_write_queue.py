@@ -0,0 +1,117 @@
+"""
+Write Queue Benchmark
+N threads each recording payments and updating a goal on a temporary
+database: every write in its own transaction on the caller's connection
+(queue off) vs the single writer thread with group commit. Reports writes/s,
+p50/p99 write latency, "database is locked" errors and the mean commit batch
+
+Usage:
+    cd backend
+    python benchmarks/bench_write_queue.py [--threads 1 8 32] [--seconds 3]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import write_queue
+from connection_pool import close_thread_connections
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from migrations import migrate
+
+LOAN_DATA = {
+    'loan_type': 'home',
+    'loan_amount': 1e12,
+    'loan_tenure': 360,
+    'monthly_emi': 8046226169.45,
+    'interest_rate': 9.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2054-01-15'
+}
+
+GOAL_DATA = {'goal_type': 'long-term', 'target_amount': 5000.0, 'target_date': '2030-01-01', 'priority': 'medium'}
+
+
+def run(db_path, threads, seconds):
+    """Drive writes from `threads` threads; returns (writes/s, latencies in ms, lock errors)"""
+    loans = LoanHistoryService(db_path)
+    goals = GoalsService(db_path)
+    loan_ids = [loans.createLoan(1, LOAN_DATA)['loan_id'] for _ in range(threads)]
+    goal_id = goals.create_goal(1, GOAL_DATA)['id']
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+    lock_errors = [0] * threads
+
+    def worker(index):
+        payment = {'payment_date': '2024-02-15', 'payment_amount': 1.0}
+        writes = [
+            lambda: loans.recordPayment(loan_ids[index], payment, user_id=1),
+            lambda: goals.update_goal(goal_id, 1, {'description': f'writer {index}'})
+        ]
+        count = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                writes[count % 2]()
+            except sqlite3.OperationalError:
+                lock_errors[index] += 1
+            latencies[index].append(time.perf_counter() - start)
+            count += 1
+        close_thread_connections()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = np.array([s for per_thread in latencies for s in per_thread]) * 1000
+    return len(samples) / elapsed, samples, sum(lock_errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print("=" * 78)
+    print(f"CONCURRENT PAYMENT + GOAL WRITES ({args.seconds:g} s per run)")
+    print("=" * 78)
+    print(f"   {'':<20}{'writes/s':>10}{'p50':>10}{'p99':>11}{'locked':>9}{'mean batch':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in args.threads:
+            print(f"\n   {threads} threads")
+            for enabled in (False, True):
+                db_path = os.path.join(tmp, f'bench_{threads}_{int(enabled)}.db')
+                migrate(db_path)
+                write_queue.WRITE_QUEUE_ENABLED = enabled
+                write_queue.write_queue.reset_stats()
+
+                throughput, samples, locked = run(db_path, threads, args.seconds)
+                p50, p99 = np.percentile(samples, [50, 99])
+                mean_batch = write_queue.get_write_queue_stats()['mean_batch_size'] if enabled else 1.0
+                label = 'write queue' if enabled else 'queue off'
+                print(f"   {label:<20}{throughput:>10,.0f}{p50:>7.2f} ms{p99:>8.2f} ms{locked:>9}{mean_batch:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
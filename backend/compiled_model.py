@@ -0,0 +1,366 @@
+"""
+Compiled_Model - Flat array-based evaluator for the enhanced GradientBoosting model
+Exports every regression tree into contiguous NumPy arrays and evaluates all
+trees for a batch of rows at once, without sklearn at inference time
+"""
+
+import json
+import os
+import sys
+import warnings
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from model_inference import checked_raw_predict
+
+
+# Rows evaluated together; keeps the (rows x trees) working set cache-sized
+EVAL_CHUNK_ROWS = 256
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+class CompiledTreeEnsemble:
+    """
+    Flattened tree ensemble
+
+    All trees share one set of node arrays. Nodes are laid out breadth-first per
+    tree with siblings adjacent, so the right child of an internal node is always
+    left + 1 and a traversal step is a single gather plus a comparison. Leaf
+    nodes point at themselves and carry a +inf threshold, so extra steps past a
+    leaf are no-ops. Leaf values already include the learning rate.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 init_value: float, max_depth: int, metadata: Dict[str, Any]):
+        """
+        Initialize CompiledTreeEnsemble
+
+        Args:
+            feature: Feature index tested at each node (int32)
+            threshold: Split threshold at each node, +inf at leaves (float64)
+            left: Left child index at each node, self at leaves (int32)
+            right: Right child index at each node, self at leaves (int32)
+            value: Leaf value scaled by the learning rate (float64)
+            roots: Root node index of each tree (int32)
+            init_value: Prediction of the init estimator (training target mean)
+            max_depth: Deepest tree in the ensemble
+            metadata: Model metadata (feature_cols, metrics, model_type, ...)
+
+        Raises:
+            ValueError: If the node arrays are inconsistent
+        """
+        n_nodes = len(feature)
+        if not (len(threshold) == len(left) == len(right) == len(value) == n_nodes):
+            raise ValueError('Node arrays must all have the same length')
+        is_internal = left != np.arange(n_nodes)
+        if not np.array_equal(right, left + is_internal):
+            raise ValueError('Right children must directly follow left children')
+
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.init_value = float(init_value)
+        self.max_depth = int(max_depth)
+        self.metadata = dict(metadata)
+
+        self.feature_names_in_ = np.array(self.metadata['feature_cols'], dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+
+    @property
+    def n_trees(self) -> int:
+        """Number of trees in the ensemble"""
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        """Total number of nodes across all trees"""
+        return len(self.feature)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict scores for a feature matrix
+
+        Args:
+            X: Array of shape (n_samples, n_features) in feature_cols order
+
+        Returns:
+            1-D float64 array of predictions
+        """
+        # Same float32 rounding sklearn applies before comparing against thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f'Expected feature matrix with {self.n_features_in_} columns, got shape {X.shape}'
+            )
+
+        n_samples = X.shape[0]
+        predictions = np.empty(n_samples, dtype=np.float64)
+        if n_samples == 0:
+            return predictions
+
+        rows = min(EVAL_CHUNK_ROWS, n_samples)
+        shape = (rows, self.n_trees)
+        node = np.empty(shape, dtype=np.intp)
+        index = np.empty(shape, dtype=np.intp)
+        x_values = np.empty(shape, dtype=np.float64)
+        thresholds = np.empty(shape, dtype=np.float64)
+        go_right = np.empty(shape, dtype=bool)
+        row_offsets = (np.arange(rows, dtype=np.intp) * self.n_features_in_)[:, None]
+
+        for start in range(0, n_samples, rows):
+            chunk = X[start:start + rows]
+            k = chunk.shape[0]
+            flat = chunk.ravel()
+            node_k, index_k, x_k = node[:k], index[:k], x_values[:k]
+            thr_k, right_k = thresholds[:k], go_right[:k]
+
+            node_k[:] = self.roots
+            for _ in range(self.max_depth):
+                np.take(self.feature, node_k, out=index_k)
+                index_k += row_offsets[:k]
+                np.take(flat, index_k, out=x_k)
+                np.take(self.threshold, node_k, out=thr_k)
+                np.greater(x_k, thr_k, out=right_k)
+                np.take(self.left, node_k, out=node_k)
+                node_k += right_k
+
+            np.take(self.value, node_k, out=x_k)
+            predictions[start:start + k] = self.init_value + x_k.sum(axis=1)
+
+        return predictions
+
+    def save(self, path: str) -> None:
+        """
+        Save the compiled ensemble as an uncompressed .npz artifact
+
+        Args:
+            path: Destination file path
+        """
+        np.savez(
+            path,
+            format_version=np.int32(ARTIFACT_FORMAT_VERSION),
+            feature=self.feature.astype(np.int32),
+            threshold=self.threshold,
+            left=self.left.astype(np.int32),
+            right=self.right.astype(np.int32),
+            value=self.value,
+            roots=self.roots.astype(np.int32),
+            init_value=np.float64(self.init_value),
+            max_depth=np.int32(self.max_depth),
+            metadata=np.array(json.dumps(self.metadata, default=str))
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledTreeEnsemble':
+        """
+        Load a compiled ensemble artifact (no pickle, no sklearn)
+
+        Args:
+            path: Path to an .npz file written by save()
+
+        Returns:
+            CompiledTreeEnsemble instance
+
+        Raises:
+            ValueError: If the artifact format version is not supported
+        """
+        with np.load(path, allow_pickle=False) as artifact:
+            version = int(artifact['format_version'])
+            if version != ARTIFACT_FORMAT_VERSION:
+                raise ValueError(f'Unsupported compiled model format version: {version}')
+            return cls(
+                feature=artifact['feature'],
+                threshold=artifact['threshold'],
+                left=artifact['left'],
+                right=artifact['right'],
+                value=artifact['value'],
+                roots=artifact['roots'],
+                init_value=float(artifact['init_value']),
+                max_depth=int(artifact['max_depth']),
+                metadata=json.loads(str(artifact['metadata']))
+            )
+
+
+def _flatten_tree(tree, offset: int, learning_rate: float):
+    """
+    Re-lay out one sklearn tree breadth-first with adjacent siblings
+
+    Returns:
+        Tuple of (feature, threshold, left, right, value) arrays using global
+        node indexes starting at offset
+    """
+    children_left = tree.children_left
+    children_right = tree.children_right
+
+    order: List[int] = [0]
+    new_index = {0: 0}
+    position = 0
+    while position < len(order):
+        old = order[position]
+        if children_left[old] != -1:
+            for child in (children_left[old], children_right[old]):
+                new_index[child] = len(order)
+                order.append(child)
+        position += 1
+
+    order_array = np.array(order, dtype=np.intp)
+    n_nodes = len(order_array)
+    is_leaf = children_left[order_array] == -1
+    self_index = np.arange(n_nodes, dtype=np.intp)
+
+    left = np.array([
+        new_index[children_left[old]] if children_left[old] != -1 else i
+        for i, old in enumerate(order)
+    ], dtype=np.intp)
+    right = np.where(is_leaf, self_index, left + 1)
+
+    feature = np.where(is_leaf, 0, tree.feature[order_array])
+    threshold = np.where(is_leaf, np.inf, tree.threshold[order_array])
+    value = learning_rate * tree.value[order_array, 0, 0]
+
+    return feature, threshold, left + offset, right + offset, value
+
+
+def _init_value(model, n_features: int) -> float:
+    """
+    Raw starting prediction of a fitted gradient boosting regressor
+
+    Raises:
+        ValueError: If the init estimator is not a constant (DummyRegressor or zero)
+    """
+    from sklearn.dummy import DummyRegressor
+
+    init = getattr(model, 'init_', None)
+    if isinstance(init, str) and init == 'zero':
+        return 0.0
+    if not isinstance(init, DummyRegressor):
+        raise ValueError('Only models with a constant init estimator can be compiled')
+
+    # A DummyRegressor predicts the same constant for every row
+    return float(np.ravel(init.predict(np.zeros((1, n_features), dtype=np.float64)))[0])
+
+
+def compile_gradient_boosting(model, metadata: Dict[str, Any]) -> CompiledTreeEnsemble:
+    """
+    Flatten a fitted GradientBoostingRegressor into a CompiledTreeEnsemble
+
+    Args:
+        model: Fitted sklearn GradientBoostingRegressor (single output)
+        metadata: Model metadata to embed (must include feature_cols)
+
+    Returns:
+        CompiledTreeEnsemble with identical predictions (within float tolerance)
+
+    Raises:
+        ValueError: If the model is not a single-output gradient boosting regressor
+    """
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None or estimators.ndim != 2 or estimators.shape[1] != 1:
+        raise ValueError('Only fitted single-output GradientBoostingRegressor models can be compiled')
+
+    n_features = len(metadata['feature_cols'])
+    if getattr(model, 'n_features_in_', n_features) != n_features:
+        raise ValueError('feature_cols does not match the number of model features')
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in estimators[:, 0]:
+        tree = estimator.tree_
+        feature, threshold, left, right, value = _flatten_tree(tree, offset, model.learning_rate)
+        roots.append(offset)
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        offset += len(feature)
+        max_depth = max(max_depth, tree.max_depth)
+
+    # Constant prediction of the init estimator (zero when init='zero'), read
+    # through the public init_ estimator; regression losses use the identity link
+    init_value = _init_value(model, n_features)
+
+    compiled_metadata = {key: val for key, val in metadata.items() if key != 'model'}
+    compiled_metadata['n_estimators'] = int(len(roots))
+    compiled_metadata['learning_rate'] = float(model.learning_rate)
+
+    return CompiledTreeEnsemble(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.intp),
+        init_value=init_value,
+        max_depth=max_depth,
+        metadata=compiled_metadata
+    )
+
+
+def export_compiled_model(model_path: str, output_path: Optional[str] = None,
+                          verify_rows: Optional[Sequence[Sequence[float]]] = None) -> str:
+    """
+    Compile an enhanced_model.pkl file into a flat .npz artifact
+
+    Args:
+        model_path: Path to the joblib model file written by train_enhanced_model.py
+        output_path: Destination path (defaults to <model>_compiled.npz)
+        verify_rows: Optional feature rows used to check parity with model.predict
+
+    Returns:
+        Path of the written artifact
+
+    Raises:
+        AssertionError: If compiled predictions differ from sklearn beyond 1e-9
+    """
+    import joblib
+
+    model_data = joblib.load(model_path)
+    compiled = compile_gradient_boosting(model_data['model'], model_data)
+
+    if verify_rows is not None:
+        rows = np.ascontiguousarray(verify_rows, dtype=np.float64)
+        model = model_data['model']
+        raw_predict = checked_raw_predict(model, rows.shape[1]) if rows.ndim == 2 else None
+        if raw_predict is not None:
+            expected = np.asarray(raw_predict(rows.astype(np.float32)), dtype=np.float64).ravel()
+        else:
+            with warnings.catch_warnings():
+                # Fitted on a DataFrame; the verification rows have no feature names
+                warnings.simplefilter('ignore', UserWarning)
+                expected = np.asarray(model.predict(rows), dtype=np.float64).ravel()
+        max_error = float(np.max(np.abs(compiled.predict(rows) - expected))) if len(rows) else 0.0
+        assert max_error < 1e-9, f'Compiled model differs from sklearn by {max_error}'
+
+    if output_path is None:
+        output_path = os.path.splitext(model_path)[0] + '_compiled.npz'
+    compiled.save(output_path)
+    return output_path
+
+
+if __name__ == '__main__':
+    """Compile data/enhanced_model.pkl into data/enhanced_model_compiled.npz"""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, 'enhanced_model.pkl')
+
+    print(f"Compiling {source}...")
+    rng = np.random.default_rng(0)
+    sample_rows = np.column_stack([
+        rng.uniform(0, 300000, 2000),   # income
+        rng.uniform(0, 200000, 2000),   # expenses
+        rng.uniform(0, 100000, 2000),   # savings
+        rng.uniform(0, 80000, 2000),    # emi
+        rng.integers(18, 80, 2000),     # age
+        rng.integers(0, 2, 2000),       # has_loan_numeric
+        rng.uniform(0, 5000000, 2000),  # loan_amount_filled
+        rng.uniform(0, 25, 2000)        # interest_rate_filled
+    ])
+    path = export_compiled_model(source, verify_rows=sample_rows)
+    print(f"   ✓ Compiled model written to {path} (verified on {len(sample_rows):,} rows)")
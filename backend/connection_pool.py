@@ -0,0 +1,295 @@
+"""
+Connection_Pool - Bounded pool of SQLite connections for backend services
+Opens connections with WAL and tuned pragmas, hands the same one to nested
+calls on a thread, and returns it to a shared idle pool when the outermost
+caller closes it, so short-lived request threads do not churn connections
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict
+
+from request_scope import record_statement
+
+
+# Pragmas applied once when a pooled connection is opened
+CACHE_SIZE_KIB = int(os.environ.get('SQLITE_CACHE_SIZE_KIB', 16384))
+MMAP_SIZE_BYTES = int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))
+BUSY_TIMEOUT_SECONDS = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 5.0))
+
+# Idle connections kept for reuse across threads (all databases together); any
+# released beyond this are closed
+POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 16))
+
+# Declared foreign keys have never been enforced on existing databases (goals can
+# be created before a profile row exists), so enforcement is opt-in
+FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', '0') == '1'
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_open_connections = weakref.WeakSet()
+_idle_lock = threading.Lock()
+_idle: Deque['PooledConnection'] = deque()
+_stats = {
+    'connections_opened': 0,
+    'connections_closed': 0,
+    'checkouts': 0,
+    'reuses': 0,
+    'stale_reopens': 0,
+    'leaked_transactions_rolled_back': 0,
+    'evicted': 0
+}
+
+
+def _count(name: str, amount: int = 1) -> None:
+    """Increment a pool statistic"""
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _file_identity(db_path: str):
+    """Identify the database file so a deleted-and-recreated path is detected"""
+    if db_path == ':memory:' or db_path.startswith('file:'):
+        return None
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+class CountingCursor(sqlite3.Cursor):
+    """Cursor that counts each statement against the current request scope"""
+
+    def execute(self, sql, parameters=()):
+        record_statement()
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # One prepared statement, however many rows it is run for
+        record_statement()
+        return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        record_statement()
+        return super().executescript(sql_script)
+
+
+class PooledConnection:
+    """
+    Pooled sqlite3 connection shared by nested service calls on one thread
+
+    Services call close() exactly as they did with a private connection; this
+    only releases one checkout. When the outermost checkout is released, any
+    transaction a caller forgot to commit is rolled back so it cannot leak into
+    the next user, and the connection goes back to the idle pool.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open and configure a connection
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE_BYTES}')
+        conn.execute(f"PRAGMA foreign_keys={'ON' if FOREIGN_KEYS else 'OFF'}")
+
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, 'db_path', db_path)
+        object.__setattr__(self, 'depth', 0)
+        object.__setattr__(self, 'owner', None)
+        object.__setattr__(self, 'file_identity', _file_identity(db_path))
+        _open_connections.add(self)
+        _count('connections_opened')
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # e.g. row_factory, isolation_level
+        setattr(self._conn, name, value)
+
+    def cursor(self, factory=CountingCursor):
+        return self._conn.cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def __enter__(self):
+        # Statements inside the block still go through CountingCursor
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the underlying connection has been closed for good"""
+        try:
+            self._conn.total_changes
+        except sqlite3.ProgrammingError:
+            return True
+        return False
+
+    def close(self) -> None:
+        """Release one checkout; on the last one roll back leaked work and return to the pool"""
+        depth = max(0, self.depth - 1)
+        object.__setattr__(self, 'depth', depth)
+        if depth > 0 or self.owner is None:
+            return
+
+        if self.owner.get(self.db_path) is self:
+            del self.owner[self.db_path]
+        object.__setattr__(self, 'owner', None)
+
+        if self.closed:
+            return
+        if self._conn.in_transaction:
+            self._conn.rollback()
+            _count('leaked_transactions_rolled_back')
+        _release(self)
+
+    def close_connection(self) -> None:
+        """Really close the underlying sqlite3 connection"""
+        if not self.closed:
+            self._conn.close()
+            _count('connections_closed')
+        _open_connections.discard(self)
+
+
+def _release(conn: PooledConnection) -> None:
+    """Put a connection back in the idle pool, closing the oldest idle one if it is full"""
+    with _idle_lock:
+        _idle.append(conn)
+        evicted = _idle.popleft() if len(_idle) > POOL_SIZE else None
+    if evicted is not None:
+        evicted.close_connection()
+        _count('evicted')
+
+
+def _acquire(db_path: str) -> PooledConnection:
+    """Take the most recently released idle connection to a database, or open one"""
+    while True:
+        with _idle_lock:
+            conn = next((idle for idle in reversed(_idle) if idle.db_path == db_path), None)
+            if conn is not None:
+                _idle.remove(conn)
+        if conn is None:
+            return PooledConnection(db_path)
+
+        # Between uses, make sure the file was not deleted or replaced
+        if conn.closed or conn.file_identity != _file_identity(db_path):
+            conn.close_connection()
+            _count('stale_reopens')
+            continue
+        _count('reuses')
+        return conn
+
+
+def get_connection(db_path: str) -> PooledConnection:
+    """
+    Check out a connection for a database
+
+    A thread gets the connection it already has checked out (nested service
+    calls share it), otherwise an idle one from the pool, otherwise a new one.
+    Callers must call close() when done, exactly as with sqlite3.connect().
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        PooledConnection with row_factory set to sqlite3.Row
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _acquire(db_path)
+        object.__setattr__(conn, 'owner', connections)
+    else:
+        _count('reuses')
+
+    object.__setattr__(conn, 'depth', conn.depth + 1)
+    _count('checkouts')
+    return conn
+
+
+def close_thread_connections() -> None:
+    """Close every pooled connection checked out by the calling thread"""
+    connections = getattr(_local, 'connections', None) or {}
+    for conn in list(connections.values()):
+        object.__setattr__(conn, 'owner', None)
+        conn.close_connection()
+    connections.clear()
+
+
+def close_all() -> None:
+    """Close every pooled connection in the process (shutdown and tests)"""
+    with _idle_lock:
+        _idle.clear()
+    for conn in list(_open_connections):
+        conn.close_connection()
+    close_thread_connections()
+
+
+def _forget_inherited_connections() -> None:
+    """
+    Drop the parent's connections in a forked child
+
+    SQLite connections must not be carried across fork(); the child opens its
+    own on first use, so pre-forked workers never share a handle.
+    """
+    global _local, _open_connections, _stats_lock, _idle_lock, _idle
+    _local = threading.local()
+    _open_connections = weakref.WeakSet()
+    _stats_lock = threading.Lock()
+    _idle_lock = threading.Lock()
+    _idle = deque()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_inherited_connections)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool statistics
+
+    Returns:
+        Dictionary with connections_opened, connections_closed, checkouts,
+        reuses, stale_reopens, leaked_transactions_rolled_back, evicted,
+        open_connections, idle_connections, pool_size and reuse_rate
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats['open_connections'] = len(_open_connections)
+    with _idle_lock:
+        stats['idle_connections'] = len(_idle)
+    stats['pool_size'] = POOL_SIZE
+    stats['reuse_rate'] = round(stats['reuses'] / stats['checkouts'], 4) if stats['checkouts'] else 0.0
+    return stats
+
+
+def reset_pool_stats() -> None:
+    """Reset all counters to zero"""
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -7,16 +7,99 @@ import sqlite3
 import os
 from typing import Optional, List, Dict, Any, Tuple
 
+from connection_pool import get_connection
+from write_queue import run_write
+
 
 def get_db_path() -> str:
     """Get the absolute path to the database file"""
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'auth.db')
 
 
+# Loan tables and their single-column filter indexes; lookups by user and by
+# loan go through the composite listing indexes (see init_listing_indexes)
+LOAN_TABLE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS loans (
+        loan_id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        loan_type TEXT NOT NULL CHECK (loan_type IN ('personal', 'home', 'auto', 'education')),
+        loan_amount REAL NOT NULL CHECK (loan_amount > 0),
+        loan_tenure INTEGER NOT NULL CHECK (loan_tenure > 0),
+        monthly_emi REAL NOT NULL CHECK (monthly_emi > 0),
+        interest_rate REAL NOT NULL CHECK (interest_rate >= 0 AND interest_rate <= 50),
+        loan_start_date TEXT NOT NULL,
+        loan_maturity_date TEXT NOT NULL,
+        default_status INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        deleted_at TEXT,
+        total_paid REAL NOT NULL DEFAULT 0,
+        payments_count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_payments (
+        payment_id TEXT PRIMARY KEY,
+        loan_id TEXT NOT NULL,
+        payment_date TEXT NOT NULL,
+        payment_amount REAL NOT NULL CHECK (payment_amount > 0),
+        payment_status TEXT NOT NULL CHECK (payment_status IN ('on-time', 'late', 'missed')),
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (loan_id) REFERENCES loans(loan_id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_metrics (
+        user_id INTEGER PRIMARY KEY,
+        loan_diversity_score REAL CHECK (loan_diversity_score >= 0 AND loan_diversity_score <= 100),
+        payment_history_score REAL CHECK (payment_history_score >= 0 AND payment_history_score <= 100),
+        loan_maturity_score REAL CHECK (loan_maturity_score >= 0 AND loan_maturity_score <= 100),
+        payment_statistics TEXT,
+        loan_statistics TEXT,
+        calculated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_loans_loan_type ON loans(loan_type)',
+    'CREATE INDEX IF NOT EXISTS idx_loans_default_status ON loans(default_status)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_date ON loan_payments(payment_date)',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_status ON loan_payments(payment_status)'
+]
+
+
+def create_loan_schema(conn) -> None:
+    """
+    Create the loan tables, indexes, running totals, score history and listing indexes
+
+    Every statement is idempotent. Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection
+    """
+    cursor = conn.cursor()
+    for statement in LOAN_TABLE_SCHEMA:
+        cursor.execute(statement)
+
+    # Running totals maintained on every loan/payment write
+    init_loan_payment_totals(conn)
+    init_loan_metric_counters(conn)
+    init_score_history(conn)
+
+    # Composite indexes for keyset pagination
+    init_listing_indexes(conn)
+
+
 def init_loan_tables(db_path: Optional[str] = None) -> None:
     """
     Initialize loan-related tables in the database
     
+    Builds only the loan part of the schema (see create_loan_schema), for
+    standalone service databases; the application database is versioned by
+    migrations.py instead.
+    
     Args:
         db_path: Path to database file (defaults to auth.db in backend directory)
     
@@ -24,72 +107,17 @@ def init_loan_tables(db_path: Optional[str] = None) -> None:
         - loans table: stores loan information
         - loan_payments table: tracks payment history
         - loan_metrics table: caches calculated metrics
+        - loan_metric_counters / loan_type_totals: running totals kept by triggers
+        - score_history table: financial health scores over time
         - indexes for performance optimization
     """
     if db_path is None:
         db_path = get_db_path()
     
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    conn = get_connection(db_path)
     
     try:
-        # Create loans table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS loans (
-                loan_id TEXT PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                loan_type TEXT NOT NULL CHECK (loan_type IN ('personal', 'home', 'auto', 'education')),
-                loan_amount REAL NOT NULL CHECK (loan_amount > 0),
-                loan_tenure INTEGER NOT NULL CHECK (loan_tenure > 0),
-                monthly_emi REAL NOT NULL CHECK (monthly_emi > 0),
-                interest_rate REAL NOT NULL CHECK (interest_rate >= 0 AND interest_rate <= 50),
-                loan_start_date TEXT NOT NULL,
-                loan_maturity_date TEXT NOT NULL,
-                default_status INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                deleted_at TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Create loan_payments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS loan_payments (
-                payment_id TEXT PRIMARY KEY,
-                loan_id TEXT NOT NULL,
-                payment_date TEXT NOT NULL,
-                payment_amount REAL NOT NULL CHECK (payment_amount > 0),
-                payment_status TEXT NOT NULL CHECK (payment_status IN ('on-time', 'late', 'missed')),
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (loan_id) REFERENCES loans(loan_id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Create loan_metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS loan_metrics (
-                user_id INTEGER PRIMARY KEY,
-                loan_diversity_score REAL CHECK (loan_diversity_score >= 0 AND loan_diversity_score <= 100),
-                payment_history_score REAL CHECK (payment_history_score >= 0 AND payment_history_score <= 100),
-                loan_maturity_score REAL CHECK (loan_maturity_score >= 0 AND loan_maturity_score <= 100),
-                payment_statistics TEXT,
-                loan_statistics TEXT,
-                calculated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loans_user_id ON loans(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loans_loan_type ON loans(loan_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loans_default_status ON loans(default_status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loans_deleted_at ON loans(deleted_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_loan_id ON loan_payments(loan_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_date ON loan_payments(payment_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_loan_payments_payment_status ON loan_payments(payment_status)')
-        
+        create_loan_schema(conn)
         conn.commit()
         
     except Exception as e:
@@ -99,6 +127,565 @@ def init_loan_tables(db_path: Optional[str] = None) -> None:
         conn.close()
 
 
+LOAN_PAYMENT_TOTAL_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_insert
+    AFTER INSERT ON loan_payments
+    BEGIN
+        UPDATE loans SET
+            total_paid = total_paid + NEW.payment_amount,
+            payments_count = payments_count + 1
+        WHERE loan_id = NEW.loan_id;
+    END
+    """,
+    # Reset to exactly zero when the last payment goes so float drift cannot accumulate
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_delete
+    AFTER DELETE ON loan_payments
+    BEGIN
+        UPDATE loans SET
+            total_paid = CASE WHEN payments_count <= 1 THEN 0 ELSE total_paid - OLD.payment_amount END,
+            payments_count = payments_count - 1
+        WHERE loan_id = OLD.loan_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_loan_totals_payment_update
+    AFTER UPDATE OF loan_id, payment_amount ON loan_payments
+    WHEN OLD.loan_id IS NOT NEW.loan_id OR OLD.payment_amount IS NOT NEW.payment_amount
+    BEGIN
+        UPDATE loans SET
+            total_paid = CASE WHEN payments_count <= 1 THEN 0 ELSE total_paid - OLD.payment_amount END,
+            payments_count = payments_count - 1
+        WHERE loan_id = OLD.loan_id;
+        UPDATE loans SET
+            total_paid = total_paid + NEW.payment_amount,
+            payments_count = payments_count + 1
+        WHERE loan_id = NEW.loan_id;
+    END
+    """
+]
+
+
+def init_loan_payment_totals(conn) -> None:
+    """
+    Add loans.total_paid / loans.payments_count and the triggers that maintain them
+
+    Each payment insert, delete or move updates its loan's running totals in
+    the same transaction, so recording a payment needs one row read instead of
+    loading the loan's whole payment history. Databases created before these
+    columns existed are altered and backfilled from loan_payments.
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection on a database that already has the loan tables
+    """
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA table_info(loans)')
+    columns = {row[1] for row in cursor.fetchall()}
+
+    added = False
+    if 'total_paid' not in columns:
+        cursor.execute('ALTER TABLE loans ADD COLUMN total_paid REAL NOT NULL DEFAULT 0')
+        added = True
+    if 'payments_count' not in columns:
+        cursor.execute('ALTER TABLE loans ADD COLUMN payments_count INTEGER NOT NULL DEFAULT 0')
+        added = True
+
+    for statement in LOAN_PAYMENT_TOTAL_TRIGGERS:
+        cursor.execute(statement)
+
+    if added:
+        _rebuild_payment_totals(cursor)
+
+
+def _rebuild_payment_totals(cursor, user_id: Optional[int] = None) -> None:
+    """Recompute loans.total_paid and loans.payments_count from loan_payments"""
+    user_filter = ' WHERE user_id = ?' if user_id is not None else ''
+    params = (user_id,) if user_id is not None else ()
+    cursor.execute(f'''
+        UPDATE loans SET
+            total_paid = (SELECT COALESCE(SUM(payment_amount), 0)
+                          FROM loan_payments p WHERE p.loan_id = loans.loan_id),
+            payments_count = (SELECT COUNT(*)
+                              FROM loan_payments p WHERE p.loan_id = loans.loan_id){user_filter}
+    ''', params)
+
+
+# Payment statuses tracked by loan_metric_counters, mapped to their count column
+PAYMENT_STATUS_COLUMNS = {
+    'on-time': 'on_time_count',
+    'late': 'late_count',
+    'missed': 'missed_count'
+}
+
+# Loan columns that feed the counters; updates touching anything else are ignored
+_COUNTED_LOAN_COLUMNS = ('loan_id', 'user_id', 'loan_type', 'loan_amount', 'loan_tenure',
+                         'loan_maturity_date', 'deleted_at')
+
+
+def _loan_changed() -> str:
+    """SQL condition that is true when any counted loan column changed"""
+    return ' OR '.join(f'OLD.{col} IS NOT NEW.{col}' for col in _COUNTED_LOAN_COLUMNS)
+
+
+def _loan_payment_counts(row: str, sign: str) -> str:
+    """SET clauses adding (sign '+') or removing (sign '-') all of one loan's payments"""
+    return ',\n            '.join(
+        f"{column} = {column} {sign} (SELECT COUNT(*) FROM loan_payments "
+        f"WHERE loan_id = {row}.loan_id AND payment_status = '{status}')"
+        for status, column in PAYMENT_STATUS_COLUMNS.items()
+    )
+
+
+def _single_payment_counts(row: str, sign: str) -> str:
+    """SET clauses adding or removing a single payment row's status"""
+    return ',\n            '.join(
+        f"{column} = {column} {sign} ({row}.payment_status = '{status}')"
+        for status, column in PAYMENT_STATUS_COLUMNS.items()
+    )
+
+
+def _payment_owner(row: str) -> str:
+    """Owner of a payment's loan, or NULL when the loan is missing or soft-deleted"""
+    return f'(SELECT user_id FROM loans WHERE loan_id = {row}.loan_id AND deleted_at IS NULL)'
+
+
+def _add_loan_sql(row: str) -> str:
+    """Trigger body adding one active loan (and its payments) to the counters"""
+    return f"""
+        INSERT INTO loan_metric_counters (user_id) VALUES ({row}.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count + 1,
+            total_loan_amount = total_loan_amount + {row}.loan_amount,
+            tenure_sum = tenure_sum + {row}.loan_tenure,
+            weighted_tenure_sum = weighted_tenure_sum + {row}.loan_amount * {row}.loan_tenure,
+            soonest_maturity_date = MIN(COALESCE(soonest_maturity_date, {row}.loan_maturity_date), {row}.loan_maturity_date),
+            latest_maturity_date = MAX(COALESCE(latest_maturity_date, {row}.loan_maturity_date), {row}.loan_maturity_date),
+            {_loan_payment_counts(row, '+')},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = {row}.user_id;
+        INSERT INTO loan_type_totals (user_id, loan_type, loan_count, total_amount)
+            VALUES ({row}.user_id, {row}.loan_type, 1, {row}.loan_amount)
+            ON CONFLICT (user_id, loan_type) DO UPDATE SET
+                loan_count = loan_count + 1,
+                total_amount = total_amount + excluded.total_amount;
+    """
+
+
+def _remove_loan_sql(row: str, include_payments: bool = True) -> str:
+    """
+    Trigger body removing one formerly active loan from the counters
+
+    Sums are reset to exactly zero when the last loan goes so float drift cannot
+    accumulate, and maturity bounds are re-read through idx_loans_active_user_maturity.
+    """
+    payments = f'{_loan_payment_counts(row, "-")},' if include_payments else ''
+    return f"""
+        UPDATE loan_metric_counters SET
+            active_loan_count = active_loan_count - 1,
+            total_loan_amount = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE total_loan_amount - {row}.loan_amount END,
+            tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE tenure_sum - {row}.loan_tenure END,
+            weighted_tenure_sum = CASE WHEN active_loan_count <= 1 THEN 0
+                ELSE weighted_tenure_sum - {row}.loan_amount * {row}.loan_tenure END,
+            soonest_maturity_date = (SELECT MIN(loan_maturity_date) FROM loans
+                                     WHERE user_id = {row}.user_id AND deleted_at IS NULL),
+            latest_maturity_date = (SELECT MAX(loan_maturity_date) FROM loans
+                                    WHERE user_id = {row}.user_id AND deleted_at IS NULL),
+            {payments}
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = {row}.user_id;
+        UPDATE loan_type_totals SET
+            loan_count = loan_count - 1,
+            total_amount = CASE WHEN loan_count <= 1 THEN 0 ELSE total_amount - {row}.loan_amount END
+        WHERE user_id = {row}.user_id AND loan_type = {row}.loan_type;
+        DELETE FROM loan_type_totals
+        WHERE user_id = {row}.user_id AND loan_type = {row}.loan_type AND loan_count <= 0;
+    """
+
+
+# Serves the maturity bounds re-read by the triggers and the next-maturity lookup
+ACTIVE_MATURITY_INDEX = (
+    'CREATE INDEX IF NOT EXISTS idx_loans_active_user_maturity '
+    'ON loans(user_id, loan_maturity_date) WHERE deleted_at IS NULL'
+)
+
+LOAN_METRIC_COUNTER_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS loan_metric_counters (
+        user_id INTEGER PRIMARY KEY,
+        active_loan_count INTEGER NOT NULL DEFAULT 0,
+        total_loan_amount REAL NOT NULL DEFAULT 0,
+        tenure_sum INTEGER NOT NULL DEFAULT 0,
+        weighted_tenure_sum REAL NOT NULL DEFAULT 0,
+        soonest_maturity_date TEXT,
+        latest_maturity_date TEXT,
+        on_time_count INTEGER NOT NULL DEFAULT 0,
+        late_count INTEGER NOT NULL DEFAULT 0,
+        missed_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS loan_type_totals (
+        user_id INTEGER NOT NULL,
+        loan_type TEXT NOT NULL,
+        loan_count INTEGER NOT NULL DEFAULT 0,
+        total_amount REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, loan_type)
+    )
+    """,
+    ACTIVE_MATURITY_INDEX,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_insert
+    AFTER INSERT ON loans
+    WHEN NEW.deleted_at IS NULL
+    BEGIN {_add_loan_sql('NEW')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_update_remove
+    AFTER UPDATE ON loans
+    WHEN OLD.deleted_at IS NULL AND ({_loan_changed()})
+    BEGIN {_remove_loan_sql('OLD')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_update_add
+    AFTER UPDATE ON loans
+    WHEN NEW.deleted_at IS NULL AND ({_loan_changed()})
+    BEGIN {_add_loan_sql('NEW')} END
+    """,
+    # Payment counts are taken before the loan row goes: with foreign keys on,
+    # the cascade deletes payments after the loan is gone, so the payment delete
+    # trigger finds no active owner and does not count them a second time
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_delete_payments
+    BEFORE DELETE ON loans
+    WHEN OLD.deleted_at IS NULL
+    BEGIN
+        UPDATE loan_metric_counters SET
+            {_loan_payment_counts('OLD', '-')}
+        WHERE user_id = OLD.user_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_loan_counters_delete
+    AFTER DELETE ON loans
+    WHEN OLD.deleted_at IS NULL
+    BEGIN {_remove_loan_sql('OLD', include_payments=False)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_insert
+    AFTER INSERT ON loan_payments
+    BEGIN
+        UPDATE loan_metric_counters SET
+            {_single_payment_counts('NEW', '+')}
+        WHERE user_id = {_payment_owner('NEW')};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_delete
+    AFTER DELETE ON loan_payments
+    BEGIN
+        UPDATE loan_metric_counters SET
+            {_single_payment_counts('OLD', '-')}
+        WHERE user_id = {_payment_owner('OLD')};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_counters_update
+    AFTER UPDATE OF loan_id, payment_status ON loan_payments
+    WHEN OLD.loan_id IS NOT NEW.loan_id OR OLD.payment_status IS NOT NEW.payment_status
+    BEGIN
+        UPDATE loan_metric_counters SET
+            {_single_payment_counts('OLD', '-')}
+        WHERE user_id = {_payment_owner('OLD')};
+        UPDATE loan_metric_counters SET
+            {_single_payment_counts('NEW', '+')}
+        WHERE user_id = {_payment_owner('NEW')};
+    END
+    """
+]
+
+
+def init_loan_metric_counters(conn) -> None:
+    """
+    Create loan_metric_counters, loan_type_totals and their maintenance triggers
+
+    The triggers keep per-user running totals in step with every write to loans
+    and loan_payments, inside the writer's own transaction. When the counters
+    table is created for the first time it is filled from the existing rows.
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection on a database that already has the loan tables
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='loan_metric_counters'")
+    existed = cursor.fetchone() is not None
+
+    for statement in LOAN_METRIC_COUNTER_SCHEMA:
+        cursor.execute(statement)
+
+    if not existed:
+        _rebuild_counters(cursor)
+
+
+def _rebuild_counters(cursor, user_id: Optional[int] = None) -> None:
+    """Recompute counter rows from loans and loan_payments on an open cursor"""
+    user_filter = ' AND l.user_id = ?' if user_id is not None else ''
+    params = (user_id,) if user_id is not None else ()
+
+    if user_id is None:
+        cursor.execute('DELETE FROM loan_metric_counters')
+        cursor.execute('DELETE FROM loan_type_totals')
+    else:
+        cursor.execute('DELETE FROM loan_metric_counters WHERE user_id = ?', params)
+        cursor.execute('DELETE FROM loan_type_totals WHERE user_id = ?', params)
+
+    status_sums = ', '.join(
+        f"SUM(payment_status = '{status}') AS {column}"
+        for status, column in PAYMENT_STATUS_COLUMNS.items()
+    )
+    status_totals = ', '.join(f'COALESCE(SUM(p.{column}), 0)' for column in PAYMENT_STATUS_COLUMNS.values())
+
+    cursor.execute(f'''
+        INSERT INTO loan_metric_counters
+            (user_id, active_loan_count, total_loan_amount, tenure_sum, weighted_tenure_sum,
+             soonest_maturity_date, latest_maturity_date,
+             on_time_count, late_count, missed_count, updated_at)
+        SELECT l.user_id, COUNT(*), SUM(l.loan_amount), SUM(l.loan_tenure),
+               SUM(l.loan_amount * l.loan_tenure),
+               MIN(l.loan_maturity_date), MAX(l.loan_maturity_date),
+               {status_totals}, CURRENT_TIMESTAMP
+        FROM loans l
+        LEFT JOIN (
+            SELECT loan_id, {status_sums}
+            FROM loan_payments
+            GROUP BY loan_id
+        ) p ON p.loan_id = l.loan_id
+        WHERE l.deleted_at IS NULL{user_filter}
+        GROUP BY l.user_id
+    ''', params)
+    cursor.execute(f'''
+        INSERT INTO loan_type_totals (user_id, loan_type, loan_count, total_amount)
+        SELECT l.user_id, l.loan_type, COUNT(*), SUM(l.loan_amount)
+        FROM loans l
+        WHERE l.deleted_at IS NULL{user_filter}
+        GROUP BY l.user_id, l.loan_type
+    ''', params)
+
+
+def _counter_snapshot(cursor, user_id: Optional[int]) -> Dict[int, Tuple]:
+    """Counter and type-total rows per user, rounded for drift comparison"""
+    where = ' WHERE user_id = ?' if user_id is not None else ''
+    params = (user_id,) if user_id is not None else ()
+    snapshot: Dict[int, Tuple] = {}
+
+    cursor.execute(f'''
+        SELECT user_id, active_loan_count, total_loan_amount, tenure_sum, weighted_tenure_sum,
+               soonest_maturity_date, latest_maturity_date, on_time_count, late_count, missed_count
+        FROM loan_metric_counters{where}
+    ''', params)
+    for row in cursor.fetchall():
+        counters = tuple(round(v, 6) if isinstance(v, float) else v for v in tuple(row)[1:])
+        snapshot[row[0]] = (counters, ())
+
+    cursor.execute(f'''
+        SELECT user_id, loan_type, loan_count, total_amount
+        FROM loan_type_totals{where}
+        ORDER BY user_id, loan_type
+    ''', params)
+    for row in cursor.fetchall():
+        counters, types = snapshot.get(row[0], ((), ()))
+        snapshot[row[0]] = (counters, types + ((row[1], row[2], round(row[3], 6)),))
+
+    return snapshot
+
+
+def rebuild_loan_metric_counters(db_path: Optional[str] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reconcile loan metric counters with the base tables
+
+    Recomputes the counters (and each loan's total_paid / payments_count)
+    from loans and loan_payments in one transaction, for every user or just one. Use after bulk edits made outside the triggers,
+    or to check that the running totals have not drifted.
+
+    Args:
+        db_path: Path to database file (defaults to auth.db in backend directory)
+        user_id: Only rebuild this user's counters
+
+    Returns:
+        Dictionary with users_rebuilt and mismatched_users (users whose stored
+        counters differed from the recomputed ones)
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    try:
+        init_loan_payment_totals(conn)
+        init_loan_metric_counters(conn)
+        before = _counter_snapshot(cursor, user_id)
+        _rebuild_payment_totals(cursor, user_id)
+        _rebuild_counters(cursor, user_id)
+        after = _counter_snapshot(cursor, user_id)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+    mismatched = sorted(
+        uid for uid in set(before) | set(after)
+        if before.get(uid) != after.get(uid)
+    )
+    return {
+        'users_rebuilt': len(after),
+        'mismatched_users': mismatched
+    }
+
+
+SCORE_HISTORY_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS score_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        overall_score REAL NOT NULL CHECK (overall_score >= 0 AND overall_score <= 100),
+        savings_score REAL,
+        debt_score REAL,
+        expense_score REAL,
+        balance_score REAL,
+        life_stage_score REAL,
+        loan_diversity_score REAL,
+        payment_history_score REAL,
+        loan_maturity_score REAL,
+        calculated_at TEXT NOT NULL,
+        source TEXT NOT NULL DEFAULT 'health' CHECK (source IN ('health', 'predict')),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    # Leads with (user_id, calculated_at) and carries every column getScoreHistory
+    # reads, so history queries are answered from the index alone
+    '''
+    CREATE INDEX IF NOT EXISTS idx_score_history_user_time ON score_history (
+        user_id, calculated_at, overall_score, source,
+        savings_score, debt_score, expense_score, balance_score, life_stage_score,
+        loan_diversity_score, payment_history_score, loan_maturity_score
+    )
+    '''
+]
+
+
+def init_score_history(conn) -> None:
+    """
+    Create score_history and its covering (user_id, calculated_at) index
+
+    Tables created before the source column existed are altered first.
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection
+    """
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA table_info(score_history)')
+    columns = {row[1] for row in cursor.fetchall()}
+    if columns and 'source' not in columns:
+        cursor.execute("ALTER TABLE score_history ADD COLUMN source TEXT NOT NULL DEFAULT 'health'")
+
+    for statement in SCORE_HISTORY_SCHEMA:
+        cursor.execute(statement)
+
+
+def _priority_rank(priority: str) -> str:
+    """SQL expression ranking a goal priority: high 1, medium 2, low 3"""
+    return f"CASE {priority} WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END"
+
+
+GOAL_PRIORITY_RANK = _priority_rank('priority')
+
+# Keyset pagination: every page of a listing is a range scan of one of these.
+# idx_loans_active_user_created holds active loans only, so the hot
+# "user_id = ? AND deleted_at IS NULL" reads never visit soft-deleted rows
+LISTING_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_loans_user_created ON loans(user_id, created_at, loan_id)',
+    'CREATE INDEX IF NOT EXISTS idx_loans_active_user_created ON loans(user_id, created_at, loan_id) '
+    'WHERE deleted_at IS NULL',
+    'CREATE INDEX IF NOT EXISTS idx_loan_payments_loan_date ON loan_payments(loan_id, payment_date, payment_id)'
+]
+
+# financial_goals.priority_rank is GOAL_PRIORITY_RANK stored as a plain column,
+# so goal listings (optionally filtered on status) sort straight off an index
+GOAL_PRIORITY_RANK_SCHEMA = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_financial_goals_rank_insert
+    AFTER INSERT ON financial_goals
+    BEGIN
+        UPDATE financial_goals SET priority_rank = {_priority_rank('NEW.priority')}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_financial_goals_rank_update
+    AFTER UPDATE OF priority ON financial_goals
+    BEGIN
+        UPDATE financial_goals SET priority_rank = {_priority_rank('NEW.priority')}
+        WHERE id = NEW.id;
+    END
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_priority '
+    'ON financial_goals(user_id, priority_rank, target_date, id)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_status_priority '
+    'ON financial_goals(user_id, status, priority_rank, target_date, id)',
+    # Superseded by idx_financial_goals_user_priority
+    'DROP INDEX IF EXISTS idx_financial_goals_user_rank'
+]
+
+
+def init_listing_indexes(conn) -> None:
+    """
+    Create the composite indexes behind the paginated loan, payment and goal listings
+
+    The goal part (see init_goal_priority_rank) is only created when
+    financial_goals exists.
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection on a database that already has the loan tables
+    """
+    cursor = conn.cursor()
+    for statement in LISTING_INDEXES:
+        cursor.execute(statement)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'financial_goals'")
+    if cursor.fetchone():
+        init_goal_priority_rank(conn)
+
+
+def init_goal_priority_rank(conn) -> None:
+    """
+    Add financial_goals.priority_rank with the triggers and indexes that use it
+
+    Tables created before the column existed are altered and backfilled.
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        conn: Open connection on a database that already has financial_goals
+    """
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA table_info(financial_goals)')
+    if 'priority_rank' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE financial_goals ADD COLUMN priority_rank INTEGER')
+        cursor.execute(f'UPDATE financial_goals SET priority_rank = {GOAL_PRIORITY_RANK}')
+
+    for statement in GOAL_PRIORITY_RANK_SCHEMA:
+        cursor.execute(statement)
+
+
 def verify_loan_tables(db_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Verify that loan tables exist and have correct structure
@@ -112,7 +699,7 @@ def verify_loan_tables(db_path: Optional[str] = None) -> Dict[str, Any]:
     if db_path is None:
         db_path = get_db_path()
     
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     results = {
@@ -124,7 +711,7 @@ def verify_loan_tables(db_path: Optional[str] = None) -> Dict[str, Any]:
     
     try:
         # Check tables
-        expected_tables = ['loans', 'loan_payments', 'loan_metrics']
+        expected_tables = ['loans', 'loan_payments', 'loan_metrics', 'loan_metric_counters', 'loan_type_totals']
         for table in expected_tables:
             cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
             exists = cursor.fetchone() is not None
@@ -181,16 +768,14 @@ def execute_loan_query(
     if db_path is None:
         db_path = get_db_path()
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     try:
-        cursor.execute(query, params)
-        
         if commit:
-            conn.commit()
-            return cursor.lastrowid
+            return run_write(db_path, lambda write_conn: write_conn.execute(query, params).lastrowid)
+        
+        cursor.execute(query, params)
         
         if fetch_one:
             result = cursor.fetchone()
@@ -223,7 +808,7 @@ def get_loan_table_stats(db_path: Optional[str] = None) -> Dict[str, int]:
     if db_path is None:
         db_path = get_db_path()
     
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     stats = {}
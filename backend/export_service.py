@@ -0,0 +1,191 @@
+"""
+ExportService - Streaming export of a user's financial record
+Rows are read from SQLite cursors in fetchmany() batches and serialized as they
+arrive, so memory use does not grow with the size of the history and the first
+bytes can be sent before the last query has run
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from connection_pool import get_connection
+
+
+# Rows fetched from SQLite (and serialized) per batch
+EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE', 500))
+
+# Export sections, in output order: (columns, query selecting them for one user_id).
+# Payments follow the loans section's order and goals the goal listing's, so
+# every section is read in index order without a sort. l.rowid proves to SQLite
+# that each loan is a single outer row, so its payments are not re-sorted
+EXPORT_SECTIONS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    'profile': (
+        ('user_id', 'name', 'age', 'location', 'risk_tolerance', 'profile_picture_url',
+         'notification_preferences', 'created_at', 'updated_at'),
+        'SELECT {columns} FROM users_profile WHERE user_id = ?'
+    ),
+    'loans': (
+        ('loan_id', 'user_id', 'loan_type', 'loan_amount', 'loan_tenure', 'monthly_emi',
+         'interest_rate', 'loan_start_date', 'loan_maturity_date', 'default_status',
+         'total_paid', 'payments_count', 'created_at', 'updated_at', 'deleted_at'),
+        'SELECT {columns} FROM loans WHERE user_id = ? ORDER BY created_at, loan_id'
+    ),
+    'payments': (
+        ('payment_id', 'loan_id', 'payment_date', 'payment_amount', 'payment_status',
+         'created_at', 'updated_at'),
+        '''SELECT {columns} FROM loan_payments p JOIN loans l ON l.loan_id = p.loan_id
+           WHERE l.user_id = ? ORDER BY l.created_at, l.loan_id, l.rowid, p.payment_date, p.payment_id'''
+    ),
+    'goals': (
+        ('id', 'user_id', 'goal_type', 'target_amount', 'target_date', 'priority',
+         'status', 'description', 'created_at', 'updated_at'),
+        'SELECT {columns} FROM financial_goals WHERE user_id = ? ORDER BY priority_rank, target_date, id'
+    )
+}
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+class ExportService:
+    """Service class for streaming a user's loans, payments, goals and profile"""
+
+    def __init__(self, db_path: str, fetch_size: int = EXPORT_FETCH_SIZE):
+        """
+        Initialize ExportService
+
+        Args:
+            db_path: Path to SQLite database
+            fetch_size: Rows fetched and serialized per batch
+        """
+        self.db_path = db_path
+        self.fetch_size = fetch_size
+
+    def _get_connection(self):
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
+
+    def parse_sections(self, sections: Optional[str], fmt: str) -> List[str]:
+        """
+        Validate the sections requested for an export
+
+        Args:
+            sections: Comma-separated section names, or None for all
+            fmt: 'ndjson' or 'csv'
+
+        Returns:
+            Section names in export order
+
+        Raises:
+            ValueError: If the format or a section is unknown, or a CSV export
+                does not name exactly one section
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        if sections is None:
+            requested = set(EXPORT_SECTIONS)
+        else:
+            requested = {name.strip() for name in sections.split(',') if name.strip()}
+            unknown = requested.difference(EXPORT_SECTIONS)
+            if unknown or not requested:
+                raise ValueError(f"sections must be chosen from: {', '.join(EXPORT_SECTIONS)}")
+        if fmt == 'csv' and len(requested) != 1:
+            # One header per file; each section has its own columns
+            raise ValueError('CSV exports take exactly one section, e.g. sections=payments')
+        return [name for name in EXPORT_SECTIONS if name in requested]
+
+    def iter_batches(self, user_id: int, sections: Sequence[str]) -> Iterator[Tuple[str, Tuple[str, ...], List[Any]]]:
+        """
+        Read the user's rows section by section, a batch at a time
+
+        All sections are read inside one read transaction, so the export is a
+        consistent snapshot even if the user writes while it streams.
+
+        Args:
+            user_id: ID of the user
+            sections: Section names (from parse_sections)
+
+        Yields:
+            Tuples of (section, columns, rows) with at most fetch_size rows
+        """
+        conn = self._get_connection()
+        try:
+            conn.execute('BEGIN')
+            for section in sections:
+                columns, query = EXPORT_SECTIONS[section]
+                prefix = 'p.' if section == 'payments' else ''
+                cur = conn.cursor()
+                cur.execute(query.format(columns=', '.join(prefix + column for column in columns)), (user_id,))
+                while True:
+                    rows = cur.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    yield section, columns, rows
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+
+    def iter_ndjson(self, user_id: int, sections: Sequence[str]) -> Iterator[str]:
+        """
+        Stream the export as NDJSON, one object per row tagged with its section
+
+        Args:
+            user_id: ID of the user
+            sections: Section names (from parse_sections)
+
+        Yields:
+            Chunks of newline-terminated JSON lines, one chunk per batch
+        """
+        for section, columns, rows in self.iter_batches(user_id, sections):
+            yield ''.join(
+                json.dumps({'section': section, **dict(zip(columns, row))}) + '\n'
+                for row in rows
+            )
+
+    def iter_csv(self, user_id: int, section: str) -> Iterator[str]:
+        """
+        Stream one section as CSV with a header row
+
+        Args:
+            user_id: ID of the user
+            section: Section name
+
+        Yields:
+            Chunks of CSV text: the header, then one chunk per batch
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_SECTIONS[section][0])
+        yield buffer.getvalue()
+
+        for _, _, rows in self.iter_batches(user_id, [section]):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue()
+
+
+def gzip_stream(chunks: Iterator[str], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip a stream of text chunks incrementally
+
+    Each chunk is sync-flushed, so the client can decompress every batch as
+    soon as it arrives instead of waiting for the end of the export.
+
+    Args:
+        chunks: Text chunks
+        level: zlib compression level
+
+    Yields:
+        Gzip-encoded bytes
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
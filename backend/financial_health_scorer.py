@@ -5,8 +5,125 @@ Integrates loan metrics with existing 5-factor model for comprehensive assessmen
 
 import sqlite3
 from datetime import datetime
+from itertools import repeat
 from typing import Dict, Any, List, Optional
+
+import numpy as np
+
 from loan_metrics_engine import LoanMetricsEngine
+from connection_pool import get_connection
+from score_history import score_history_writer
+from write_queue import run_write
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """np.round to 2 decimals, agreeing with round() on values that sit near a half"""
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(value, 2) for value in values[near_half].tolist()]
+    return rounded
+
+
+# Display names of the eight factors, in WEIGHTS order
+FACTOR_NAMES = {
+    'savings': 'Savings',
+    'debt': 'Debt Management',
+    'expense': 'Expense Control',
+    'balance': 'Balance',
+    'life_stage': 'Life Stage',
+    'loan_diversity': 'Loan Diversity',
+    'payment_history': 'Payment History',
+    'loan_maturity': 'Loan Maturity'
+}
+
+
+class ScoreResult:
+    """
+    One 8-factor scoring of a user
+    
+    Holds each factor's raw score once. The overall score, the per-factor
+    breakdown and the with/without-loans delta are all derived from it, so
+    none of them recomputes factors or queries loan metrics again.
+    """
+    
+    def __init__(self, factor_scores: Dict[str, float], weights: Dict[str, float],
+                 loan_defaults: Dict[str, float], calculated_at: Optional[str] = None):
+        """
+        Initialize ScoreResult
+        
+        Args:
+            factor_scores: Raw score per factor, keyed like WEIGHTS
+            weights: Factor weights
+            loan_defaults: Neutral loan factor scores used for the "without loans" score
+            calculated_at: ISO 8601 timestamp (defaults to now, UTC)
+        """
+        self.factor_scores = factor_scores
+        self.weights = weights
+        self.loan_defaults = loan_defaults
+        self.calculated_at = calculated_at or datetime.utcnow().isoformat() + 'Z'
+    
+    def _weighted_score(self, factor_scores: Dict[str, float]) -> float:
+        """Weighted sum of factor scores, normalized to 0-100 with 2 decimal places"""
+        overall_score = sum(factor_scores[factor] * self.weights[factor] for factor in FACTOR_NAMES)
+        return max(0.0, min(100.0, round(overall_score, 2)))
+    
+    @property
+    def overall_score(self) -> float:
+        """Overall 8-factor score (0-100)"""
+        return self._weighted_score(self.factor_scores)
+    
+    @property
+    def score_without_loans(self) -> float:
+        """Overall score with the three loan factors at their neutral defaults"""
+        return self._weighted_score({**self.factor_scores, **self.loan_defaults})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Overall and per-factor scores (see calculateFinancialHealthScore)"""
+        return {
+            'overall_score': self.overall_score,
+            **{f'{factor}_score': round(self.factor_scores[factor], 2) for factor in FACTOR_NAMES},
+            'calculated_at': self.calculated_at
+        }
+    
+    def breakdown(self) -> Dict[str, Any]:
+        """Factor scores with weights and contributions (see getScoreBreakdown)"""
+        factors = []
+        for factor, name in FACTOR_NAMES.items():
+            score = round(self.factor_scores[factor], 2)
+            factors.append({
+                'name': name,
+                'score': score,
+                'weight': self.weights[factor],
+                'contribution': round(score * self.weights[factor], 2)
+            })
+        
+        return {
+            'overall_score': self.overall_score,
+            'factors': factors
+        }
+    
+    def delta(self) -> Dict[str, Any]:
+        """Impact of loan history on the overall score (see calculateScoreDelta)"""
+        score_with_loans = self.overall_score
+        score_without_loans = self.score_without_loans
+        
+        # Calculate delta
+        delta = round(score_with_loans - score_without_loans, 2)
+        
+        # Calculate percentage change
+        if score_without_loans > 0:
+            percentage_change = round((delta / score_without_loans) * 100, 2)
+        else:
+            percentage_change = 0.0
+        
+        return {
+            'score_with_loans': score_with_loans,
+            'score_without_loans': score_without_loans,
+            'delta': delta,
+            'percentage_change': percentage_change
+        }
 
 
 class FinancialHealthScorer:
@@ -31,6 +148,12 @@ class FinancialHealthScorer:
         'loan_maturity': 50.0        # Neutral
     }
     
+    # Financial fields read by the five non-loan factors, with their defaults
+    FINANCIAL_DEFAULTS = {
+        'income': 0, 'savings': 0, 'rent': 0, 'food': 0,
+        'travel': 0, 'shopping': 0, 'emi': 0, 'age': 30
+    }
+    
     def __init__(self, db_path: str):
         """
         Initialize FinancialHealthScorer
@@ -42,10 +165,8 @@ class FinancialHealthScorer:
         self.loan_metrics_engine = LoanMetricsEngine(db_path)
     
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
     
     def _calculate_savings_score(self, financial_data: Dict[str, float]) -> float:
         """
@@ -208,6 +329,48 @@ class FinancialHealthScorer:
         else:
             return 70.0  # Retirement
     
+    def scoreUser(self, user_id: int, financial_data: Dict[str, float]) -> ScoreResult:
+        """
+        Score a user once and return the result object
+        
+        All eight factors are computed here (one loan metrics read); overall
+        score, breakdown and delta are derived from the returned ScoreResult.
+        The score is queued for score_history.
+        
+        Args:
+            user_id: ID of the user
+            financial_data: Dictionary with financial information
+        
+        Returns:
+            ScoreResult
+        """
+        # Calculate existing 5 factors
+        factor_scores = {
+            'savings': self._calculate_savings_score(financial_data),
+            'debt': self._calculate_debt_score(financial_data),
+            'expense': self._calculate_expense_score(financial_data),
+            'balance': self._calculate_balance_score(financial_data),
+            'life_stage': self._calculate_life_stage_score(financial_data)
+        }
+        
+        # Calculate new 3 loan factors
+        # Check if user has loan history
+        try:
+            loan_metrics = self.loan_metrics_engine.computeAllMetrics(user_id)
+            factor_scores['loan_diversity'] = loan_metrics['loan_diversity_score']
+            factor_scores['payment_history'] = loan_metrics['payment_history_score']
+            factor_scores['loan_maturity'] = loan_metrics['loan_maturity_score']
+        except Exception:
+            # Use defaults if loan metrics calculation fails
+            factor_scores.update(self.LOAN_DEFAULTS)
+        
+        result = ScoreResult(factor_scores, self.WEIGHTS, self.LOAN_DEFAULTS)
+        
+        # Queued for score_history; written in the background in batches
+        score_history_writer.append(self.db_path, user_id, result.to_dict())
+        
+        return result
+    
     def calculateFinancialHealthScore(self, user_id: int, financial_data: Dict[str, float]) -> Dict[str, Any]:
         """
         Calculate overall financial health score using 8-factor model
@@ -239,52 +402,126 @@ class FinancialHealthScorer:
             - loan_maturity_score: float
             - calculated_at: str (ISO 8601 timestamp)
         """
-        # Calculate existing 5 factors
-        savings_score = self._calculate_savings_score(financial_data)
-        debt_score = self._calculate_debt_score(financial_data)
-        expense_score = self._calculate_expense_score(financial_data)
-        balance_score = self._calculate_balance_score(financial_data)
-        life_stage_score = self._calculate_life_stage_score(financial_data)
+        return self.scoreUser(user_id, financial_data).to_dict()
+    
+    def _calculate_base_scores_batch(self, financial_data: Dict[str, Any], size: int) -> Dict[str, np.ndarray]:
+        """
+        Calculate the five non-loan factor scores for many users at once
         
-        # Calculate new 3 loan factors
-        # Check if user has loan history
-        try:
-            loan_diversity_score = self.loan_metrics_engine.calculateLoanDiversityScore(user_id)
-            payment_history_score = self.loan_metrics_engine.calculatePaymentHistoryScore(user_id)
-            loan_maturity_score = self.loan_metrics_engine.calculateLoanMaturityScore(user_id)
-        except Exception:
-            # Use defaults if loan metrics calculation fails
-            loan_diversity_score = self.LOAN_DEFAULTS['loan_diversity']
-            payment_history_score = self.LOAN_DEFAULTS['payment_history']
-            loan_maturity_score = self.LOAN_DEFAULTS['loan_maturity']
-        
-        # Calculate weighted overall score
-        overall_score = (
-            savings_score * self.WEIGHTS['savings'] +
-            debt_score * self.WEIGHTS['debt'] +
-            expense_score * self.WEIGHTS['expense'] +
-            balance_score * self.WEIGHTS['balance'] +
-            life_stage_score * self.WEIGHTS['life_stage'] +
-            loan_diversity_score * self.WEIGHTS['loan_diversity'] +
-            payment_history_score * self.WEIGHTS['payment_history'] +
-            loan_maturity_score * self.WEIGHTS['loan_maturity']
-        )
-        
-        # Normalize to 0-100 and round to 2 decimal places
-        overall_score = max(0.0, min(100.0, round(overall_score, 2)))
+        Evaluates the same ladders as the _calculate_*_score methods, with
+        np.select/np.digitize over whole columns instead of per-user branches.
+        
+        Args:
+            financial_data: Mapping of field name to a column of values
+                (missing fields use FINANCIAL_DEFAULTS)
+            size: Number of users
+        
+        Returns:
+            Dictionary of arrays: savings_score, debt_score, expense_score,
+            balance_score, life_stage_score
+        """
+        columns = {
+            field: np.asarray(financial_data[field], dtype=np.float64) if field in financial_data
+            else np.full(size, default, dtype=np.float64)
+            for field, default in self.FINANCIAL_DEFAULTS.items()
+        }
+        income = columns['income']
+        savings = columns['savings']
+        emi = columns['emi']
+        total_expenses = columns['rent'] + columns['food'] + columns['travel'] + columns['shopping'] + emi
+        no_income = income <= 0
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            savings_ratio = savings / income
+            emi_ratio = emi / income
+            expense_ratio = total_expenses / income
+        balance = income - total_expenses - savings
         
         return {
+            'savings_score': np.select(
+                [no_income, savings_ratio >= 0.30, savings_ratio >= 0.20, savings_ratio >= 0.15,
+                 savings_ratio >= 0.10, savings_ratio >= 0.05],
+                [0.0, 100.0, 85.0, 70.0, 55.0, 40.0], 20.0
+            ),
+            'debt_score': np.select(
+                [no_income, emi_ratio == 0, emi_ratio <= 0.20, emi_ratio <= 0.30,
+                 emi_ratio <= 0.40, emi_ratio <= 0.50],
+                [0.0, 100.0, 85.0, 70.0, 50.0, 30.0], 10.0
+            ),
+            'expense_score': np.select(
+                [no_income, expense_ratio <= 0.50, expense_ratio <= 0.60, expense_ratio <= 0.70,
+                 expense_ratio <= 0.80, expense_ratio <= 0.90],
+                [0.0, 100.0, 85.0, 70.0, 50.0, 30.0], 10.0
+            ),
+            'balance_score': np.select(
+                [no_income, (balance >= 0) & (savings > 0), balance >= 0, balance >= -income * 0.10],
+                [0.0, 100.0, 70.0, 50.0], 20.0
+            ),
+            # Age bands <25, <35, <50, <60, 60+
+            'life_stage_score': np.array([75.0, 85.0, 80.0, 75.0, 70.0])[np.digitize(columns['age'], [25, 35, 50, 60])]
+        }
+    
+    def calculateFinancialHealthScoresBatch(self, user_ids, financial_data: Dict[str, Any],
+                                            persist: bool = True) -> Dict[str, Any]:
+        """
+        Calculate the 8-factor score for a whole population in one pass
+        
+        For rescoring every user (e.g. after a WEIGHTS change): loan factors
+        come from LoanMetricsEngine.computeScoresBatch (a few set-based
+        queries for all users), the other five from vectorized ladders, and
+        results are appended to score_history with one executemany. Scores
+        match calculateFinancialHealthScore user for user.
+        
+        Args:
+            user_ids: Sequence of user IDs
+            financial_data: Mapping of financial field (income, savings, rent,
+                food, travel, shopping, emi, age) to a column of values aligned
+                with user_ids
+            persist: Whether to write the results to score_history
+        
+        Returns:
+            Dictionary containing:
+            - user_id: array of user IDs
+            - overall_score: array (0-100, 2 decimal places)
+            - one array per factor score (savings_score ... loan_maturity_score)
+            - calculated_at: str (ISO 8601 timestamp, shared by the batch)
+        
+        Raises:
+            sqlite3.Error: If persisting the results fails
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        
+        scores = self._calculate_base_scores_batch(financial_data, len(user_ids))
+        scores.update(self.loan_metrics_engine.computeScoresBatch(user_ids))
+        
+        overall_score = sum(scores[f'{factor}_score'] * weight for factor, weight in self.WEIGHTS.items())
+        overall_score = np.clip(_round2(overall_score), 0.0, 100.0)
+        
+        calculated_at = datetime.utcnow().isoformat() + 'Z'
+        result = {
+            'user_id': user_ids,
             'overall_score': overall_score,
-            'savings_score': round(savings_score, 2),
-            'debt_score': round(debt_score, 2),
-            'expense_score': round(expense_score, 2),
-            'balance_score': round(balance_score, 2),
-            'life_stage_score': round(life_stage_score, 2),
-            'loan_diversity_score': round(loan_diversity_score, 2),
-            'payment_history_score': round(payment_history_score, 2),
-            'loan_maturity_score': round(loan_maturity_score, 2),
-            'calculated_at': datetime.utcnow().isoformat() + 'Z'
+            **scores,
+            'calculated_at': calculated_at
         }
+        
+        if persist:
+            self._write_score_history(result)
+        
+        return result
+    
+    def _write_score_history(self, result: Dict[str, Any]) -> None:
+        """Append a batch result to score_history in a single transaction"""
+        columns = ['user_id', 'overall_score'] + [f'{factor}_score' for factor in self.WEIGHTS]
+        rows = zip(*(result[column].tolist() for column in columns), repeat(result['calculated_at']))
+        
+        def write(conn):
+            conn.executemany(f'''
+                INSERT INTO score_history ({', '.join(columns)}, calculated_at)
+                VALUES ({', '.join('?' * (len(columns) + 1))})
+            ''', rows)
+        
+        run_write(self.db_path, write)
     
     def getScoreBreakdown(self, user_id: int, financial_data: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -299,90 +536,37 @@ class FinancialHealthScorer:
             - overall_score: float
             - factors: list of factor dictionaries with name, score, weight, contribution
         """
-        score_result = self.calculateFinancialHealthScore(user_id, financial_data)
-        
-        factors = [
-            {
-                'name': 'Savings',
-                'score': score_result['savings_score'],
-                'weight': self.WEIGHTS['savings'],
-                'contribution': round(score_result['savings_score'] * self.WEIGHTS['savings'], 2)
-            },
-            {
-                'name': 'Debt Management',
-                'score': score_result['debt_score'],
-                'weight': self.WEIGHTS['debt'],
-                'contribution': round(score_result['debt_score'] * self.WEIGHTS['debt'], 2)
-            },
-            {
-                'name': 'Expense Control',
-                'score': score_result['expense_score'],
-                'weight': self.WEIGHTS['expense'],
-                'contribution': round(score_result['expense_score'] * self.WEIGHTS['expense'], 2)
-            },
-            {
-                'name': 'Balance',
-                'score': score_result['balance_score'],
-                'weight': self.WEIGHTS['balance'],
-                'contribution': round(score_result['balance_score'] * self.WEIGHTS['balance'], 2)
-            },
-            {
-                'name': 'Life Stage',
-                'score': score_result['life_stage_score'],
-                'weight': self.WEIGHTS['life_stage'],
-                'contribution': round(score_result['life_stage_score'] * self.WEIGHTS['life_stage'], 2)
-            },
-            {
-                'name': 'Loan Diversity',
-                'score': score_result['loan_diversity_score'],
-                'weight': self.WEIGHTS['loan_diversity'],
-                'contribution': round(score_result['loan_diversity_score'] * self.WEIGHTS['loan_diversity'], 2)
-            },
-            {
-                'name': 'Payment History',
-                'score': score_result['payment_history_score'],
-                'weight': self.WEIGHTS['payment_history'],
-                'contribution': round(score_result['payment_history_score'] * self.WEIGHTS['payment_history'], 2)
-            },
-            {
-                'name': 'Loan Maturity',
-                'score': score_result['loan_maturity_score'],
-                'weight': self.WEIGHTS['loan_maturity'],
-                'contribution': round(score_result['loan_maturity_score'] * self.WEIGHTS['loan_maturity'], 2)
-            }
-        ]
-        
-        return {
-            'overall_score': score_result['overall_score'],
-            'factors': factors
-        }
-
+        return self.scoreUser(user_id, financial_data).breakdown()
     
     def getScoreHistory(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get historical financial health scores for a user
         
+        Scores still waiting in the write-behind queue are flushed first, so a
+        user always sees their latest score. The query is answered from the
+        covering idx_score_history_user_time index.
+        
         Args:
             user_id: ID of the user
             limit: Maximum number of historical records to return
         
         Returns:
-            List of score history dictionaries with:
+            List of score history dictionaries, newest first, with:
             - score: float
+            - source: str ('health' for the 8-factor model, 'predict' for /api/predict)
             - calculated_at: str (ISO 8601 timestamp)
-            - factors: list of factor scores
+            - factors: list of factor scores (empty for 'predict' scores)
         """
+        score_history_writer.flush()
+        
         conn = self._get_connection()
         cur = conn.cursor()
         
         try:
-            # Query score history from database
-            # Note: This assumes a score_history table exists
-            # For now, return empty list as placeholder
             cur.execute('''
                 SELECT overall_score, savings_score, debt_score, expense_score,
                        balance_score, life_stage_score, loan_diversity_score,
-                       payment_history_score, loan_maturity_score, calculated_at
+                       payment_history_score, loan_maturity_score, source, calculated_at
                 FROM score_history
                 WHERE user_id = ?
                 ORDER BY calculated_at DESC
@@ -395,6 +579,7 @@ class FinancialHealthScorer:
             for row in rows:
                 history.append({
                     'score': row['overall_score'],
+                    'source': row['source'],
                     'calculated_at': row['calculated_at'],
                     'factors': [
                         {'name': 'Savings', 'score': row['savings_score']},
@@ -405,13 +590,13 @@ class FinancialHealthScorer:
                         {'name': 'Loan Diversity', 'score': row['loan_diversity_score']},
                         {'name': 'Payment History', 'score': row['payment_history_score']},
                         {'name': 'Loan Maturity', 'score': row['loan_maturity_score']}
-                    ]
+                    ] if row['savings_score'] is not None else []
                 })
             
             return history
             
         except sqlite3.OperationalError:
-            # Table doesn't exist yet, return empty list
+            # Database without the score_history table (not initialized by init_db)
             return []
         finally:
             conn.close()
@@ -434,49 +619,4 @@ class FinancialHealthScorer:
             - delta: float (change in score)
             - percentage_change: float
         """
-        # Calculate score with actual loan data
-        score_with_loans_result = self.calculateFinancialHealthScore(user_id, financial_data)
-        score_with_loans = score_with_loans_result['overall_score']
-        
-        # Calculate score without loan data (using defaults)
-        # Temporarily override loan metrics to use defaults
-        savings_score = self._calculate_savings_score(financial_data)
-        debt_score = self._calculate_debt_score(financial_data)
-        expense_score = self._calculate_expense_score(financial_data)
-        balance_score = self._calculate_balance_score(financial_data)
-        life_stage_score = self._calculate_life_stage_score(financial_data)
-        
-        # Use default loan scores
-        loan_diversity_score = self.LOAN_DEFAULTS['loan_diversity']
-        payment_history_score = self.LOAN_DEFAULTS['payment_history']
-        loan_maturity_score = self.LOAN_DEFAULTS['loan_maturity']
-        
-        # Calculate score without loans
-        score_without_loans = (
-            savings_score * self.WEIGHTS['savings'] +
-            debt_score * self.WEIGHTS['debt'] +
-            expense_score * self.WEIGHTS['expense'] +
-            balance_score * self.WEIGHTS['balance'] +
-            life_stage_score * self.WEIGHTS['life_stage'] +
-            loan_diversity_score * self.WEIGHTS['loan_diversity'] +
-            payment_history_score * self.WEIGHTS['payment_history'] +
-            loan_maturity_score * self.WEIGHTS['loan_maturity']
-        )
-        
-        score_without_loans = max(0.0, min(100.0, round(score_without_loans, 2)))
-        
-        # Calculate delta
-        delta = round(score_with_loans - score_without_loans, 2)
-        
-        # Calculate percentage change
-        if score_without_loans > 0:
-            percentage_change = round((delta / score_without_loans) * 100, 2)
-        else:
-            percentage_change = 0.0
-        
-        return {
-            'score_with_loans': score_with_loans,
-            'score_without_loans': score_without_loans,
-            'delta': delta,
-            'percentage_change': percentage_change
-        }
+        return self.scoreUser(user_id, financial_data).delta()
@@ -6,11 +6,21 @@ import sqlite3
 import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from connection_pool import get_connection
+from pagination import build_page, decode_cursor, select_columns
+from write_queue import run_write
 
 
 class GoalsService:
     """Service class for managing financial goals"""
     
+    # Columns of the goal listing (selectable with fields=), and its sort key
+    GOAL_LIST_FIELDS = (
+        'id', 'user_id', 'goal_type', 'target_amount', 'target_date',
+        'priority', 'status', 'description', 'created_at', 'updated_at'
+    )
+    GOAL_LIST_KEY = ('priority_rank', 'target_date', 'id')
+    
     def __init__(self, db_path: str):
         """
         Initialize GoalsService
@@ -21,10 +31,8 @@ class GoalsService:
         self.db_path = db_path
     
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
     
     def _row_to_dict(self, row) -> Optional[Dict[str, Any]]:
         """Convert SQLite row to dictionary"""
@@ -51,18 +59,15 @@ class GoalsService:
         Raises:
             sqlite3.Error: For database errors
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        # Generate unique goal ID
+        goal_id = str(uuid.uuid4())
         
-        try:
-            # Generate unique goal ID
-            goal_id = str(uuid.uuid4())
-            
-            # Get current timestamp
-            now = datetime.utcnow().isoformat()
-            
+        # Get current timestamp
+        now = datetime.utcnow().isoformat()
+        
+        def write(conn):
             # Insert goal with default status 'active'
-            cur.execute('''
+            conn.cursor().execute('''
                 INSERT INTO financial_goals 
                 (id, user_id, goal_type, target_amount, target_date, priority, status, description, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -78,17 +83,11 @@ class GoalsService:
                 now,
                 now
             ))
-            
-            conn.commit()
-            
-            # Retrieve and return the created goal
-            return self.get_goal(goal_id)
-            
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        
+        run_write(self.db_path, write)
+        
+        # Retrieve and return the created goal
+        return self.get_goal(goal_id)
     
     def get_goal(self, goal_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -117,7 +116,8 @@ class GoalsService:
         finally:
             conn.close()
     
-    def get_goals(self, user_id: int, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def get_goals(self, user_id: int, filters: Optional[Dict[str, Any]] = None,
+                  fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve all goals for a user with optional filtering
         Goals are sorted by priority (high > medium > low) then by target_date (earliest first)
@@ -127,51 +127,97 @@ class GoalsService:
             filters: Optional dictionary with filter criteria
                 - status: str (filter by status)
                 - goal_type: str (filter by type)
+            fields: Columns to return (from GOAL_LIST_FIELDS), or None for all
         
         Returns:
             List of goal dictionaries, sorted by priority then date
         """
+        return self.get_goals_page(user_id, None, filters=filters, fields=fields)['goals']
+    
+    def get_goals_page(self, user_id: int, limit: Optional[int], cursor: Optional[str] = None,
+                       filters: Optional[Dict[str, Any]] = None,
+                       fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Retrieve one page of a user's goals, sorted as in get_goals
+        
+        Pages are keyed on (priority_rank, target_date, id), which is the
+        order of idx_financial_goals_user_priority (and, with a status filter,
+        of idx_financial_goals_user_status_priority).
+        
+        Args:
+            user_id: ID of the user
+            limit: Page size, or None for all remaining goals
+            cursor: next_cursor of the previous page, or None for the first page
+            filters: Optional dictionary with filter criteria (see get_goals)
+            fields: Columns to return (from GOAL_LIST_FIELDS), or None for all
+        
+        Returns:
+            Dictionary with goals (list of goal dictionaries) and next_cursor
+            (None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        columns = select_columns(fields, self.GOAL_LIST_FIELDS, self.GOAL_LIST_KEY)
+        
+        # Build query with filters
+        query = f'''
+            SELECT {', '.join(columns)}, priority_rank
+            FROM financial_goals
+            WHERE user_id = ?
+        '''
+        params: List[Any] = [user_id]
+        
+        if filters:
+            if 'status' in filters:
+                query += ' AND status = ?'
+                params.append(filters['status'])
+            if 'goal_type' in filters:
+                query += ' AND goal_type = ?'
+                params.append(filters['goal_type'])
+        
+        if cursor is not None:
+            query += ' AND (priority_rank, target_date, id) > (?, ?, ?)'
+            params.extend(decode_cursor(cursor, len(self.GOAL_LIST_KEY)))
+        
+        # Add sorting: priority (high > medium > low) then target_date (earliest first);
+        # priority_rank is kept in step with priority by trg_financial_goals_rank_*
+        query += ' ORDER BY priority_rank, target_date ASC, id ASC'
+        
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit + 1)
+        
         conn = self._get_connection()
         cur = conn.cursor()
         
         try:
-            # Build query with filters
-            query = '''
-                SELECT id, user_id, goal_type, target_amount, target_date,
-                       priority, status, description, created_at, updated_at
-                FROM financial_goals
-                WHERE user_id = ?
-            '''
-            params = [user_id]
-            
-            if filters:
-                if 'status' in filters:
-                    query += ' AND status = ?'
-                    params.append(filters['status'])
-                if 'goal_type' in filters:
-                    query += ' AND goal_type = ?'
-                    params.append(filters['goal_type'])
-            
-            # Add sorting: priority (high > medium > low) then target_date (earliest first)
-            # Use CASE to convert priority to numeric for sorting
-            query += '''
-                ORDER BY 
-                    CASE priority
-                        WHEN 'high' THEN 1
-                        WHEN 'medium' THEN 2
-                        WHEN 'low' THEN 3
-                    END,
-                    target_date ASC
-            '''
-            
             cur.execute(query, params)
-            rows = cur.fetchall()
+            rows = [self._row_to_dict(row) for row in cur.fetchall()]
             
-            return [self._row_to_dict(row) for row in rows]
+            goals, next_cursor = build_page(rows, limit, self.GOAL_LIST_KEY,
+                                            fields or list(self.GOAL_LIST_FIELDS))
+            return {'goals': goals, 'next_cursor': next_cursor}
             
         finally:
             conn.close()
     
+    def _check_owner(self, goal_id: str, goal: Optional[Dict[str, Any]], user_id: int) -> None:
+        """
+        Raise if a goal is missing or belongs to another user
+        
+        Only called when an ownership-filtered statement matched nothing, or
+        when there is nothing to update.
+        
+        Raises:
+            ValueError: If goal doesn't exist or user doesn't own it
+        """
+        if goal is None:
+            raise ValueError(f'Goal not found: {goal_id}')
+        
+        if goal['user_id'] != user_id:
+            raise ValueError(f'User {user_id} does not own goal {goal_id}')
+    
     def update_goal(self, goal_id: str, user_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update an existing goal with ownership check
@@ -188,58 +234,47 @@ class GoalsService:
             ValueError: If goal doesn't exist or user doesn't own it
             sqlite3.Error: For database errors
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        # Build UPDATE query dynamically
+        update_fields = []
+        update_values = []
         
-        try:
-            # Check if goal exists and belongs to user
+        allowed_fields = ['target_amount', 'target_date', 'priority', 'status', 'description']
+        
+        for field in allowed_fields:
+            if field in updates:
+                update_fields.append(f'{field} = ?')
+                update_values.append(updates[field])
+        
+        if not update_fields:
+            # No fields to update, return existing goal
             existing_goal = self.get_goal(goal_id)
-            if existing_goal is None:
-                raise ValueError(f'Goal not found: {goal_id}')
-            
-            if existing_goal['user_id'] != user_id:
-                raise ValueError(f'User {user_id} does not own goal {goal_id}')
-            
-            # Build UPDATE query dynamically
-            update_fields = []
-            update_values = []
-            
-            allowed_fields = ['target_amount', 'target_date', 'priority', 'status', 'description']
-            
-            for field in allowed_fields:
-                if field in updates:
-                    update_fields.append(f'{field} = ?')
-                    update_values.append(updates[field])
-            
-            if not update_fields:
-                # No fields to update, return existing goal
-                return existing_goal
-            
-            # Always update the updated_at timestamp
-            update_fields.append('updated_at = ?')
-            update_values.append(datetime.utcnow().isoformat())
-            
-            # Add goal_id to values for WHERE clause
-            update_values.append(goal_id)
-            
-            # Execute update
-            query = f'''
-                UPDATE financial_goals
-                SET {', '.join(update_fields)}
-                WHERE id = ?
-            '''
-            
+            self._check_owner(goal_id, existing_goal, user_id)
+            return existing_goal
+        
+        # Always update the updated_at timestamp
+        update_fields.append('updated_at = ?')
+        update_values.append(datetime.utcnow().isoformat())
+        
+        # Add goal_id and user_id to values for WHERE clause
+        update_values.extend([goal_id, user_id])
+        
+        # Execute update; ownership is part of the WHERE clause
+        query = f'''
+            UPDATE financial_goals
+            SET {', '.join(update_fields)}
+            WHERE id = ? AND user_id = ?
+        '''
+        
+        def write(conn):
+            cur = conn.cursor()
             cur.execute(query, update_values)
-            conn.commit()
-            
-            # Retrieve and return updated goal
-            return self.get_goal(goal_id)
-            
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+            if cur.rowcount == 0:
+                self._check_owner(goal_id, self.get_goal(goal_id), user_id)
+        
+        run_write(self.db_path, write)
+        
+        # Retrieve and return updated goal
+        return self.get_goal(goal_id)
     
     def delete_goal(self, goal_id: str, user_id: int) -> bool:
         """
@@ -255,26 +290,18 @@ class GoalsService:
         Raises:
             ValueError: If user doesn't own the goal
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        def write(conn):
+            # Delete goal; ownership is part of the WHERE clause
+            cur = conn.cursor()
+            cur.execute('DELETE FROM financial_goals WHERE id = ? AND user_id = ?', (goal_id, user_id))
+            if cur.rowcount == 0:
+                existing_goal = self.get_goal(goal_id)
+                if existing_goal is None:
+                    return False
+                self._check_owner(goal_id, existing_goal, user_id)
+            return True
         
-        try:
-            # Check if goal exists and belongs to user
-            existing_goal = self.get_goal(goal_id)
-            if existing_goal is None:
-                return False
-            
-            if existing_goal['user_id'] != user_id:
-                raise ValueError(f'User {user_id} does not own goal {goal_id}')
-            
-            # Delete goal
-            cur.execute('DELETE FROM financial_goals WHERE id = ?', (goal_id,))
-            conn.commit()
-            
-            return cur.rowcount > 0
-            
-        finally:
-            conn.close()
+        return run_write(self.db_path, write)
     
     def goal_exists(self, goal_id: str) -> bool:
         """
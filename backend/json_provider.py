@@ -0,0 +1,118 @@
+"""
+Json_Provider - Fast JSON serialization for API responses
+Flask's JSON provider with orjson as the encoder when it is installed. Responses
+are encoded straight to bytes; sqlite3.Row values are written out as objects
+without first being copied into dicts by the caller. Without orjson (or with
+JSON_BACKEND=stdlib) the stdlib encoder is used exactly as before
+"""
+
+import dataclasses
+import decimal
+import json
+import os
+import sqlite3
+import typing as t
+from datetime import date
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# 'auto' uses orjson when installed; 'stdlib' forces the json module
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+
+def _stdlib_default(obj: t.Any) -> t.Any:
+    """Flask's default hook, plus sqlite3.Row and NumPy scalars (as orjson handles them)"""
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return DefaultJSONProvider.default(obj)
+
+
+def _orjson_default(obj: t.Any) -> t.Any:
+    """
+    Types orjson does not encode itself, converted the way Flask's encoder does
+    (dates as HTTP dates, Decimal and UUID as strings, dataclasses as dicts)
+    """
+    if isinstance(obj, sqlite3.Row):
+        return dict(obj)
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+if orjson is not None:
+    # Datetimes go through _orjson_default so they match the stdlib provider's format
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps_bytes(obj: t.Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON with the fastest available backend
+
+    Args:
+        obj: Value to encode
+        sort_keys: Sort object keys
+        indent: Indent with two spaces (otherwise compact)
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None and JSON_BACKEND != 'stdlib':
+        options = ORJSON_OPTIONS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=options)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles these
+            pass
+
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=_stdlib_default, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=separators).encode('utf-8')
+
+
+def backend_name() -> str:
+    """Name of the encoder in use ('orjson' or 'json')"""
+    return 'orjson' if orjson is not None and JSON_BACKEND != 'stdlib' else 'json'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider whose responses are encoded by dumps_bytes
+
+    Keeps the default provider's settings (sorted keys, compact output outside
+    debug mode) and its stdlib json.loads for request bodies.
+    """
+
+    default = staticmethod(_stdlib_default)
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if kwargs or backend_name() == 'json':
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
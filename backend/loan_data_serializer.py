@@ -4,9 +4,10 @@ Handles conversion between JSON and Python objects for API requests/responses
 """
 
 import json
-import copy
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Mapping, Optional
+
+from json_provider import dumps_bytes
 
 
 class ParseError(Exception):
@@ -172,58 +173,90 @@ class LoanDataSerializer:
         
         return data
     
+    # Fields formatted on output; everything else is written as stored
+    LOAN_DATE_FIELDS = ('loan_start_date', 'loan_maturity_date', 'created_at', 'updated_at', 'deleted_at')
+    LOAN_MONEY_FIELDS = ('loan_amount', 'monthly_emi', 'interest_rate')
+    PAYMENT_DATE_FIELDS = ('payment_date', 'created_at', 'updated_at')
+    
     @staticmethod
-    def serializeLoan(loan: Dict[str, Any]) -> str:
+    def _formatLoan(loan: Mapping[str, Any], now: datetime) -> Dict[str, Any]:
         """
-        Serialize Loan object to JSON string
+        Build the output form of one loan in a single pass over its fields
         
         Args:
-            loan: Dictionary containing loan data
+            loan: Loan dictionary or sqlite3.Row (not modified)
+            now: Current UTC time, for months_remaining
         
         Returns:
-            JSON string representation of loan
-        
-        Formats:
-            - Dates as ISO 8601 strings
-            - Numeric values with appropriate precision
-            - Includes calculated fields if present
+            New dictionary with dates as ISO 8601 strings, amounts rounded to
+            2 decimals and months_remaining when the maturity date parses
         """
-        # Create a copy to avoid modifying the original
-        loan_data = loan.copy()
-        
-        # Format dates as ISO 8601 strings (if they're datetime objects)
-        for date_field in ['loan_start_date', 'loan_maturity_date', 'created_at', 'updated_at', 'deleted_at']:
-            if date_field in loan_data and loan_data[date_field] is not None:
-                if isinstance(loan_data[date_field], datetime):
-                    loan_data[date_field] = loan_data[date_field].isoformat()
-        
-        # Format numeric values with appropriate precision
-        if 'loan_amount' in loan_data:
-            loan_data['loan_amount'] = round(float(loan_data['loan_amount']), 2)
-        
-        if 'monthly_emi' in loan_data:
-            loan_data['monthly_emi'] = round(float(loan_data['monthly_emi']), 2)
-        
-        if 'interest_rate' in loan_data:
-            loan_data['interest_rate'] = round(float(loan_data['interest_rate']), 2)
+        loan_data = {}
+        for field in loan.keys():
+            value = loan[field]
+            if value is not None:
+                if field in LoanDataSerializer.LOAN_MONEY_FIELDS:
+                    value = round(float(value), 2)
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+            loan_data[field] = value
         
         # Calculate and include months_remaining if maturity_date is present
-        if 'loan_maturity_date' in loan_data and loan_data['loan_maturity_date'] is not None:
+        maturity = loan_data.get('loan_maturity_date')
+        if maturity is not None:
             try:
-                maturity_date = datetime.fromisoformat(
-                    loan_data['loan_maturity_date'].replace('Z', '+00:00')
-                )
-                current_date = datetime.utcnow()
+                maturity_date = datetime.fromisoformat(maturity.replace('Z', '+00:00'))
                 months_remaining = (
-                    (maturity_date.year - current_date.year) * 12 +
-                    (maturity_date.month - current_date.month)
+                    (maturity_date.year - now.year) * 12 +
+                    (maturity_date.month - now.month)
                 )
                 loan_data['months_remaining'] = max(0, months_remaining)
             except (ValueError, AttributeError):
                 # If date parsing fails, skip calculated field
                 pass
         
-        return json.dumps(loan_data, indent=2)
+        return loan_data
+    
+    @staticmethod
+    def _formatPayment(payment: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Build the output form of one payment in a single pass over its fields
+        
+        Args:
+            payment: Payment dictionary or sqlite3.Row (not modified)
+        
+        Returns:
+            New dictionary with dates as ISO 8601 strings and payment_amount
+            rounded to 2 decimals
+        """
+        payment_data = {}
+        for field in payment.keys():
+            value = payment[field]
+            if value is not None:
+                if field == 'payment_amount':
+                    value = round(float(value), 2)
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+            payment_data[field] = value
+        return payment_data
+    
+    @staticmethod
+    def serializeLoan(loan: Dict[str, Any]) -> str:
+        """
+        Serialize Loan object to JSON string
+        
+        Args:
+            loan: Dictionary containing loan data
+        
+        Returns:
+            JSON string representation of loan
+        
+        Formats:
+            - Dates as ISO 8601 strings
+            - Numeric values with appropriate precision
+            - Includes calculated fields if present
+        """
+        return json.dumps(LoanDataSerializer._formatLoan(loan, datetime.utcnow()), indent=2)
     
     @staticmethod
     def serializePayment(payment: Dict[str, Any]) -> str:
@@ -240,20 +273,41 @@ class LoanDataSerializer:
             - Dates as ISO 8601 strings
             - Numeric values with appropriate precision
         """
-        # Create a copy to avoid modifying the original
-        payment_data = payment.copy()
+        return json.dumps(LoanDataSerializer._formatPayment(payment), indent=2)
+    
+    @staticmethod
+    def serializeLoans(loans: Iterable[Mapping[str, Any]]) -> bytes:
+        """
+        Serialize a list of loans as one compact JSON array
+        
+        Bulk mode: each loan (dictionary or sqlite3.Row straight from a cursor)
+        is formatted into its output dictionary once, without copying the
+        input, and the whole array is encoded in a single call to the fastest
+        available JSON backend.
+        
+        Args:
+            loans: Loan dictionaries or sqlite3.Row objects
+        
+        Returns:
+            UTF-8 encoded JSON array, formatted as serializeLoan formats each loan
+        """
+        now = datetime.utcnow()
+        return dumps_bytes([LoanDataSerializer._formatLoan(loan, now) for loan in loans])
+    
+    @staticmethod
+    def serializePayments(payments: Iterable[Mapping[str, Any]]) -> bytes:
+        """
+        Serialize a list of payments as one compact JSON array
         
-        # Format dates as ISO 8601 strings (if they're datetime objects)
-        for date_field in ['payment_date', 'created_at', 'updated_at']:
-            if date_field in payment_data and payment_data[date_field] is not None:
-                if isinstance(payment_data[date_field], datetime):
-                    payment_data[date_field] = payment_data[date_field].isoformat()
+        Bulk mode counterpart of serializePayment (see serializeLoans).
         
-        # Format numeric values with appropriate precision
-        if 'payment_amount' in payment_data:
-            payment_data['payment_amount'] = round(float(payment_data['payment_amount']), 2)
+        Args:
+            payments: Payment dictionaries or sqlite3.Row objects
         
-        return json.dumps(payment_data, indent=2)
+        Returns:
+            UTF-8 encoded JSON array, formatted as serializePayment formats each payment
+        """
+        return dumps_bytes([LoanDataSerializer._formatPayment(payment) for payment in payments])
     
     @staticmethod
     def serializeLoanMetrics(metrics: Dict[str, Any]) -> str:
@@ -270,8 +324,8 @@ class LoanDataSerializer:
             - Numeric values with 2 decimal places
             - Nested statistics objects
         """
-        # Create a deep copy to avoid modifying the original (including nested dicts)
-        metrics_data = copy.deepcopy(metrics)
+        # Shallow copies of only the dicts that get rounded, so the original is untouched
+        metrics_data = dict(metrics)
         
         # Format score values with 2 decimal places
         for score_field in ['loan_diversity_score', 'payment_history_score', 'loan_maturity_score']:
@@ -280,13 +334,13 @@ class LoanDataSerializer:
         
         # Format payment statistics if present
         if 'payment_statistics' in metrics_data:
-            stats = metrics_data['payment_statistics']
+            stats = metrics_data['payment_statistics'] = dict(metrics_data['payment_statistics'])
             if 'on_time_payment_percentage' in stats:
                 stats['on_time_payment_percentage'] = round(float(stats['on_time_payment_percentage']), 2)
         
         # Format loan statistics if present
         if 'loan_statistics' in metrics_data:
-            stats = metrics_data['loan_statistics']
+            stats = metrics_data['loan_statistics'] = dict(metrics_data['loan_statistics'])
             if 'total_loan_amount' in stats:
                 stats['total_loan_amount'] = round(float(stats['total_loan_amount']), 2)
             if 'average_loan_tenure' in stats:
@@ -294,10 +348,10 @@ class LoanDataSerializer:
             if 'weighted_average_tenure' in stats:
                 stats['weighted_average_tenure'] = round(float(stats['weighted_average_tenure']), 2)
             if 'loan_type_distribution' in stats:
-                for loan_type in stats['loan_type_distribution']:
-                    stats['loan_type_distribution'][loan_type] = round(
-                        float(stats['loan_type_distribution'][loan_type]), 2
-                    )
+                stats['loan_type_distribution'] = {
+                    loan_type: round(float(share), 2)
+                    for loan_type, share in stats['loan_type_distribution'].items()
+                }
         
         # Format calculated_at timestamp if present
         if 'calculated_at' in metrics_data and metrics_data['calculated_at'] is not None:
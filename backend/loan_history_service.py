@@ -7,14 +7,14 @@ import sqlite3
 import uuid
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 import math
+from connection_pool import get_connection
+from amortization_engine import schedule_cache, project_schedules
+from request_scope import load_row, update_row
+from write_queue import run_write
+from pagination import build_page, decode_cursor, select_columns
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +30,32 @@ class ValidationError(Exception):
 class LoanHistoryService:
     """Service class for managing loan history and payments"""
     
+    # Affinity of each updatable loans column, so request-cached rows match what SQLite stores
+    LOAN_COLUMN_AFFINITIES = {
+        'loan_type': 'TEXT',
+        'loan_amount': 'REAL',
+        'loan_tenure': 'INTEGER',
+        'monthly_emi': 'REAL',
+        'interest_rate': 'REAL',
+        'loan_start_date': 'TEXT',
+        'loan_maturity_date': 'TEXT',
+        'default_status': 'INTEGER',
+        'updated_at': 'TEXT'
+    }
+    
+    # Columns of the loan and payment listings (selectable with fields=), and their sort keys
+    LOAN_LIST_FIELDS = (
+        'loan_id', 'user_id', 'loan_type', 'loan_amount', 'loan_tenure',
+        'monthly_emi', 'interest_rate', 'loan_start_date', 'loan_maturity_date',
+        'default_status', 'created_at', 'updated_at', 'deleted_at'
+    )
+    LOAN_LIST_KEY = ('created_at', 'loan_id')
+    PAYMENT_LIST_FIELDS = (
+        'payment_id', 'loan_id', 'payment_date', 'payment_amount',
+        'payment_status', 'created_at', 'updated_at'
+    )
+    PAYMENT_LIST_KEY = ('payment_date', 'payment_id')
+    
     def __init__(self, db_path: str):
         """
         Initialize LoanHistoryService
@@ -40,10 +66,8 @@ class LoanHistoryService:
         self.db_path = db_path
     
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
     
     def _row_to_dict(self, row) -> Optional[Dict[str, Any]]:
         """Convert SQLite row to dictionary"""
@@ -51,6 +75,77 @@ class LoanHistoryService:
             return None
         return dict(row)
     
+    def _get_payment_context(self, conn, loan_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read what recordPayment needs about a loan in a single row lookup
+        
+        Args:
+            conn: Open connection
+            loan_id: ID of the loan
+        
+        Returns:
+            Dictionary with user_id, the schedule fields (loan_amount,
+            interest_rate, loan_tenure, loan_start_date), total_paid and
+            payments_count, or None if the loan does not exist
+        """
+        return self._get_payment_contexts(conn, [loan_id]).get(loan_id)
+    
+    def _get_payment_contexts(self, conn, loan_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Read payment context rows for several loans by primary key
+        
+        Args:
+            conn: Open connection
+            loan_ids: IDs of the loans
+        
+        Returns:
+            Dictionary mapping loan_id to its context (missing loans are absent)
+        """
+        loan_ids = list(loan_ids)
+        contexts = {}
+        cur = conn.cursor()
+        
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(loan_ids), 500):
+            chunk = loan_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cur.execute(f'''
+                SELECT loan_id, user_id, loan_amount, interest_rate, loan_tenure, loan_start_date,
+                       total_paid, payments_count
+                FROM loans
+                WHERE loan_id IN ({placeholders})
+            ''', chunk)
+            for row in cur.fetchall():
+                contexts[row['loan_id']] = dict(row)
+        
+        return contexts
+    
+    def _get_loan_owner(self, conn, loan_id: str) -> Optional[int]:
+        """
+        Owner of a loan, for telling "not found" from "not yours" after an
+        ownership-filtered statement matched nothing
+        
+        Args:
+            conn: Open connection
+            loan_id: ID of the loan
+        
+        Returns:
+            user_id of the owner, or None if the loan does not exist
+        """
+        row = conn.execute('SELECT user_id FROM loans WHERE loan_id = ?', (loan_id,)).fetchone()
+        return row['user_id'] if row is not None else None
+    
+    def _check_owner(self, loan_id: str, owner_id: int, user_id: Optional[int]) -> None:
+        """
+        Raise if user_id is given and is not the loan's owner
+        
+        Raises:
+            ValueError: If the user doesn't own the loan
+        """
+        if user_id is not None and owner_id != user_id:
+            logger.warning(f"User {user_id} attempted to access loan {loan_id} owned by user {owner_id}")
+            raise ValueError(f'User {user_id} does not own loan {loan_id}')
+    
     def validateLoanData(self, loan_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate loan data according to business rules
@@ -243,18 +338,15 @@ class LoanHistoryService:
             logger.warning(f"Loan validation failed for user {user_id}: {error['message']}")
             raise ValidationError(error['field'], error['message'], error['code'])
         
-        conn = self._get_connection()
-        cur = conn.cursor()
+        # Generate unique loan ID
+        loan_id = str(uuid.uuid4())
         
-        try:
-            # Generate unique loan ID
-            loan_id = str(uuid.uuid4())
-            
-            # Get current timestamp (timezone-aware)
-            now = datetime.now(timezone.utc).isoformat()
-            
+        # Get current timestamp (timezone-aware)
+        now = datetime.now(timezone.utc).isoformat()
+        
+        def write(conn):
             # Insert loan
-            cur.execute('''
+            conn.cursor().execute('''
                 INSERT INTO loans 
                 (loan_id, user_id, loan_type, loan_amount, loan_tenure, monthly_emi,
                  interest_rate, loan_start_date, loan_maturity_date, default_status,
@@ -274,30 +366,35 @@ class LoanHistoryService:
                 now,
                 now
             ))
-            
-            conn.commit()
-            logger.info(f"Loan created successfully: {loan_id} for user {user_id}")
-            
-            # Retrieve and return the created loan
-            return self.getLoan(loan_id)
-            
+        
+        try:
+            run_write(self.db_path, write)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Database error creating loan for user {user_id}: {str(e)}")
             raise
-        finally:
-            conn.close()
+        
+        logger.info(f"Loan created successfully: {loan_id} for user {user_id}")
+        
+        # Retrieve and return the created loan
+        return self.getLoan(loan_id)
     
     def getLoan(self, loan_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a specific loan by ID
         
+        Within a request scope the row is read once and then served from the
+        request's identity map (see request_scope).
+        
         Args:
             loan_id: ID of the loan
         
         Returns:
             Dictionary containing loan data, or None if not found
         """
+        return load_row(self.db_path, 'loans', loan_id, lambda: self._fetch_loan(loan_id))
+    
+    def _fetch_loan(self, loan_id: str) -> Optional[Dict[str, Any]]:
+        """Read a loan row from the database"""
         conn = self._get_connection()
         cur = conn.cursor()
         
@@ -316,38 +413,73 @@ class LoanHistoryService:
         finally:
             conn.close()
     
-    def getLoansByUser(self, user_id: int, include_deleted: bool = False) -> List[Dict[str, Any]]:
+    def getLoansByUser(self, user_id: int, include_deleted: bool = False,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Retrieve all loans for a user
+        Retrieve all loans for a user, newest first
         
         Args:
             user_id: ID of the user
             include_deleted: Whether to include soft-deleted loans
+            fields: Columns to return (from LOAN_LIST_FIELDS), or None for all
         
         Returns:
             List of loan dictionaries
         """
+        return self.getLoansPage(user_id, None, include_deleted=include_deleted, fields=fields)['loans']
+    
+    def getLoansPage(self, user_id: int, limit: Optional[int], cursor: Optional[str] = None,
+                     fields: Optional[List[str]] = None, include_deleted: bool = False) -> Dict[str, Any]:
+        """
+        Retrieve one page of a user's loans, newest first
+        
+        Pages are keyed on (created_at, loan_id), so each page is a range scan
+        of idx_loans_user_created starting after the previous page's last loan.
+        
+        Args:
+            user_id: ID of the user
+            limit: Page size, or None for all remaining loans
+            cursor: next_cursor of the previous page, or None for the first page
+            fields: Columns to return (from LOAN_LIST_FIELDS), or None for all
+            include_deleted: Whether to include soft-deleted loans
+        
+        Returns:
+            Dictionary with loans (list of loan dictionaries) and next_cursor
+            (None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        columns = select_columns(fields, self.LOAN_LIST_FIELDS, self.LOAN_LIST_KEY)
+        query = f'''
+            SELECT {', '.join(columns)}
+            FROM loans
+            WHERE user_id = ?
+        '''
+        params: List[Any] = [user_id]
+        
+        if not include_deleted:
+            query += ' AND deleted_at IS NULL'
+        
+        if cursor is not None:
+            query += ' AND (created_at, loan_id) < (?, ?)'
+            params.extend(decode_cursor(cursor, len(self.LOAN_LIST_KEY)))
+        
+        query += ' ORDER BY created_at DESC, loan_id DESC'
+        
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit + 1)
+        
         conn = self._get_connection()
         cur = conn.cursor()
         
         try:
-            query = '''
-                SELECT loan_id, user_id, loan_type, loan_amount, loan_tenure,
-                       monthly_emi, interest_rate, loan_start_date, loan_maturity_date,
-                       default_status, created_at, updated_at, deleted_at
-                FROM loans
-                WHERE user_id = ?
-            '''
+            cur.execute(query, params)
+            rows = [self._row_to_dict(row) for row in cur.fetchall()]
             
-            if not include_deleted:
-                query += ' AND deleted_at IS NULL'
-            
-            query += ' ORDER BY created_at DESC'
-            
-            cur.execute(query, (user_id,))
-            rows = cur.fetchall()
-            
-            return [self._row_to_dict(row) for row in rows]
+            loans, next_cursor = build_page(rows, limit, self.LOAN_LIST_KEY, fields)
+            return {'loans': loans, 'next_cursor': next_cursor}
             
         finally:
             conn.close()
@@ -371,10 +503,7 @@ class LoanHistoryService:
         """
         logger.info(f"Updating loan {loan_id} for user {user_id}")
         
-        conn = self._get_connection()
-        cur = conn.cursor()
-        
-        try:
+        def write(conn):
             # Check if loan exists and belongs to user
             existing_loan = self.getLoan(loan_id)
             if existing_loan is None:
@@ -420,9 +549,9 @@ class LoanHistoryService:
                     update_values.append(updates[field])
             
             if not update_fields:
-                # No fields to update, return existing loan
+                # No fields to update, the existing loan is returned as is
                 logger.info(f"No fields to update for loan {loan_id}")
-                return existing_loan
+                return None
             
             # Always update the updated_at timestamp
             update_fields.append('updated_at = ?')
@@ -438,19 +567,22 @@ class LoanHistoryService:
                 WHERE loan_id = ?
             '''
             
-            cur.execute(query, update_values)
-            conn.commit()
-            logger.info(f"Loan updated successfully: {loan_id}")
-            
-            # Retrieve and return updated loan
-            return self.getLoan(loan_id)
-            
+            conn.cursor().execute(query, update_values)
+            return {field.split(' = ')[0]: value for field, value in zip(update_fields, update_values)}
+        
+        try:
+            changes = run_write(self.db_path, write)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Database error updating loan {loan_id}: {str(e)}")
             raise
-        finally:
-            conn.close()
+        
+        if changes is not None:
+            schedule_cache.invalidate(loan_id)
+            update_row(self.db_path, 'loans', loan_id, changes, self.LOAN_COLUMN_AFFINITIES)
+            logger.info(f"Loan updated successfully: {loan_id}")
+        
+        # Retrieve and return updated loan (the request's cached copy, if any)
+        return self.getLoan(loan_id)
     
     def deleteLoan(self, loan_id: str, user_id: int) -> bool:
         """
@@ -469,81 +601,58 @@ class LoanHistoryService:
         """
         logger.info(f"Deleting loan {loan_id} for user {user_id}")
         
-        conn = self._get_connection()
-        cur = conn.cursor()
+        now = datetime.now(timezone.utc).isoformat()
         
-        try:
-            # Check if loan exists and belongs to user
-            existing_loan = self.getLoan(loan_id)
-            if existing_loan is None:
-                logger.warning(f"Loan not found for deletion: {loan_id}")
-                return False
-            
-            if existing_loan['user_id'] != user_id:
-                logger.warning(f"User {user_id} attempted to delete loan {loan_id} owned by user {existing_loan['user_id']}")
-                raise ValueError(f'User {user_id} does not own loan {loan_id}')
-            
-            # Soft delete by setting deleted_at timestamp
-            now = datetime.now(timezone.utc).isoformat()
+        def write(conn):
+            # Soft delete by setting deleted_at timestamp; ownership is part of the
+            # WHERE clause, so a successful delete is a single statement
+            cur = conn.cursor()
             cur.execute('''
                 UPDATE loans
                 SET deleted_at = ?, updated_at = ?
-                WHERE loan_id = ?
-            ''', (now, now, loan_id))
-            
-            conn.commit()
-            logger.info(f"Loan deleted successfully: {loan_id}")
-            
-            return cur.rowcount > 0
+                WHERE loan_id = ? AND user_id = ?
+            ''', (now, now, loan_id, user_id))
             
+            if cur.rowcount == 0:
+                owner_id = self._get_loan_owner(conn, loan_id)
+                if owner_id is None:
+                    logger.warning(f"Loan not found for deletion: {loan_id}")
+                    return False
+                self._check_owner(loan_id, owner_id, user_id)
+            return True
+        
+        try:
+            deleted = run_write(self.db_path, write)
         except sqlite3.Error as e:
             logger.error(f"Database error deleting loan {loan_id}: {str(e)}")
             raise
-        finally:
-            conn.close()
+        
+        if deleted:
+            schedule_cache.invalidate(loan_id)
+            update_row(self.db_path, 'loans', loan_id, {'deleted_at': now, 'updated_at': now})
+            logger.info(f"Loan deleted successfully: {loan_id}")
+        
+        return deleted
     
-    def recordPayment(self, loan_id: str, payment_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_payment_input(self, loan_id: str, payment_data: Dict[str, Any]):
         """
-        Record a loan payment with validation and status classification
+        Validate and parse a payment's date and amount
         
         Args:
-            loan_id: ID of the loan
-            payment_data: Dictionary containing payment information
-                - payment_date: str (ISO format date)
-                - payment_amount: float (> 0)
+            loan_id: ID of the loan (for logging)
+            payment_data: Dictionary with payment_date and payment_amount
         
         Returns:
-            Dictionary containing the created payment
+            Tuple of (timezone-aware payment datetime, payment amount)
         
         Raises:
-            ValidationError: If validation fails
-            ValueError: If loan doesn't exist
-            sqlite3.Error: For database errors
+            ValidationError: If a field is missing or invalid
         """
-        logger.info(f"Recording payment for loan {loan_id}")
-        
-        # Validate payment data
-        errors = []
-        
         # Required fields
-        if 'payment_date' not in payment_data:
-            errors.append({
-                'field': 'payment_date',
-                'message': 'payment_date is required',
-                'code': 'REQUIRED_FIELD'
-            })
-        
-        if 'payment_amount' not in payment_data:
-            errors.append({
-                'field': 'payment_amount',
-                'message': 'payment_amount is required',
-                'code': 'REQUIRED_FIELD'
-            })
-        
-        if errors:
-            error = errors[0]
-            logger.warning(f"Payment validation failed for loan {loan_id}: {error['message']}")
-            raise ValidationError(error['field'], error['message'], error['code'])
+        for field in ('payment_date', 'payment_amount'):
+            if field not in payment_data:
+                logger.warning(f"Payment validation failed for loan {loan_id}: {field} is required")
+                raise ValidationError(field, f'{field} is required', 'REQUIRED_FIELD')
         
         # Validate payment_date
         try:
@@ -553,121 +662,107 @@ class LoanHistoryService:
             if payment_date.tzinfo is None:
                 payment_date = payment_date.replace(tzinfo=timezone.utc)
             
-            # Make utcnow timezone-aware for comparison
-            utc_now = datetime.now(timezone.utc)
-            
-            logger.info(f"Payment date: {payment_date} (tzinfo: {payment_date.tzinfo})")
-            logger.info(f"UTC now: {utc_now} (tzinfo: {utc_now.tzinfo})")
-            
             # Note: We don't validate against future dates because of timezone differences
             # Users in different timezones may have valid reasons to record payments with dates
             # that appear to be in the future in UTC
-        except ValidationError:
-            raise
-        except ValueError as e:
+        except (ValueError, TypeError, AttributeError):
             logger.error(f"Invalid date format for loan {loan_id}: {payment_data.get('payment_date')}")
             raise ValidationError('payment_date', 'Invalid date format. Use ISO 8601 format', 'INVALID_DATE_FORMAT')
-        except TypeError as e:
-            logger.error(f"TypeError comparing datetimes for loan {loan_id}: {str(e)}")
-            raise ValidationError('payment_date', 'Invalid date format. Use ISO 8601 format', 'INVALID_DATE_FORMAT')
         
         # Validate payment_amount
         try:
             payment_amount = float(payment_data['payment_amount'])
-            if payment_amount <= 0:
-                logger.warning(f"Invalid payment amount for loan {loan_id}: {payment_amount}")
-                raise ValidationError('payment_amount', 'Payment amount must be positive', 'INVALID_AMOUNT')
         except (ValueError, TypeError):
             logger.error(f"Invalid payment amount type for loan {loan_id}")
             raise ValidationError('payment_amount', 'Payment amount must be a valid number', 'INVALID_TYPE')
         
-        # Check if loan exists
-        loan = self.getLoan(loan_id)
-        if loan is None:
-            logger.error(f"Loan not found: {loan_id}")
-            raise ValueError(f'Loan not found: {loan_id}')
-        
-        # Calculate total payments made so far
-        existing_payments = self.getPaymentHistory(loan_id)
-        total_paid = sum(float(p['payment_amount']) for p in existing_payments)
-        
-        # Calculate remaining balance
-        loan_amount = float(loan['loan_amount'])
-        remaining_balance = loan_amount - total_paid
-        
-        # Check if payment exceeds remaining balance
-        if payment_amount > remaining_balance + 0.01:  # Allow small rounding tolerance
-            logger.warning(f"Payment exceeds remaining balance for loan {loan_id}: {payment_amount} > {remaining_balance}")
-            raise ValidationError(
-                'payment_amount',
-                f'Payment amount exceeds remaining balance (remaining: {remaining_balance:.2f})',
-                'EXCEEDS_BALANCE'
-            )
-        
-        # Calculate payment status (on-time, late, missed)
-        # Based on expected monthly EMI due date
-        loan_start = datetime.fromisoformat(loan['loan_start_date'].replace('Z', '+00:00'))
-        
-        # Ensure loan_start is timezone-aware (if naive, assume UTC)
-        if loan_start.tzinfo is None:
-            loan_start = loan_start.replace(tzinfo=timezone.utc)
-        
-        # Calculate the expected due date for this payment
-        # Due date is the same day each month as the loan start date
-        # For example, if loan starts on 15th, EMI is due on 15th of each month
-        
-        # Get the number of payments made so far (including this one)
-        num_payments_made = len(existing_payments) + 1
-        
-        # Calculate expected due date: loan_start_date + (num_payments_made * 1 month)
-        # We use the day of the month from loan_start_date
-        loan_start_day = loan_start.day
-        loan_start_month = loan_start.month
-        loan_start_year = loan_start.year
-        
-        # Calculate the month and year for the expected due date
-        due_month = loan_start_month + num_payments_made - 1
-        due_year = loan_start_year
-        
-        # Handle month overflow
-        while due_month > 12:
-            due_month -= 12
-            due_year += 1
-        
-        # Handle day overflow (e.g., Feb 31st doesn't exist)
-        try:
-            expected_due_date = datetime(due_year, due_month, loan_start_day, tzinfo=timezone.utc).date()
-        except ValueError:
-            # If day doesn't exist in that month, use last day of month
-            from calendar import monthrange
-            last_day = monthrange(due_year, due_month)[1]
-            expected_due_date = datetime(due_year, due_month, last_day, tzinfo=timezone.utc).date()
+        if not payment_amount > 0 or math.isinf(payment_amount):
+            logger.warning(f"Invalid payment amount for loan {loan_id}: {payment_amount}")
+            raise ValidationError('payment_amount', 'Payment amount must be positive', 'INVALID_AMOUNT')
         
-        payment_date_only = payment_date.date()
+        return payment_date, payment_amount
+    
+    def _classify_payment(self, payment_date: datetime, expected_due_date) -> str:
+        """
+        Classify a payment as on-time, late (1-30 days) or missed (>30 days overdue)
         
-        # Classify payment status based on days overdue
-        days_overdue = (payment_date_only - expected_due_date).days
+        Args:
+            payment_date: Timezone-aware payment datetime
+            expected_due_date: Due date of this EMI
+        
+        Returns:
+            Payment status string
+        """
+        days_overdue = (payment_date.date() - expected_due_date).days
         
         if days_overdue <= 0:
             # Payment made on or before due date
-            payment_status = 'on-time'
+            return 'on-time'
         elif days_overdue <= 30:
             # Payment made 1-30 days after due date
-            payment_status = 'late'
+            return 'late'
         else:
             # Payment made more than 30 days after due date
-            payment_status = 'missed'
+            return 'missed'
+    
+    def recordPayment(self, loan_id: str, payment_data: Dict[str, Any],
+                      user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Record a loan payment with validation and status classification
+        
+        Args:
+            loan_id: ID of the loan
+            payment_data: Dictionary containing payment information
+                - payment_date: str (ISO format date)
+                - payment_amount: float (> 0)
+            user_id: If given, the loan must belong to this user (checked on
+                the same row read, with no extra query)
         
-        logger.info(f"Payment status calculation for loan {loan_id}: "
-                   f"expected_due_date={expected_due_date}, "
-                   f"payment_date={payment_date_only}, "
-                   f"days_overdue={days_overdue}, "
-                   f"status={payment_status}")
+        Returns:
+            Dictionary containing the created payment
         
-        conn = self._get_connection()
-        cur = conn.cursor()
+        Raises:
+            ValidationError: If validation fails
+            ValueError: If loan doesn't exist or user doesn't own it
+            sqlite3.Error: For database errors
+        """
+        logger.info(f"Recording payment for loan {loan_id}")
         
-        try:
+        payment_date, payment_amount = self._validate_payment_input(loan_id, payment_data)
+        
+        def write(conn):
+            cur = conn.cursor()
+            
+            # Loan fields and running payment totals in one indexed row read
+            loan = self._get_payment_context(conn, loan_id)
+            if loan is None:
+                logger.error(f"Loan not found: {loan_id}")
+                raise ValueError(f'Loan not found: {loan_id}')
+            self._check_owner(loan_id, loan['user_id'], user_id)
+            
+            # Calculate remaining balance
+            loan_amount = float(loan['loan_amount'])
+            total_paid = float(loan['total_paid'])
+            remaining_balance = loan_amount - total_paid
+            
+            # Check if payment exceeds remaining balance
+            if payment_amount > remaining_balance + 0.01:  # Allow small rounding tolerance
+                logger.warning(f"Payment exceeds remaining balance for loan {loan_id}: {payment_amount} > {remaining_balance}")
+                raise ValidationError(
+                    'payment_amount',
+                    f'Payment amount exceeds remaining balance (remaining: {remaining_balance:.2f})',
+                    'EXCEEDS_BALANCE'
+                )
+            
+            # Classify against the due date of this EMI (payments made so far + this one)
+            expected_due_date = schedule_cache.get_schedule(loan).due_date(int(loan['payments_count']) + 1)
+            payment_status = self._classify_payment(payment_date, expected_due_date)
+            
+            logger.info(f"Payment status calculation for loan {loan_id}: "
+                       f"expected_due_date={expected_due_date}, "
+                       f"payment_date={payment_date.date()}, "
+                       f"status={payment_status}")
+            
             # Generate unique payment ID
             payment_id = str(uuid.uuid4())
             
@@ -690,10 +785,7 @@ class LoanHistoryService:
                 now
             ))
             
-            conn.commit()
-            logger.info(f"Payment recorded successfully: {payment_id} for loan {loan_id}")
-            
-            # Retrieve and return the created payment
+            # Read back the created payment within the same transaction
             cur.execute('''
                 SELECT payment_id, loan_id, payment_date, payment_amount,
                        payment_status, created_at, updated_at
@@ -701,95 +793,381 @@ class LoanHistoryService:
                 WHERE payment_id = ?
             ''', (payment_id,))
             
-            row = cur.fetchone()
-            return self._row_to_dict(row)
-            
+            return self._row_to_dict(cur.fetchone())
+        
+        try:
+            payment = run_write(self.db_path, write)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Database error recording payment for loan {loan_id}: {str(e)}")
             raise
+        
+        logger.info(f"Payment recorded successfully: {payment['payment_id']} for loan {loan_id}")
+        
+        return payment
+    
+    def recordPaymentsBulk(self, user_id: int, payments: List[Any]) -> Dict[str, Any]:
+        """
+        Record many payments, for one or more loans, in a single transaction
+        
+        Rows are validated in memory and classified in input order per loan
+        against each loan's EMI schedule, continuing from the payments already
+        stored, so the result matches posting them one at a time. Valid rows
+        are inserted with one executemany; invalid rows are reported and
+        skipped without aborting the batch.
+        
+        Args:
+            user_id: ID of the user (loans owned by anyone else are rejected)
+            payments: List of dictionaries with loan_id, payment_date and
+                payment_amount
+        
+        Returns:
+            Dictionary containing:
+            - inserted: int
+            - failed: int
+            - payment_ids: list of created payment IDs, in input order
+            - errors: list of {index, loan_id, field, message, code}
+        
+        Raises:
+            sqlite3.Error: For database errors (nothing is inserted)
+        """
+        logger.info(f"Bulk recording {len(payments)} payments for user {user_id}")
+        
+        errors = []
+        parsed = []
+        
+        def reject(index, loan_id, field, message, code):
+            errors.append({
+                'index': index,
+                'loan_id': loan_id,
+                'field': field,
+                'message': message,
+                'code': code
+            })
+        
+        # Field validation needs no database access
+        for index, payment_data in enumerate(payments):
+            if not isinstance(payment_data, dict):
+                reject(index, None, 'payment', 'Each payment must be a JSON object', 'INVALID_ROW')
+                continue
+            loan_id = payment_data.get('loan_id')
+            if not loan_id or not isinstance(loan_id, str):
+                reject(index, None, 'loan_id', 'loan_id is required', 'REQUIRED_FIELD')
+                continue
+            try:
+                payment_date, payment_amount = self._validate_payment_input(loan_id, payment_data)
+            except ValidationError as e:
+                reject(index, loan_id, e.field, e.message, e.code)
+                continue
+            parsed.append((index, loan_id, payment_data['payment_date'], payment_date, payment_amount))
+        
+        def write(conn):
+            loans = self._get_payment_contexts(conn, {row[1] for row in parsed})
+            
+            # Every referenced loan's due-date schedule, built in one batch
+            owned = [loan for loan in loans.values() if loan['user_id'] == user_id]
+            schedules = dict(zip((loan['loan_id'] for loan in owned), schedule_cache.get_schedules(owned)))
+            
+            # Running balance and schedule position per loan, advanced row by row
+            progress = {}
+            rows = []
+            payment_ids = []
+            now = datetime.now(timezone.utc).isoformat()
+            
+            for index, loan_id, raw_date, payment_date, payment_amount in parsed:
+                loan = loans.get(loan_id)
+                if loan is None:
+                    reject(index, loan_id, 'loan_id', f'Loan not found: {loan_id}', 'LOAN_NOT_FOUND')
+                    continue
+                if loan['user_id'] != user_id:
+                    reject(index, loan_id, 'loan_id', 'Not authorized to record payment for this loan', 'FORBIDDEN')
+                    continue
+                
+                if loan_id not in progress:
+                    progress[loan_id] = {
+                        'schedule': schedules[loan_id],
+                        'remaining': float(loan['loan_amount']) - float(loan['total_paid']),
+                        'count': int(loan['payments_count'])
+                    }
+                state = progress[loan_id]
+                
+                if payment_amount > state['remaining'] + 0.01:  # Allow small rounding tolerance
+                    reject(index, loan_id, 'payment_amount',
+                           f"Payment amount exceeds remaining balance (remaining: {state['remaining']:.2f})",
+                           'EXCEEDS_BALANCE')
+                    continue
+                
+                state['count'] += 1
+                state['remaining'] -= payment_amount
+                payment_status = self._classify_payment(
+                    payment_date, state['schedule'].due_date(state['count'])
+                )
+                
+                payment_id = str(uuid.uuid4())
+                payment_ids.append(payment_id)
+                rows.append((payment_id, loan_id, raw_date, payment_amount, payment_status, now, now))
+            
+            conn.cursor().executemany('''
+                INSERT INTO loan_payments
+                (payment_id, loan_id, payment_date, payment_amount, payment_status,
+                 created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            return rows, payment_ids
+        
+        try:
+            rows, payment_ids = run_write(self.db_path, write)
+        except sqlite3.Error as e:
+            logger.error(f"Database error bulk recording payments for user {user_id}: {str(e)}")
+            raise
+        
+        errors.sort(key=lambda error: error['index'])
+        logger.info(f"Bulk payment import for user {user_id}: {len(rows)} inserted, {len(errors)} failed")
+        
+        return {
+            'inserted': len(rows),
+            'failed': len(errors),
+            'payment_ids': payment_ids,
+            'errors': errors
+        }
+    
+    def getAmortizationSchedule(self, loan_id: str, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Full amortization schedule of a loan with its payment progress
+        
+        Args:
+            loan_id: ID of the loan
+            user_id: If given, the loan must belong to this user
+        
+        Returns:
+            Dictionary containing monthly_emi, total_interest, total_payment,
+            payments_made, total_paid, next_due_date, scheduled_balance and
+            schedule (one row per EMI), or None if the loan does not exist
+        
+        Raises:
+            ValueError: If user doesn't own the loan
+        """
+        conn = self._get_connection()
+        
+        try:
+            loan = self._get_payment_context(conn, loan_id)
         finally:
             conn.close()
+        
+        if loan is None:
+            return None
+        self._check_owner(loan_id, loan['user_id'], user_id)
+        
+        schedule = schedule_cache.get_schedule(loan)
+        payments_made = int(loan['payments_count'])
+        
+        return {
+            'loan_id': loan_id,
+            'monthly_emi': round(schedule.monthly_emi, 2),
+            'total_interest': round(schedule.total_interest, 2),
+            'total_payment': round(float(loan['loan_amount']) + schedule.total_interest, 2),
+            'payments_made': payments_made,
+            'total_paid': round(float(loan['total_paid']), 2),
+            'next_due_date': schedule.due_date(payments_made + 1).isoformat() if payments_made < len(schedule) else None,
+            'scheduled_balance': round(schedule.balance_after(payments_made), 2),
+            'schedule': schedule.to_rows()
+        }
     
-    def getPaymentHistory(self, loan_id: str) -> List[Dict[str, Any]]:
+    def getLoanProjection(self, user_id: int, months: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Project a user's combined EMIs and outstanding principal month by month
+        
+        Schedules of all active loans are fetched from the cache, with any
+        misses built in one vectorized batch.
+        
+        Args:
+            user_id: ID of the user
+            months: Number of months to project from the current month
+                (defaults to the last scheduled EMI)
+        
+        Returns:
+            Dictionary with loan_count and month-aligned lists: months,
+            payment, principal, interest and outstanding_balance
+        """
+        loans = self.getLoansByUser(user_id)
+        schedules = schedule_cache.get_schedules(loans)
+        projection = project_schedules(schedules, datetime.now(timezone.utc).date(), months)
+        
+        return {
+            'user_id': user_id,
+            'loan_count': len(loans),
+            **projection
+        }
+    
+    def getPaymentHistory(self, loan_id: str, user_id: Optional[int] = None,
+                          fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve payment history for a loan
         
         Args:
             loan_id: ID of the loan
+            user_id: If given, the loan must exist and belong to this user; the
+                owner is read in the same query as the payments
+            fields: Columns to return (from PAYMENT_LIST_FIELDS), or None for all
         
         Returns:
             List of payment dictionaries sorted by payment_date
+        
+        Raises:
+            ValueError: If user_id is given and the loan doesn't exist or
+                belongs to another user
+        """
+        return self.getPaymentHistoryPage(loan_id, None, user_id=user_id, fields=fields)['payments']
+    
+    def getPaymentHistoryPage(self, loan_id: str, limit: Optional[int], cursor: Optional[str] = None,
+                              user_id: Optional[int] = None,
+                              fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """
+        Retrieve one page of a loan's payments, oldest first
+        
+        Pages are keyed on (payment_date, payment_id), so each page is a range
+        scan of idx_loan_payments_loan_date.
+        
+        Args:
+            loan_id: ID of the loan
+            limit: Page size, or None for all remaining payments
+            cursor: next_cursor of the previous page, or None for the first page
+            user_id: If given, the loan must exist and belong to this user; the
+                owner is read in the same query as the payments
+            fields: Columns to return (from PAYMENT_LIST_FIELDS), or None for all
+        
+        Returns:
+            Dictionary with payments (list of payment dictionaries) and
+            next_cursor (None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is invalid, or user_id is given and the
+                loan doesn't exist or belongs to another user
+        """
+        columns = select_columns(fields, self.PAYMENT_LIST_FIELDS, self.PAYMENT_LIST_KEY)
+        after = decode_cursor(cursor, len(self.PAYMENT_LIST_KEY)) if cursor is not None else None
+        
         conn = self._get_connection()
         cur = conn.cursor()
         
         try:
-            cur.execute('''
-                SELECT payment_id, loan_id, payment_date, payment_amount,
-                       payment_status, created_at, updated_at
-                FROM loan_payments
-                WHERE loan_id = ?
-                ORDER BY payment_date ASC
-            ''', (loan_id,))
+            if user_id is not None:
+                # Keyset condition goes in the join, so the loan row (and its owner)
+                # is still returned when the page is empty
+                query = f'''
+                    SELECT l.user_id AS owner_id, {', '.join('p.' + column for column in columns)}
+                    FROM loans l
+                    LEFT JOIN loan_payments p ON p.loan_id = l.loan_id
+                '''
+                params: List[Any] = []
+                if after is not None:
+                    query += ' AND (p.payment_date, p.payment_id) > (?, ?)'
+                    params.extend(after)
+                query += '''
+                    WHERE l.loan_id = ?
+                    ORDER BY p.payment_date ASC, p.payment_id ASC
+                '''
+                params.append(loan_id)
+                if limit is not None:
+                    query += ' LIMIT ?'
+                    params.append(limit + 1)
+                
+                cur.execute(query, params)
+                
+                rows = cur.fetchall()
+                if not rows:
+                    logger.warning(f"Loan not found: {loan_id}")
+                    raise ValueError(f'Loan not found: {loan_id}')
+                self._check_owner(loan_id, rows[0]['owner_id'], user_id)
+                # Build each output dict straight from the row, leaving out owner_id
+                rows = [{column: row[column] for column in columns}
+                        for row in rows if row['payment_id'] is not None]
+            else:
+                query = f'''
+                    SELECT {', '.join(columns)}
+                    FROM loan_payments
+                    WHERE loan_id = ?
+                '''
+                params = [loan_id]
+                if after is not None:
+                    query += ' AND (payment_date, payment_id) > (?, ?)'
+                    params.extend(after)
+                query += ' ORDER BY payment_date ASC, payment_id ASC'
+                if limit is not None:
+                    query += ' LIMIT ?'
+                    params.append(limit + 1)
+                
+                cur.execute(query, params)
+                rows = [self._row_to_dict(row) for row in cur.fetchall()]
             
-            rows = cur.fetchall()
-            return [self._row_to_dict(row) for row in rows]
+            payments, next_cursor = build_page(rows, limit, self.PAYMENT_LIST_KEY, fields)
+            return {'payments': payments, 'next_cursor': next_cursor}
             
         finally:
             conn.close()
 
-    def deletePayment(self, payment_id: str, loan_id: str) -> bool:
+    def deletePayment(self, payment_id: str, loan_id: str, user_id: Optional[int] = None) -> bool:
         """
         Delete a payment record
         
+        The payment, loan and (optionally) owner are all matched by the DELETE
+        itself; the extra lookups only run when it matches nothing.
+        
         Args:
             payment_id: ID of the payment to delete
             loan_id: ID of the loan (for verification)
+            user_id: If given, the loan must belong to this user
         
         Returns:
             True if payment was deleted, False if not found
         
         Raises:
-            ValueError: If payment doesn't belong to the loan
+            ValueError: If the loan doesn't exist or user doesn't own it (only
+                checked when user_id is given), or payment doesn't belong to the loan
             sqlite3.Error: For database errors
         """
         logger.info(f"Deleting payment {payment_id} for loan {loan_id}")
         
-        conn = self._get_connection()
-        cur = conn.cursor()
-        
-        try:
-            # Verify payment belongs to the loan
-            cur.execute('''
-                SELECT payment_id, loan_id FROM loan_payments
-                WHERE payment_id = ?
-            ''', (payment_id,))
+        def write(conn):
+            cur = conn.cursor()
+            query = '''
+                DELETE FROM loan_payments
+                WHERE payment_id = ? AND loan_id = ?
+            '''
+            params = [payment_id, loan_id]
+            if user_id is not None:
+                query += ' AND loan_id IN (SELECT loan_id FROM loans WHERE loan_id = ? AND user_id = ?)'
+                params += [loan_id, user_id]
             
-            row = cur.fetchone()
-            if row is None:
-                logger.warning(f"Payment not found: {payment_id}")
-                return False
+            cur.execute(query, params)
             
-            payment = self._row_to_dict(row)
-            if payment['loan_id'] != loan_id:
+            if cur.rowcount == 0:
+                # Work out why nothing matched
+                if user_id is not None:
+                    owner_id = self._get_loan_owner(conn, loan_id)
+                    if owner_id is None:
+                        logger.warning(f"Loan not found: {loan_id}")
+                        raise ValueError(f'Loan not found: {loan_id}')
+                    self._check_owner(loan_id, owner_id, user_id)
+                
+                row = cur.execute('''
+                    SELECT loan_id FROM loan_payments
+                    WHERE payment_id = ?
+                ''', (payment_id,)).fetchone()
+                if row is None:
+                    logger.warning(f"Payment not found: {payment_id}")
+                    return False
+                
                 logger.warning(f"Payment {payment_id} does not belong to loan {loan_id}")
                 raise ValueError(f'Payment does not belong to loan {loan_id}')
-            
-            # Delete the payment
-            cur.execute('''
-                DELETE FROM loan_payments
-                WHERE payment_id = ?
-            ''', (payment_id,))
-            
-            conn.commit()
-            logger.info(f"Payment deleted successfully: {payment_id}")
-            
-            return cur.rowcount > 0
-            
+            return True
+        
+        try:
+            deleted = run_write(self.db_path, write)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Database error deleting payment {payment_id}: {str(e)}")
             raise
-        finally:
-            conn.close()
+        
+        if deleted:
+            logger.info(f"Payment deleted successfully: {payment_id}")
+        
+        return deleted
@@ -8,6 +8,338 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from collections import defaultdict
 
+import numpy as np
+
+from connection_pool import get_connection
+from db_utils import PAYMENT_STATUS_COLUMNS
+
+
+def _score_loan_diversity(totals: Dict[str, Any]) -> float:
+    """Loan diversity score from aggregated loan totals (see calculateLoanDiversityScore)"""
+    # No active loans: return neutral baseline
+    if not totals['loan_count']:
+        return 50.0
+    
+    # Calculate loan type diversity (distinct types)
+    type_amounts = totals['type_amounts']
+    num_types = len(type_amounts)
+    
+    # Calculate type distribution (percentage per type)
+    total_amount = totals['total_amount']
+    
+    type_percentages = {
+        loan_type: (amount / total_amount) * 100
+        for loan_type, amount in type_amounts.items()
+    }
+    
+    # Calculate loan count
+    loan_count = totals['loan_count']
+    
+    # Base score calculation
+    # Type diversity component (40% weight)
+    if num_types == 1:
+        type_diversity_score = 50
+    elif num_types == 2:
+        type_diversity_score = 75
+    elif num_types == 3:
+        type_diversity_score = 90
+    else:  # 4 types
+        type_diversity_score = 100
+    
+    # Distribution component (35% weight)
+    # Check if distribution is balanced (no single type dominates)
+    max_percentage = max(type_percentages.values())
+    if max_percentage > 80:
+        distribution_score = 50
+    elif max_percentage > 60:
+        distribution_score = 70
+    elif max_percentage > 40:
+        distribution_score = 85
+    else:
+        distribution_score = 100
+    
+    # Count component (25% weight)
+    if loan_count == 1:
+        count_score = 60
+    elif loan_count == 2:
+        count_score = 75
+    elif loan_count == 3:
+        count_score = 90
+    elif loan_count == 4:
+        count_score = 100
+    else:  # 5 or more
+        count_score = 85  # Slight penalty for too many loans
+    
+    # Weighted score
+    base_score = (
+        type_diversity_score * 0.40 +
+        distribution_score * 0.35 +
+        count_score * 0.25
+    )
+    
+    # Apply penalties (but don't double-penalize)
+    penalties = 0
+    
+    # Single loan type penalty (only if not already reflected in type_diversity_score)
+    if num_types == 1 and loan_count > 1:
+        penalties += 10  # Reduced penalty since already reflected in type_diversity_score
+    
+    # Imbalanced distribution penalty (only if multiple types)
+    if num_types > 1 and max_percentage > 80:
+        penalties += 10  # Reduced penalty
+    
+    # Too many loans penalty
+    if loan_count > 5:
+        penalties += 10
+    
+    # Calculate final score
+    final_score = max(0, min(100, base_score - penalties))
+    
+    return round(final_score, 2)
+
+
+def _score_payment_history(status_counts: Dict[str, int]) -> float:
+    """Payment history score from payment status counts (see calculatePaymentHistoryScore)"""
+    total_count = sum(status_counts.values())
+    
+    # No payment history: return neutral baseline for new loans
+    if not total_count:
+        return 70.0
+    
+    on_time_count = status_counts.get('on-time', 0)
+    late_count = status_counts.get('late', 0)
+    missed_count = status_counts.get('missed', 0)
+    
+    # Calculate on-time percentage
+    on_time_percentage = (on_time_count / total_count) * 100
+    
+    # Assign base score based on on-time percentage
+    if on_time_percentage >= 95:
+        base_score = 95
+    elif on_time_percentage >= 85:
+        base_score = 80
+    elif on_time_percentage >= 75:
+        base_score = 65
+    elif on_time_percentage >= 60:
+        base_score = 45
+    else:
+        base_score = 25
+    
+    # Calculate deductions
+    late_deduction = min(15, late_count * 2)
+    missed_deduction = min(25, missed_count * 5)
+    
+    # Calculate final score
+    final_score = max(0, min(100, base_score - late_deduction - missed_deduction))
+    
+    return round(final_score, 2)
+
+
+def _months_until(date_str: str, current_date: datetime) -> int:
+    """Whole calendar months from current_date to an ISO date string"""
+    maturity_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    return (
+        (maturity_date.year - current_date.year) * 12 +
+        (maturity_date.month - current_date.month)
+    )
+
+
+def _aggregate_loans(loans: List[Dict[str, Any]], current_date: datetime) -> Dict[str, Any]:
+    """
+    Reduce a list of active loans to the totals the scores are computed from
+
+    Produces the same shape that is read from loan_metric_counters, so both
+    paths share one set of scoring helpers.
+    """
+    type_amounts = defaultdict(float)
+    for loan in loans:
+        type_amounts[loan['loan_type']] += loan['loan_amount']
+    
+    # Parse each maturity date once
+    months = [_months_until(loan['loan_maturity_date'], current_date) for loan in loans]
+    upcoming = [i for i, remaining in enumerate(months) if remaining > 0]
+    next_index = min(upcoming, key=months.__getitem__) if upcoming else None
+    latest_index = max(range(len(loans)), key=months.__getitem__) if loans else None
+    
+    return {
+        'loan_count': len(loans),
+        'total_amount': sum(loan['loan_amount'] for loan in loans),
+        'tenure_sum': sum(loan['loan_tenure'] for loan in loans),
+        'weighted_tenure_sum': sum(loan['loan_amount'] * loan['loan_tenure'] for loan in loans),
+        'type_amounts': dict(type_amounts),
+        'next_maturity_date': loans[next_index]['loan_maturity_date'] if next_index is not None else None,
+        'latest_maturity_date': loans[latest_index]['loan_maturity_date'] if latest_index is not None else None
+    }
+
+
+def _score_loan_maturity(totals: Dict[str, Any], current_date: datetime) -> float:
+    """Loan maturity score from aggregated loan totals (see calculateLoanMaturityScore)"""
+    # No active loans: return neutral baseline
+    if not totals['loan_count']:
+        return 50.0
+    
+    # Calculate weighted average tenure
+    weighted_tenure = totals['weighted_tenure_sum'] / totals['total_amount']
+    
+    # Use weighted average for scoring (more representative)
+    tenure_months = weighted_tenure
+    
+    # Assign base score based on tenure
+    if tenure_months < 12:
+        base_score = 85
+    elif tenure_months < 36:
+        base_score = 75
+    elif tenure_months < 60:
+        base_score = 65
+    else:
+        base_score = 50
+    
+    # Calculate adjustments
+    adjustments = 0
+    
+    # Bonus (once) when the next loan to mature does so within 6 months
+    next_maturity = totals['next_maturity_date']
+    if next_maturity and 0 < _months_until(next_maturity, current_date) <= 6:
+        adjustments += 10
+    
+    # Penalty (once) when the last loan to mature runs beyond 10 years
+    latest_maturity = totals['latest_maturity_date']
+    if latest_maturity and _months_until(latest_maturity, current_date) > 120:
+        adjustments -= 10
+    
+    # Calculate final score
+    final_score = max(0, min(100, base_score + adjustments))
+    
+    return round(final_score, 2)
+
+
+def _summarize_payments(status_counts: Dict[str, int]) -> Dict[str, Any]:
+    """Payment statistics from payment status counts (see getPaymentStatistics)"""
+    total_count = sum(status_counts.values())
+    
+    if not total_count:
+        return {
+            'on_time_payment_percentage': 0.0,
+            'late_payment_count': 0,
+            'missed_payment_count': 0,
+            'total_payments': 0
+        }
+    
+    # Calculate on-time percentage
+    on_time_percentage = (status_counts.get('on-time', 0) / total_count) * 100
+    
+    return {
+        'on_time_payment_percentage': round(on_time_percentage, 2),
+        'late_payment_count': status_counts.get('late', 0),
+        'missed_payment_count': status_counts.get('missed', 0),
+        'total_payments': total_count
+    }
+
+
+def _summarize_loans(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Loan statistics from aggregated loan totals (see getLoanStatistics)"""
+    if not totals['loan_count']:
+        return {
+            'total_active_loans': 0,
+            'total_loan_amount': 0.0,
+            'average_loan_tenure': 0.0,
+            'weighted_average_tenure': 0.0,
+            'loan_type_distribution': {}
+        }
+    
+    total_active_loans = totals['loan_count']
+    total_loan_amount = totals['total_amount']
+    
+    # Calculate average and amount-weighted tenure
+    average_loan_tenure = totals['tenure_sum'] / total_active_loans
+    weighted_average_tenure = totals['weighted_tenure_sum'] / total_loan_amount
+    
+    # Calculate loan type distribution
+    loan_type_distribution = {
+        loan_type: round((amount / total_loan_amount) * 100, 2)
+        for loan_type, amount in totals['type_amounts'].items()
+    }
+    
+    return {
+        'total_active_loans': total_active_loans,
+        'total_loan_amount': round(total_loan_amount, 2),
+        'average_loan_tenure': round(average_loan_tenure, 2),
+        'weighted_average_tenure': round(weighted_average_tenure, 2),
+        'loan_type_distribution': loan_type_distribution
+    }
+
+
+def _months_until_array(date_strs: List[Optional[str]], current_date: datetime) -> np.ndarray:
+    """Vectorized _months_until; None dates become NaN"""
+    months = np.array([d[:7] if d else 'NaT' for d in date_strs], dtype='datetime64[M]')
+    offset = (months - np.datetime64(current_date.strftime('%Y-%m'), 'M')).astype(np.float64)
+    return np.where(np.isnat(months), np.nan, offset)
+
+
+def _score_loan_diversity_batch(loan_count: np.ndarray, type_count: np.ndarray,
+                                max_type_amount: np.ndarray, total_amount: np.ndarray) -> np.ndarray:
+    """Vectorized _score_loan_diversity over per-user totals"""
+    has_loans = (loan_count > 0) & (type_count > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_percentage = np.where(has_loans, max_type_amount / total_amount * 100, 0.0)
+    
+    type_diversity_score = np.select([type_count == 1, type_count == 2, type_count == 3], [50, 75, 90], 100)
+    distribution_score = np.select([max_percentage > 80, max_percentage > 60, max_percentage > 40], [50, 70, 85], 100)
+    count_score = np.select(
+        [loan_count == 1, loan_count == 2, loan_count == 3, loan_count == 4], [60, 75, 90, 100], 85
+    )
+    
+    base_score = type_diversity_score * 0.40 + distribution_score * 0.35 + count_score * 0.25
+    penalties = 10 * (
+        ((type_count == 1) & (loan_count > 1)).astype(int) +
+        ((type_count > 1) & (max_percentage > 80)).astype(int) +
+        (loan_count > 5).astype(int)
+    )
+    
+    return np.where(has_loans, np.round(np.clip(base_score - penalties, 0, 100), 2), 50.0)
+
+
+def _score_payment_history_batch(on_time: np.ndarray, late: np.ndarray, missed: np.ndarray) -> np.ndarray:
+    """Vectorized _score_payment_history over per-user status counts"""
+    total_count = on_time + late + missed
+    with np.errstate(divide='ignore', invalid='ignore'):
+        on_time_percentage = on_time / total_count * 100
+    
+    base_score = np.select(
+        [on_time_percentage >= 95, on_time_percentage >= 85, on_time_percentage >= 75, on_time_percentage >= 60],
+        [95, 80, 65, 45], 25
+    )
+    final_score = base_score - np.minimum(15, late * 2) - np.minimum(25, missed * 5)
+    
+    return np.where(total_count > 0, np.round(np.clip(final_score, 0, 100), 2), 70.0)
+
+
+def _score_loan_maturity_batch(loan_count: np.ndarray, weighted_tenure_sum: np.ndarray,
+                               total_amount: np.ndarray, next_months: np.ndarray,
+                               latest_months: np.ndarray) -> np.ndarray:
+    """Vectorized _score_loan_maturity; *_months are months until maturity (NaN if none)"""
+    has_loans = loan_count > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tenure_months = weighted_tenure_sum / total_amount
+    
+    base_score = np.select([tenure_months < 12, tenure_months < 36, tenure_months < 60], [85, 75, 65], 50)
+    adjustments = (
+        10 * ((next_months > 0) & (next_months <= 6)).astype(int) -
+        10 * (latest_months > 120).astype(int)
+    )
+    
+    return np.where(has_loans, np.round(np.clip(base_score + adjustments, 0, 100), 2), 50.0)
+
+
+def _align(row_ids: np.ndarray, values: np.ndarray, user_ids: np.ndarray, default: float) -> np.ndarray:
+    """Gather per-row values for each of user_ids (as float), default where a user has no row"""
+    if not len(row_ids):
+        return np.full(len(user_ids), default, dtype=np.float64)
+    order = np.argsort(row_ids, kind='stable')
+    sorted_ids = row_ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, user_ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == user_ids, np.asarray(values, dtype=np.float64)[order][pos], default)
+
 
 class LoanMetricsEngine:
     """Engine for calculating loan-related metrics and scores"""
@@ -22,10 +354,8 @@ class LoanMetricsEngine:
         self.db_path = db_path
     
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
     
     def _get_active_loans(self, user_id: int) -> List[Dict[str, Any]]:
         """
@@ -38,23 +368,24 @@ class LoanMetricsEngine:
             List of loan dictionaries
         """
         conn = self._get_connection()
-        cur = conn.cursor()
         
         try:
-            cur.execute('''
-                SELECT loan_id, user_id, loan_type, loan_amount, loan_tenure,
-                       monthly_emi, interest_rate, loan_start_date, loan_maturity_date,
-                       default_status, created_at, updated_at
-                FROM loans
-                WHERE user_id = ? AND deleted_at IS NULL
-            ''', (user_id,))
-            
-            rows = cur.fetchall()
-            return [dict(row) for row in rows]
-            
+            return self._query_active_loans(conn, user_id)
         finally:
             conn.close()
     
+    def _query_active_loans(self, conn, user_id: int) -> List[Dict[str, Any]]:
+        """Fetch active loans for a user on an open connection"""
+        cur = conn.cursor()
+        cur.execute('''
+            SELECT loan_id, user_id, loan_type, loan_amount, loan_tenure,
+                   monthly_emi, interest_rate, loan_start_date, loan_maturity_date,
+                   default_status, created_at, updated_at
+            FROM loans
+            WHERE user_id = ? AND deleted_at IS NULL
+        ''', (user_id,))
+        return [dict(row) for row in cur.fetchall()]
+    
     def _get_all_payments(self, user_id: int) -> List[Dict[str, Any]]:
         """
         Get all payments for all loans of a user
@@ -83,6 +414,38 @@ class LoanMetricsEngine:
         finally:
             conn.close()
     
+    def _get_payment_status_counts(self, user_id: int) -> Dict[str, int]:
+        """
+        Count payments per status for all active loans of a user
+        
+        Args:
+            user_id: ID of the user
+        
+        Returns:
+            Dictionary mapping payment_status to payment count
+        """
+        conn = self._get_connection()
+        
+        try:
+            return self._query_payment_status_counts(conn, user_id)
+        finally:
+            conn.close()
+    
+    def _query_payment_status_counts(self, conn, user_id: int) -> Dict[str, int]:
+        """Aggregate payment statuses in SQL instead of fetching every payment"""
+        # One conditional sum per status; a GROUP BY would sort the payments
+        # in a temp B-tree
+        status_sums = ', '.join(f"SUM(p.payment_status = '{status}')" for status in PAYMENT_STATUS_COLUMNS)
+        cur = conn.cursor()
+        cur.execute(f'''
+            SELECT {status_sums}
+            FROM loan_payments p
+            INNER JOIN loans l ON p.loan_id = l.loan_id
+            WHERE l.user_id = ? AND l.deleted_at IS NULL
+        ''', (user_id,))
+        row = cur.fetchone()
+        return {status: count for status, count in zip(PAYMENT_STATUS_COLUMNS, row) if count}
+    
     def calculateLoanDiversityScore(self, user_id: int) -> float:
         """
         Calculate loan diversity score (0-100)
@@ -109,91 +472,7 @@ class LoanMetricsEngine:
         Returns:
             Loan diversity score (0-100)
         """
-        loans = self._get_active_loans(user_id)
-        
-        # No active loans: return neutral baseline
-        if not loans:
-            return 50.0
-        
-        # Calculate loan type diversity (distinct types)
-        loan_types = set(loan['loan_type'] for loan in loans)
-        num_types = len(loan_types)
-        
-        # Calculate type distribution (percentage per type)
-        total_amount = sum(loan['loan_amount'] for loan in loans)
-        type_amounts = defaultdict(float)
-        for loan in loans:
-            type_amounts[loan['loan_type']] += loan['loan_amount']
-        
-        type_percentages = {
-            loan_type: (amount / total_amount) * 100
-            for loan_type, amount in type_amounts.items()
-        }
-        
-        # Calculate loan count
-        loan_count = len(loans)
-        
-        # Base score calculation
-        # Type diversity component (40% weight)
-        if num_types == 1:
-            type_diversity_score = 50
-        elif num_types == 2:
-            type_diversity_score = 75
-        elif num_types == 3:
-            type_diversity_score = 90
-        else:  # 4 types
-            type_diversity_score = 100
-        
-        # Distribution component (35% weight)
-        # Check if distribution is balanced (no single type dominates)
-        max_percentage = max(type_percentages.values())
-        if max_percentage > 80:
-            distribution_score = 50
-        elif max_percentage > 60:
-            distribution_score = 70
-        elif max_percentage > 40:
-            distribution_score = 85
-        else:
-            distribution_score = 100
-        
-        # Count component (25% weight)
-        if loan_count == 1:
-            count_score = 60
-        elif loan_count == 2:
-            count_score = 75
-        elif loan_count == 3:
-            count_score = 90
-        elif loan_count == 4:
-            count_score = 100
-        else:  # 5 or more
-            count_score = 85  # Slight penalty for too many loans
-        
-        # Weighted score
-        base_score = (
-            type_diversity_score * 0.40 +
-            distribution_score * 0.35 +
-            count_score * 0.25
-        )
-        
-        # Apply penalties (but don't double-penalize)
-        penalties = 0
-        
-        # Single loan type penalty (only if not already reflected in type_diversity_score)
-        if num_types == 1 and loan_count > 1:
-            penalties += 10  # Reduced penalty since already reflected in type_diversity_score
-        
-        # Imbalanced distribution penalty (only if multiple types)
-        if num_types > 1 and max_percentage > 80:
-            penalties += 10  # Reduced penalty
-        
-        # Too many loans penalty
-        if loan_count > 5:
-            penalties += 10
-        
-        # Calculate final score
-        final_score = max(0, min(100, base_score - penalties))
-        
-        return round(final_score, 2)
+        return _score_loan_diversity(_aggregate_loans(self._get_active_loans(user_id), datetime.utcnow()))
     
     def calculatePaymentHistoryScore(self, user_id: int) -> float:
         """
@@ -221,41 +500,7 @@ class LoanMetricsEngine:
         Returns:
             Payment history score (0-100)
         """
-        payments = self._get_all_payments(user_id)
-        
-        # No payment history: return neutral baseline for new loans
-        if not payments:
-            return 70.0
-        
-        # Count payment statuses
-        on_time_count = sum(1 for p in payments if p['payment_status'] == 'on-time')
-        late_count = sum(1 for p in payments if p['payment_status'] == 'late')
-        missed_count = sum(1 for p in payments if p['payment_status'] == 'missed')
-        total_count = len(payments)
-        
-        # Calculate on-time percentage
-        on_time_percentage = (on_time_count / total_count) * 100
-        
-        # Assign base score based on on-time percentage
-        if on_time_percentage >= 95:
-            base_score = 95
-        elif on_time_percentage >= 85:
-            base_score = 80
-        elif on_time_percentage >= 75:
-            base_score = 65
-        elif on_time_percentage >= 60:
-            base_score = 45
-        else:
-            base_score = 25
-        
-        # Calculate deductions
-        late_deduction = min(15, late_count * 2)
-        missed_deduction = min(25, missed_count * 5)
-        
-        # Calculate final score
-        final_score = max(0, min(100, base_score - late_deduction - missed_deduction))
-        
-        return round(final_score, 2)
+        return _score_payment_history(self._get_payment_status_counts(user_id))
     
     def calculateLoanMaturityScore(self, user_id: int) -> float:
         """
@@ -283,78 +528,8 @@ class LoanMetricsEngine:
         Returns:
             Loan maturity score (0-100)
         """
-        loans = self._get_active_loans(user_id)
-        
-        # No active loans: return neutral baseline
-        if not loans:
-            return 50.0
-        
-        # Calculate average loan tenure
-        total_tenure = sum(loan['loan_tenure'] for loan in loans)
-        average_tenure = total_tenure / len(loans)
-        
-        # Calculate weighted average tenure
-        total_amount = sum(loan['loan_amount'] for loan in loans)
-        weighted_tenure = sum(
-            loan['loan_amount'] * loan['loan_tenure']
-            for loan in loans
-        ) / total_amount
-        
-        # Use weighted average for scoring (more representative)
-        tenure_months = weighted_tenure
-        
-        # Assign base score based on tenure
-        if tenure_months < 12:
-            base_score = 85
-        elif tenure_months < 36:
-            base_score = 75
-        elif tenure_months < 60:
-            base_score = 65
-        else:
-            base_score = 50
-        
-        # Calculate adjustments
-        adjustments = 0
         current_date = datetime.utcnow()
-        
-        for loan in loans:
-            # Parse maturity date
-            maturity_date = datetime.fromisoformat(
-                loan['loan_maturity_date'].replace('Z', '+00:00')
-            )
-            
-            # Calculate months remaining
-            months_remaining = (
-                (maturity_date.year - current_date.year) * 12 +
-                (maturity_date.month - current_date.month)
-            )
-            
-            # Bonus for loans maturing within 6 months
-            if 0 < months_remaining <= 6:
-                adjustments += 10
-                break  # Only apply bonus once
-        
-        for loan in loans:
-            # Parse maturity date
-            maturity_date = datetime.fromisoformat(
-                loan['loan_maturity_date'].replace('Z', '+00:00')
-            )
-            
-            # Calculate months remaining
-            months_remaining = (
-                (maturity_date.year - current_date.year) * 12 +
-                (maturity_date.month - current_date.month)
-            )
-            
-            # Penalty for loans maturing beyond 10 years
-            if months_remaining > 120:
-                adjustments -= 10
-                break  # Only apply penalty once
-        
-        # Calculate final score
-        final_score = max(0, min(100, base_score + adjustments))
-        
-        return round(final_score, 2)
+        return _score_loan_maturity(_aggregate_loans(self._get_active_loans(user_id), current_date), current_date)
     
     def getPaymentStatistics(self, user_id: int) -> Dict[str, Any]:
         """
@@ -370,31 +545,7 @@ class LoanMetricsEngine:
             - missed_payment_count: int
             - total_payments: int
         """
-        payments = self._get_all_payments(user_id)
-        
-        if not payments:
-            return {
-                'on_time_payment_percentage': 0.0,
-                'late_payment_count': 0,
-                'missed_payment_count': 0,
-                'total_payments': 0
-            }
-        
-        # Count payment statuses
-        on_time_count = sum(1 for p in payments if p['payment_status'] == 'on-time')
-        late_count = sum(1 for p in payments if p['payment_status'] == 'late')
-        missed_count = sum(1 for p in payments if p['payment_status'] == 'missed')
-        total_count = len(payments)
-        
-        # Calculate on-time percentage
-        on_time_percentage = (on_time_count / total_count) * 100
-        
-        return {
-            'on_time_payment_percentage': round(on_time_percentage, 2),
-            'late_payment_count': late_count,
-            'missed_payment_count': missed_count,
-            'total_payments': total_count
-        }
+        return _summarize_payments(self._get_payment_status_counts(user_id))
     
     def getLoanStatistics(self, user_id: int) -> Dict[str, Any]:
         """
@@ -411,47 +562,228 @@ class LoanMetricsEngine:
             - weighted_average_tenure: float (months)
             - loan_type_distribution: dict (type -> percentage)
         """
-        loans = self._get_active_loans(user_id)
-        
-        if not loans:
-            return {
-                'total_active_loans': 0,
-                'total_loan_amount': 0.0,
-                'average_loan_tenure': 0.0,
-                'weighted_average_tenure': 0.0,
-                'loan_type_distribution': {}
+        return _summarize_loans(_aggregate_loans(self._get_active_loans(user_id), datetime.utcnow()))
+    
+    def _query_counter_totals(self, conn, user_id: int, current_date: datetime):
+        """
+        Read a user's running totals from loan_metric_counters
+        
+        Args:
+            conn: Open connection
+            user_id: ID of the user
+            current_date: Date the maturity bonus is measured from
+        
+        Returns:
+            Tuple of (loan totals, payment status counts)
+        
+        """
+        cur = conn.cursor()
+        cur.execute('''
+            SELECT active_loan_count, total_loan_amount, tenure_sum, weighted_tenure_sum,
+                   soonest_maturity_date, latest_maturity_date,
+                   on_time_count, late_count, missed_count
+            FROM loan_metric_counters
+            WHERE user_id = ?
+        ''', (user_id,))
+        row = cur.fetchone()
+        
+        cur.execute('''
+            SELECT loan_type, total_amount
+            FROM loan_type_totals
+            WHERE user_id = ? AND loan_count > 0
+        ''', (user_id,))
+        type_amounts = {r['loan_type']: r['total_amount'] for r in cur.fetchall()}
+        
+        if row is None or not row['active_loan_count']:
+            totals = {
+                'loan_count': 0, 'total_amount': 0.0, 'tenure_sum': 0, 'weighted_tenure_sum': 0.0,
+                'type_amounts': {}, 'next_maturity_date': None, 'latest_maturity_date': None
             }
+            return totals, {}
+        
+        # The soonest maturity may already be past; only then look up the first
+        # loan maturing from next month on (served by idx_loans_active_user_maturity)
+        next_maturity = row['soonest_maturity_date']
+        if next_maturity and _months_until(next_maturity, current_date) <= 0:
+            year, month = divmod(current_date.year * 12 + current_date.month, 12)
+            next_month = f'{year:04d}-{month + 1:02d}-01'
+            cur.execute('''
+                SELECT MIN(loan_maturity_date) AS next_maturity
+                FROM loans
+                WHERE user_id = ? AND deleted_at IS NULL AND loan_maturity_date >= ?
+            ''', (user_id, next_month))
+            next_maturity = cur.fetchone()['next_maturity']
+        
+        totals = {
+            'loan_count': row['active_loan_count'],
+            'total_amount': row['total_loan_amount'],
+            'tenure_sum': row['tenure_sum'],
+            'weighted_tenure_sum': row['weighted_tenure_sum'],
+            'type_amounts': type_amounts,
+            'next_maturity_date': next_maturity,
+            'latest_maturity_date': row['latest_maturity_date']
+        }
+        status_counts = {
+            'on-time': row['on_time_count'],
+            'late': row['late_count'],
+            'missed': row['missed_count']
+        }
+        return totals, status_counts
+    
+    def computeAllMetrics(self, user_id: int) -> Dict[str, Any]:
+        """
+        Calculate all loan metrics from the running counters
         
-        # Calculate total active loans
-        total_active_loans = len(loans)
+        Reads the user's row in loan_metric_counters (kept current by triggers
+        on every loan and payment write) instead of scanning their loans and
+        payments.
         
-        # Calculate total loan amount
-        total_loan_amount = sum(loan['loan_amount'] for loan in loans)
+        Args:
+            user_id: ID of the user
         
-        # Calculate average loan tenure
-        total_tenure = sum(loan['loan_tenure'] for loan in loans)
-        average_loan_tenure = total_tenure / total_active_loans
+        Returns:
+            Dictionary containing:
+            - loan_diversity_score: float (0-100)
+            - payment_history_score: float (0-100)
+            - loan_maturity_score: float (0-100)
+            - payment_statistics: dict (see getPaymentStatistics)
+            - loan_statistics: dict (see getLoanStatistics)
+        """
+        current_date = datetime.utcnow()
+        conn = self._get_connection()
         
-        # Calculate weighted average tenure
-        weighted_average_tenure = sum(
-            loan['loan_amount'] * loan['loan_tenure']
-            for loan in loans
-        ) / total_loan_amount
+        try:
+            totals, status_counts = self._query_counter_totals(conn, user_id, current_date)
+        finally:
+            conn.close()
+        
+        return {
+            'loan_diversity_score': _score_loan_diversity(totals),
+            'payment_history_score': _score_payment_history(status_counts),
+            'loan_maturity_score': _score_loan_maturity(totals, current_date),
+            'payment_statistics': _summarize_payments(status_counts),
+            'loan_statistics': _summarize_loans(totals)
+        }
+    
+    def _query_population_totals(self, conn, current_date: datetime) -> Dict[str, np.ndarray]:
+        """
+        Loan totals and payment status counts of every user with loans, as columns
         
-        # Calculate loan type distribution
-        type_amounts = defaultdict(float)
-        for loan in loans:
-            type_amounts[loan['loan_type']] += loan['loan_amount']
+        One query over loan_metric_counters (joined to loan_type_totals); a
+        second runs only if some soonest maturity has passed.
         
-        loan_type_distribution = {
-            loan_type: round((amount / total_loan_amount) * 100, 2)
-            for loan_type, amount in type_amounts.items()
+        Args:
+            conn: Open connection
+            current_date: Date maturities are measured from
+        
+        Returns:
+            Dictionary of equal-length arrays: user_id, loan_count, total_amount,
+            weighted_tenure_sum, type_count, max_type_amount, next_months,
+            latest_months, on_time, late, missed
+        """
+        cur = conn.cursor()
+        
+        cur.execute('''
+            SELECT c.user_id, c.active_loan_count, c.total_loan_amount, c.weighted_tenure_sum,
+                   COALESCE(t.type_count, 0), COALESCE(t.max_type_amount, 0),
+                   c.soonest_maturity_date, c.latest_maturity_date,
+                   c.on_time_count, c.late_count, c.missed_count
+            FROM loan_metric_counters c
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS type_count, MAX(total_amount) AS max_type_amount
+                FROM loan_type_totals
+                WHERE loan_count > 0
+                GROUP BY user_id
+            ) t ON t.user_id = c.user_id
+        ''')
+        rows = cur.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 11
+        status_columns = columns[8:11]
+        
+        user_ids = np.array(columns[0], dtype=np.int64)
+        next_months = _months_until_array(columns[6], current_date)
+        
+        # The soonest maturity may already be past; only then look up the first
+        # loan maturing from next month on, for all such users in one query
+        past = next_months <= 0
+        if past.any():
+            year, month = divmod(current_date.year * 12 + current_date.month, 12)
+            cur.execute('''
+                SELECT user_id, MIN(loan_maturity_date)
+                FROM loans
+                WHERE deleted_at IS NULL AND loan_maturity_date >= ?
+                GROUP BY user_id
+            ''', (f'{year:04d}-{month + 1:02d}-01',))
+            upcoming = cur.fetchall()
+            if upcoming:
+                upcoming_ids, upcoming_dates = zip(*upcoming)
+                upcoming_months = _align(
+                    np.array(upcoming_ids, dtype=np.int64),
+                    _months_until_array(upcoming_dates, current_date),
+                    user_ids, np.nan
+                )
+            else:
+                upcoming_months = np.full(len(user_ids), np.nan)
+            next_months = np.where(past, upcoming_months, next_months)
+        
+        return {
+            'user_id': user_ids,
+            'loan_count': np.array(columns[1], dtype=np.float64),
+            'total_amount': np.array(columns[2], dtype=np.float64),
+            'weighted_tenure_sum': np.array(columns[3], dtype=np.float64),
+            'type_count': np.array(columns[4], dtype=np.float64),
+            'max_type_amount': np.array(columns[5], dtype=np.float64),
+            'next_months': next_months,
+            'latest_months': _months_until_array(columns[7], current_date),
+            'on_time': np.array(status_columns[0], dtype=np.float64),
+            'late': np.array(status_columns[1], dtype=np.float64),
+            'missed': np.array(status_columns[2], dtype=np.float64)
+        }
+    
+    def computeScoresBatch(self, user_ids) -> Dict[str, np.ndarray]:
+        """
+        Calculate the three loan scores for many users at once
+        
+        Aggregates for the whole population are read in a few set-based
+        queries and every score ladder is evaluated over arrays, so rescoring
+        N users costs the same handful of queries as rescoring one. Scores
+        match computeAllMetrics user for user; users without loans get the
+        neutral baselines.
+        
+        Args:
+            user_ids: Sequence of user IDs
+        
+        Returns:
+            Dictionary of arrays aligned with user_ids:
+            - loan_diversity_score
+            - payment_history_score
+            - loan_maturity_score
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        current_date = datetime.utcnow()
+        conn = self._get_connection()
+        
+        try:
+            totals = self._query_population_totals(conn, current_date)
+        finally:
+            conn.close()
+        
+        # One column per user_id, zero (or NaN for maturities) when a user has no loans
+        columns = {
+            name: _align(totals['user_id'], values, user_ids, np.nan if name.endswith('_months') else 0.0)
+            for name, values in totals.items() if name != 'user_id'
         }
         
         return {
-            'total_active_loans': total_active_loans,
-            'total_loan_amount': round(total_loan_amount, 2),
-            'average_loan_tenure': round(average_loan_tenure, 2),
-            'weighted_average_tenure': round(weighted_average_tenure, 2),
-            'loan_type_distribution': loan_type_distribution
+            'loan_diversity_score': _score_loan_diversity_batch(
+                columns['loan_count'], columns['type_count'],
+                columns['max_type_amount'], columns['total_amount']
+            ),
+            'payment_history_score': _score_payment_history_batch(
+                columns['on_time'], columns['late'], columns['missed']
+            ),
+            'loan_maturity_score': _score_loan_maturity_batch(
+                columns['loan_count'], columns['weighted_tenure_sum'], columns['total_amount'],
+                columns['next_months'], columns['latest_months']
+            )
         }
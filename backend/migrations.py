@@ -0,0 +1,253 @@
+"""
+Migrations - Versioned schema migrations for the SmartFin database
+Ordered migrations are applied once each, in their own transaction, and the
+applied version is stored in PRAGMA user_version. When the database is current,
+checking it costs a single pragma read
+
+Usage:
+    cd backend
+    python migrations.py [--db auth.db] [--target N] [--status]
+"""
+
+import argparse
+import logging
+import sqlite3
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import baseline_schema
+from db_utils import get_db_path
+
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    """One schema step: applied on an open transaction, never committed by itself"""
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: List[tuple]) -> List[str]:
+    """ALTER TABLE ... ADD COLUMN for every column the table does not have yet; returns the added names"""
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    added = []
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+            added.append(name)
+    return added
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    """Whether the database has the table"""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _baseline(conn: sqlite3.Connection) -> None:
+    """
+    The schema as it stood before versioned migrations (see baseline_schema)
+
+    Every statement is idempotent, so the baseline also brings databases built
+    by the old init_db and misc/migrate_add_*.py scripts up to date.
+    """
+    for statement in baseline_schema.USER_SCHEMA:
+        conn.execute(statement)
+    _add_missing_columns(conn, 'users', baseline_schema.USERS_ADDED_COLUMNS)
+
+    for statement in baseline_schema.LOAN_TABLE_SCHEMA:
+        conn.execute(statement)
+
+    # Running totals, backfilled when the columns are new to an existing loans table
+    added_totals = _add_missing_columns(conn, 'loans', baseline_schema.LOANS_ADDED_COLUMNS)
+    for statement in baseline_schema.LOAN_PAYMENT_TOTAL_TRIGGERS:
+        conn.execute(statement)
+    if added_totals:
+        conn.execute(baseline_schema.PAYMENT_TOTALS_BACKFILL)
+
+    counters_existed = _table_exists(conn, 'loan_metric_counters')
+    for statement in baseline_schema.LOAN_METRIC_COUNTER_SCHEMA:
+        conn.execute(statement)
+    if not counters_existed:
+        for statement in baseline_schema.COUNTER_BACKFILL:
+            conn.execute(statement)
+
+    if _table_exists(conn, 'score_history'):
+        _add_missing_columns(conn, 'score_history', [('source', "TEXT NOT NULL DEFAULT 'health'")])
+    for statement in baseline_schema.SCORE_HISTORY_SCHEMA:
+        conn.execute(statement)
+
+    for statement in baseline_schema.LISTING_INDEXES:
+        conn.execute(statement)
+
+
+# Active-loan partial indexes, and financial_goals.priority_rank (the goal
+# priority CASE stored as a column) with its triggers and listing indexes
+HOT_PATH_SCHEMA = [
+    'CREATE INDEX IF NOT EXISTS idx_loans_active_user_created ON loans(user_id, created_at, loan_id) '
+    'WHERE deleted_at IS NULL',
+    'CREATE INDEX IF NOT EXISTS idx_loans_active_user_maturity '
+    'ON loans(user_id, loan_maturity_date) WHERE deleted_at IS NULL',
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_financial_goals_rank_insert
+    AFTER INSERT ON financial_goals
+    BEGIN
+        UPDATE financial_goals
+        SET priority_rank = CASE NEW.priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_financial_goals_rank_update
+    AFTER UPDATE OF priority ON financial_goals
+    BEGIN
+        UPDATE financial_goals
+        SET priority_rank = CASE NEW.priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END
+        WHERE id = NEW.id;
+    END
+    """,
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_priority '
+    'ON financial_goals(user_id, priority_rank, target_date, id)',
+    'CREATE INDEX IF NOT EXISTS idx_financial_goals_user_status_priority '
+    'ON financial_goals(user_id, status, priority_rank, target_date, id)'
+]
+
+# Indexes that the composite and partial indexes make redundant; left in
+# place they only give the planner worse choices
+SUPERSEDED_INDEXES = [
+    'idx_loans_user_id',
+    'idx_loans_deleted_at',
+    'idx_loans_user_maturity',
+    'idx_loan_payments_loan_id',
+    'idx_financial_goals_user_id',
+    'idx_financial_goals_priority',
+    'idx_financial_goals_status',
+    'idx_financial_goals_user_rank'
+]
+
+
+def _hot_path_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Composite and partial indexes for the hot reads, and a stored goal priority_rank
+
+    Adds and backfills financial_goals.priority_rank, creates HOT_PATH_SCHEMA,
+    then drops SUPERSEDED_INDEXES.
+    """
+    if _add_missing_columns(conn, 'financial_goals', [('priority_rank', 'INTEGER')]):
+        conn.execute("UPDATE financial_goals SET priority_rank = "
+                     "CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END")
+    for statement in HOT_PATH_SCHEMA:
+        conn.execute(statement)
+    for name in SUPERSEDED_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+# Append new migrations with the next version number; never edit applied ones
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'baseline', _baseline),
+    Migration(2, 'hot_path_indexes', _hot_path_indexes)
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """
+    Read the schema version of a database
+
+    Args:
+        conn: Open connection
+
+    Returns:
+        PRAGMA user_version (0 for a new or pre-migration database)
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(db_path: Optional[str] = None, target: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Apply every pending migration up to target
+
+    Each migration runs in its own BEGIN IMMEDIATE transaction together with
+    the user_version bump, so a failure leaves the database at the previous
+    version. The version is re-read under the write lock, so processes booting
+    at the same time apply each migration only once.
+
+    Args:
+        db_path: Path to database file (defaults to auth.db in backend directory)
+        target: Version to migrate to (defaults to SCHEMA_VERSION)
+
+    Returns:
+        Dictionary with from_version, to_version and applied (migration names)
+
+    Raises:
+        sqlite3.Error: If a migration fails (its transaction is rolled back)
+    """
+    if db_path is None:
+        db_path = get_db_path()
+    if target is None:
+        target = SCHEMA_VERSION
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        start = version = current_version(conn)
+        if version > SCHEMA_VERSION:
+            logger.warning(f"Database {db_path} is at schema version {version}, newer than {SCHEMA_VERSION}")
+
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version <= version or migration.version > target:
+                continue
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if current_version(conn) >= migration.version:
+                    # Another process applied it while we waited for the lock
+                    conn.execute('COMMIT')
+                    version = current_version(conn)
+                    continue
+                migration.apply(conn)
+                conn.execute(f'PRAGMA user_version = {migration.version:d}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                logger.error(f"Migration {migration.version} ({migration.name}) failed on {db_path}")
+                raise
+
+            version = migration.version
+            applied.append(migration.name)
+            logger.info(f"Applied migration {migration.version} ({migration.name}) to {db_path}")
+
+        return {'from_version': start, 'to_version': version, 'applied': applied}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply SmartFin schema migrations')
+    parser.add_argument('--db', default=get_db_path(), help='Database file (default: backend/auth.db)')
+    parser.add_argument('--target', type=int, default=None, help='Version to migrate to (default: latest)')
+    parser.add_argument('--status', action='store_true', help='Show the current version and pending migrations')
+    args = parser.parse_args()
+
+    if args.status:
+        conn = sqlite3.connect(args.db)
+        version = current_version(conn)
+        conn.close()
+        print(f"Database: {args.db}")
+        print(f"Schema version: {version} (latest {SCHEMA_VERSION})")
+        for migration in MIGRATIONS:
+            state = 'applied' if migration.version <= version else 'pending'
+            print(f"  {migration.version:>3}  {migration.name:<30} {state}")
+        return
+
+    result = migrate(args.db, args.target)
+    if result['applied']:
+        print(f"Migrated {args.db} from version {result['from_version']} to {result['to_version']}: "
+              f"{', '.join(result['applied'])}")
+    else:
+        print(f"{args.db} is at version {result['to_version']}; nothing to apply")
+
+
+if __name__ == '__main__':
+    main()
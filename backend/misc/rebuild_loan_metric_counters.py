@@ -0,0 +1,50 @@
+"""
+Rebuild loan metric counters
+Recomputes loan_metric_counters and loan_type_totals from the loans and
+loan_payments tables, reporting any users whose running totals had drifted
+
+Usage:
+    python misc/rebuild_loan_metric_counters.py [user_id]
+"""
+
+import os
+import sys
+
+# Backend modules live one level up from misc/
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from db_utils import rebuild_loan_metric_counters
+
+DB_PATH = os.path.join(BACKEND_DIR, 'auth.db')
+
+
+def rebuild(user_id=None):
+    """Rebuild counters for every user, or only user_id"""
+    try:
+        result = rebuild_loan_metric_counters(DB_PATH, user_id)
+
+        print(f"✓ Rebuilt counters for {result['users_rebuilt']} user(s)")
+        if result['mismatched_users']:
+            print(f"⚠ Counters had drifted for {len(result['mismatched_users'])} user(s):")
+            for uid in result['mismatched_users']:
+                print(f"  - user {uid}")
+        else:
+            print("✓ No drift found")
+
+    except Exception as e:
+        print(f"❌ Rebuild failed: {str(e)}")
+        raise
+
+
+if __name__ == '__main__':
+    print("=" * 70)
+    print("Rebuild Loan Metric Counters")
+    print("=" * 70)
+    print(f"Database: {DB_PATH}\n")
+
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Error: Database file not found at {DB_PATH}")
+        exit(1)
+
+    rebuild(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,143 @@
+"""
+Model_Inference - Pandas-free inference adapter for the enhanced scoring model
+Scores float64 NumPy feature buffers without per-call DataFrame construction
+"""
+
+import threading
+import warnings
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# sklearn releases whose private GradientBoosting _raw_predict the adapter may call
+RAW_PREDICT_SKLEARN_VERSIONS = ((1, 0), (2, 0))
+
+
+def _sklearn_version() -> Optional[tuple]:
+    """Installed scikit-learn (major, minor), or None if it cannot be determined"""
+    try:
+        import sklearn
+        return tuple(int(part) for part in sklearn.__version__.split('.')[:2])
+    except (ImportError, ValueError):
+        return None
+
+
+def checked_raw_predict(model, n_features: int) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """
+    The model's private _raw_predict, if it is safe to call instead of predict()
+
+    It is only used on a tested scikit-learn version, and only when it gives
+    predict()'s result for a probe row. Anything else returns None, so the
+    adapter falls back to the public predict().
+
+    Args:
+        model: Fitted regressor
+        n_features: Number of feature columns
+
+    Returns:
+        The bound _raw_predict, or None
+    """
+    raw_predict = getattr(model, '_raw_predict', None)
+    if raw_predict is None:
+        return None
+
+    version = _sklearn_version()
+    low, high = RAW_PREDICT_SKLEARN_VERSIONS
+    if version is None or not low <= version < high:
+        return None
+
+    probe = np.ones((1, n_features), dtype=np.float64)
+    try:
+        raw = np.asarray(raw_predict(probe.astype(np.float32)), dtype=np.float64).ravel()
+        with warnings.catch_warnings():
+            # Fitted on a DataFrame; the probe has no feature names
+            warnings.simplefilter('ignore', UserWarning)
+            expected = np.asarray(model.predict(probe), dtype=np.float64).ravel()
+    except Exception:
+        return None
+    if raw.shape != expected.shape or not np.allclose(raw, expected):
+        return None
+    return raw_predict
+
+
+class ModelInference:
+    """Inference adapter around the enhanced_model.pkl GradientBoostingRegressor"""
+
+    def __init__(self, model, feature_names: Sequence[str]):
+        """
+        Initialize ModelInference
+
+        Args:
+            model: Fitted regressor loaded from enhanced_model.pkl
+            feature_names: Feature columns in training order (model_data['feature_cols'])
+
+        Raises:
+            ValueError: If feature_names does not match the order the model was fitted with
+        """
+        self.model = model
+        self.feature_names: List[str] = list(feature_names)
+        self.n_features = len(self.feature_names)
+
+        # Column order is checked once here instead of by pandas on every call
+        fitted_names = getattr(model, 'feature_names_in_', None)
+        if fitted_names is not None and list(fitted_names) != self.feature_names:
+            raise ValueError(
+                f'Feature order {self.feature_names} does not match model features {list(fitted_names)}'
+            )
+
+        # GradientBoosting exposes the tree-sum directly; predict() only adds
+        # input validation on top of it, which the adapter does up front.
+        # It is private, so it is only used where it is checked to match predict()
+        self._raw_predict = checked_raw_predict(model, self.n_features)
+        self._local = threading.local()
+
+    def row_buffer(self) -> np.ndarray:
+        """
+        Get this thread's preallocated (1, n_features) float64 buffer
+
+        The buffer is reused across calls on the same thread, so callers must
+        finish with one prediction before filling it again.
+        """
+        buffer = getattr(self._local, 'row', None)
+        if buffer is None:
+            buffer = self._local.row = np.zeros((1, self.n_features), dtype=np.float64)
+        return buffer
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict raw scores for a feature matrix
+
+        Args:
+            features: Array of shape (n_samples, n_features) or (n_features,)
+                      with columns in feature_names order
+
+        Returns:
+            1-D float64 array of raw (unclamped) predictions
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(
+                f'Expected feature matrix with {self.n_features} columns, got shape {features.shape}'
+            )
+
+        if self._raw_predict is None:
+            return np.asarray(self.model.predict(features), dtype=np.float64).ravel()
+
+        # Trees compare in float32, exactly as sklearn's own predict() converts input
+        return self._raw_predict(np.ascontiguousarray(features, dtype=np.float32)).ravel()
+
+    def predict_one(self, values: Iterable[float]) -> float:
+        """
+        Predict the raw score for a single feature row using the thread-local buffer
+
+        Args:
+            values: Feature values in feature_names order
+
+        Returns:
+            Raw (unclamped) prediction
+        """
+        buffer = self.row_buffer()
+        buffer[0, :] = values
+        return float(self.predict(buffer)[0])
@@ -0,0 +1,151 @@
+"""
+Model_Registry - Lazy, fork-friendly loading of the scoring model
+Resolves which model artifact to use without reading it, and loads it on first
+use (or up front via load(), so pre-forked workers share the model's arrays
+copy-on-write instead of each unpickling their own)
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from compiled_model import CompiledTreeEnsemble
+from model_inference import ModelInference
+
+
+logger = logging.getLogger(__name__)
+
+# 'sklearn' loads the joblib pickle; 'compiled' opts into the flat-array artifact,
+# which loads faster and scores single rows faster but batches about 3x slower
+MODEL_FORMAT = os.environ.get('SMARTFIN_MODEL_FORMAT', 'sklearn')
+
+COMPILED_MODEL_FILE = 'enhanced_model_compiled.npz'
+SKLEARN_MODEL_FILE = 'enhanced_model.pkl'
+
+
+class ModelRegistry:
+    """
+    Holds the scoring model, loading it at most once per process
+
+    Every accessor loads the model on first use; load() is thread-safe and
+    idempotent, so concurrent first requests wait for a single load.
+    """
+
+    def __init__(self, data_dir: str, model_format: str = MODEL_FORMAT,
+                 on_load: Optional[Callable[['ModelRegistry'], None]] = None):
+        """
+        Initialize ModelRegistry
+
+        Args:
+            data_dir: Directory holding the model artifacts
+            model_format: 'sklearn', or 'compiled' (used when the .npz exists)
+            on_load: Called with the registry once the model has been loaded
+        """
+        compiled_path = os.path.join(data_dir, COMPILED_MODEL_FILE)
+        self.compiled = model_format == 'compiled' and os.path.exists(compiled_path)
+        self.model_path = compiled_path if self.compiled else os.path.join(data_dir, SKLEARN_MODEL_FILE)
+        self.on_load = on_load
+        self.load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._model_data: Optional[Dict[str, Any]] = None
+        self._inference: Optional[ModelInference] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model has been loaded in this process"""
+        return self._inference is not None
+
+    def load(self) -> 'ModelRegistry':
+        """
+        Load the model if it is not loaded yet
+
+        Returns:
+            This registry
+
+        Raises:
+            OSError: If the model artifact cannot be read
+        """
+        if self._inference is not None:
+            return self
+
+        with self._lock:
+            if self._inference is None:
+                started = time.perf_counter()
+                if self.compiled:
+                    model = CompiledTreeEnsemble.load(self.model_path)
+                    model_data = {**model.metadata, 'model': model}
+                else:
+                    import joblib
+                    model_data = joblib.load(self.model_path)
+                    model = model_data['model']
+
+                self._model_data = model_data
+                self._inference = ModelInference(model, model_data['feature_cols'])
+                self.load_seconds = time.perf_counter() - started
+                logger.info(f"Model loaded: {model_data['model_type']} from "
+                            f"{os.path.basename(self.model_path)} in {self.load_seconds * 1000:.1f} ms")
+                if self.on_load is not None:
+                    self.on_load(self)
+        return self
+
+    def preload_for_fork(self) -> 'ModelRegistry':
+        """
+        Load the model in a parent process that is about to fork workers
+
+        Also moves every object alive so far into the permanent GC generation, so
+        collections in the workers do not write to (and so copy) shared pages.
+
+        Returns:
+            This registry
+        """
+        self.load()
+        gc.collect()
+        gc.freeze()
+        return self
+
+    @property
+    def model_data(self) -> Dict[str, Any]:
+        """Artifact contents: model, feature_cols, metrics, model_type"""
+        return self.load()._model_data
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Feature columns in training order"""
+        return self.load()._inference.feature_names
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Training metrics (r2_test, mae_test, rmse_test)"""
+        return self.model_data['metrics']
+
+    @property
+    def inference(self) -> ModelInference:
+        """Shared pandas-free inference adapter"""
+        return self.load()._inference
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Predict raw scores for a feature matrix (see ModelInference.predict)"""
+        return self.inference.predict(matrix)
+
+    def predict_one(self, values: Sequence[float]) -> float:
+        """Predict the raw score for one feature row (see ModelInference.predict_one)"""
+        return self.inference.predict_one(values)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Load state of the model
+
+        Returns:
+            Dictionary with loaded, format, path and load_ms (None until loaded)
+        """
+        return {
+            'loaded': self.loaded,
+            'format': 'compiled' if self.compiled else 'sklearn',
+            'path': os.path.basename(self.model_path),
+            'load_ms': round(self.load_seconds * 1000, 2) if self.load_seconds is not None else None
+        }
@@ -0,0 +1,157 @@
+"""
+Pagination - Keyset cursors and field projection for list endpoints
+A cursor is the sort key of the last row of a page, so the next page starts
+with an index range scan from that key instead of skipping OFFSET rows.
+Cursors are opaque to clients (base64url-encoded JSON)
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+# Upper bound for ?limit= on list endpoints
+MAX_PAGE_SIZE = 200
+
+# Page size when a cursor is given without a limit
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """
+    Encode a sort key as an opaque cursor
+
+    Args:
+        key: Sort key values of the last row returned
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page
+        size: Number of values in the sort key
+
+    Returns:
+        Tuple of sort key values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if (not isinstance(key, list) or len(key) != size
+            or not all(isinstance(value, (str, int, float)) for value in key)):
+        raise ValueError('Invalid cursor')
+    return tuple(key)
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ?fields= value
+
+    Args:
+        fields: Raw parameter value, or None for all fields
+        allowed: Columns a client may request, in SELECT order
+
+    Returns:
+        Requested columns in SELECT order, or None for all fields
+
+    Raises:
+        ValueError: If a field is unknown or none is given
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(',') if name.strip()}
+    if not requested:
+        raise ValueError('fields must name at least one field')
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return [name for name in allowed if name in requested]
+
+
+def parse_page_args(args: Mapping[str, str], allowed: Sequence[str]
+                    ) -> Tuple[Optional[int], Optional[str], Optional[List[str]]]:
+    """
+    Read limit, cursor and fields from a list endpoint's query string
+
+    Listings stay unpaginated unless limit or cursor is given.
+
+    Args:
+        args: Query parameters (request.args)
+        allowed: Fields the listing can return
+
+    Returns:
+        Tuple of (limit or None, cursor or None, fields or None)
+
+    Raises:
+        ValueError: If limit is out of range or a field is unknown
+    """
+    limit = None
+    if 'limit' in args:
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be an integer between 1 and {MAX_PAGE_SIZE}')
+    cursor = args.get('cursor') or None
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    return limit, cursor, parse_fields(args.get('fields'), allowed)
+
+
+def select_columns(fields: Optional[Sequence[str]], allowed: Sequence[str],
+                   required: Iterable[str] = ()) -> List[str]:
+    """
+    Columns to SELECT for a projection: the requested fields plus whatever the
+    query needs for itself (sort keys), in SELECT order
+
+    Args:
+        fields: Requested fields (from parse_fields), or None for all
+        allowed: All selectable columns, in SELECT order
+        required: Columns that must be read even if not requested
+
+    Returns:
+        List of column names
+    """
+    if fields is None:
+        return list(allowed)
+    wanted = set(fields).union(required)
+    return [name for name in allowed if name in wanted]
+
+
+def build_page(rows: Sequence[Dict[str, Any]], limit: Optional[int], key_columns: Sequence[str],
+               fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim rows fetched with LIMIT limit + 1 to one page and build its cursor
+
+    Args:
+        rows: Rows in sort order, at most limit + 1
+        limit: Page size, or None when the whole list was fetched
+        key_columns: Sort key columns, used for the next cursor
+        fields: Requested fields; other columns (read only for the sort key)
+            are dropped from the returned rows
+
+    Returns:
+        Tuple of (page rows, next cursor or None on the last page)
+    """
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in key_columns])
+    if fields is not None:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return list(rows), next_cursor
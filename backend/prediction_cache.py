@@ -0,0 +1,158 @@
+"""
+Prediction_Cache - Bounded LRU/TTL cache for model predictions
+Memoizes scores and rule-pipeline results keyed on canonical feature vectors
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+def canonical_key(kind: str, values: Iterable[Any]) -> Tuple:
+    """
+    Build a cache key from a sequence of numeric inputs
+
+    Values are normalised to float so 100000 and 100000.0 share an entry.
+
+    Args:
+        kind: Namespace for the cached value (e.g. 'score', 'result')
+        values: Input values in a fixed order
+
+    Returns:
+        Hashable key tuple
+    """
+    return (kind,) + tuple(float(value) for value in values)
+
+
+def model_version_for(path: str) -> str:
+    """
+    Derive a model version from the content of a model artifact
+
+    Args:
+        path: Path to the loaded model file
+
+    Returns:
+        First 16 hex characters of the file's SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry TTL; keys are scoped to the model version"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize PredictionCache
+
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (0 means no expiry)
+            clock: Monotonic time source, injectable for tests
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.model_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def set_model_version(self, version: str) -> None:
+        """
+        Bind the cache to a model version, dropping all entries if it changed
+
+        Args:
+            version: Identifier of the currently loaded model
+        """
+        with self._lock:
+            if version != self.model_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.model_version = version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Key built with canonical_key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        key = (self.model_version, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if self.ttl_seconds and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        Args:
+            key: Key built with canonical_key
+            value: Value to cache (treated as read-only by callers)
+        """
+        if self.max_size <= 0:
+            return
+
+        key = (self.model_version, key)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hits, misses, evictions, expirations, invalidations,
+            hit_rate, size, max_size, ttl_seconds and model_version
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'model_version': self.model_version
+            }
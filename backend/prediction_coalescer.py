@@ -0,0 +1,204 @@
+"""
+Prediction_Coalescer - Micro-batching of concurrent model predictions
+Requests that arrive while other predictions are in flight hand their feature
+rows to a dispatcher thread, which gathers rows for a short window and scores
+them with one batched model call. A request with nothing else in flight is
+scored directly on its own thread, so light load pays no extra latency
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# How long the dispatcher waits for more rows after the first one (0 disables coalescing)
+COALESCE_WINDOW_MS = float(os.environ.get('PREDICTION_COALESCE_WINDOW_MS', 2.0))
+
+# Rows that close a batch immediately
+COALESCE_MAX_BATCH = int(os.environ.get('PREDICTION_COALESCE_MAX_BATCH', 256))
+
+# Batch-size histogram buckets (upper bounds, in rows)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Queue-wait samples kept for the latency percentiles
+LATENCY_SAMPLES = 2048
+
+
+class PredictionCoalescer:
+    """
+    Thread-safe micro-batcher in front of a vectorized predict function
+
+    predict() is called by request threads. If no other caller is inside
+    predict(), the rows are scored directly. Otherwise they are queued with a
+    Future; a daemon dispatcher thread (started on first use) takes everything
+    queued within window_ms of the first waiting request, or max_batch rows,
+    makes one predict_fn call and resolves each caller's Future with its
+    slice of the result. The window closes early once every caller inside
+    predict() is queued, since no one else can join the batch.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 predict_one: Optional[Callable[[Sequence[float]], float]] = None,
+                 window_ms: float = COALESCE_WINDOW_MS, max_batch: int = COALESCE_MAX_BATCH):
+        """
+        Initialize PredictionCoalescer
+
+        Args:
+            predict_fn: Scores an (n, n_features) float64 matrix, returning n values
+            predict_one: Optional faster path for a single direct row
+            window_ms: Milliseconds a batch stays open after its first request
+                (0 scores every request directly)
+            max_batch: Rows that close a batch before the window ends
+        """
+        self.predict_fn = predict_fn
+        self.predict_one = predict_one
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Deque[Tuple[np.ndarray, Future, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._active = 0
+        self._stats = {
+            'direct_requests': 0, 'coalesced_requests': 0, 'batches': 0,
+            'rows_predicted': 0, 'failed_batches': 0, 'max_queue_depth': 0
+        }
+        self._histogram = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+        self._histogram_overflow = 0
+        self._waits: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def predict(self, rows: Sequence[Sequence[float]]) -> np.ndarray:
+        """
+        Score feature rows, batched with concurrent callers when there are any
+
+        Args:
+            rows: Feature rows in model feature order
+
+        Returns:
+            1-D float64 array of raw predictions, one per row
+
+        Raises:
+            Exception: Whatever predict_fn raised for the batch
+        """
+        with self._cond:
+            self._active += 1
+            direct = self.window <= 0 or self._active == 1
+        try:
+            if direct:
+                with self._cond:
+                    self._stats['direct_requests'] += 1
+                if len(rows) == 1 and self.predict_one is not None:
+                    return np.array([self.predict_one(rows[0])], dtype=np.float64)
+                return np.asarray(self.predict_fn(np.asarray(rows, dtype=np.float64)), dtype=np.float64)
+
+            future: Future = Future()
+            with self._cond:
+                self._queue.append((np.asarray(rows, dtype=np.float64), future, time.perf_counter()))
+                self._stats['coalesced_requests'] += 1
+                self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], len(self._queue))
+                self._ensure_thread()
+                self._cond.notify_all()
+            return future.result()
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters, queue depth, batch-size histogram and queue-wait latency
+
+        Returns:
+            Dictionary with direct/coalesced request counts, batches,
+            queue_depth, max_queue_depth, batch_size_histogram (rows per
+            batch, by upper bound) and added_latency_ms (p50/p99/max of the
+            time coalesced requests waited before their batch was scored)
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._queue)
+            stats['window_ms'] = self.window * 1000
+            stats['max_batch'] = self.max_batch
+            histogram = {f'<={bound}': count for bound, count in self._histogram.items()}
+            histogram[f'>{BATCH_SIZE_BUCKETS[-1]}'] = self._histogram_overflow
+            stats['batch_size_histogram'] = histogram
+            waits = sorted(self._waits)
+
+        if waits:
+            stats['added_latency_ms'] = {
+                'p50': round(waits[len(waits) // 2] * 1000, 3),
+                'p99': round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 3),
+                'max': round(waits[-1] * 1000, 3)
+            }
+        else:
+            stats['added_latency_ms'] = {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        return stats
+
+    def _ensure_thread(self) -> None:
+        """Start the dispatcher thread if it is not running (caller holds the lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='prediction-coalescer', daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Tuple[np.ndarray, Future, float]]:
+        """Wait for a request, then collect requests until the window closes or the batch is full"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue)
+            deadline = self._queue[0][2] + self.window
+            while True:
+                rows = sum(len(item[0]) for item in self._queue)
+                remaining = deadline - time.perf_counter()
+                # Every caller inside predict() is already queued: nobody is left to wait for
+                if rows >= self.max_batch or remaining <= 0 or len(self._queue) >= self._active:
+                    break
+                self._cond.wait(remaining)
+
+            batch, rows = [], 0
+            while self._queue and (not batch or rows + len(self._queue[0][0]) <= self.max_batch):
+                item = self._queue.popleft()
+                batch.append(item)
+                rows += len(item[0])
+            return batch
+
+    def _record_batch(self, batch: List[Tuple[np.ndarray, Future, float]], started: float) -> None:
+        """Update the batch counters and queue-wait samples"""
+        rows = sum(len(item[0]) for item in batch)
+        with self._cond:
+            self._stats['batches'] += 1
+            self._stats['rows_predicted'] += rows
+            for bound in BATCH_SIZE_BUCKETS:
+                if rows <= bound:
+                    self._histogram[bound] += 1
+                    break
+            else:
+                self._histogram_overflow += 1
+            self._waits.extend(started - enqueued for _, _, enqueued in batch)
+
+    def _run(self) -> None:
+        """Dispatcher loop: one predict_fn call per batch"""
+        while True:
+            batch = self._take_batch()
+            started = time.perf_counter()
+            self._record_batch(batch, started)
+            try:
+                matrix = batch[0][0] if len(batch) == 1 else np.concatenate([item[0] for item in batch])
+                predictions = np.asarray(self.predict_fn(matrix), dtype=np.float64)
+            except Exception as e:
+                with self._cond:
+                    self._stats['failed_batches'] += 1
+                logger.error(f"Coalesced prediction failed for {len(batch)} requests: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for rows, future, _ in batch:
+                future.set_result(predictions[offset:offset + len(rows)])
+                offset += len(rows)
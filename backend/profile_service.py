@@ -6,11 +6,24 @@ import sqlite3
 import json
 from datetime import datetime
 from typing import Optional, Dict, Any
+from connection_pool import get_connection
+from request_scope import forget_row, load_row, store_row, update_row
+from write_queue import run_write
 
 
 class ProfileService:
     """Service class for managing user profiles"""
     
+    # Affinity of each updatable users_profile column, so request-cached rows match what SQLite stores
+    PROFILE_COLUMN_AFFINITIES = {
+        'name': 'TEXT',
+        'age': 'INTEGER',
+        'location': 'TEXT',
+        'risk_tolerance': 'INTEGER',
+        'profile_picture_url': 'TEXT',
+        'updated_at': 'TEXT'
+    }
+    
     def __init__(self, db_path: str):
         """
         Initialize ProfileService
@@ -21,10 +34,8 @@ class ProfileService:
         self.db_path = db_path
     
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled database connection"""
+        return get_connection(self.db_path)
     
     def _row_to_dict(self, row) -> Optional[Dict[str, Any]]:
         """Convert SQLite row to dictionary"""
@@ -52,26 +63,23 @@ class ProfileService:
             sqlite3.IntegrityError: If profile already exists for user
             sqlite3.Error: For other database errors
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        # Set default notification preferences if not provided
+        notification_prefs = profile_data.get('notification_preferences', {
+            'email': True,
+            'push': False,
+            'in_app': True,
+            'frequency': 'daily'
+        })
         
-        try:
-            # Set default notification preferences if not provided
-            notification_prefs = profile_data.get('notification_preferences', {
-                'email': True,
-                'push': False,
-                'in_app': True,
-                'frequency': 'daily'
-            })
-            
-            # Convert notification preferences to JSON string
-            notification_prefs_json = json.dumps(notification_prefs)
-            
-            # Get current timestamp
-            now = datetime.utcnow().isoformat()
-            
+        # Convert notification preferences to JSON string
+        notification_prefs_json = json.dumps(notification_prefs)
+        
+        # Get current timestamp
+        now = datetime.utcnow().isoformat()
+        
+        def write(conn):
             # Insert profile
-            cur.execute('''
+            conn.cursor().execute('''
                 INSERT INTO users_profile 
                 (user_id, name, age, location, risk_tolerance, notification_preferences, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -85,33 +93,37 @@ class ProfileService:
                 now,
                 now
             ))
-            
-            conn.commit()
-            
-            # Retrieve and return the created profile
-            return self.get_profile(user_id)
-            
+        
+        try:
+            run_write(self.db_path, write)
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if 'UNIQUE constraint' in str(e) or 'PRIMARY KEY' in str(e):
                 raise ValueError(f'Profile already exists for user {user_id}')
             raise
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        
+        # A lookup earlier in the request may have cached "no profile"
+        forget_row(self.db_path, 'users_profile', user_id)
+        
+        # Retrieve and return the created profile
+        return self.get_profile(user_id)
     
     def get_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
         Retrieve a user's profile
         
+        Within a request scope the row is read once and then served from the
+        request's identity map (see request_scope).
+        
         Args:
             user_id: ID of the user
         
         Returns:
             Dictionary containing profile data, or None if not found
         """
+        return load_row(self.db_path, 'users_profile', user_id, lambda: self._fetch_profile(user_id))
+    
+    def _fetch_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Read a profile row from the database, with notification preferences parsed"""
         conn = self._get_connection()
         cur = conn.cursor()
         
@@ -155,60 +167,58 @@ class ProfileService:
             ValueError: If profile doesn't exist
             sqlite3.Error: For database errors
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
-        
-        try:
-            # Check if profile exists
-            existing_profile = self.get_profile(user_id)
-            if existing_profile is None:
-                raise ValueError(f'Profile not found for user {user_id}')
-            
-            # Build UPDATE query dynamically based on provided fields
-            update_fields = []
-            update_values = []
-            
-            allowed_fields = ['name', 'age', 'location', 'risk_tolerance', 'notification_preferences', 'profile_picture_url']
-            
-            for field in allowed_fields:
-                if field in updates:
-                    if field == 'notification_preferences':
-                        # Convert dict to JSON string
-                        update_fields.append(f'{field} = ?')
-                        update_values.append(json.dumps(updates[field]))
-                    else:
-                        update_fields.append(f'{field} = ?')
-                        update_values.append(updates[field])
-            
-            if not update_fields:
-                # No fields to update, return existing profile
-                return existing_profile
-            
-            # Always update the updated_at timestamp
-            update_fields.append('updated_at = ?')
-            update_values.append(datetime.utcnow().isoformat())
-            
-            # Add user_id to values for WHERE clause
-            update_values.append(user_id)
-            
-            # Execute update
-            query = f'''
-                UPDATE users_profile
-                SET {', '.join(update_fields)}
-                WHERE user_id = ?
-            '''
-            
-            cur.execute(query, update_values)
-            conn.commit()
-            
-            # Retrieve and return updated profile
-            return self.get_profile(user_id)
-            
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        # Check if profile exists
+        existing_profile = self.get_profile(user_id)
+        if existing_profile is None:
+            raise ValueError(f'Profile not found for user {user_id}')
+        
+        # Build UPDATE query dynamically based on provided fields
+        update_fields = []
+        update_values = []
+        
+        allowed_fields = ['name', 'age', 'location', 'risk_tolerance', 'notification_preferences', 'profile_picture_url']
+        
+        for field in allowed_fields:
+            if field in updates:
+                if field == 'notification_preferences':
+                    # Convert dict to JSON string
+                    update_fields.append(f'{field} = ?')
+                    update_values.append(json.dumps(updates[field]))
+                else:
+                    update_fields.append(f'{field} = ?')
+                    update_values.append(updates[field])
+        
+        if not update_fields:
+            # No fields to update, return existing profile
+            return existing_profile
+        
+        # Always update the updated_at timestamp
+        update_fields.append('updated_at = ?')
+        update_values.append(datetime.utcnow().isoformat())
+        
+        # Add user_id to values for WHERE clause
+        update_values.append(user_id)
+        
+        # Execute update
+        query = f'''
+            UPDATE users_profile
+            SET {', '.join(update_fields)}
+            WHERE user_id = ?
+        '''
+        
+        def write(conn):
+            conn.cursor().execute(query, update_values)
+        
+        run_write(self.db_path, write)
+        
+        # Cached copy holds parsed notification preferences, as get_profile returns them
+        changes = {field.split(' = ')[0]: value for field, value in zip(update_fields, update_values)}
+        if 'notification_preferences' in changes:
+            changes['notification_preferences'] = json.loads(changes['notification_preferences'])
+        update_row(self.db_path, 'users_profile', user_id, changes, self.PROFILE_COLUMN_AFFINITIES)
+        
+        # Retrieve and return updated profile (the request's cached copy, if any)
+        return self.get_profile(user_id)
     
     def delete_profile(self, user_id: int) -> bool:
         """
@@ -220,17 +230,13 @@ class ProfileService:
         Returns:
             True if profile was deleted, False if not found
         """
-        conn = self._get_connection()
-        cur = conn.cursor()
+        def write(conn):
+            return conn.cursor().execute('DELETE FROM users_profile WHERE user_id = ?', (user_id,)).rowcount
         
-        try:
-            cur.execute('DELETE FROM users_profile WHERE user_id = ?', (user_id,))
-            conn.commit()
-            
-            return cur.rowcount > 0
-            
-        finally:
-            conn.close()
+        deleted = run_write(self.db_path, write)
+        store_row(self.db_path, 'users_profile', user_id, None)
+        
+        return deleted > 0
     
     def profile_exists(self, user_id: int) -> bool:
         """
@@ -0,0 +1,254 @@
+"""
+Request_Scope - Per-request identity map and SQL statement counting
+Loan and profile rows are read through the current request's identity map, so
+each row is fetched at most once per request, and services keep the cached copy
+in step with their own writes. Outside a scope (scripts, tests, background
+threads) every read goes to the database as before
+"""
+
+import contextvars
+import copy
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+_current = contextvars.ContextVar('request_scope', default=None)
+
+_stats_lock = threading.Lock()
+_stats = {
+    'requests': 0,
+    'sql_statements': 0,
+    'max_sql_statements': 0,
+    'rows_loaded': 0,
+    'rows_reused': 0
+}
+_endpoint_stats: Dict[str, Dict[str, int]] = {}
+
+
+class RequestScope:
+    """
+    Rows read during one request, and the number of SQL statements it issued
+
+    Rows are keyed by (db_path, table, key). A row that does not exist is
+    remembered as None, so repeated misses are not re-queried either. Callers
+    always receive a copy; the cached row only changes through store/update.
+    """
+
+    def __init__(self, name: str = ''):
+        """
+        Initialize RequestScope
+
+        Args:
+            name: Label used for per-endpoint statistics (e.g. the Flask endpoint)
+        """
+        self.name = name
+        self.sql_statements = 0
+        self.rows_loaded = 0
+        self.rows_reused = 0
+        self._rows: Dict[Tuple[str, str, Any], Optional[Dict[str, Any]]] = {}
+
+    def load(self, db_path: str, table: str, key: Any,
+             loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Return the cached row, calling loader only the first time"""
+        identity = (db_path, table, key)
+        if identity in self._rows:
+            self.rows_reused += 1
+        else:
+            self._rows[identity] = loader()
+            self.rows_loaded += 1
+        return copy.deepcopy(self._rows[identity])
+
+    def store(self, db_path: str, table: str, key: Any, row: Optional[Dict[str, Any]]) -> None:
+        """Replace the cached row (None records that it does not exist)"""
+        self._rows[(db_path, table, key)] = copy.deepcopy(row)
+
+    def update(self, db_path: str, table: str, key: Any, changes: Dict[str, Any]) -> None:
+        """Apply column changes to the cached row, if it is cached"""
+        row = self._rows.get((db_path, table, key))
+        if row is not None:
+            row.update(copy.deepcopy(changes))
+
+    def forget(self, db_path: str, table: str, key: Any) -> None:
+        """Drop the cached row so the next read goes to the database"""
+        self._rows.pop((db_path, table, key), None)
+
+
+def begin_request(name: str = '') -> RequestScope:
+    """
+    Start a scope for the current request (or any unit of work)
+
+    Args:
+        name: Label used for per-endpoint statistics
+
+    Returns:
+        The new RequestScope
+    """
+    scope = RequestScope(name)
+    _current.set(scope)
+    return scope
+
+
+def end_request() -> Optional[RequestScope]:
+    """
+    Close the current scope and add its counts to the statistics
+
+    Returns:
+        The closed RequestScope, or None if no scope was open
+    """
+    scope = _current.get()
+    if scope is None:
+        return None
+    _current.set(None)
+
+    with _stats_lock:
+        _stats['requests'] += 1
+        _stats['sql_statements'] += scope.sql_statements
+        _stats['max_sql_statements'] = max(_stats['max_sql_statements'], scope.sql_statements)
+        _stats['rows_loaded'] += scope.rows_loaded
+        _stats['rows_reused'] += scope.rows_reused
+
+        endpoint = _endpoint_stats.setdefault(scope.name, {
+            'requests': 0, 'sql_statements': 0, 'max_sql_statements': 0
+        })
+        endpoint['requests'] += 1
+        endpoint['sql_statements'] += scope.sql_statements
+        endpoint['max_sql_statements'] = max(endpoint['max_sql_statements'], scope.sql_statements)
+    return scope
+
+
+def current_scope() -> Optional[RequestScope]:
+    """The scope open in this context, or None"""
+    return _current.get()
+
+
+def record_statement() -> None:
+    """Count one SQL statement against the current scope (called by pooled cursors)"""
+    scope = _current.get()
+    if scope is not None:
+        scope.sql_statements += 1
+
+
+def load_row(db_path: str, table: str, key: Any,
+             loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """
+    Read a row through the identity map
+
+    Args:
+        db_path: Database the row lives in
+        table: Table name
+        key: Primary key value
+        loader: Reads the row from the database (returns None if missing)
+
+    Returns:
+        The row dictionary, or None if it does not exist
+    """
+    scope = _current.get()
+    if scope is None:
+        return loader()
+    return scope.load(db_path, table, key, loader)
+
+
+def store_row(db_path: str, table: str, key: Any, row: Optional[Dict[str, Any]]) -> None:
+    """Record a row the caller has just written in full (no-op outside a scope)"""
+    scope = _current.get()
+    if scope is not None:
+        scope.store(db_path, table, key, row)
+
+
+def forget_row(db_path: str, table: str, key: Any) -> None:
+    """Drop a row from the identity map (no-op outside a scope)"""
+    scope = _current.get()
+    if scope is not None:
+        scope.forget(db_path, table, key)
+
+
+def update_row(db_path: str, table: str, key: Any, changes: Dict[str, Any],
+               affinities: Optional[Dict[str, str]] = None) -> None:
+    """
+    Apply an UPDATE's new values to the cached row
+
+    Values are converted the way SQLite stores them for the column's affinity
+    (e.g. an int written to a REAL column reads back as float). When a value
+    is not one of the simple cases, the row is dropped instead and re-read on
+    next use.
+
+    Args:
+        db_path: Database the row lives in
+        table: Table name
+        key: Primary key value
+        changes: Column values as bound to the UPDATE
+        affinities: Column affinity ('TEXT', 'INTEGER' or 'REAL'); columns not
+            listed are cached as given
+    """
+    scope = _current.get()
+    if scope is None:
+        return
+
+    affinities = affinities or {}
+    try:
+        stored = {
+            column: stored_value(value, affinities[column]) if column in affinities else value
+            for column, value in changes.items()
+        }
+    except TypeError:
+        scope.forget(db_path, table, key)
+        return
+    scope.update(db_path, table, key, stored)
+
+
+def stored_value(value: Any, affinity: str) -> Any:
+    """
+    Value as SQLite returns it from a column with the given affinity
+
+    Raises:
+        TypeError: If the conversion is not a simple, certain case
+    """
+    if value is None:
+        return None
+    if affinity == 'TEXT' and isinstance(value, str):
+        return value
+    if affinity in ('REAL', 'INTEGER') and isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            raise TypeError(f'Non-finite value {value!r}')
+        if affinity == 'REAL':
+            return float(value)
+        if isinstance(value, float):
+            return int(value) if value.is_integer() and abs(value) < 2 ** 63 else value
+        return int(value)
+    raise TypeError(f'Cannot predict how {value!r} is stored with {affinity} affinity')
+
+
+def get_request_stats() -> Dict[str, Any]:
+    """
+    Get per-request SQL statement statistics
+
+    Returns:
+        Dictionary with requests, sql_statements, max_sql_statements,
+        avg_sql_statements, rows_loaded, rows_reused and, per endpoint,
+        requests, avg_sql_statements and max_sql_statements
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+        endpoints = {name: dict(counts) for name, counts in _endpoint_stats.items()}
+
+    stats['avg_sql_statements'] = (
+        round(stats['sql_statements'] / stats['requests'], 2) if stats['requests'] else 0.0
+    )
+    stats['endpoints'] = {
+        name: {
+            'requests': counts['requests'],
+            'avg_sql_statements': round(counts['sql_statements'] / counts['requests'], 2),
+            'max_sql_statements': counts['max_sql_statements']
+        }
+        for name, counts in sorted(endpoints.items())
+    }
+    return stats
+
+
+def reset_request_stats() -> None:
+    """Reset all counters to zero"""
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+        _endpoint_stats.clear()
@@ -0,0 +1,199 @@
+"""
+Score_History - Write-behind persistence of financial health scores
+Scores are queued in memory and appended to score_history by one background
+thread in batched transactions, so scoring never waits on a disk commit
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from write_queue import run_write
+
+
+logger = logging.getLogger(__name__)
+
+# Rows written per transaction, and how long a partial batch may wait for more
+BATCH_SIZE = int(os.environ.get('SCORE_HISTORY_BATCH_SIZE', 500))
+FLUSH_INTERVAL_SECONDS = float(os.environ.get('SCORE_HISTORY_FLUSH_INTERVAL', 1.0))
+
+# Rows held in memory, and how long append() waits for room once that many are
+# queued; only rows still without room after the wait are dropped
+MAX_PENDING = int(os.environ.get('SCORE_HISTORY_MAX_PENDING', 10000))
+FULL_WAIT_SECONDS = float(os.environ.get('SCORE_HISTORY_FULL_WAIT', 2.0))
+
+SCORE_COLUMNS = (
+    'overall_score', 'savings_score', 'debt_score', 'expense_score', 'balance_score',
+    'life_stage_score', 'loan_diversity_score', 'payment_history_score', 'loan_maturity_score'
+)
+
+
+class ScoreHistoryWriter:
+    """
+    Thread-safe write-behind queue for score_history rows
+
+    append() only buffers the row. A daemon thread, started on first use,
+    drains the buffer once BATCH_SIZE rows are waiting or FLUSH_INTERVAL_SECONDS
+    have passed, and writes each database's rows with one executemany. When
+    MAX_PENDING rows are queued, append() asks for an immediate write and
+    waits up to FULL_WAIT_SECONDS for room before dropping the row. flush()
+    blocks until everything appended so far is committed, for readers that
+    need their own writes.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 max_pending: int = MAX_PENDING, full_wait: float = FULL_WAIT_SECONDS):
+        """
+        Initialize ScoreHistoryWriter
+
+        Args:
+            batch_size: Rows that trigger an immediate write
+            flush_interval: Seconds a partial batch waits before being written
+            max_pending: Buffered rows beyond which append() waits for room
+            full_wait: Seconds append() waits for room before dropping the row
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.full_wait = full_wait
+        self._pending: List[Tuple[str, Tuple]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_requested = False
+        self._stats = {'appended': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0, 'waits': 0}
+
+    def append(self, db_path: str, user_id: int, scores: Dict[str, Any], source: str = 'health',
+               calculated_at: Optional[str] = None) -> bool:
+        """
+        Queue a score for a user
+
+        Args:
+            db_path: Database the row belongs to
+            user_id: ID of the user
+            scores: Dictionary with overall_score and any of the factor scores
+                (missing factors are stored as NULL)
+            source: What produced the score ('health' or 'predict')
+            calculated_at: ISO 8601 timestamp (defaults to now, UTC)
+
+        Returns:
+            True if queued, False if dropped because the buffer stayed full
+            for full_wait seconds
+        """
+        row = (
+            user_id,
+            *(scores.get(column) for column in SCORE_COLUMNS),
+            source,
+            calculated_at or scores.get('calculated_at') or datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        )
+
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                # Backpressure: have the writer drain now and wait for it
+                self._ensure_thread()
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._stats['waits'] += 1
+                if not self._cond.wait_for(lambda: len(self._pending) < self.max_pending, self.full_wait):
+                    self._stats['dropped'] += 1
+                    logger.warning(
+                        f"Score history buffer still full ({self.max_pending}) after {self.full_wait}s; "
+                        f"dropped score for user {user_id}"
+                    )
+                    return False
+
+            self._pending.append((db_path, row))
+            self._stats['appended'] += 1
+            self._ensure_thread()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Write everything queued so far and wait for it to be committed
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the buffer was drained within the timeout
+        """
+        with self._cond:
+            target = self._stats['appended']
+            if self._done() >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._done() >= target, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the number of rows still waiting to be written"""
+        with self._cond:
+            return {**self._stats, 'pending': len(self._pending)}
+
+    def _done(self) -> int:
+        return self._stats['written'] + self._stats['failed']
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='score-history-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Background loop: collect a batch, then write it outside the lock"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                # Give a partial batch a chance to fill unless someone is waiting on it
+                if len(self._pending) < self.batch_size and not self._flush_requested:
+                    self._cond.wait_for(
+                        lambda: len(self._pending) >= self.batch_size or self._flush_requested,
+                        self.flush_interval
+                    )
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                # Wake appenders waiting for room in the buffer
+                self._cond.notify_all()
+
+            by_database = defaultdict(list)
+            for db_path, row in batch:
+                by_database[db_path].append(row)
+
+            for db_path, rows in by_database.items():
+                written = self._write(db_path, rows)
+                with self._cond:
+                    self._stats['written' if written else 'failed'] += len(rows)
+                    self._stats['batches'] += 1
+                    self._cond.notify_all()
+
+    def _write(self, db_path: str, rows: List[Tuple]) -> bool:
+        """Append rows to one database in a single transaction"""
+        # Never recreate a database file that has been removed (e.g. by tests)
+        if db_path != ':memory:' and not os.path.exists(db_path):
+            logger.warning(f"Score history database {db_path} no longer exists; discarded {len(rows)} rows")
+            return False
+
+        # The table and its source column come from the schema migrations
+        def write(conn):
+            conn.executemany(f'''
+                INSERT INTO score_history (user_id, {', '.join(SCORE_COLUMNS)}, source, calculated_at)
+                VALUES ({', '.join('?' * (len(SCORE_COLUMNS) + 3))})
+            ''', rows)
+
+        try:
+            run_write(db_path, write)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} score history rows to {db_path}: {str(e)}")
+            return False
+
+
+# Shared by every scorer in the process
+score_history_writer = ScoreHistoryWriter()
+
+# Commit whatever is still buffered on interpreter shutdown
+atexit.register(score_history_writer.flush)
@@ -0,0 +1,225 @@
+"""
+Structured_Logging - Queue-based JSON logging for the backend
+Log calls only enqueue the record; one listener thread formats it and writes it
+to the console and backend.log, flushing on an interval instead of per record.
+Per-request access records are sampled by level
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+# JSON lines by default; 'text' keeps the classic "time - name - level - message" format
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+
+# Seconds buffered log output may wait before it is flushed to the console and file
+LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 1.0))
+
+# Fraction of INFO-level access records kept (4xx/5xx access records are always kept)
+ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 1.0))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed with extra= and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'sampled'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, with extra= fields at top level"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of sampled records per level
+
+    Only records logged with extra={'sampled': True} (the access log) are
+    subject to sampling; levels without a rate are always kept.
+    """
+
+    def __init__(self, rates: Dict[int, float]):
+        """
+        Initialize SamplingFilter
+
+        Args:
+            rates: Fraction (0-1) of sampled records kept, by logging level
+        """
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'sampled', False):
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _BufferedEmitMixin:
+    """Write without flushing; the listener flushes on its interval"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BufferedStreamHandler(_BufferedEmitMixin, logging.StreamHandler):
+    """StreamHandler that does not flush after every record"""
+
+
+class BufferedFileHandler(_BufferedEmitMixin, logging.FileHandler):
+    """FileHandler that does not flush after every record"""
+
+
+class BufferedStdoutHandler(BufferedStreamHandler):
+    """
+    BufferedStreamHandler writing to whatever sys.stdout is when a record is written
+
+    The stream is looked up per record rather than captured when logging is
+    configured, so a replaced stdout (a test runner's capture, a redirect)
+    never leaves the listener writing to a closed file.
+    """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that drains the queue in batches and flushes on an interval
+
+    Instead of blocking on the queue (which wakes the thread, and hands the GIL
+    back and forth, for every single record), the listener sleeps for
+    flush_interval, then writes everything queued meanwhile and flushes once.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, flush_interval: float = LOG_FLUSH_INTERVAL):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block: bool):
+        while True:
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+            try:
+                return self.queue.get_nowait()
+            except queue.Empty:
+                if not block:
+                    raise
+            # Queue drained: flush what was written and wait for the next batch
+            self.flush()
+            time.sleep(self.flush_interval)
+
+    def flush(self) -> None:
+        """Flush every handler now"""
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # Stream already closed (interpreter shutdown)
+                pass
+        self._last_flush = time.monotonic()
+
+    def stop(self) -> None:
+        """Write everything still queued, flush and stop the listener thread"""
+        if self._thread is not None:
+            super().stop()
+        self.flush()
+
+
+_listener: Optional[FlushingQueueListener] = None
+
+
+def configure_logging(log_path: str = 'backend.log', level: int = logging.DEBUG, fmt: str = LOG_FORMAT,
+                      flush_interval: float = LOG_FLUSH_INTERVAL,
+                      access_sample_rate: float = ACCESS_LOG_SAMPLE_RATE) -> FlushingQueueListener:
+    """
+    Route all logging through a queue to a background listener
+
+    Replaces the root logger's handlers with a single QueueHandler. Calling
+    it again stops the previous listener first.
+
+    Args:
+        log_path: File the listener appends to (None for console only)
+        level: Root logger level
+        fmt: 'json' or 'text'
+        flush_interval: Seconds between flushes of the console and file
+        access_sample_rate: Fraction of INFO-level access records kept
+
+    Returns:
+        The running listener
+    """
+    global _listener
+    shutdown_logging()
+
+    formatter = JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [BufferedStdoutHandler()]
+    if log_path:
+        handlers.append(BufferedFileHandler(log_path, mode='a'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter({logging.INFO: access_sample_rate}))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = FlushingQueueListener(log_queue, *handlers, flush_interval=flush_interval)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Stop the listener, writing and flushing everything still queued"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+        _listener = None
+
+
+def _restart_listener_in_child() -> None:
+    """Threads do not survive fork(); give a forked worker its own listener thread"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.start()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
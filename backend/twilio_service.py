@@ -5,7 +5,6 @@ Handles sending and verifying OTP codes via SMS, Email, or WhatsApp
 
 import os
 from dotenv import load_dotenv
-from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 
 # Load environment variables
@@ -20,6 +19,8 @@ class TwilioVerifyService:
         
         # Initialize Twilio client
         if self.account_sid and self.auth_token:
+            # twilio.rest pulls in requests/urllib3; only import it when it is used
+            from twilio.rest import Client
             self.client = Client(self.account_sid, self.auth_token)
         else:
             self.client = None
@@ -0,0 +1,181 @@
+"""
+Unit tests for the amortization engine
+Tests vectorized schedule building, due date clamping, the per-loan schedule
+cache and the schedule/projection endpoints
+"""
+
+import pytest
+import json
+import os
+import sys
+from datetime import date
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amortization_engine import (
+    ScheduleCache, build_schedule, build_schedules, due_dates, parse_start_date,
+    project_schedules
+)
+from loan_history_service import LoanHistoryService
+from db_utils import init_loan_tables
+from connection_pool import close_thread_connections
+
+
+LOAN = {
+    'loan_id': 'loan-1',
+    'loan_amount': 100000.0,
+    'interest_rate': 10.0,
+    'loan_tenure': 24,
+    'loan_start_date': '2024-01-15'
+}
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+
+def test_schedule_matches_emi_formula():
+    """Test EMI, principal repayment and final balance of a standard loan"""
+    schedule = build_schedule(LOAN)
+
+    assert len(schedule) == 24
+    assert schedule.monthly_emi == pytest.approx(4614.49, abs=0.01)
+    assert schedule.interest[0] == pytest.approx(100000 * 0.10 / 12)
+    assert schedule.principal.sum() == pytest.approx(100000.0)
+    assert schedule.balance[-1] == 0.0
+    assert np.all(np.diff(schedule.balance) < 0)
+
+
+def test_zero_rate_loan_repays_evenly():
+    """Test that an interest-free loan splits principal evenly"""
+    schedule = build_schedule({**LOAN, 'interest_rate': 0, 'loan_amount': 1200, 'loan_tenure': 12})
+
+    assert schedule.monthly_emi == pytest.approx(100.0)
+    assert schedule.total_interest == 0.0
+    assert schedule.balance.tolist() == pytest.approx([1100 - 100 * i for i in range(12)])
+
+
+def test_due_dates_clamp_to_month_end():
+    """Test that a 31st start falls on the last day of shorter months"""
+    start = parse_start_date('2024-01-31T00:00:00Z')
+    dates = due_dates(start, np.arange(1, 5))
+
+    assert [str(d) for d in dates] == ['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']
+    assert build_schedule({**LOAN, 'loan_start_date': '2024-01-31'}).due_date(30) == date(2026, 6, 30)
+
+
+def test_batch_matches_single_builds():
+    """Test that one batch over mixed tenures equals building each loan alone"""
+    loans = [
+        LOAN,
+        {**LOAN, 'loan_amount': 5000000, 'interest_rate': 8.5, 'loan_tenure': 240},
+        {**LOAN, 'interest_rate': 0, 'loan_tenure': 6}
+    ]
+
+    for batched, loan in zip(build_schedules(loans), loans):
+        single = build_schedule(loan)
+        assert len(batched) == len(single)
+        assert np.allclose(batched.balance, single.balance)
+        assert np.array_equal(batched.due_dates, single.due_dates)
+
+
+def test_cache_reuses_and_rebuilds_on_signature_change():
+    """Test cache hits, and that edited loan terms are never served stale"""
+    cache = ScheduleCache(max_size=2)
+
+    first = cache.get_schedule(LOAN)
+    assert cache.get_schedule(LOAN) is first
+    assert cache.get_schedule({**LOAN, 'loan_tenure': 36}) is not first
+
+    cache.get_schedules([{**LOAN, 'loan_id': 'loan-2'}, {**LOAN, 'loan_id': 'loan-3'}])
+    assert cache.stats() == {'hits': 1, 'misses': 4, 'size': 2, 'max_size': 2}
+
+
+def test_projection_sums_loans_per_month():
+    """Test that the projection adds EMIs and balances month by month"""
+    schedules = build_schedules([LOAN, {**LOAN, 'loan_id': 'loan-2', 'loan_start_date': '2024-03-01'}])
+    projection = project_schedules(schedules, date(2024, 1, 20), months=4)
+
+    assert projection['months'] == ['2024-01', '2024-02', '2024-03', '2024-04']
+    emi = schedules[0].monthly_emi
+    assert projection['payment'] == pytest.approx([emi, emi, 2 * emi, 2 * emi], abs=0.01)
+    assert projection['outstanding_balance'][0] == pytest.approx(schedules[0].balance[0] + 100000, abs=0.01)
+
+
+@pytest.fixture
+def service(tmp_path):
+    """LoanHistoryService on a fresh database"""
+    db_path = str(tmp_path / 'amortization.db')
+    init_loan_tables(db_path)
+    yield LoanHistoryService(db_path)
+    close_thread_connections()
+
+
+def test_update_loan_invalidates_cached_schedule(service):
+    """Test that updateLoan drops the cached schedule so classification follows new terms"""
+    loan = service.createLoan(1, LOAN_DATA)
+    before = service.getAmortizationSchedule(loan['loan_id'])
+
+    service.updateLoan(loan['loan_id'], 1, {'loan_start_date': '2024-03-15', 'loan_maturity_date': '2026-03-15'})
+    payment = service.recordPayment(loan['loan_id'], {'payment_date': '2024-03-01', 'payment_amount': 4614.49})
+    after = service.getAmortizationSchedule(loan['loan_id'])
+
+    assert before['next_due_date'] == '2024-01-15'
+    assert payment['payment_status'] == 'on-time'
+    assert after['payments_made'] == 1
+    assert after['next_due_date'] == '2024-04-15'
+
+
+@pytest.fixture
+def client(service):
+    """Test client whose loan service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['loan_service'] = service
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_schedule_endpoint(client, service):
+    """Test GET /api/loans/<loan_id>/schedule and its ownership check"""
+    mine = service.createLoan(1, LOAN_DATA)
+    other = service.createLoan(2, LOAN_DATA)
+
+    response = client.get(f"/api/loans/{mine['loan_id']}/schedule")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['monthly_emi'] == pytest.approx(4614.49)
+    assert len(data['schedule']) == 24
+    assert data['schedule'][-1]['balance'] == 0.0
+    assert client.get(f"/api/loans/{other['loan_id']}/schedule").status_code == 403
+    assert client.get('/api/loans/missing/schedule').status_code == 404
+
+
+def test_projection_endpoint(client, service):
+    """Test GET /api/loans/user/<user_id>/projection"""
+    service.createLoan(1, {**LOAN_DATA, 'loan_start_date': '2100-01-15', 'loan_maturity_date': '2102-01-15'})
+
+    response = client.get('/api/loans/user/1/projection?months=12')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['loan_count'] == 1
+    assert len(data['months']) == 12
+    assert data['outstanding_balance'] == [100000.0] * 12
+    assert client.get('/api/loans/user/1/projection?months=0').status_code == 400
+    assert client.get('/api/loans/user/2/projection').status_code == 403
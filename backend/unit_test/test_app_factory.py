@@ -0,0 +1,140 @@
+"""
+Unit tests for the app factory and lazy startup
+Tests that importing app.py has no side effects, the schema-version marker,
+per-app services, lazy and preloaded model loading, and fork safety of the
+connection pool
+"""
+
+import pytest
+import multiprocessing
+import sqlite3
+import subprocess
+import threading
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'data')
+
+from connection_pool import close_thread_connections, get_connection, get_pool_stats
+from migrations import SCHEMA_VERSION
+from model_registry import ModelRegistry
+
+
+def test_import_does_no_startup_work(tmp_path):
+    """Test that importing app configures no logging, builds no app or services and prints nothing"""
+    script = (
+        "import logging, sys, app; "
+        "print(hasattr(app, 'app'), app._schema_checked, logging.getLogger().handlers, 'twilio.rest' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), capture_output=True, text=True,
+                            timeout=120, env={**os.environ, 'PYTHONPATH': BACKEND_DIR, 'TWILIO_ACCOUNT_SID': ''})
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False False [] False'
+    assert not (tmp_path / 'backend.log').exists()
+
+
+def test_registry_loads_once_across_threads():
+    """Test that concurrent first uses trigger a single load"""
+    loads = []
+    registry = ModelRegistry(DATA_DIR, on_load=loads.append)
+    assert not registry.loaded and registry.stats()['load_ms'] is None
+
+    barrier = threading.Barrier(8)
+    names = []
+
+    def worker():
+        barrier.wait()
+        names.append(registry.feature_names)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [registry]
+    assert len(names) == 8 and all(n == names[0] for n in names)
+    assert registry.stats()['loaded'] and registry.stats()['load_ms'] is not None
+
+
+def test_registry_scores_like_the_model():
+    """Test that predict and predict_one agree"""
+    registry = ModelRegistry(DATA_DIR)
+    row = [75000.0, 38000.0, 15000.0, 9000.0, 32.0, 1.0, 500000.0, 9.5]
+
+    assert registry.predict([row])[0] == pytest.approx(registry.predict_one(row))
+
+
+def test_init_db_runs_once_per_schema_version(tmp_path, monkeypatch):
+    """Test that init_db stamps user_version and skips the DDL afterwards"""
+    import app as app_module
+    db_path = str(tmp_path / 'fresh.db')
+    monkeypatch.setattr(app_module, 'DB_PATH', db_path)
+
+    app_module.init_db()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    conn.execute('DROP TABLE loan_metrics')
+    conn.commit()
+
+    app_module.init_db()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert 'users' in tables and 'loan_metrics' not in tables
+
+
+def test_create_app_applies_config_and_preloads(monkeypatch):
+    """Test create_app config overrides, the schema check and model preloading"""
+    import app as app_module
+    calls = []
+    monkeypatch.setattr(app_module, 'ensure_schema', lambda: calls.append('schema'))
+    monkeypatch.setattr(ModelRegistry, 'preload_for_fork', lambda registry: calls.append('preload'))
+
+    first = app_module.create_app({'PREDICT_BATCH_CHUNK_SIZE': 7}, preload_model=False)
+    assert first.config['PREDICT_BATCH_CHUNK_SIZE'] == 7
+    assert calls == ['schema']
+
+    second = app_module.create_app(preload_model=True)
+    assert calls == ['schema', 'schema', 'preload']
+    assert second.config['PREDICT_BATCH_CHUNK_SIZE'] != 7
+
+
+def test_each_app_has_its_own_services():
+    """Test that the module-level service proxies resolve to the current app's services"""
+    import app as app_module
+    first, second = app_module.create_app(), app_module.create_app()
+
+    assert first.extensions['smartfin']['loan_service'] is not second.extensions['smartfin']['loan_service']
+    for flask_app in (first, second):
+        with flask_app.app_context():
+            assert app_module.loan_service._get_current_object() is flask_app.extensions['smartfin']['loan_service']
+            assert app_module.model_registry._get_current_object() is flask_app.extensions['smartfin']['model_registry']
+
+
+def _child_connection_is_fresh(db_path, results):
+    inherited = get_pool_stats()['open_connections']
+    conn = get_connection(db_path)
+    results.put((inherited, conn.execute('SELECT 1').fetchone()[0]))
+    conn.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork()')
+def test_forked_worker_opens_its_own_connection(tmp_path):
+    """Test that a forked child does not reuse the parent's pooled connection"""
+    db_path = str(tmp_path / 'fork.db')
+    conn = get_connection(db_path)
+    conn.close()
+
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    child = ctx.Process(target=_child_connection_is_fresh, args=(db_path, results))
+    child.start()
+    child.join(timeout=30)
+
+    assert child.exitcode == 0 and results.get(timeout=5) == (0, 1)
+    close_thread_connections()
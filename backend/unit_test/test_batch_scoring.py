@@ -0,0 +1,138 @@
+"""
+Unit tests for batch financial health scoring
+Tests that FinancialHealthScorer.calculateFinancialHealthScoresBatch and
+LoanMetricsEngine.computeScoresBatch agree with the per-user scorers
+"""
+
+import pytest
+import random
+import sqlite3
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amortization_engine import build_schedule
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from financial_health_scorer import FinancialHealthScorer
+from loan_history_service import LoanHistoryService
+from loan_metrics_engine import LoanMetricsEngine
+
+
+LOAN_TYPES = ['personal', 'home', 'auto', 'education']
+FACTORS = ['overall_score', 'savings_score', 'debt_score', 'expense_score', 'balance_score',
+           'life_stage_score', 'loan_diversity_score', 'payment_history_score', 'loan_maturity_score']
+
+
+@pytest.fixture
+def population(tmp_path):
+    """Database with 40 users holding 0-6 loans each, some paid, some deleted"""
+    db_path = str(tmp_path / 'population.db')
+    init_loan_tables(db_path)
+    service = LoanHistoryService(db_path)
+    rng = random.Random(7)
+
+    for user_id in range(1, 41):
+        for _ in range(rng.randint(0, 6)):
+            start_year, start_month = rng.randint(2012, 2026), rng.randint(1, 12)
+            tenure = rng.choice([6, 12, 24, 60, 120, 240])
+            end_year, end_month = divmod(start_year * 12 + start_month - 1 + tenure, 12)
+            loan_data = {
+                'loan_type': rng.choice(LOAN_TYPES),
+                'loan_amount': rng.randint(1, 200) * 1000.0,
+                'loan_tenure': tenure,
+                'interest_rate': rng.choice([0, 7.5, 11]),
+                'loan_start_date': f'{start_year}-{start_month:02d}-10',
+                'loan_maturity_date': f'{end_year}-{end_month + 1:02d}-10'
+            }
+            loan_data['monthly_emi'] = round(build_schedule({**loan_data, 'loan_id': ''}).monthly_emi, 2)
+            loan = service.createLoan(user_id, loan_data)
+
+            for _ in range(rng.randint(0, 6)):
+                service.recordPayment(loan['loan_id'], {
+                    'payment_date': f'{start_year}-{rng.randint(1, 12):02d}-20',
+                    'payment_amount': 10.0
+                })
+            if rng.random() < 0.15:
+                service.deleteLoan(loan['loan_id'], user_id)
+
+    yield db_path
+    close_thread_connections()
+
+
+def financial_columns(size, seed=0):
+    """Random financial data columns, including zero-income and zero-EMI users"""
+    rng = np.random.default_rng(seed)
+    columns = {
+        field: rng.integers(0, 60000, size).astype(float)
+        for field in ['savings', 'rent', 'food', 'travel', 'shopping', 'emi']
+    }
+    columns['income'] = rng.integers(0, 150000, size).astype(float)
+    columns['income'][:2] = 0
+    columns['emi'][2:5] = 0
+    columns['age'] = rng.integers(18, 80, size).astype(float)
+    return columns
+
+
+def assert_matches_scalar(scorer, user_ids, columns, result):
+    for i, user_id in enumerate(user_ids):
+        expected = scorer.calculateFinancialHealthScore(
+            user_id, {field: float(values[i]) for field, values in columns.items()}
+        )
+        assert {factor: result[factor][i] for factor in FACTORS} == \
+            {factor: expected[factor] for factor in FACTORS}, f'user {user_id}'
+
+
+def test_batch_matches_per_user_scores(population):
+    """Test that every factor matches calculateFinancialHealthScore, user for user"""
+    scorer = FinancialHealthScorer(population)
+    user_ids = list(range(0, 42))
+    columns = financial_columns(len(user_ids))
+
+    result = scorer.calculateFinancialHealthScoresBatch(user_ids, columns, persist=False)
+
+    assert_matches_scalar(scorer, user_ids, columns, result)
+
+
+def test_ladder_boundaries_match_scalar(tmp_path):
+    """Test threshold values land in the same band as the scalar if/elif ladders"""
+    db_path = str(tmp_path / 'empty.db')
+    init_loan_tables(db_path)
+    scorer = FinancialHealthScorer(db_path)
+
+    income = 100000.0
+    ratios = [0.0, 0.05, 0.10, 0.15, 0.20, 0.30, 0.40, 0.50, 0.60, 0.70, 0.80, 0.90, 1.2]
+    columns = {
+        'income': np.full(len(ratios), income),
+        'savings': np.array(ratios) * income,
+        'emi': np.array(ratios) * income,
+        'rent': np.zeros(len(ratios)),
+        'age': np.array([24, 25, 34, 35, 49, 50, 59, 60, 18, 30, 45, 70, 90], dtype=float)
+    }
+    user_ids = list(range(1000, 1000 + len(ratios)))
+
+    result = scorer.calculateFinancialHealthScoresBatch(user_ids, columns, persist=False)
+
+    assert_matches_scalar(scorer, user_ids, columns, result)
+    close_thread_connections()
+
+
+def test_batch_results_are_written_in_bulk(population):
+    """Test that persisted results land in score_history for every user"""
+    scorer = FinancialHealthScorer(population)
+    user_ids = list(range(1, 41))
+
+    result = scorer.calculateFinancialHealthScoresBatch(user_ids, financial_columns(len(user_ids)))
+
+    conn = sqlite3.connect(population)
+    rows = conn.execute('SELECT COUNT(*), COUNT(DISTINCT user_id), MIN(calculated_at) FROM score_history').fetchone()
+    conn.close()
+    assert rows == (40, 40, result['calculated_at'])
+
+    history = scorer.getScoreHistory(7)
+    assert history[0]['score'] == result['overall_score'][6]
+    assert [f['score'] for f in history[0]['factors']] == [result[factor][6] for factor in FACTORS[1:]]
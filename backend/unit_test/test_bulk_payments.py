@@ -0,0 +1,170 @@
+"""
+Unit tests for bulk payment import
+Tests recordPaymentsBulk parity with recordPayment, per-row errors and the
+/api/loans/payments/bulk endpoint (JSON array and NDJSON bodies)
+"""
+
+import pytest
+import sqlite3
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loan_history_service import LoanHistoryService
+from db_utils import init_loan_tables
+from connection_pool import close_thread_connections
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+# On time, on time, 10 days late, 45 days late
+PAYMENT_DATES = ['2024-01-10', '2024-02-15', '2024-03-25', '2024-05-30']
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Create a test database with loan tables"""
+    db_path = str(tmp_path / 'bulk.db')
+    init_loan_tables(db_path)
+    yield db_path
+    close_thread_connections()
+
+
+@pytest.fixture
+def service(test_db):
+    """Create LoanHistoryService instance"""
+    return LoanHistoryService(test_db)
+
+
+def payment_rows(loan_id):
+    """Bulk rows for PAYMENT_DATES on one loan"""
+    return [
+        {'loan_id': loan_id, 'payment_date': date, 'payment_amount': 4614.49}
+        for date in PAYMENT_DATES
+    ]
+
+
+def test_bulk_matches_sequential_classification(service):
+    """Test that bulk import classifies exactly like one-at-a-time recording"""
+    sequential = service.createLoan(1, LOAN_DATA)
+    bulk = service.createLoan(1, LOAN_DATA)
+
+    expected = [
+        service.recordPayment(sequential['loan_id'], row)['payment_status']
+        for row in payment_rows(sequential['loan_id'])
+    ]
+    result = service.recordPaymentsBulk(1, payment_rows(bulk['loan_id']))
+
+    assert expected == ['on-time', 'on-time', 'late', 'missed']
+    assert result['inserted'] == 4 and result['failed'] == 0
+    assert [p['payment_status'] for p in service.getPaymentHistory(bulk['loan_id'])] == expected
+
+
+def test_bulk_continues_existing_schedule(service, test_db):
+    """Test that bulk rows follow payments already stored for the loan"""
+    loan = service.createLoan(1, LOAN_DATA)
+    rows = payment_rows(loan['loan_id'])
+    service.recordPayment(loan['loan_id'], rows[0])
+
+    result = service.recordPaymentsBulk(1, rows[1:])
+
+    conn = sqlite3.connect(test_db)
+    totals = conn.execute('SELECT total_paid, payments_count FROM loans WHERE loan_id = ?',
+                          (loan['loan_id'],)).fetchone()
+    conn.close()
+    assert result['inserted'] == 3
+    assert [p['payment_status'] for p in service.getPaymentHistory(loan['loan_id'])] == \
+        ['on-time', 'on-time', 'late', 'missed']
+    assert totals == (pytest.approx(4 * 4614.49), 4)
+
+
+def test_bulk_reports_row_errors_without_aborting(service):
+    """Test that invalid rows are reported by index and valid rows still insert"""
+    mine = service.createLoan(1, LOAN_DATA)
+    other = service.createLoan(2, LOAN_DATA)
+
+    result = service.recordPaymentsBulk(1, [
+        {'loan_id': mine['loan_id'], 'payment_date': '2024-01-10', 'payment_amount': 4614.49},
+        {'loan_id': mine['loan_id'], 'payment_date': 'not-a-date', 'payment_amount': 10},
+        {'loan_id': 'missing', 'payment_date': '2024-01-10', 'payment_amount': 10},
+        {'loan_id': other['loan_id'], 'payment_date': '2024-01-10', 'payment_amount': 10},
+        {'loan_id': mine['loan_id'], 'payment_date': '2024-02-10', 'payment_amount': 99000},
+        {'payment_date': '2024-02-10', 'payment_amount': 10},
+        'not an object',
+        {'loan_id': mine['loan_id'], 'payment_date': '2024-02-10', 'payment_amount': 4614.49}
+    ])
+
+    assert result['inserted'] == 2
+    assert [(e['index'], e['code']) for e in result['errors']] == [
+        (1, 'INVALID_DATE_FORMAT'),
+        (2, 'LOAN_NOT_FOUND'),
+        (3, 'FORBIDDEN'),
+        (4, 'EXCEEDS_BALANCE'),
+        (5, 'REQUIRED_FIELD'),
+        (6, 'INVALID_ROW')
+    ]
+    assert service.getPaymentHistory(other['loan_id']) == []
+
+
+@pytest.fixture
+def client(test_db):
+    """Test client whose loan service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['loan_service'] = LoanHistoryService(test_db)
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_bulk_endpoint_json_array(client, service):
+    """Test POST /api/loans/payments/bulk with a JSON array"""
+    loan = service.createLoan(1, LOAN_DATA)
+
+    response = client.post('/api/loans/payments/bulk', json=payment_rows(loan['loan_id']))
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['inserted'] == 4 and data['failed'] == 0
+    assert len(data['payment_ids']) == 4
+
+
+def test_bulk_endpoint_ndjson_with_bad_line(client, service):
+    """Test NDJSON import where one line is not valid JSON"""
+    loan = service.createLoan(1, LOAN_DATA)
+    lines = [json.dumps(row) for row in payment_rows(loan['loan_id'])[:2]]
+    body = '\n'.join([lines[0], '{broken', lines[1]]) + '\n'
+
+    response = client.post('/api/loans/payments/bulk', data=body,
+                           content_type='application/x-ndjson')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['inserted'] == 2
+    assert [(e['index'], e['code']) for e in data['errors']] == [(1, 'INVALID_JSON')]
+
+
+def test_bulk_endpoint_rejects_oversized_batch(client, service, monkeypatch):
+    """Test that imports above BULK_PAYMENT_MAX_ROWS are refused"""
+    monkeypatch.setitem(client.application.config, 'BULK_PAYMENT_MAX_ROWS', 2)
+    loan = service.createLoan(1, LOAN_DATA)
+
+    response = client.post('/api/loans/payments/bulk', json=payment_rows(loan['loan_id']))
+
+    assert response.status_code == 400
+    assert service.getPaymentHistory(loan['loan_id']) == []
@@ -0,0 +1,173 @@
+"""
+Unit tests for Compiled_Model flat-array tree evaluator
+Tests parity with sklearn, artifact round-trips and layout validation
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compiled_model
+from compiled_model import CompiledTreeEnsemble, compile_gradient_boosting, export_compiled_model, EVAL_CHUNK_ROWS
+from model_inference import ModelInference
+
+
+FEATURE_NAMES = [
+    'income', 'expenses', 'savings', 'emi', 'age',
+    'has_loan_numeric', 'loan_amount_filled', 'interest_rate_filled'
+]
+
+METADATA = {
+    'metrics': {'r2_test': 0.91},
+    'feature_cols': FEATURE_NAMES,
+    'model_type': '8-factor enhanced'
+}
+
+
+@pytest.fixture(scope='module')
+def fitted_model():
+    """Fit a small GradientBoostingRegressor with uneven tree shapes"""
+    rng = np.random.default_rng(3)
+    n = 500
+    income = rng.uniform(10000, 200000, n)
+    X = pd.DataFrame({
+        'income': income,
+        'expenses': income * rng.uniform(0.2, 1.1, n),
+        'savings': income * rng.uniform(0.0, 0.4, n),
+        'emi': income * rng.uniform(0.0, 0.5, n),
+        'age': rng.integers(18, 70, n),
+        'has_loan_numeric': rng.integers(0, 2, n),
+        'loan_amount_filled': rng.uniform(0, 1e6, n),
+        'interest_rate_filled': rng.uniform(0, 20, n)
+    }, columns=FEATURE_NAMES)
+    y = 100 * X['savings'] / X['income'] - 50 * X['emi'] / X['income'] + 40
+    model = GradientBoostingRegressor(n_estimators=40, max_depth=5, min_samples_leaf=15,
+                                      learning_rate=0.2, random_state=0)
+    model.fit(X, y)
+    return model, X.to_numpy(dtype=np.float64)
+
+
+def test_compiled_predictions_match_sklearn(fitted_model):
+    """Test that compiled predictions equal sklearn predictions across chunk boundaries"""
+    model, X = fitted_model
+    compiled = compile_gradient_boosting(model, METADATA)
+    rows = np.vstack([X, X[:EVAL_CHUNK_ROWS // 2]])  # not a multiple of the chunk size
+
+    expected = model.predict(pd.DataFrame(rows, columns=FEATURE_NAMES))
+
+    np.testing.assert_allclose(compiled.predict(rows), expected, rtol=0, atol=1e-9)
+
+
+def test_compiled_layout(fitted_model):
+    """Test node counts and the adjacent-sibling layout"""
+    model, _ = fitted_model
+    compiled = compile_gradient_boosting(model, METADATA)
+
+    assert compiled.n_trees == 40
+    assert compiled.n_nodes == sum(e.tree_.node_count for e in model.estimators_[:, 0])
+    internal = compiled.left != np.arange(compiled.n_nodes)
+    np.testing.assert_array_equal(compiled.right[internal], compiled.left[internal] + 1)
+    assert np.all(np.isinf(compiled.threshold[~internal]))
+    assert compiled.metadata['learning_rate'] == 0.2
+
+
+def test_save_load_roundtrip(fitted_model, tmp_path):
+    """Test that a saved artifact reloads with identical predictions and metadata"""
+    model, X = fitted_model
+    compiled = compile_gradient_boosting(model, {**METADATA, 'model': model})
+    path = str(tmp_path / 'compiled.npz')
+
+    compiled.save(path)
+    loaded = CompiledTreeEnsemble.load(path)
+
+    np.testing.assert_array_equal(loaded.predict(X), compiled.predict(X))
+    assert loaded.metadata['model_type'] == '8-factor enhanced'
+    assert 'model' not in loaded.metadata
+
+
+@pytest.mark.parametrize('raw_predict_allowed', [True, False])
+def test_export_verifies_through_guarded_raw_predict(fitted_model, tmp_path, monkeypatch, raw_predict_allowed):
+    """Test that export verification uses checked_raw_predict and falls back to predict()"""
+    import joblib
+
+    model, X = fitted_model
+    model_path = str(tmp_path / 'enhanced_model.pkl')
+    joblib.dump({**METADATA, 'model': model}, model_path)
+    if not raw_predict_allowed:
+        monkeypatch.setattr(compiled_model, 'checked_raw_predict', lambda model, n_features: None)
+
+    output_path = export_compiled_model(model_path, verify_rows=X[:50])
+
+    assert output_path == str(tmp_path / 'enhanced_model_compiled.npz')
+    np.testing.assert_array_equal(CompiledTreeEnsemble.load(output_path).predict(X),
+                                  compile_gradient_boosting(model, METADATA).predict(X))
+
+
+def test_works_behind_model_inference(fitted_model):
+    """Test that ModelInference accepts the compiled ensemble in place of sklearn"""
+    model, X = fitted_model
+    inference = ModelInference(compile_gradient_boosting(model, METADATA), FEATURE_NAMES)
+
+    score = inference.predict_one(X[11].tolist())
+
+    assert score == pytest.approx(float(model.predict(pd.DataFrame(X[[11]], columns=FEATURE_NAMES))[0]),
+                                  abs=1e-9)
+    with pytest.raises(ValueError, match='does not match'):
+        ModelInference(compile_gradient_boosting(model, METADATA), list(reversed(FEATURE_NAMES)))
+
+
+def test_empty_and_single_leaf_trees():
+    """Test empty input and a constant target whose trees are a single leaf"""
+    X = np.random.default_rng(0).uniform(0, 10, (20, len(FEATURE_NAMES)))
+    model = GradientBoostingRegressor(n_estimators=3, random_state=0).fit(X, np.full(20, 55.0))
+    compiled = compile_gradient_boosting(model, METADATA)
+
+    assert compiled.predict(np.empty((0, len(FEATURE_NAMES)))).shape == (0,)
+    np.testing.assert_allclose(compiled.predict(X[:4]), np.full(4, 55.0))
+
+
+def test_rejects_wrong_width_and_unfitted(fitted_model):
+    """Test input width validation and refusal to compile an unfitted model"""
+    model, _ = fitted_model
+    compiled = compile_gradient_boosting(model, METADATA)
+
+    with pytest.raises(ValueError, match='8 columns'):
+        compiled.predict(np.zeros((2, 3)))
+    with pytest.raises(ValueError, match='Only fitted'):
+        compile_gradient_boosting(GradientBoostingRegressor(), METADATA)
+
+
+@pytest.mark.parametrize('init', ['zero', 'quantile'])
+def test_init_estimator_variants(fitted_model, init):
+    """Test that the starting prediction comes from the public init_ estimator"""
+    _, X = fitted_model
+    y = X[:, 2] / X[:, 0] * 100
+    if init == 'zero':
+        model = GradientBoostingRegressor(n_estimators=10, init='zero', random_state=0)
+    else:
+        model = GradientBoostingRegressor(n_estimators=10, loss='quantile', alpha=0.7, random_state=0)
+    model.fit(X, y)
+
+    compiled = compile_gradient_boosting(model, METADATA)
+
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-9)
+    assert (compiled.init_value == 0.0) == (init == 'zero')
+
+
+def test_rejects_non_constant_init(fitted_model):
+    """Test that a model started from a non-constant estimator is not compiled"""
+    from sklearn.linear_model import LinearRegression
+
+    _, X = fitted_model
+    model = GradientBoostingRegressor(n_estimators=5, init=LinearRegression(), random_state=0)
+    model.fit(X, X[:, 2] / X[:, 0])
+
+    with pytest.raises(ValueError, match='constant init'):
+        compile_gradient_boosting(model, METADATA)
@@ -0,0 +1,211 @@
+"""
+Unit tests for Connection_Pool
+Tests reuse within and across threads, pragmas, nested checkouts, the idle
+pool bound, leaked transactions and stats
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import connection_pool
+from connection_pool import get_connection, get_pool_stats, reset_pool_stats, close_thread_connections
+from loan_history_service import LoanHistoryService
+from db_utils import init_loan_tables
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Create a database file and close pooled connections afterwards"""
+    path = str(tmp_path / 'pool.db')
+    reset_pool_stats()
+    yield path
+    close_thread_connections()
+
+
+def test_connection_reused_within_thread(db_path):
+    """Test that repeated checkouts on one thread share a single connection"""
+    first = get_connection(db_path)
+    first.close()
+    second = get_connection(db_path)
+    second.close()
+
+    assert first is second
+    stats = get_pool_stats()
+    assert stats['connections_opened'] == 1
+    assert stats['checkouts'] == 2
+    assert stats['reuses'] == 1
+
+
+def test_pragmas_applied(db_path):
+    """Test that pooled connections are opened with WAL and tuned pragmas"""
+    conn = get_connection(db_path)
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == -connection_pool.CACHE_SIZE_KIB
+        assert conn.execute('PRAGMA foreign_keys').fetchone()[0] == int(connection_pool.FOREIGN_KEYS)
+    finally:
+        conn.close()
+
+
+def test_concurrent_checkouts_get_separate_connections(db_path):
+    """Test that a connection checked out on one thread is not handed to another"""
+    main_conn = get_connection(db_path)
+    seen = []
+
+    def worker():
+        conn = get_connection(db_path)
+        seen.append(conn)
+        conn.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    main_conn.close()
+
+    assert seen[0] is not main_conn
+
+
+def test_released_connection_reused_by_next_thread(db_path):
+    """Test that short-lived threads (one per request) share pooled connections"""
+    seen = []
+
+    def request():
+        conn = get_connection(db_path)
+        seen.append(conn)
+        conn.close()
+
+    for _ in range(5):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+
+    assert all(conn is seen[0] for conn in seen)
+    stats = get_pool_stats()
+    assert stats['connections_opened'] == 1 and stats['reuses'] == 4
+
+
+def test_idle_pool_is_bounded(db_path, monkeypatch):
+    """Test that connections released beyond the pool size are closed"""
+    monkeypatch.setattr(connection_pool, 'POOL_SIZE', 2)
+    connection_pool.close_all()
+    reset_pool_stats()
+    held = [threading.Event() for _ in range(4)]
+    release = threading.Event()
+
+    def request(index):
+        conn = get_connection(db_path)
+        held[index].set()
+        release.wait(5)
+        conn.close()
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for event in held:
+        event.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    stats = get_pool_stats()
+    assert stats['connections_opened'] == 4
+    assert stats['idle_connections'] == 2 and stats['evicted'] == 2 and stats['connections_closed'] == 2
+
+
+def test_context_manager_counts_statements(db_path):
+    """Test that `with conn` yields the pooled connection, so statements are still counted"""
+    from request_scope import begin_request, end_request
+
+    conn = get_connection(db_path)
+    scope = begin_request('test')
+    try:
+        with conn as inner:
+            assert inner is conn
+            inner.execute('CREATE TABLE t (x INTEGER)')
+            inner.execute('INSERT INTO t VALUES (1)')
+    finally:
+        end_request()
+        conn.close()
+
+    assert scope.sql_statements == 2
+    assert not conn.in_transaction
+
+
+def test_nested_close_keeps_outer_transaction(db_path):
+    """Test that an inner close() does not end the outer caller's transaction"""
+    outer = get_connection(db_path)
+    outer.execute('CREATE TABLE t (x INTEGER)')
+    outer.commit()
+    outer.execute('INSERT INTO t VALUES (1)')
+
+    inner = get_connection(db_path)
+    inner.close()
+
+    assert outer.in_transaction
+    outer.commit()
+    outer.close()
+
+
+def test_leaked_transaction_rolled_back(db_path):
+    """Test that uncommitted work is rolled back when the last checkout is released"""
+    conn = get_connection(db_path)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+
+    conn = get_connection(db_path)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert get_pool_stats()['leaked_transactions_rolled_back'] == 1
+
+
+def test_replaced_database_file_reopened(db_path):
+    """Test that a deleted and recreated database file gets a fresh connection"""
+    conn = get_connection(db_path)
+    conn.execute('CREATE TABLE old_table (x INTEGER)')
+    conn.commit()
+    conn.close()
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    init_loan_tables(db_path)
+
+    conn = get_connection(db_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    finally:
+        conn.close()
+    assert 'loans' in tables and 'old_table' not in tables
+    assert get_pool_stats()['stale_reopens'] >= 1
+
+
+def test_service_calls_share_one_connection(db_path):
+    """Test that a payment POST flow reuses the pooled connection with a single checkout"""
+    init_loan_tables(db_path)
+    service = LoanHistoryService(db_path)
+    loan = service.createLoan(1, {
+        'loan_type': 'personal',
+        'loan_amount': 100000,
+        'loan_tenure': 12,
+        'monthly_emi': 8814.86,
+        'interest_rate': 10.5,
+        'loan_start_date': '2024-01-01',
+        'loan_maturity_date': '2025-01-01'
+    })
+    reset_pool_stats()
+
+    service.recordPayment(loan['loan_id'], {'payment_date': '2024-02-01', 'payment_amount': 8814.86})
+
+    stats = get_pool_stats()
+    assert stats['connections_opened'] == 0
+    assert stats['checkouts'] == 1
@@ -0,0 +1,183 @@
+"""
+Unit tests for ExportService
+Tests NDJSON/CSV serialization of the export sections, batched reads,
+incremental gzip, section validation and the /api/export endpoint
+"""
+
+import pytest
+import csv
+import gzip
+import io
+import json
+import sqlite3
+import os
+import sys
+import zlib
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_goal_priority_rank, init_loan_tables
+from export_service import ExportService, gzip_stream
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from request_scope import begin_request, end_request
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with loan tables, users_profile and financial_goals"""
+    db_path = str(tmp_path / 'export.db')
+    init_loan_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE users_profile (
+            user_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            location TEXT NOT NULL,
+            risk_tolerance INTEGER,
+            profile_picture_url TEXT,
+            notification_preferences TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        );
+        CREATE TABLE financial_goals (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            goal_type TEXT NOT NULL,
+            target_amount REAL NOT NULL,
+            target_date TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT DEFAULT 'active',
+            description TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO users_profile (user_id, name, age, location) VALUES (1, 'Asha, "A"', 30, 'Pune');
+    ''')
+    init_goal_priority_rank(conn)
+    conn.commit()
+    conn.close()
+    yield db_path
+    end_request()
+    close_thread_connections()
+
+
+@pytest.fixture
+def loans(db_path):
+    """Two loans with five payments for user 1, one loan for user 2, and a goal"""
+    service = LoanHistoryService(db_path)
+    loan_ids = [service.createLoan(1, LOAN_DATA)['loan_id'] for _ in range(2)]
+    for month in range(2, 7):
+        service.recordPayment(loan_ids[month % 2], {'payment_date': f'2024-0{month}-15', 'payment_amount': 100.0})
+    other = service.createLoan(2, LOAN_DATA)['loan_id']
+    service.recordPayment(other, {'payment_date': '2024-02-15', 'payment_amount': 100.0})
+    GoalsService(db_path).create_goal(1, {'goal_type': 'short-term', 'target_amount': 500.0,
+                                          'target_date': '2030-01-01', 'priority': 'high'})
+    return loan_ids
+
+
+def test_ndjson_export_covers_all_sections(db_path, loans):
+    """Test one tagged JSON line per row, only for the exporting user"""
+    exporter = ExportService(db_path)
+    lines = ''.join(exporter.iter_ndjson(1, exporter.parse_sections(None, 'ndjson'))).splitlines()
+    records = [json.loads(line) for line in lines]
+
+    sections = [record['section'] for record in records]
+    assert sections == ['profile'] + ['loans'] * 2 + ['payments'] * 5 + ['goals']
+    assert records[0]['name'] == 'Asha, "A"'
+    assert {r['loan_id'] for r in records if r['section'] == 'payments'} == set(loans)
+    assert records[1]['total_paid'] in (200.0, 300.0)
+
+
+def test_reads_in_batches(db_path, loans):
+    """Test that rows are fetched and serialized fetch_size at a time"""
+    exporter = ExportService(db_path, fetch_size=2)
+    batches = [(section, len(rows)) for section, _, rows in exporter.iter_batches(1, ['payments', 'goals'])]
+
+    assert batches == [('payments', 2), ('payments', 2), ('payments', 1), ('goals', 1)]
+
+
+def test_csv_header_sent_before_any_query(db_path, loans):
+    """Test that the CSV header is produced before the export query runs"""
+    exporter = ExportService(db_path, fetch_size=2)
+    scope = begin_request('test')
+    chunks = exporter.iter_csv(1, 'payments')
+    header = next(chunks)
+    assert scope.sql_statements == 0
+    body = header + ''.join(chunks)
+    end_request()
+
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == 5
+    assert [row['payment_date'] for row in rows if row['loan_id'] == loans[0]] == ['2024-02-15', '2024-04-15', '2024-06-15']
+
+
+def test_gzip_stream_decodes_incrementally():
+    """Test that every gzip chunk can be decompressed as soon as it arrives"""
+    chunks = [f'line {i}\n' * 50 for i in range(3)]
+    decoder = zlib.decompressobj(31)
+    encoded = list(gzip_stream(iter(chunks)))
+
+    assert decoder.decompress(encoded[0]).decode() == chunks[0]
+    assert gzip.decompress(b''.join(encoded)).decode() == ''.join(chunks)
+
+
+def test_parse_sections(db_path):
+    """Test section and format validation"""
+    exporter = ExportService(db_path)
+    assert exporter.parse_sections('goals, loans', 'ndjson') == ['loans', 'goals']
+    assert exporter.parse_sections('payments', 'csv') == ['payments']
+    for sections, fmt in [('users', 'ndjson'), (',', 'ndjson'), (None, 'csv'), ('loans,goals', 'csv'), (None, 'xml')]:
+        with pytest.raises(ValueError):
+            exporter.parse_sections(sections, fmt)
+
+
+@pytest.fixture
+def client(db_path):
+    """Test client for user 1 whose export service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['export_service'] = ExportService(db_path)
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_export_endpoint(client, loans):
+    """Test streamed NDJSON, gzip-encoded CSV and argument errors"""
+    response = client.get('/api/export')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+    assert len(response.get_data(as_text=True).splitlines()) == 9
+
+    compressed = client.get('/api/export?format=csv&sections=loans', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(compressed.data).decode())))
+    assert rows[0][0] == 'loan_id' and len(rows) == 3
+
+    refused = client.get('/api/export?format=csv&sections=loans', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in refused.headers
+    assert refused.get_data(as_text=True).startswith('loan_id')
+
+    assert client.get('/api/export?format=csv').status_code == 400
+    assert client.get('/api/export?sections=passwords').status_code == 400
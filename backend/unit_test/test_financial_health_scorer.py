@@ -13,6 +13,7 @@ from datetime import datetime, timedelta
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from db_utils import create_loan_schema
 from financial_health_scorer import FinancialHealthScorer
 
 
@@ -60,6 +61,7 @@ class TestFinancialHealthScorer(unittest.TestCase):
                 FOREIGN KEY (loan_id) REFERENCES loans(loan_id)
             )
         ''')
+        create_loan_schema(conn)
         
         conn.commit()
         conn.close()
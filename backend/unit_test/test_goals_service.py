@@ -9,6 +9,7 @@ import tempfile
 from datetime import date, timedelta
 from hypothesis import given, strategies as st, settings
 from goals_service import GoalsService
+from db_utils import init_goal_priority_rank
 
 
 # Test database setup
@@ -47,6 +48,7 @@ def create_test_db():
             FOREIGN KEY (user_id) REFERENCES users_profile(user_id) ON DELETE CASCADE
         )
     ''')
+    init_goal_priority_rank(conn)
     
     conn.commit()
     conn.close()
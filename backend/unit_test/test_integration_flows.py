@@ -9,6 +9,7 @@ import sqlite3
 import tempfile
 from profile_service import ProfileService
 from goals_service import GoalsService
+from db_utils import init_goal_priority_rank
 from risk_assessment_service import RiskAssessmentService
 
 
@@ -62,6 +63,7 @@ def create_test_db():
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
         )
     ''')
+    init_goal_priority_rank(conn)
     
     # Create indexes
     cur.execute('CREATE INDEX idx_profile_user_id ON users_profile(user_id)')
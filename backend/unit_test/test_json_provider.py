@@ -0,0 +1,114 @@
+"""
+Unit tests for Json_Provider and the bulk LoanDataSerializer mode
+Tests that the fast encoder produces the same JSON as Flask's default provider,
+its stdlib fallback, and bulk loan/payment serialization from sqlite3.Row
+"""
+
+import pytest
+import dataclasses
+import decimal
+import json
+import sqlite3
+import uuid
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_provider
+from json_provider import FastJSONProvider, dumps_bytes
+from loan_data_serializer import LoanDataSerializer
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: float
+
+
+def sample_payload():
+    return {
+        'when': datetime(2024, 1, 15, 10, 30),
+        'id': uuid.UUID(int=7),
+        'amount': decimal.Decimal('12.50'),
+        'score': np.float64(71.25),
+        'count': np.int64(3),
+        'point': Point(1, 2.5),
+        'name': 'Zoë',
+        'nested': [{'b': 1, 'a': None}, True]
+    }
+
+
+@pytest.mark.parametrize('backend', ['auto', 'stdlib'])
+def test_matches_default_provider(backend, monkeypatch):
+    """Test that both backends decode to what Flask's default provider produces"""
+    monkeypatch.setattr(json_provider, 'JSON_BACKEND', backend)
+    app = Flask(__name__)
+    payload = sample_payload()
+    expected = json.loads(DefaultJSONProvider(app).dumps({**payload, 'count': 3}))
+
+    assert json.loads(dumps_bytes(payload, sort_keys=True)) == expected
+    assert json.loads(FastJSONProvider(app).dumps(payload)) == expected
+
+
+def test_response_uses_provider_settings():
+    """Test compact, key-sorted response bodies and sqlite3.Row support"""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT 'p1' AS payment_id, 100.5 AS payment_amount").fetchone()
+
+    with app.app_context():
+        response = app.json.response({'payments': [row], 'count': 1})
+
+    assert response.mimetype == 'application/json'
+    assert response.data == b'{"count":1,"payments":[{"payment_amount":100.5,"payment_id":"p1"}]}\n'
+
+
+def test_falls_back_for_values_orjson_rejects():
+    """Test that integers beyond 64 bits are still encoded"""
+    assert json.loads(dumps_bytes({'big': 2 ** 70})) == {'big': 2 ** 70}
+
+
+def test_bulk_serializers_match_single_item_output():
+    """Test serializeLoans/serializePayments against serializeLoan/serializePayment"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    payments = conn.execute('''
+        SELECT 'p' || value AS payment_id, 'loan-1' AS loan_id, '2024-02-15' AS payment_date,
+               value * 1.005 AS payment_amount, 'on-time' AS payment_status, NULL AS updated_at
+        FROM (SELECT 1 AS value UNION ALL SELECT 2)
+    ''').fetchall()
+    loans = [{'loan_id': 'loan-1', 'loan_amount': 100000.004, 'monthly_emi': 4614.486,
+              'interest_rate': 10, 'loan_start_date': datetime(2024, 1, 15),
+              'loan_maturity_date': '2090-01-15', 'deleted_at': None}]
+
+    assert json.loads(LoanDataSerializer.serializePayments(payments)) == [
+        json.loads(LoanDataSerializer.serializePayment(dict(row))) for row in payments
+    ]
+    bulk = json.loads(LoanDataSerializer.serializeLoans(loans))
+    assert bulk == [json.loads(LoanDataSerializer.serializeLoan(loans[0]))]
+    assert bulk[0]['loan_amount'] == 100000.0 and bulk[0]['months_remaining'] > 0
+    assert isinstance(loans[0]['loan_start_date'], datetime)
+
+
+def test_metrics_serialization_leaves_input_untouched():
+    """Test that serializeLoanMetrics rounds nested values without changing the caller's dicts"""
+    metrics = {
+        'loan_diversity_score': 66.6666,
+        'payment_statistics': {'on_time_payment_percentage': 83.3333},
+        'loan_statistics': {'total_loan_amount': 1000.555, 'loan_type_distribution': {'home': 33.3333}}
+    }
+    result = json.loads(LoanDataSerializer.serializeLoanMetrics(metrics))
+
+    assert result['loan_statistics']['loan_type_distribution'] == {'home': 33.33}
+    assert result['payment_statistics']['on_time_payment_percentage'] == 83.33
+    assert metrics['loan_statistics']['loan_type_distribution'] == {'home': 33.3333}
+    assert metrics['payment_statistics']['on_time_payment_percentage'] == 83.3333
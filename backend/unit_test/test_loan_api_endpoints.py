@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app, init_db
+from app import create_app, init_db
 from werkzeug.security import generate_password_hash
 import sqlite3
 
@@ -20,8 +20,7 @@ import sqlite3
 @pytest.fixture
 def client():
     """Create test client with test database"""
-    app.config['TESTING'] = True
-    app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+    app = create_app({'TESTING': True, 'JWT_SECRET_KEY': 'test-secret-key'})
     
     # Use in-memory database for testing
     test_db_path = ':memory:'
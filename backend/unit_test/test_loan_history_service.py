@@ -340,5 +340,86 @@ class TestGetPaymentHistory:
         assert len(payments) == 0
 
 
+
+class TestPaymentTotals:
+    """Tests for loans.total_paid / loans.payments_count running totals"""
+    
+    def _totals(self, test_db, loan_id):
+        conn = sqlite3.connect(test_db)
+        try:
+            return conn.execute(
+                'SELECT total_paid, payments_count FROM loans WHERE loan_id = ?', (loan_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+    
+    def test_totals_follow_record_and_delete(self, service, valid_loan_data, test_db):
+        """Test that recording and deleting payments keeps the loan totals in step"""
+        loan = service.createLoan(user_id=1, loan_data=valid_loan_data)
+        payments = [
+            service.recordPayment(loan['loan_id'], {
+                'payment_date': datetime.utcnow().isoformat(),
+                'payment_amount': 4614.49
+            })
+            for _ in range(3)
+        ]
+        
+        assert self._totals(test_db, loan['loan_id']) == (pytest.approx(3 * 4614.49), 3)
+        
+        service.deletePayment(payments[0]['payment_id'], loan['loan_id'])
+        assert self._totals(test_db, loan['loan_id']) == (pytest.approx(2 * 4614.49), 2)
+        
+        for payment in payments[1:]:
+            service.deletePayment(payment['payment_id'], loan['loan_id'])
+        assert self._totals(test_db, loan['loan_id']) == (0, 0)
+    
+    def test_balance_check_uses_running_total(self, service, valid_loan_data):
+        """Test that the remaining balance accounts for earlier payments"""
+        loan = service.createLoan(user_id=1, loan_data=valid_loan_data)
+        service.recordPayment(loan['loan_id'], {
+            'payment_date': datetime.utcnow().isoformat(),
+            'payment_amount': 90000
+        })
+        
+        with pytest.raises(ValidationError) as exc_info:
+            service.recordPayment(loan['loan_id'], {
+                'payment_date': datetime.utcnow().isoformat(),
+                'payment_amount': 10000.02
+            })
+        
+        assert exc_info.value.code == 'EXCEEDS_BALANCE'
+    
+    def test_existing_database_backfilled(self, tmp_path):
+        """Test that a loans table without the columns is altered and backfilled"""
+        db_path = str(tmp_path / 'legacy.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE loans (
+                loan_id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, loan_type TEXT NOT NULL,
+                loan_amount REAL NOT NULL, loan_tenure INTEGER NOT NULL, monthly_emi REAL NOT NULL,
+                interest_rate REAL NOT NULL, loan_start_date TEXT NOT NULL,
+                loan_maturity_date TEXT NOT NULL, default_status INTEGER DEFAULT 0,
+                created_at TEXT, updated_at TEXT, deleted_at TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE loan_payments (
+                payment_id TEXT PRIMARY KEY, loan_id TEXT NOT NULL, payment_date TEXT NOT NULL,
+                payment_amount REAL NOT NULL, payment_status TEXT NOT NULL,
+                created_at TEXT, updated_at TEXT
+            )
+        ''')
+        conn.execute("INSERT INTO loans VALUES ('l1', 1, 'personal', 100000, 24, 4614.49, 10, "
+                     "'2024-01-01', '2026-01-01', 0, NULL, NULL, NULL)")
+        conn.executemany("INSERT INTO loan_payments VALUES (?, 'l1', '2024-02-01', 4614.49, 'on-time', NULL, NULL)",
+                         [('p1',), ('p2',)])
+        conn.commit()
+        conn.close()
+        
+        init_loan_tables(db_path)
+        
+        assert self._totals(db_path, 'l1') == (pytest.approx(2 * 4614.49), 2)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
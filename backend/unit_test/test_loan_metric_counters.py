@@ -0,0 +1,245 @@
+"""
+Unit tests for trigger-maintained loan metric counters
+Tests counter upkeep on loan/payment writes, and rebuild reconciliation
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loan_metrics_engine import LoanMetricsEngine
+from loan_history_service import LoanHistoryService
+from db_utils import init_loan_tables, rebuild_loan_metric_counters
+from connection_pool import close_thread_connections
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Create a test database with loan tables and counters"""
+    db_path = str(tmp_path / 'counters.db')
+    
+    # Users table is the target of the loans foreign key
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT NOT NULL)')
+    conn.executemany('INSERT INTO users (id, username) VALUES (?, ?)', [(1, 'first'), (2, 'second')])
+    conn.commit()
+    conn.close()
+    
+    init_loan_tables(db_path)
+    yield db_path
+    close_thread_connections()
+
+
+@pytest.fixture
+def loan_service(test_db):
+    """Create LoanHistoryService instance"""
+    return LoanHistoryService(test_db)
+
+
+@pytest.fixture
+def metrics_engine(test_db):
+    """Create LoanMetricsEngine instance"""
+    return LoanMetricsEngine(test_db)
+
+
+def create_loan(loan_service, user_id, loan_type, amount, tenure, interest_rate=10.0):
+    """Create a loan with a consistent EMI maturing after its tenure"""
+    start_date = datetime.utcnow()
+    monthly_rate = interest_rate / 100 / 12
+    emi = (amount * monthly_rate * pow(1 + monthly_rate, tenure)) / (pow(1 + monthly_rate, tenure) - 1)
+    return loan_service.createLoan(user_id, {
+        'loan_type': loan_type,
+        'loan_amount': amount,
+        'loan_tenure': tenure,
+        'monthly_emi': round(emi, 2),
+        'interest_rate': interest_rate,
+        'loan_start_date': start_date.isoformat(),
+        'loan_maturity_date': (start_date + timedelta(days=30 * tenure)).isoformat()
+    })
+
+
+def get_counters(db_path, user_id):
+    """Read a user's counter row and type totals"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute('SELECT * FROM loan_metric_counters WHERE user_id = ?', (user_id,)).fetchone()
+        types = {
+            r['loan_type']: (r['loan_count'], r['total_amount'])
+            for r in conn.execute('SELECT * FROM loan_type_totals WHERE user_id = ?', (user_id,))
+        }
+    finally:
+        conn.close()
+    return (dict(row) if row else None), types
+
+
+def assert_matches_base_tables(metrics_engine, user_id):
+    """Counter-backed metrics must equal the base-table calculations"""
+    assert metrics_engine.computeAllMetrics(user_id) == {
+        'loan_diversity_score': metrics_engine.calculateLoanDiversityScore(user_id),
+        'payment_history_score': metrics_engine.calculatePaymentHistoryScore(user_id),
+        'loan_maturity_score': metrics_engine.calculateLoanMaturityScore(user_id),
+        'payment_statistics': metrics_engine.getPaymentStatistics(user_id),
+        'loan_statistics': metrics_engine.getLoanStatistics(user_id)
+    }
+
+
+def test_loan_and_payment_inserts_update_counters(test_db, loan_service, metrics_engine):
+    """Test that creating loans and recording payments maintains the counters"""
+    personal = create_loan(loan_service, 1, 'personal', 100000, 24)
+    home = create_loan(loan_service, 1, 'home', 500000, 240)
+    create_loan(loan_service, 2, 'auto', 300000, 60)
+    for i in range(3):
+        loan_service.recordPayment(personal['loan_id'], {
+            'payment_date': (datetime.utcnow() - timedelta(days=30 * i)).isoformat(),
+            'payment_amount': personal['monthly_emi']
+        })
+
+    counters, types = get_counters(test_db, 1)
+
+    assert counters['active_loan_count'] == 2
+    assert counters['total_loan_amount'] == 600000
+    assert counters['tenure_sum'] == 264
+    assert counters['weighted_tenure_sum'] == 100000 * 24 + 500000 * 240
+    assert counters['soonest_maturity_date'] == personal['loan_maturity_date']
+    assert counters['latest_maturity_date'] == home['loan_maturity_date']
+    assert counters['on_time_count'] + counters['late_count'] + counters['missed_count'] == 3
+    assert types == {'personal': (1, 100000), 'home': (1, 500000)}
+    assert_matches_base_tables(metrics_engine, 1)
+    assert rebuild_loan_metric_counters(test_db)['mismatched_users'] == []
+
+
+def test_loan_update_moves_type_totals(test_db, loan_service, metrics_engine):
+    """Test that changing a loan's type moves its amount between type totals"""
+    loan = create_loan(loan_service, 1, 'personal', 100000, 24)
+    create_loan(loan_service, 1, 'auto', 200000, 36)
+
+    loan_service.updateLoan(loan['loan_id'], 1, {'loan_type': 'education'})
+
+    counters, types = get_counters(test_db, 1)
+    assert counters['active_loan_count'] == 2
+    assert counters['total_loan_amount'] == 300000
+    assert types == {'education': (1, 100000), 'auto': (1, 200000)}
+    assert_matches_base_tables(metrics_engine, 1)
+
+
+def test_soft_delete_removes_loan_and_payments(test_db, loan_service, metrics_engine):
+    """Test that soft-deleting the last loan resets the counters to zero"""
+    loan = create_loan(loan_service, 1, 'personal', 100000, 24)
+    loan_service.recordPayment(loan['loan_id'], {
+        'payment_date': datetime.utcnow().isoformat(),
+        'payment_amount': loan['monthly_emi']
+    })
+
+    loan_service.deleteLoan(loan['loan_id'], 1)
+
+    counters, types = get_counters(test_db, 1)
+    assert counters['active_loan_count'] == 0
+    assert counters['total_loan_amount'] == 0
+    assert counters['weighted_tenure_sum'] == 0
+    assert counters['soonest_maturity_date'] is None
+    assert counters['on_time_count'] + counters['late_count'] + counters['missed_count'] == 0
+    assert types == {}
+    assert_matches_base_tables(metrics_engine, 1)
+
+
+def test_payment_status_change_adjusts_counts(test_db, loan_service, metrics_engine):
+    """Test that re-classifying a payment moves it between status counts"""
+    loan = create_loan(loan_service, 1, 'personal', 100000, 24)
+    for _ in range(2):
+        loan_service.recordPayment(loan['loan_id'], {
+            'payment_date': datetime.utcnow().isoformat(),
+            'payment_amount': loan['monthly_emi']
+        })
+
+    conn = sqlite3.connect(test_db)
+    conn.execute("UPDATE loan_payments SET payment_status = 'on-time'")
+    conn.execute("UPDATE loan_payments SET payment_status = 'missed' WHERE rowid = 1")
+    conn.commit()
+    conn.close()
+
+    counters, _ = get_counters(test_db, 1)
+    assert (counters['on_time_count'], counters['late_count'], counters['missed_count']) == (1, 0, 1)
+    assert_matches_base_tables(metrics_engine, 1)
+
+
+def test_matured_loan_skipped_for_maturity_bonus(test_db, loan_service, metrics_engine):
+    """Test that a loan already past maturity does not hide the next upcoming one"""
+    matured = create_loan(loan_service, 1, 'personal', 100000, 24)
+    create_loan(loan_service, 1, 'auto', 200000, 4)
+
+    conn = sqlite3.connect(test_db)
+    conn.execute("UPDATE loans SET loan_maturity_date = '2020-01-01' WHERE loan_id = ?", (matured['loan_id'],))
+    conn.commit()
+    conn.close()
+
+    assert get_counters(test_db, 1)[0]['soonest_maturity_date'] == '2020-01-01'
+    assert_matches_base_tables(metrics_engine, 1)
+
+
+def test_hard_delete_with_cascade_counts_payments_once(test_db, loan_service):
+    """Test that a cascading loan delete removes its payments exactly once"""
+    keep = create_loan(loan_service, 1, 'home', 500000, 240)
+    drop = create_loan(loan_service, 1, 'personal', 100000, 24)
+    for loan in (keep, drop):
+        loan_service.recordPayment(loan['loan_id'], {
+            'payment_date': datetime.utcnow().isoformat(),
+            'payment_amount': loan['monthly_emi']
+        })
+
+    conn = sqlite3.connect(test_db)
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('DELETE FROM loans WHERE loan_id = ?', (drop['loan_id'],))
+    conn.commit()
+    payments_left = conn.execute('SELECT COUNT(*) FROM loan_payments').fetchone()[0]
+    conn.close()
+
+    counters, types = get_counters(test_db, 1)
+    assert payments_left == 1
+    assert counters['on_time_count'] + counters['late_count'] + counters['missed_count'] == 1
+    assert counters['active_loan_count'] == 1
+    assert counters['soonest_maturity_date'] == keep['loan_maturity_date']
+    assert types == {'home': (1, 500000)}
+
+
+def test_rebuild_repairs_drift(test_db, loan_service, metrics_engine):
+    """Test that rebuild reports and fixes counters edited behind the triggers"""
+    create_loan(loan_service, 1, 'personal', 100000, 24)
+    create_loan(loan_service, 2, 'auto', 200000, 36)
+
+    conn = sqlite3.connect(test_db)
+    conn.execute('UPDATE loan_metric_counters SET active_loan_count = 7 WHERE user_id = 2')
+    conn.commit()
+    conn.close()
+
+    result = rebuild_loan_metric_counters(test_db)
+
+    assert result == {'users_rebuilt': 2, 'mismatched_users': [2]}
+    assert get_counters(test_db, 2)[0]['active_loan_count'] == 1
+    assert_matches_base_tables(metrics_engine, 2)
+
+
+def test_existing_loans_backfilled_on_init(tmp_path):
+    """Test that adding counters to a database with loans fills them from the rows"""
+    db_path = str(tmp_path / 'legacy.db')
+    init_loan_tables(db_path)
+    service = LoanHistoryService(db_path)
+    create_loan(service, 1, 'personal', 100000, 24)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP TABLE loan_metric_counters')
+    conn.execute('DROP TABLE loan_type_totals')
+    conn.commit()
+    conn.close()
+
+    init_loan_tables(db_path)
+
+    counters, types = get_counters(db_path, 1)
+    assert counters['active_loan_count'] == 1
+    assert types == {'personal': (1, 100000)}
+    close_thread_connections()
@@ -440,5 +440,70 @@ class TestGetLoanStatistics:
         assert 99.9 <= total_percentage <= 100.1
 
 
+
+class TestComputeAllMetrics:
+    """Tests for computeAllMetrics single-pass method"""
+    
+    def test_no_loans_returns_baselines(self, metrics_engine):
+        """Test that a user with no loans gets every baseline in one call"""
+        metrics = metrics_engine.computeAllMetrics(user_id=1)
+        
+        assert metrics['loan_diversity_score'] == 50.0
+        assert metrics['payment_history_score'] == 70.0
+        assert metrics['loan_maturity_score'] == 50.0
+        assert metrics['payment_statistics']['total_payments'] == 0
+        assert metrics['loan_statistics']['total_active_loans'] == 0
+    
+    def test_matches_individual_methods(self, metrics_engine, loan_service, test_db):
+        """Test that computeAllMetrics equals the five individual calculations"""
+        loan = create_test_loan(loan_service, 1, 'personal', 100000, 24)
+        create_test_loan(loan_service, 1, 'home', 500000, 240)
+        create_test_loan(loan_service, 2, 'auto', 300000, 60)  # other user
+        
+        for i in range(6):
+            loan_service.recordPayment(loan['loan_id'], {
+                'payment_date': (datetime.utcnow() - timedelta(days=30 * i)).isoformat(),
+                'payment_amount': 4614.49
+            })
+        
+        # Mix in late and missed statuses directly
+        conn = sqlite3.connect(test_db)
+        conn.execute("UPDATE loan_payments SET payment_status = 'late' WHERE rowid IN (1, 2)")
+        conn.execute("UPDATE loan_payments SET payment_status = 'missed' WHERE rowid = 3")
+        conn.commit()
+        conn.close()
+        
+        metrics = metrics_engine.computeAllMetrics(user_id=1)
+        
+        assert metrics == {
+            'loan_diversity_score': metrics_engine.calculateLoanDiversityScore(1),
+            'payment_history_score': metrics_engine.calculatePaymentHistoryScore(1),
+            'loan_maturity_score': metrics_engine.calculateLoanMaturityScore(1),
+            'payment_statistics': metrics_engine.getPaymentStatistics(1),
+            'loan_statistics': metrics_engine.getLoanStatistics(1)
+        }
+        assert metrics['payment_statistics'] == {
+            'on_time_payment_percentage': 50.0,
+            'late_payment_count': 2,
+            'missed_payment_count': 1,
+            'total_payments': 6
+        }
+        assert metrics['loan_statistics']['total_active_loans'] == 2
+    
+    def test_deleted_loan_payments_excluded(self, metrics_engine, loan_service):
+        """Test that payments of soft-deleted loans are not aggregated"""
+        loan = create_test_loan(loan_service, 1, 'personal', 100000, 24)
+        loan_service.recordPayment(loan['loan_id'], {
+            'payment_date': datetime.utcnow().isoformat(),
+            'payment_amount': 4614.49
+        })
+        loan_service.deleteLoan(loan['loan_id'], 1)
+        
+        metrics = metrics_engine.computeAllMetrics(user_id=1)
+        
+        assert metrics['payment_statistics']['total_payments'] == 0
+        assert metrics['loan_statistics']['total_active_loans'] == 0
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
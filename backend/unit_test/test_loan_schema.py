@@ -338,11 +338,12 @@ def test_indexes_created(test_db):
     results = verify_loan_tables(test_db)
     
     expected_indexes = [
-        'idx_loans_user_id',
+        'idx_loans_user_created',
+        'idx_loans_active_user_created',
+        'idx_loans_active_user_maturity',
         'idx_loans_loan_type',
         'idx_loans_default_status',
-        'idx_loans_deleted_at',
-        'idx_loan_payments_loan_id',
+        'idx_loan_payments_loan_date',
         'idx_loan_payments_payment_date',
         'idx_loan_payments_payment_status'
     ]
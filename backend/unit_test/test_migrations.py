@@ -0,0 +1,199 @@
+"""
+Unit tests for Migrations
+Tests the PRAGMA user_version migration runner: building a new database,
+upgrading a pre-migration one, transactional rollback, targets, concurrent boots
+and the hot-path index migration
+"""
+
+import pytest
+import sqlite3
+import threading
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from migrations import Migration, SCHEMA_VERSION, current_version, migrate
+
+
+def table_names(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    return names
+
+
+def version_of(db_path):
+    conn = sqlite3.connect(db_path)
+    version = current_version(conn)
+    conn.close()
+    return version
+
+
+def test_builds_new_database(tmp_path):
+    """Test that a new database gets the full schema and the latest version"""
+    db_path = str(tmp_path / 'new.db')
+
+    result = migrate(db_path)
+
+    assert result == {'from_version': 0, 'to_version': SCHEMA_VERSION,
+                      'applied': [m.name for m in migrations.MIGRATIONS]}
+    assert {'users', 'users_profile', 'financial_goals', 'loans', 'loan_payments',
+            'loan_metric_counters', 'score_history'} <= table_names(db_path)
+    assert version_of(db_path) == SCHEMA_VERSION
+
+
+def test_current_database_is_left_alone(tmp_path):
+    """Test that a second run applies nothing, even if a table was dropped by hand"""
+    db_path = str(tmp_path / 'current.db')
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP TABLE loan_metrics')
+    conn.commit()
+    conn.close()
+
+    result = migrate(db_path)
+
+    assert result['applied'] == [] and result['from_version'] == SCHEMA_VERSION
+    assert 'loan_metrics' not in table_names(db_path)
+
+
+def test_upgrades_pre_migration_database(tmp_path):
+    """Test that the baseline adds columns the old migrate scripts used to add, and backfills totals"""
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                            password_hash TEXT NOT NULL, created_at TEXT NOT NULL);
+        CREATE TABLE loans (loan_id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, loan_type TEXT NOT NULL,
+                            loan_amount REAL NOT NULL, loan_tenure INTEGER NOT NULL, monthly_emi REAL NOT NULL,
+                            interest_rate REAL NOT NULL, loan_start_date TEXT NOT NULL,
+                            loan_maturity_date TEXT NOT NULL, default_status INTEGER DEFAULT 0,
+                            created_at TEXT, updated_at TEXT, deleted_at TEXT);
+        CREATE TABLE loan_payments (payment_id TEXT PRIMARY KEY, loan_id TEXT NOT NULL, payment_date TEXT NOT NULL,
+                                    payment_amount REAL NOT NULL, payment_status TEXT NOT NULL,
+                                    created_at TEXT, updated_at TEXT);
+        INSERT INTO users (username, password_hash, created_at) VALUES ('a@example.com', 'x', '2024-01-01');
+        INSERT INTO loans VALUES ('loan-1', 1, 'home', 1000, 12, 90, 8, '2024-01-01', '2025-01-01', 0,
+                                  NULL, NULL, NULL);
+        INSERT INTO loan_payments VALUES ('p1', 'loan-1', '2024-02-01', 90, 'on-time', NULL, NULL);
+        INSERT INTO loan_payments VALUES ('p2', 'loan-1', '2024-03-01', 90, 'late', NULL, NULL);
+    ''')
+    conn.close()
+
+    assert migrate(db_path)['applied'] == [m.name for m in migrations.MIGRATIONS]
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(users)')}
+    totals = conn.execute("SELECT total_paid, payments_count FROM loans WHERE loan_id = 'loan-1'").fetchone()
+    users = conn.execute('SELECT username, email_verified FROM users').fetchall()
+    conn.close()
+    assert {'phone', 'email_verified', 'email_verification_token', 'email_verification_expires'} <= columns
+    assert totals == (180.0, 2)
+    assert users == [('a@example.com', 0)]
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    """Test that a failing migration leaves neither its changes nor a version bump"""
+    db_path = str(tmp_path / 'broken.db')
+    migrate(db_path)
+
+    def broken(conn):
+        conn.execute('CREATE TABLE half_done (id INTEGER)')
+        conn.execute('ALTER TABLE users ADD COLUMN nickname TEXT')
+        raise sqlite3.OperationalError('boom')
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [Migration(SCHEMA_VERSION + 1, 'broken', broken)])
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(db_path, target=SCHEMA_VERSION + 1)
+
+    assert version_of(db_path) == SCHEMA_VERSION
+    assert 'half_done' not in table_names(db_path)
+
+
+def test_target_stops_early(tmp_path, monkeypatch):
+    """Test that migrations above target are left pending"""
+    db_path = str(tmp_path / 'target.db')
+    extra = Migration(SCHEMA_VERSION + 1, 'extra', lambda conn: conn.execute('CREATE TABLE extra (id INTEGER)'))
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [extra])
+
+    assert migrate(db_path, target=SCHEMA_VERSION)['to_version'] == SCHEMA_VERSION
+    assert 'extra' not in table_names(db_path)
+
+    assert migrate(db_path, target=SCHEMA_VERSION + 1)['applied'] == ['extra']
+    assert 'extra' in table_names(db_path)
+
+
+def test_concurrent_boots_apply_each_migration_once(tmp_path):
+    """Test that processes starting together do not apply a migration twice"""
+    db_path = str(tmp_path / 'race.db')
+    barrier = threading.Barrier(4)
+    results = []
+
+    def boot():
+        barrier.wait()
+        results.append(migrate(db_path))
+
+    threads = [threading.Thread(target=boot) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    applied = [name for result in results for name in result['applied']]
+    assert sorted(applied) == sorted(m.name for m in migrations.MIGRATIONS)
+    assert version_of(db_path) == SCHEMA_VERSION
+
+
+def test_hot_path_indexes_upgrade_version_1(tmp_path):
+    """Test that version 2 backfills priority_rank and drops the superseded indexes"""
+    db_path = str(tmp_path / 'v1.db')
+    migrate(db_path, target=1)
+    conn = sqlite3.connect(db_path)
+    goal_columns = {row[1] for row in conn.execute('PRAGMA table_info(financial_goals)')}
+    v1_indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.execute("""
+        INSERT INTO financial_goals (id, user_id, goal_type, target_amount, target_date, priority)
+        VALUES ('g1', 1, 'long-term', 100, '2030-01-01', 'low')
+    """)
+    conn.commit()
+    conn.close()
+    assert 'priority_rank' not in goal_columns
+    assert set(migrations.SUPERSEDED_INDEXES) <= v1_indexes
+
+    assert migrate(db_path)['applied'] == ['hot_path_indexes']
+
+    conn = sqlite3.connect(db_path)
+    rank = conn.execute("SELECT priority_rank FROM financial_goals WHERE id = 'g1'").fetchone()[0]
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert rank == 3
+    assert {'idx_loans_active_user_created', 'idx_loans_active_user_maturity',
+            'idx_financial_goals_user_priority', 'idx_financial_goals_user_status_priority'} <= indexes
+    assert not indexes & set(migrations.SUPERSEDED_INDEXES)
+
+
+def schema_of(db_path, tables):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL "
+        f"AND tbl_name IN ({', '.join('?' * len(tables))})", tables
+    ).fetchall()
+    conn.close()
+    return {(kind, name): ' '.join(sql.replace('IF NOT EXISTS ', '').split()) for kind, name, sql in rows}
+
+
+def test_migrated_loan_schema_matches_db_utils(tmp_path):
+    """Test that the migrations build the same loan tables, indexes and triggers as init_loan_tables"""
+    migrated, standalone = str(tmp_path / 'migrated.db'), str(tmp_path / 'standalone.db')
+    migrate(migrated)
+    init_loan_tables(standalone)
+    close_thread_connections()
+
+    tables = ['loans', 'loan_payments', 'loan_metrics', 'loan_metric_counters', 'loan_type_totals', 'score_history']
+    assert schema_of(migrated, tables) == schema_of(standalone, tables)
@@ -0,0 +1,148 @@
+"""
+Unit tests for Model_Inference adapter
+Tests parity with the pandas DataFrame prediction path and input validation
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_inference
+from model_inference import ModelInference
+
+
+FEATURE_NAMES = [
+    'income', 'expenses', 'savings', 'emi', 'age',
+    'has_loan_numeric', 'loan_amount_filled', 'interest_rate_filled'
+]
+
+
+@pytest.fixture(scope='module')
+def fitted_model():
+    """Fit a small GradientBoostingRegressor on synthetic financial data"""
+    rng = np.random.default_rng(42)
+    n = 400
+    income = rng.uniform(10000, 200000, n)
+    X = pd.DataFrame({
+        'income': income,
+        'expenses': income * rng.uniform(0.2, 1.1, n),
+        'savings': income * rng.uniform(0.0, 0.4, n),
+        'emi': income * rng.uniform(0.0, 0.5, n),
+        'age': rng.integers(18, 70, n),
+        'has_loan_numeric': rng.integers(0, 2, n),
+        'loan_amount_filled': rng.uniform(0, 1e6, n),
+        'interest_rate_filled': rng.uniform(0, 20, n)
+    }, columns=FEATURE_NAMES)
+    y = 100 * X['savings'] / X['income'] - 50 * X['emi'] / X['income'] + 40
+    model = GradientBoostingRegressor(n_estimators=30, max_depth=4, random_state=0)
+    model.fit(X, y)
+    return model, X
+
+
+def test_predict_matches_dataframe_path(fitted_model):
+    """Test that adapter predictions equal model.predict on a DataFrame"""
+    model, X = fitted_model
+    inference = ModelInference(model, FEATURE_NAMES)
+
+    expected = model.predict(X)
+    actual = inference.predict(X.to_numpy(dtype=np.float64))
+
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_predict_one_uses_row_buffer(fitted_model):
+    """Test single-row prediction through the preallocated buffer"""
+    model, X = fitted_model
+    inference = ModelInference(model, FEATURE_NAMES)
+    row = X.iloc[7].tolist()
+
+    score = inference.predict_one(row)
+
+    assert score == float(model.predict(X.iloc[[7]])[0])
+    assert inference.row_buffer().dtype == np.float64
+    assert inference.row_buffer().shape == (1, len(FEATURE_NAMES))
+    assert inference.row_buffer() is inference.row_buffer()
+
+
+def test_predict_accepts_1d_row(fitted_model):
+    """Test that a 1-D feature row is treated as one sample"""
+    model, X = fitted_model
+    inference = ModelInference(model, FEATURE_NAMES)
+
+    result = inference.predict(X.iloc[0].to_numpy())
+
+    assert result.shape == (1,)
+
+
+def test_predict_rejects_wrong_width(fitted_model):
+    """Test that a matrix with the wrong number of columns is rejected"""
+    model, _ = fitted_model
+    inference = ModelInference(model, FEATURE_NAMES)
+
+    with pytest.raises(ValueError, match='8 columns'):
+        inference.predict(np.zeros((3, 5)))
+
+
+def test_feature_order_mismatch_rejected(fitted_model):
+    """Test that a feature order different from training is rejected up front"""
+    model, _ = fitted_model
+
+    with pytest.raises(ValueError, match='does not match'):
+        ModelInference(model, list(reversed(FEATURE_NAMES)))
+
+
+def test_row_buffers_are_thread_local(fitted_model):
+    """Test that each thread gets its own row buffer"""
+    model, _ = fitted_model
+    inference = ModelInference(model, FEATURE_NAMES)
+    buffers = []
+
+    thread = threading.Thread(target=lambda: buffers.append(inference.row_buffer()))
+    thread.start()
+    thread.join()
+
+    assert buffers[0] is not inference.row_buffer()
+
+
+def test_raw_predict_used_on_tested_sklearn(fitted_model):
+    """Test that the private tree-sum is used when it matches predict()"""
+    model, _ = fitted_model
+
+    assert ModelInference(model, FEATURE_NAMES)._raw_predict is not None
+
+
+class PrivateApiChanged:
+    """A fitted model whose private _raw_predict no longer behaves as expected"""
+
+    def __init__(self, model, raw_predict):
+        self.model = model
+        self.feature_names_in_ = model.feature_names_in_
+        self._raw_predict = raw_predict
+
+    def predict(self, features):
+        return self.model.predict(features)
+
+
+@pytest.mark.parametrize('case', ['untested_version', 'mismatch', 'raises'])
+def test_falls_back_to_public_predict(fitted_model, monkeypatch, case):
+    """Test that an untested sklearn or a changed _raw_predict falls back to predict()"""
+    model, X = fitted_model
+    if case == 'untested_version':
+        monkeypatch.setattr(model_inference, 'RAW_PREDICT_SKLEARN_VERSIONS', ((0, 1), (0, 2)))
+    elif case == 'mismatch':
+        model = PrivateApiChanged(model, lambda features: np.zeros((len(features), 1)))
+    else:
+        model = PrivateApiChanged(model, lambda features: 1 / 0)
+
+    inference = ModelInference(model, FEATURE_NAMES)
+
+    assert inference._raw_predict is None
+    np.testing.assert_allclose(inference.predict(X.to_numpy()[:20]), fitted_model[0].predict(X.iloc[:20]))
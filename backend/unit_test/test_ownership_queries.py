@@ -0,0 +1,230 @@
+"""
+Unit tests for ownership checks folded into loan, payment and goal queries
+Tests that the owner is checked by the statements the services already run,
+that "not found" and "not yours" are still told apart, and the 403/404
+responses of the loan and payment endpoints
+"""
+
+import pytest
+import json
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_goal_priority_rank, init_loan_tables
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from request_scope import begin_request, end_request
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+GOAL_DATA = {
+    'goal_type': 'short-term',
+    'target_amount': 50000.0,
+    'target_date': '2030-01-01',
+    'priority': 'high'
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with loan tables and financial_goals"""
+    db_path = str(tmp_path / 'ownership.db')
+    init_loan_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE financial_goals (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            goal_type TEXT NOT NULL,
+            target_amount REAL NOT NULL,
+            target_date TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT DEFAULT 'active',
+            description TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    init_goal_priority_rank(conn)
+    conn.commit()
+    conn.close()
+    yield db_path
+    end_request()
+    close_thread_connections()
+
+
+@pytest.fixture
+def service(db_path):
+    return LoanHistoryService(db_path)
+
+
+def count_statements(fn, *args):
+    """Run fn in a request scope and return (result, SQL statements executed)"""
+    scope = begin_request('test')
+    try:
+        result = fn(*args)
+    finally:
+        end_request()
+    return result, scope.sql_statements
+
+
+def test_payment_history_reads_owner_in_same_query(service):
+    """Test that the owner and the payments come from one statement"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+    service.recordPayment(loan_id, {'payment_date': '2024-02-15', 'payment_amount': 4614.49})
+    service.recordPayment(loan_id, {'payment_date': '2024-03-15', 'payment_amount': 4614.49})
+
+    payments, statements = count_statements(service.getPaymentHistory, loan_id, 1)
+
+    assert statements == 1
+    assert payments == service.getPaymentHistory(loan_id)
+    assert [p['payment_date'] for p in payments] == ['2024-02-15', '2024-03-15']
+    assert 'owner_id' not in payments[0]
+
+    empty_loan = service.createLoan(1, LOAN_DATA)['loan_id']
+    assert service.getPaymentHistory(empty_loan, 1) == []
+
+    with pytest.raises(ValueError, match='does not own'):
+        service.getPaymentHistory(loan_id, 2)
+    with pytest.raises(ValueError, match='not found'):
+        service.getPaymentHistory('missing', 1)
+
+
+def test_record_payment_checks_owner_on_context_row(service):
+    """Test that ownership costs no statement beyond an unchecked recordPayment"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    _, unchecked = count_statements(
+        service.recordPayment, loan_id, {'payment_date': '2024-02-15', 'payment_amount': 100.0})
+    _, checked = count_statements(
+        service.recordPayment, loan_id, {'payment_date': '2024-03-15', 'payment_amount': 100.0}, 1)
+
+    assert checked == unchecked
+    with pytest.raises(ValueError, match='does not own'):
+        service.recordPayment(loan_id, {'payment_date': '2024-04-15', 'payment_amount': 100.0}, 2)
+    assert len(service.getPaymentHistory(loan_id)) == 2
+
+
+def test_delete_payment_single_statement(service):
+    """Test that a permitted delete is one statement and failures are diagnosed"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+    other_loan = service.createLoan(1, LOAN_DATA)['loan_id']
+    payments = [service.recordPayment(loan_id, {'payment_date': f'2024-0{m}-15', 'payment_amount': 100.0})
+                for m in (2, 3)]
+
+    with pytest.raises(ValueError, match='does not own'):
+        service.deletePayment(payments[0]['payment_id'], loan_id, 2)
+    with pytest.raises(ValueError, match='not found'):
+        service.deletePayment(payments[0]['payment_id'], 'missing', 1)
+    with pytest.raises(ValueError, match='does not belong'):
+        service.deletePayment(payments[0]['payment_id'], other_loan, 1)
+    assert not service.deletePayment('missing', loan_id, 1)
+
+    deleted, statements = count_statements(service.deletePayment, payments[0]['payment_id'], loan_id, 1)
+    assert deleted and statements == 1
+    assert service.deletePayment(payments[1]['payment_id'], loan_id)
+    assert service.getPaymentHistory(loan_id) == []
+
+
+def test_delete_loan_single_statement(service):
+    """Test that deleteLoan no longer reads the loan before updating it"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    with pytest.raises(ValueError, match='does not own'):
+        service.deleteLoan(loan_id, 2)
+    assert service.getLoan(loan_id)['deleted_at'] is None
+    assert service.deleteLoan('missing', 1) is False
+
+    deleted, statements = count_statements(service.deleteLoan, loan_id, 1)
+    assert deleted and statements == 1
+    assert service.getLoan(loan_id)['deleted_at'] is not None
+
+
+def test_schedule_checks_owner(service):
+    """Test the owner check on the amortization schedule"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    assert service.getAmortizationSchedule(loan_id, 1)['monthly_emi'] > 0
+    assert service.getAmortizationSchedule('missing', 1) is None
+    with pytest.raises(ValueError, match='does not own'):
+        service.getAmortizationSchedule(loan_id, 2)
+
+
+def test_goal_ownership_in_where_clause(db_path):
+    """Test goal update/delete with the owner in the WHERE clause"""
+    goals = GoalsService(db_path)
+    goal_id = goals.create_goal(1, GOAL_DATA)['id']
+
+    updated, statements = count_statements(goals.update_goal, goal_id, 1, {'priority': 'low'})
+    assert updated['priority'] == 'low'
+    assert statements == 2  # the UPDATE and the re-read of the goal
+
+    with pytest.raises(ValueError, match='does not own'):
+        goals.update_goal(goal_id, 2, {'priority': 'medium'})
+    with pytest.raises(ValueError, match='does not own'):
+        goals.update_goal(goal_id, 2, {})
+    with pytest.raises(ValueError, match='not found'):
+        goals.update_goal('missing', 1, {'priority': 'medium'})
+    with pytest.raises(ValueError, match='does not own'):
+        goals.delete_goal(goal_id, 2)
+    assert goals.get_goal(goal_id)['priority'] == 'low'
+
+    assert goals.delete_goal('missing', 1) is False
+    deleted, statements = count_statements(goals.delete_goal, goal_id, 1)
+    assert deleted and statements == 1
+    assert goals.get_goal(goal_id) is None
+
+
+@pytest.fixture
+def client(service):
+    """Test client for user 1 whose loan service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['loan_service'] = service
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_endpoints_map_ownership_errors(client, service):
+    """Test 403 for another user's loan and 404 for a missing one on each endpoint"""
+    own_loan = service.createLoan(1, LOAN_DATA)['loan_id']
+    other_loan = service.createLoan(2, LOAN_DATA)['loan_id']
+    payment = service.recordPayment(other_loan, {'payment_date': '2024-02-15', 'payment_amount': 100.0})
+    body = {'payment_date': '2024-02-15', 'payment_amount': 100.0}
+
+    requests_ = [
+        ('post', '/api/loans/{}/payments', body),
+        ('get', '/api/loans/{}/payments', None),
+        ('get', '/api/loans/{}/schedule', None),
+        ('delete', '/api/loans/{}/payments/' + payment['payment_id'], None),
+    ]
+    for method, path, data in requests_:
+        forbidden = getattr(client, method)(path.format(other_loan), json=data)
+        missing = getattr(client, method)(path.format('missing'), json=data)
+        assert forbidden.status_code == 403, path
+        assert json.loads(forbidden.data)['error'] == 'Forbidden'
+        assert missing.status_code == 404, path
+
+    response = client.get(f'/api/loans/{own_loan}/payments')
+    assert response.status_code == 200
+    assert response.headers['X-SQL-Statements'] == '1'
+    assert len(service.getPaymentHistory(other_loan)) == 1
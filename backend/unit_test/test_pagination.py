@@ -0,0 +1,201 @@
+"""
+Unit tests for Pagination
+Tests keyset pagination and field projection of the loan, payment and goal
+listings, cursor validation, the composite indexes behind each page, and the
+limit/cursor/fields query parameters of the list endpoints
+"""
+
+import pytest
+import json
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_listing_indexes, init_loan_tables
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from pagination import decode_cursor, encode_cursor, parse_page_args
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with loan tables, financial_goals and the listing indexes"""
+    db_path = str(tmp_path / 'pages.db')
+    init_loan_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE financial_goals (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            goal_type TEXT NOT NULL,
+            target_amount REAL NOT NULL,
+            target_date TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT DEFAULT 'active',
+            description TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    init_listing_indexes(conn)
+    conn.commit()
+    conn.close()
+    yield db_path
+    close_thread_connections()
+
+
+@pytest.fixture
+def service(db_path):
+    return LoanHistoryService(db_path)
+
+
+def walk(fetch, key, limit):
+    """Follow next_cursor from the first page to the last; returns all rows and page count"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = fetch(limit, cursor)
+        rows += page[key]
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            return rows, pages
+
+
+def test_loan_pages_match_full_listing(service, db_path):
+    """Test that walking the pages yields the full listing, including created_at ties"""
+    for _ in range(7):
+        service.createLoan(1, LOAN_DATA)
+    service.createLoan(2, LOAN_DATA)
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE loans SET created_at = '2024-05-01T00:00:00'")  # every key ties on created_at
+    conn.commit()
+    conn.close()
+
+    full = service.getLoansByUser(1)
+    rows, pages = walk(lambda limit, cursor: service.getLoansPage(1, limit, cursor), 'loans', 3)
+
+    assert len(full) == 7 and pages == 3
+    assert rows == full
+    assert service.getLoansPage(1, 7)['next_cursor'] is None
+
+
+def test_payment_pages_with_projection(service):
+    """Test payment pages in date order, narrowed to the requested fields"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+    for month in (5, 2, 4, 3, 6):
+        service.recordPayment(loan_id, {'payment_date': f'2024-0{month}-15', 'payment_amount': 100.0})
+
+    fields = ['payment_amount', 'payment_date']
+    rows, pages = walk(
+        lambda limit, cursor: service.getPaymentHistoryPage(loan_id, limit, cursor, 1, ['payment_amount', 'payment_date']),
+        'payments', 2)
+
+    assert pages == 3
+    assert [row['payment_date'] for row in rows] == [f'2024-0{m}-15' for m in range(2, 7)]
+    assert all(sorted(row) == sorted(fields) for row in rows)
+
+    # Without the owner check, and a page after the last payment
+    last = service.getPaymentHistoryPage(loan_id, 10, encode_cursor(['2024-06-15', 'zzz']))
+    assert last == {'payments': [], 'next_cursor': None}
+    assert service.getPaymentHistoryPage(loan_id, 10, encode_cursor(['2024-06-15', 'zzz']), 1)['payments'] == []
+
+
+def test_goal_pages_follow_priority_order(db_path):
+    """Test that goal pages keep the priority-then-date order of get_goals"""
+    goals = GoalsService(db_path)
+    for priority, date in [('low', '2030-01-01'), ('high', '2031-01-01'), ('medium', '2029-01-01'),
+                           ('high', '2028-01-01'), ('low', '2027-01-01')]:
+        goals.create_goal(1, {'goal_type': 'long-term', 'target_amount': 1000.0,
+                              'target_date': date, 'priority': priority})
+
+    full = goals.get_goals(1)
+    rows, pages = walk(lambda limit, cursor: goals.get_goals_page(1, limit, cursor), 'goals', 2)
+
+    assert [goal['priority'] for goal in full] == ['high', 'high', 'medium', 'low', 'low']
+    assert rows == full and pages == 3
+    assert 'priority_rank' not in rows[0]
+    assert goals.get_goals(1, fields=['id'])[0] == {'id': full[0]['id']}
+
+
+def test_pages_are_index_range_scans(db_path):
+    """Test that a page after a cursor seeks into the composite indexes"""
+    conn = sqlite3.connect(db_path)
+    plans = {
+        'loans': "SELECT loan_id FROM loans WHERE user_id = 1 AND (created_at, loan_id) < ('a', 'b') "
+                 "ORDER BY created_at DESC, loan_id DESC LIMIT 3",
+        'payments': "SELECT payment_id FROM loan_payments WHERE loan_id = 'l' AND (payment_date, payment_id) > ('a', 'b') "
+                    "ORDER BY payment_date ASC, payment_id ASC LIMIT 3"
+    }
+    for name, query in plans.items():
+        detail = ' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + query))
+        assert 'idx_loans_user_created' in detail or 'idx_loan_payments_loan_date' in detail, name
+        assert 'TEMP B-TREE' not in detail, name
+    conn.close()
+
+
+def test_cursor_and_argument_validation(service):
+    """Test rejection of malformed cursors, bad limits and unknown fields"""
+    assert decode_cursor(encode_cursor(['2024-01-01', 'abc']), 2) == ('2024-01-01', 'abc')
+    for cursor in ['not-a-cursor!', encode_cursor(['only-one']), encode_cursor([None, 'x'])]:
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            decode_cursor(cursor, 2)
+
+    assert parse_page_args({}, ['a']) == (None, None, None)
+    assert parse_page_args({'cursor': 'c', 'fields': 'a'}, ['a', 'b']) == (50, 'c', ['a'])
+    for args in [{'limit': '0'}, {'limit': 'x'}, {'limit': '201'}, {'fields': 'a,secret'}, {'fields': ' '}]:
+        with pytest.raises(ValueError):
+            parse_page_args(args, ['a'])
+
+
+@pytest.fixture
+def client(service):
+    """Test client for user 1 whose loan service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['loan_service'] = service
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_list_endpoints_paginate(client, service):
+    """Test limit/cursor/fields on the loan and payment endpoints"""
+    loan_ids = [service.createLoan(1, LOAN_DATA)['loan_id'] for _ in range(3)]
+    service.recordPayment(loan_ids[0], {'payment_date': '2024-02-15', 'payment_amount': 100.0})
+
+    unpaged = json.loads(client.get('/api/loans/user/1').data)
+    assert unpaged['count'] == 3 and 'next_cursor' not in unpaged
+
+    first = json.loads(client.get('/api/loans/user/1?limit=2&fields=loan_id,loan_type').data)
+    assert first['count'] == 2 and first['next_cursor']
+    assert first['loans'][0] == {'loan_id': first['loans'][0]['loan_id'], 'loan_type': 'personal'}
+    second = json.loads(client.get(f"/api/loans/user/1?limit=2&cursor={first['next_cursor']}").data)
+    assert second['count'] == 1 and second['next_cursor'] is None
+    assert {loan['loan_id'] for loan in first['loans'] + second['loans']} == set(loan_ids)
+
+    payments = json.loads(client.get(f'/api/loans/{loan_ids[0]}/payments?limit=5&fields=payment_amount').data)
+    assert payments == {'payments': [{'payment_amount': 100.0}], 'count': 1, 'next_cursor': None}
+
+    assert client.get('/api/loans/user/1?limit=1000').status_code == 400
+    assert client.get('/api/loans/user/1?fields=password').status_code == 400
+    assert client.get(f'/api/loans/{loan_ids[0]}/payments?cursor=garbage').status_code == 400
+    assert client.get('/api/loans/missing/payments?limit=5').status_code == 404
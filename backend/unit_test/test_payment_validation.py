@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from db_utils import create_loan_schema
 from loan_history_service import LoanHistoryService, ValidationError
 
 
@@ -59,6 +60,7 @@ def service():
             FOREIGN KEY (loan_id) REFERENCES loans(loan_id)
         )
     ''')
+    create_loan_schema(conn)
     
     conn.commit()
     conn.close()
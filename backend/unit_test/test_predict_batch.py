@@ -0,0 +1,128 @@
+"""
+Tests for the batch prediction endpoint
+Covers JSON and NDJSON input, per-record errors and parity with /api/predict
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+
+
+SAMPLE_RECORD = {
+    'income': 100000,
+    'rent': 20000,
+    'food': 10000,
+    'travel': 5000,
+    'shopping': 5000,
+    'emi': 10000,
+    'savings': 40000
+}
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    with create_app({'TESTING': True}).test_client() as client:
+        yield client
+
+
+def parse_ndjson(response):
+    """Decode an NDJSON response body into a list of dictionaries"""
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_batch_json_array(client):
+    """Test POST /api/predict/batch with a JSON array"""
+    records = [SAMPLE_RECORD, {**SAMPLE_RECORD, 'savings': 0, 'shopping': 30000}]
+
+    response = client.post('/api/predict/batch', json=records)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    results = parse_ndjson(response)
+    assert [r['index'] for r in results] == [0, 1]
+    for result in results:
+        assert result['success'] is True
+        for key in ['score', 'classification', 'patterns', 'guidance', 'anomalies', 'investments']:
+            assert key in result
+
+
+def test_batch_matches_single_prediction(client):
+    """Test that batch scores match /api/predict for the same record"""
+    single = json.loads(client.post('/api/predict', json=SAMPLE_RECORD).data)
+
+    response = client.post('/api/predict/batch', json={'records': [SAMPLE_RECORD]})
+    batch = parse_ndjson(response)[0]
+
+    assert batch['score'] == single['score']
+    assert batch['classification'] == single['classification']
+    assert batch['patterns'] == single['patterns']
+    assert batch['investments'] == single['investments']
+
+
+def test_batch_ndjson_input(client):
+    """Test POST /api/predict/batch with NDJSON input, including a bad line"""
+    body = '\n'.join([json.dumps(SAMPLE_RECORD), '{not json', json.dumps(SAMPLE_RECORD)]) + '\n'
+
+    response = client.post('/api/predict/batch', data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    results = parse_ndjson(response)
+    assert len(results) == 3
+    assert results[0]['success'] is True
+    assert results[1]['success'] is False
+    assert 'Invalid JSON line' in results[1]['error']
+    assert results[2]['score'] == results[0]['score']
+
+
+def test_batch_reports_invalid_records(client):
+    """Test that invalid records are reported without aborting the batch"""
+    records = [SAMPLE_RECORD, {'income': 50000, 'emi': -5, 'savings': 0}, {'income': 1000}]
+
+    results = parse_ndjson(client.post('/api/predict/batch', json=records))
+
+    assert results[0]['success'] is True
+    assert results[1] == {'index': 1, 'success': False,
+                          'error': 'Invalid value for emi. Must be non-negative number.'}
+    assert results[2]['error'] == 'Missing required field: emi'
+
+
+def test_batch_reports_invalid_optional_fields(client):
+    """Test that a non-numeric optional field fails only its own record"""
+    records = [SAMPLE_RECORD, {**SAMPLE_RECORD, 'age': 'x'}, {**SAMPLE_RECORD, 'rent': None}, SAMPLE_RECORD]
+
+    results = parse_ndjson(client.post('/api/predict/batch', json=records))
+
+    assert [r['index'] for r in results] == [0, 1, 2, 3]
+    assert results[0]['success'] is True and results[3]['success'] is True
+    for result in results[1:3]:
+        assert result == {'index': result['index'], 'success': False,
+                          'error': 'Invalid value for an optional field. Must be a number.'}
+
+
+def test_batch_spans_multiple_chunks(client):
+    """Test that indexes stay contiguous across prediction chunks"""
+    original_chunk_size = client.application.config['PREDICT_BATCH_CHUNK_SIZE']
+    client.application.config['PREDICT_BATCH_CHUNK_SIZE'] = 2
+    try:
+        records = [{**SAMPLE_RECORD, 'savings': 1000 * i} for i in range(5)]
+        results = parse_ndjson(client.post('/api/predict/batch', json=records))
+    finally:
+        client.application.config['PREDICT_BATCH_CHUNK_SIZE'] = original_chunk_size
+
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert all(r['success'] for r in results)
+
+
+def test_batch_rejects_non_array_body(client):
+    """Test that a body which is not a list of records returns 400"""
+    response = client.post('/api/predict/batch', json={'income': 1000})
+
+    assert response.status_code == 400
+    assert json.loads(response.data)['success'] is False
@@ -0,0 +1,130 @@
+"""
+Unit tests for Prediction_Cache
+Tests LRU eviction, TTL expiry, model-version invalidation and endpoint integration
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_cache import PredictionCache, canonical_key, model_version_for
+
+
+class FakeClock:
+    """Manually advanced time source"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_canonical_key_normalises_numbers():
+    """Test that int and float inputs share a key"""
+    assert canonical_key('score', [100000, 5]) == canonical_key('score', [100000.0, 5.0])
+    assert canonical_key('score', [1, 2]) != canonical_key('result', [1, 2])
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = PredictionCache(max_size=2, ttl_seconds=0)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['size'] == 2
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_ttl_expiry():
+    """Test that entries expire after ttl_seconds"""
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.put('a', 1)
+
+    clock.now = 59
+    assert cache.get('a') == 1
+    clock.now = 60
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_model_version_change_invalidates():
+    """Test that binding a different model version drops cached entries"""
+    cache = PredictionCache()
+    cache.set_model_version('v1')
+    cache.put('a', 1)
+
+    cache.set_model_version('v1')
+    assert cache.get('a') == 1
+
+    cache.set_model_version('v2')
+    assert cache.get('a') is None
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['model_version'] == 'v2'
+
+
+def test_zero_size_disables_cache():
+    """Test that max_size=0 never stores entries"""
+    cache = PredictionCache(max_size=0)
+    cache.put('a', 1)
+
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_model_version_for_tracks_content(tmp_path):
+    """Test that the model version changes with file content"""
+    path = tmp_path / 'model.pkl'
+    path.write_bytes(b'first model')
+    first = model_version_for(str(path))
+    path.write_bytes(b'second model')
+
+    assert len(first) == 16
+    assert model_version_for(str(path)) != first
+
+
+@pytest.fixture
+def client():
+    """Create test client with an empty prediction cache"""
+    from app import create_app
+    with create_app({'TESTING': True}).test_client() as client:
+        yield client
+
+
+def test_repeated_predict_hits_cache(client):
+    """Test that a repeated /api/predict payload is served from the cache"""
+    payload = {'income': 91000, 'rent': 21000, 'food': 9000, 'travel': 4000,
+               'shopping': 6000, 'emi': 8000, 'savings': 30000}
+
+    first = json.loads(client.post('/api/predict', json=payload).data)
+    hits_before = json.loads(client.get('/api/model-info').data)['prediction_cache']['hits']
+    second = json.loads(client.post('/api/predict', json=payload).data)
+    stats = json.loads(client.get('/api/model-info').data)['prediction_cache']
+
+    assert stats['hits'] == hits_before + 1
+    for key in ['score', 'classification', 'patterns', 'guidance', 'anomalies', 'investments']:
+        assert second[key] == first[key]
+
+
+def test_whatif_reuses_cached_scores(client):
+    """Test that /api/whatif scores are shared with earlier scenarios"""
+    scenario = {'income': 64000, 'expenses': 30000, 'emi': 5000, 'savings': 9000}
+
+    first = json.loads(client.post('/api/whatif', json={'current': scenario, 'modified': scenario}).data)
+    hits_before = json.loads(client.get('/api/model-info').data)['prediction_cache']['hits']
+    second = json.loads(client.post('/api/whatif', json={'current': scenario, 'modified': scenario}).data)
+    stats = json.loads(client.get('/api/model-info').data)['prediction_cache']
+
+    assert stats['hits'] == hits_before + 2
+    assert second['current_score'] == first['current_score'] == first['modified_score']
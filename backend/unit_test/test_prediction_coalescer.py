@@ -0,0 +1,144 @@
+"""
+Unit tests for Prediction_Coalescer
+Tests direct prediction under light load, micro-batching of concurrent callers,
+error propagation to every caller in a batch, and the exposed metrics
+"""
+
+import pytest
+import threading
+import time
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_coalescer import PredictionCoalescer
+
+
+class RecordingModel:
+    """Sums each row; records the size of every call and takes `delay` seconds per call"""
+
+    def __init__(self, fail=False, delay=0.02):
+        self.batch_sizes = []
+        self.fail = fail
+        self.delay = delay
+
+    def predict(self, matrix):
+        self.batch_sizes.append(len(matrix))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('model exploded')
+        return matrix.sum(axis=1)
+
+
+def run_concurrently(coalescer, row_sets):
+    """Call coalescer.predict from one thread per row set, released together"""
+    barrier = threading.Barrier(len(row_sets))
+    results = [None] * len(row_sets)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = coalescer.predict(row_sets[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(row_sets))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_single_caller_predicts_directly():
+    """Test that a lone request bypasses the queue and uses predict_one for one row"""
+    model = RecordingModel()
+    calls = []
+    coalescer = PredictionCoalescer(model.predict, lambda row: calls.append(row) or sum(row), window_ms=50)
+
+    assert coalescer.predict([[1.0, 2.0]]).tolist() == [3.0]
+    assert coalescer.predict([[1.0, 2.0], [3.0, 4.0]]).tolist() == [3.0, 7.0]
+
+    stats = coalescer.stats()
+    assert calls == [[1.0, 2.0]] and model.batch_sizes == [2]
+    assert stats['direct_requests'] == 2 and stats['coalesced_requests'] == 0
+    assert stats['batches'] == 0
+
+
+def test_concurrent_callers_share_batches():
+    """Test that concurrent requests are scored in fewer model calls, each getting its own rows"""
+    model = RecordingModel()
+    coalescer = PredictionCoalescer(model.predict, window_ms=50, max_batch=256)
+    row_sets = [[[float(i), 1.0]] for i in range(16)]
+
+    results = run_concurrently(coalescer, row_sets)
+
+    assert [r.tolist() for r in results] == [[i + 1.0] for i in range(16)]
+    stats = coalescer.stats()
+    assert stats['direct_requests'] + stats['coalesced_requests'] == 16
+    assert stats['coalesced_requests'] >= 2
+    assert stats['batches'] < stats['coalesced_requests']
+    assert len(model.batch_sizes) < 16
+    assert sum(stats['batch_size_histogram'].values()) == stats['batches']
+    assert stats['rows_predicted'] == stats['coalesced_requests']
+    assert stats['queue_depth'] == 0
+
+
+def test_multi_row_requests_are_split_back():
+    """Test that results are sliced back per caller when requests carry several rows"""
+    model = RecordingModel()
+    coalescer = PredictionCoalescer(model.predict, window_ms=50)
+    row_sets = [[[float(i), 0.0]] * (i + 1) for i in range(6)]
+
+    results = run_concurrently(coalescer, row_sets)
+
+    for i, result in enumerate(results):
+        assert result.tolist() == [float(i)] * (i + 1)
+
+
+def test_max_batch_closes_batch_early():
+    """Test that no coalesced model call exceeds max_batch rows (unless one request does)"""
+    model = RecordingModel()
+    coalescer = PredictionCoalescer(model.predict, window_ms=200, max_batch=4)
+
+    results = run_concurrently(coalescer, [[[1.0, 1.0]] * 2 for _ in range(10)])
+
+    assert all(r.tolist() == [2.0, 2.0] for r in results)
+    assert max(model.batch_sizes) <= 4
+
+
+def test_batch_errors_reach_every_caller():
+    """Test that a failing batched call raises in every waiting request"""
+    coalescer = PredictionCoalescer(RecordingModel(fail=True).predict, window_ms=50)
+
+    results = run_concurrently(coalescer, [[[1.0, 2.0]] for _ in range(8)])
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    stats = coalescer.stats()
+    assert stats['failed_batches'] == stats['batches']
+
+
+def test_zero_window_disables_coalescing():
+    """Test that window_ms=0 scores every request directly"""
+    model = RecordingModel()
+    coalescer = PredictionCoalescer(model.predict, window_ms=0)
+
+    results = run_concurrently(coalescer, [[[float(i), 0.0]] for i in range(8)])
+
+    assert sorted(r[0] for r in results) == list(range(8))
+    stats = coalescer.stats()
+    assert stats['direct_requests'] == 8 and stats['batches'] == 0
+    assert stats['added_latency_ms'] == {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+
+
+def test_model_info_reports_coalescer():
+    """Test that /api/model-info exposes the coalescer metrics"""
+    from app import create_app
+
+    with create_app({'TESTING': True}).test_client() as client:
+        response = client.get('/api/model-info')
+
+    stats = response.get_json()['prediction_coalescer']
+    assert {'queue_depth', 'batch_size_histogram', 'added_latency_ms', 'direct_requests'} <= set(stats)
@@ -11,6 +11,8 @@ import os
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash
 
+from db_utils import init_goal_priority_rank
+
 
 def create_test_app():
     """Create a test Flask app with test database"""
@@ -64,6 +66,7 @@ def create_test_app():
             FOREIGN KEY (user_id) REFERENCES users_profile(user_id) ON DELETE CASCADE
         )
     ''')
+    init_goal_priority_rank(conn)
     
     # Create test user
     password_hash = generate_password_hash('testpass123')
@@ -78,16 +81,11 @@ def create_test_app():
     # Import app and configure for testing
     import app as flask_app
     flask_app.DB_PATH = db_path
-    flask_app.app.config['TESTING'] = True
-    flask_app.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
     
-    # Reinitialize services with test database
-    from profile_service import ProfileService
-    from goals_service import GoalsService
-    flask_app.profile_service = ProfileService(db_path)
-    flask_app.goals_service = GoalsService(db_path)
+    # create_app() builds the services on DB_PATH, i.e. the test database
+    app = flask_app.create_app({'TESTING': True, 'JWT_SECRET_KEY': 'test-secret-key'})
     
-    return flask_app.app, db_path
+    return app, db_path
 
 
 def get_auth_token(client):
@@ -71,18 +71,15 @@ def create_test_app():
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     import app as flask_app
     flask_app.DB_PATH = db_path
-    flask_app.app.config['TESTING'] = True
-    flask_app.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
     
     # Create temporary upload folder
     upload_dir = tempfile.mkdtemp()
-    flask_app.app.config['UPLOAD_FOLDER'] = upload_dir
     
-    # Reinitialize services with test database
-    from profile_service import ProfileService
-    flask_app.profile_service = ProfileService(db_path)
+    # create_app() builds the services on DB_PATH, i.e. the test database
+    app = flask_app.create_app({'TESTING': True, 'JWT_SECRET_KEY': 'test-secret-key',
+                                'UPLOAD_FOLDER': upload_dir})
     
-    return flask_app.app, db_path, upload_dir
+    return app, db_path, upload_dir
 
 
 def get_auth_token(client):
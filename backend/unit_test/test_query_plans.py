@@ -0,0 +1,176 @@
+"""
+Unit tests for Query Plans
+Runs the hot service calls against a fully migrated database, captures every
+statement they execute, and asserts that EXPLAIN QUERY PLAN shows neither a
+full scan nor a temp B-tree sort for any of them
+"""
+
+import pytest
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections, get_connection
+from export_service import ExportService
+from financial_health_scorer import FinancialHealthScorer
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from loan_metrics_engine import LoanMetricsEngine
+from migrations import migrate
+import write_queue
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+PAYMENT_DATA = {'payment_date': '2024-02-15', 'payment_amount': 4614.49}
+
+GOAL_DATA = {'goal_type': 'long-term', 'target_amount': 5000.0, 'target_date': '2030-01-01', 'priority': 'medium'}
+
+# Statements with no query plan of their own
+UNPLANNED = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA')
+
+
+class Hot:
+    """Services and seeded rows the hot calls run against"""
+
+    def __init__(self, db_path):
+        self.loans = LoanHistoryService(db_path)
+        self.metrics = LoanMetricsEngine(db_path)
+        self.goals = GoalsService(db_path)
+        self.export = ExportService(db_path)
+        self.scorer = FinancialHealthScorer(db_path)
+
+        for user_id in (1, 2):
+            for _ in range(3):
+                loan = self.loans.createLoan(user_id, LOAN_DATA)
+                self.loans.recordPayment(loan['loan_id'], PAYMENT_DATA, user_id=user_id)
+            for priority in ('high', 'low'):
+                self.goals.create_goal(user_id, {**GOAL_DATA, 'priority': priority})
+        self.loans.deleteLoan(loan['loan_id'], 2)
+
+        self.loan_id = self.loans.getLoansPage(1, 1)['loans'][0]['loan_id']
+        self.goal_id = self.goals.get_goals(1)[0]['id']
+
+
+HOT_CALLS = {
+    'create_loan': lambda h: h.loans.createLoan(1, LOAN_DATA),
+    'get_loan': lambda h: h.loans.getLoan(h.loan_id),
+    'loans_page': lambda h: h.loans.getLoansPage(1, 1, h.loans.getLoansPage(1, 1)['next_cursor']),
+    'loans_page_with_deleted': lambda h: h.loans.getLoansPage(2, 1, include_deleted=True),
+    'update_loan': lambda h: h.loans.updateLoan(h.loan_id, 1, {'loan_type': 'home'}),
+    'delete_loan': lambda h: h.loans.deleteLoan(h.loan_id, 1),
+    'record_payment': lambda h: h.loans.recordPayment(h.loan_id, PAYMENT_DATA, user_id=1),
+    'payment_page': lambda h: h.loans.getPaymentHistoryPage(h.loan_id, 1, user_id=1),
+    'payment_page_unscoped': lambda h: h.loans.getPaymentHistoryPage(h.loan_id, 1),
+    'delete_payment': lambda h: h.loans.deletePayment(
+        h.loans.getPaymentHistory(h.loan_id)[0]['payment_id'], h.loan_id, user_id=1),
+    'loan_metrics': lambda h: h.metrics.computeAllMetrics(1),
+    'payment_statistics': lambda h: h.metrics.getPaymentStatistics(1),
+    'loan_statistics': lambda h: h.metrics.getLoanStatistics(1),
+    'goals_page': lambda h: h.goals.get_goals_page(1, 1, h.goals.get_goals_page(1, 1)['next_cursor']),
+    'goals_by_status': lambda h: h.goals.get_goals(1, filters={'status': 'active'}),
+    'create_goal': lambda h: h.goals.create_goal(1, GOAL_DATA),
+    'update_goal': lambda h: h.goals.update_goal(h.goal_id, 1, {'priority': 'low'}),
+    'delete_goal': lambda h: h.goals.delete_goal(h.goal_id, 1),
+    'goal_count': lambda h: h.goals.get_user_goals_count(1),
+    'export': lambda h: list(h.export.iter_ndjson(1, ['profile', 'loans', 'payments', 'goals'])),
+    'score_history': lambda h: h.scorer.getScoreHistory(1)
+}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Database built by the migration runner, as in production"""
+    # Writes run inline, on the connection being traced
+    monkeypatch.setattr(write_queue, 'WRITE_QUEUE_ENABLED', False)
+    db_path = str(tmp_path / 'plans.db')
+    migrate(db_path)
+    yield db_path
+    close_thread_connections()
+
+
+def traced_statements(db_path, call):
+    """Run call and return the distinct statements it executed, with parameters bound"""
+    statements = []
+    conn = get_connection(db_path)
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+        conn.close()
+
+    distinct = []
+    for statement in statements:
+        statement = ' '.join(statement.split())
+        # Trigger bodies are reported as comments and planned with their statement
+        if statement.startswith('--') or statement.split(' ', 1)[0].upper() in UNPLANNED:
+            continue
+        if statement not in distinct:
+            distinct.append(statement)
+    return distinct
+
+
+def plan_of(conn, statement):
+    """EXPLAIN QUERY PLAN detail lines of a statement"""
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + statement)]
+
+
+@pytest.mark.parametrize('name', list(HOT_CALLS))
+def test_hot_statements_use_indexes(db_path, name):
+    """Test that no statement of a hot call scans a table or sorts in a temp B-tree"""
+    hot = Hot(db_path)
+    statements = traced_statements(db_path, lambda: HOT_CALLS[name](hot))
+    assert statements, name
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for statement in statements:
+            plan = plan_of(conn, statement)
+            assert not any(detail.startswith('SCAN ') for detail in plan), (statement, plan)
+            assert not any('TEMP B-TREE' in detail for detail in plan), (statement, plan)
+    finally:
+        conn.close()
+
+
+def test_active_reads_use_partial_indexes(db_path):
+    """Test that active-loan reads only visit the partial indexes"""
+    Hot(db_path)
+    conn = sqlite3.connect(db_path)
+    listing = ' '.join(plan_of(conn, 'SELECT loan_id FROM loans WHERE user_id = 1 AND deleted_at IS NULL '
+                                     'ORDER BY created_at DESC, loan_id DESC'))
+    maturity = ' '.join(plan_of(conn, 'SELECT MIN(loan_maturity_date) FROM loans '
+                                      'WHERE user_id = 1 AND deleted_at IS NULL'))
+    conn.close()
+
+    assert 'idx_loans_active_user_created' in listing
+    assert 'idx_loans_active_user_maturity' in maturity
+
+
+def test_priority_rank_follows_priority(db_path):
+    """Test that the triggers keep priority_rank in step on insert and update"""
+    goals = GoalsService(db_path)
+    goal = goals.create_goal(1, GOAL_DATA)
+
+    def rank():
+        conn = sqlite3.connect(db_path)
+        value = conn.execute('SELECT priority_rank FROM financial_goals WHERE id = ?', (goal['id'],)).fetchone()[0]
+        conn.close()
+        return value
+
+    assert rank() == 2
+    goals.update_goal(goal['id'], 1, {'priority': 'high'})
+    assert rank() == 1
+    goals.update_goal(goal['id'], 1, {'description': 'unchanged priority'})
+    assert rank() == 1
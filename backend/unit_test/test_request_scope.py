@@ -0,0 +1,201 @@
+"""
+Unit tests for Request_Scope
+Tests the per-request identity map used by the loan and profile services,
+write-through of cached rows, and per-request SQL statement counting
+"""
+
+import pytest
+import json
+import sqlite3
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from loan_history_service import LoanHistoryService
+from profile_service import ProfileService
+from request_scope import (
+    begin_request, end_request, get_request_stats, reset_request_stats, stored_value, update_row
+)
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'monthly_emi': 4614.49,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database with loan tables and users_profile"""
+    db_path = str(tmp_path / 'scope.db')
+    init_loan_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE users_profile (
+            user_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            location TEXT NOT NULL,
+            risk_tolerance INTEGER,
+            profile_picture_url TEXT,
+            notification_preferences TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    conn.commit()
+    conn.close()
+    yield db_path
+    end_request()
+    close_thread_connections()
+
+
+@pytest.fixture
+def service(db_path):
+    return LoanHistoryService(db_path)
+
+
+def test_loan_read_once_per_scope(service):
+    """Test that repeated getLoan calls in one scope issue a single query"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    scope = begin_request('test')
+    loans = [service.getLoan(loan_id) for _ in range(3)]
+    end_request()
+
+    assert scope.sql_statements == 1
+    assert scope.rows_loaded == 1 and scope.rows_reused == 2
+    assert loans[0] == loans[2] and loans[0] is not loans[1]
+
+
+def test_no_caching_outside_scope(service):
+    """Test that without a scope every read goes to the database"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+    first = service.getLoan(loan_id)
+    first['loan_type'] = 'home'
+
+    assert service.getLoan(loan_id)['loan_type'] == 'personal'
+
+
+def test_update_loan_writes_through(service):
+    """Test that updateLoan reuses and updates the cached row, matching a fresh read"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    scope = begin_request('test')
+    service.getLoan(loan_id)  # route-level ownership check
+    updated = service.updateLoan(loan_id, 1, {'loan_amount': 100000, 'loan_tenure': 24.0, 'default_status': True})
+    end_request()
+
+    # One SELECT and the UPDATE; updateLoan's two internal reads come from the identity map
+    assert scope.sql_statements == 2
+    assert updated == service.getLoan(loan_id)
+    assert isinstance(updated['loan_amount'], float) and isinstance(updated['loan_tenure'], int)
+
+
+def test_update_with_unpredictable_value_rereads(service):
+    """Test that a value whose stored form is uncertain drops the cached row"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    begin_request('test')
+    service.getLoan(loan_id)
+    updated = service.updateLoan(loan_id, 1, {'loan_amount': '100000', 'loan_type': 'home'})
+    end_request()
+
+    assert updated['loan_amount'] == 100000.0 and updated['loan_type'] == 'home'
+    assert updated == service.getLoan(loan_id)
+
+
+def test_delete_loan_updates_cached_row(service):
+    """Test that a soft delete is visible to later reads in the same scope"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+
+    scope = begin_request('test')
+    service.getLoan(loan_id)
+    assert service.deleteLoan(loan_id, 1)
+    cached = service.getLoan(loan_id)
+    end_request()
+
+    assert cached['deleted_at'] is not None
+    assert cached == service.getLoan(loan_id)
+    assert scope.rows_loaded == 1
+
+
+def test_profile_identity_map(db_path):
+    """Test profile reads, a cached miss followed by create, and update write-through"""
+    profiles = ProfileService(db_path)
+
+    scope = begin_request('test')
+    assert not profiles.profile_exists(1)
+    created = profiles.create_profile(1, {'name': 'Asha', 'age': 30, 'location': 'Pune'})
+    updated = profiles.update_profile(1, {'age': 31, 'notification_preferences': {'email': False}})
+    again = profiles.get_profile(1)
+    end_request()
+
+    assert created['name'] == 'Asha'
+    assert updated == again == profiles.get_profile(1)
+    assert again['notification_preferences'] == {'email': False}
+    assert scope.rows_loaded == 2  # the miss, then the row after create
+
+    begin_request('test')
+    profiles.delete_profile(1)
+    assert profiles.get_profile(1) is None
+    end_request()
+
+
+def test_stored_value_follows_affinity():
+    """Test conversions to the stored form, and refusal of uncertain cases"""
+    assert stored_value(5, 'REAL') == 5.0 and isinstance(stored_value(5, 'REAL'), float)
+    assert stored_value(6.0, 'INTEGER') == 6 and isinstance(stored_value(6.0, 'INTEGER'), int)
+    assert stored_value(6.5, 'INTEGER') == 6.5
+    assert stored_value(True, 'INTEGER') == 1
+    assert stored_value('2024-01-01', 'TEXT') == '2024-01-01'
+    assert stored_value(None, 'REAL') is None
+    for value, affinity in [('5', 'REAL'), (5, 'TEXT'), (float('nan'), 'REAL')]:
+        with pytest.raises(TypeError):
+            stored_value(value, affinity)
+    update_row('x.db', 'loans', 'a', {'loan_amount': '5'}, {'loan_amount': 'REAL'})  # no scope: no-op
+
+
+@pytest.fixture
+def client(service):
+    """Test client whose loan service uses the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['loan_service'] = service
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_statement_count_header_and_stats(client, service):
+    """Test the X-SQL-Statements header and per-endpoint statistics"""
+    loan_id = service.createLoan(1, LOAN_DATA)['loan_id']
+    reset_request_stats()
+
+    response = client.put(f'/api/loans/{loan_id}', json={'loan_type': 'home'})
+
+    assert response.status_code == 200
+    assert json.loads(response.data)['loan']['loan_type'] == 'home'
+    assert response.headers['X-SQL-Statements'] == '2'
+
+    stats = get_request_stats()
+    assert stats['endpoints']['update_loan'] == {
+        'requests': 1, 'avg_sql_statements': 2.0, 'max_sql_statements': 2
+    }
+    served = json.loads(client.get('/api/db/pool-stats').data)
+    assert served['requests']['requests'] >= 1
+    assert served['write_queue']['jobs'] >= 1 and served['write_queue']['lock_errors'] == 0
+    assert served['score_history']['dropped'] == 0
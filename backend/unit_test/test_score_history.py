@@ -0,0 +1,201 @@
+"""
+Unit tests for Score_History
+Tests the write-behind queue, score_history reads through the covering index,
+and recording from calculateFinancialHealthScore and /api/predict
+"""
+
+import pytest
+import json
+import sqlite3
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables, init_score_history
+from financial_health_scorer import FinancialHealthScorer
+from score_history import ScoreHistoryWriter, score_history_writer
+
+
+FINANCIAL_DATA = {
+    'income': 100000, 'savings': 25000, 'rent': 20000, 'food': 10000,
+    'travel': 5000, 'shopping': 5000, 'emi': 15000, 'age': 32
+}
+
+
+@pytest.fixture
+def test_db(tmp_path):
+    """Database with loan tables and score_history"""
+    db_path = str(tmp_path / 'history.db')
+    init_loan_tables(db_path)
+    yield db_path
+    score_history_writer.flush()
+    close_thread_connections()
+
+
+def history_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT user_id, overall_score, source FROM score_history ORDER BY id').fetchall()
+    conn.close()
+    return rows
+
+
+def test_writer_batches_rows(test_db):
+    """Test that rows are buffered and written in batch_size transactions"""
+    writer = ScoreHistoryWriter(batch_size=3, flush_interval=5.0)
+
+    for score in range(7):
+        writer.append(test_db, 1, {'overall_score': float(score)})
+    assert writer.flush()
+
+    assert [row[1] for row in history_rows(test_db)] == [float(score) for score in range(7)]
+    stats = writer.stats()
+    assert stats['written'] == 7 and stats['pending'] == 0
+    assert stats['batches'] <= 3
+
+
+def test_writer_flushes_partial_batch_after_interval(test_db):
+    """Test that a partial batch is written without an explicit flush"""
+    writer = ScoreHistoryWriter(batch_size=100, flush_interval=0.05)
+    writer.append(test_db, 1, {'overall_score': 50.0})
+
+    deadline = time.monotonic() + 5
+    while writer.stats()['written'] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert history_rows(test_db) == [(1, 50.0, 'health')]
+
+
+def test_writer_waits_for_room_when_buffer_is_full(test_db):
+    """Test that an append into a full buffer waits for the writer instead of dropping"""
+    writer = ScoreHistoryWriter(batch_size=100, flush_interval=5.0, max_pending=2)
+
+    accepted = [writer.append(test_db, 1, {'overall_score': 10.0}) for _ in range(3)]
+    writer.flush()
+
+    assert accepted == [True, True, True]
+    assert writer.stats()['waits'] == 1
+    assert writer.stats()['dropped'] == 0
+    assert len(history_rows(test_db)) == 3
+
+
+def test_writer_drops_rows_when_buffer_stays_full(test_db):
+    """Test that a row is dropped and counted only after the wait for room times out"""
+    writer = ScoreHistoryWriter(batch_size=1, flush_interval=5.0, max_pending=1, full_wait=0.1)
+    release = threading.Event()
+    write = writer._write
+    writer._write = lambda db_path, rows: release.wait(5) and write(db_path, rows)
+
+    accepted = [writer.append(test_db, 1, {'overall_score': 10.0}) for _ in range(3)]
+    release.set()
+    writer.flush()
+
+    assert accepted == [True, True, False]
+    assert writer.stats()['dropped'] == 1
+    assert len(history_rows(test_db)) == 2
+
+
+def test_scoring_appends_history(test_db):
+    """Test that calculateFinancialHealthScore records each score, newest first"""
+    scorer = FinancialHealthScorer(test_db)
+
+    first = scorer.calculateFinancialHealthScore(1, FINANCIAL_DATA)
+    second = scorer.calculateFinancialHealthScore(1, {**FINANCIAL_DATA, 'savings': 0})
+    history = scorer.getScoreHistory(1)
+
+    assert [entry['score'] for entry in history] == [second['overall_score'], first['overall_score']]
+    assert history[0]['source'] == 'health'
+    assert history[0]['factors'][0] == {'name': 'Savings', 'score': second['savings_score']}
+    assert scorer.getScoreHistory(2) == []
+
+
+def test_history_query_uses_covering_index(test_db):
+    """Test that history reads are answered from idx_score_history_user_time alone"""
+    conn = sqlite3.connect(test_db)
+    plan = ' '.join(row[3] for row in conn.execute('''
+        EXPLAIN QUERY PLAN
+        SELECT overall_score, savings_score, debt_score, expense_score,
+               balance_score, life_stage_score, loan_diversity_score,
+               payment_history_score, loan_maturity_score, source, calculated_at
+        FROM score_history
+        WHERE user_id = ?
+        ORDER BY calculated_at DESC
+        LIMIT ?
+    ''', (1, 10)))
+    conn.close()
+
+    assert 'COVERING INDEX idx_score_history_user_time' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_init_adds_source_to_existing_table(tmp_path):
+    """Test that a score_history table without source is migrated"""
+    conn = sqlite3.connect(str(tmp_path / 'old.db'))
+    conn.execute('''
+        CREATE TABLE score_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+            overall_score REAL NOT NULL, savings_score REAL, debt_score REAL,
+            expense_score REAL, balance_score REAL, life_stage_score REAL,
+            loan_diversity_score REAL, payment_history_score REAL,
+            loan_maturity_score REAL, calculated_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute("INSERT INTO score_history (user_id, overall_score, calculated_at) VALUES (1, 60, '2026-01-01')")
+
+    init_score_history(conn)
+
+    assert conn.execute('SELECT source FROM score_history').fetchone() == ('health',)
+    conn.close()
+
+
+@pytest.fixture
+def client(test_db, monkeypatch):
+    """Test client writing score history to the test database"""
+    import app as app_module
+    from flask_jwt_extended import create_access_token
+
+    # /api/predict records to DB_PATH; the scorer is built from it by create_app()
+    monkeypatch.setattr(app_module, 'DB_PATH', test_db)
+    app = app_module.create_app({'TESTING': True})
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.token = token
+        yield client
+
+
+def test_authenticated_predict_is_recorded(client, test_db):
+    """Test that /api/predict records scores only for authenticated callers"""
+    payload = {'income': 91000, 'rent': 21000, 'food': 9000, 'travel': 4000,
+               'shopping': 6000, 'emi': 8000, 'savings': 30000}
+
+    anonymous = client.post('/api/predict', json=payload)
+    expired = client.post('/api/predict', json=payload, headers={'Authorization': 'Bearer not-a-token'})
+    signed_in = client.post('/api/predict', json=payload, headers={'Authorization': f'Bearer {client.token}'})
+    score_history_writer.flush()
+
+    assert anonymous.status_code == expired.status_code == signed_in.status_code == 200
+    assert history_rows(test_db) == [(1, json.loads(signed_in.data)['score'], 'predict')]
+
+
+def test_score_history_endpoint(client):
+    """Test GET /api/score/history/<user_id> and its ownership check"""
+    headers = {'Authorization': f'Bearer {client.token}'}
+    client.post('/api/predict', headers=headers, json={
+        'income': 50000, 'rent': 15000, 'food': 8000, 'travel': 2000,
+        'shopping': 3000, 'emi': 5000, 'savings': 10000
+    })
+
+    response = client.get('/api/score/history/1?limit=5', headers=headers)
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['count'] == 1
+    assert data['history'][0]['source'] == 'predict'
+    assert data['history'][0]['factors'] == []
+    assert client.get('/api/score/history/2', headers=headers).status_code == 403
+    assert client.get('/api/score/history/1?limit=0', headers=headers).status_code == 400
@@ -0,0 +1,162 @@
+"""
+Unit tests for ScoreResult
+Tests that score, breakdown and delta come from a single scoring pass, that
+they match the factor formulas, and the combined /api/score/full endpoint
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amortization_engine import build_schedule
+from connection_pool import close_thread_connections
+from db_utils import init_loan_tables
+from financial_health_scorer import FACTOR_NAMES, FinancialHealthScorer, ScoreResult
+from loan_history_service import LoanHistoryService
+from score_history import score_history_writer
+
+
+FINANCIAL_DATA = {
+    'income': 100000, 'savings': 25000, 'rent': 20000, 'food': 10000,
+    'travel': 5000, 'shopping': 5000, 'emi': 15000, 'age': 32
+}
+
+LOAN_DATA = {
+    'loan_type': 'home',
+    'loan_amount': 100000.0,
+    'loan_tenure': 24,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2026-01-15'
+}
+
+
+@pytest.fixture
+def scorer(tmp_path):
+    """Scorer on a database where user 1 has one loan with a payment"""
+    db_path = str(tmp_path / 'score_result.db')
+    init_loan_tables(db_path)
+    service = LoanHistoryService(db_path)
+    loan = service.createLoan(1, {
+        **LOAN_DATA, 'monthly_emi': round(build_schedule({**LOAN_DATA, 'loan_id': ''}).monthly_emi, 2)
+    })
+    service.recordPayment(loan['loan_id'], {'payment_date': '2024-01-10', 'payment_amount': 4614.49})
+    yield FinancialHealthScorer(db_path)
+    score_history_writer.flush()
+    close_thread_connections()
+
+
+def count_metric_calls(scorer, monkeypatch):
+    calls = []
+    compute = scorer.loan_metrics_engine.computeAllMetrics
+
+    def counting(user_id):
+        calls.append(user_id)
+        return compute(user_id)
+
+    monkeypatch.setattr(scorer.loan_metrics_engine, 'computeAllMetrics', counting)
+    return calls
+
+
+def test_score_user_reads_loan_metrics_once(scorer, monkeypatch):
+    """Test that deriving score, breakdown and delta needs one loan metrics read"""
+    calls = count_metric_calls(scorer, monkeypatch)
+
+    result = scorer.scoreUser(1, FINANCIAL_DATA)
+    result.to_dict(), result.breakdown(), result.delta()
+
+    assert calls == [1]
+
+
+@pytest.mark.parametrize('method', ['calculateFinancialHealthScore', 'getScoreBreakdown', 'calculateScoreDelta'])
+def test_public_methods_score_once(scorer, monkeypatch, method):
+    """Test that each public scoring method makes a single scoring pass"""
+    calls = count_metric_calls(scorer, monkeypatch)
+
+    getattr(scorer, method)(1, FINANCIAL_DATA)
+
+    assert calls == [1]
+
+
+def test_result_matches_factor_formulas(scorer):
+    """Test overall, breakdown and delta against the weighted factor sums"""
+    metrics = scorer.loan_metrics_engine.computeAllMetrics(1)
+    factors = {
+        'savings': scorer._calculate_savings_score(FINANCIAL_DATA),
+        'debt': scorer._calculate_debt_score(FINANCIAL_DATA),
+        'expense': scorer._calculate_expense_score(FINANCIAL_DATA),
+        'balance': scorer._calculate_balance_score(FINANCIAL_DATA),
+        'life_stage': scorer._calculate_life_stage_score(FINANCIAL_DATA),
+        'loan_diversity': metrics['loan_diversity_score'],
+        'payment_history': metrics['payment_history_score'],
+        'loan_maturity': metrics['loan_maturity_score']
+    }
+    with_loans = round(sum(factors[f] * w for f, w in scorer.WEIGHTS.items()), 2)
+    without_loans = round(sum({**factors, **scorer.LOAN_DEFAULTS}[f] * w for f, w in scorer.WEIGHTS.items()), 2)
+
+    result = scorer.scoreUser(1, FINANCIAL_DATA)
+    breakdown = result.breakdown()
+    delta = result.delta()
+
+    assert result.to_dict()['overall_score'] == breakdown['overall_score'] == with_loans
+    assert [f['name'] for f in breakdown['factors']] == list(FACTOR_NAMES.values())
+    assert [f['score'] for f in breakdown['factors']] == [round(factors[f], 2) for f in FACTOR_NAMES]
+    assert delta['score_with_loans'] == with_loans
+    assert delta['score_without_loans'] == without_loans
+    assert delta['delta'] == round(with_loans - without_loans, 2)
+
+
+def test_loan_defaults_when_metrics_fail(scorer, monkeypatch):
+    """Test that a failing loan metrics read falls back to LOAN_DEFAULTS with zero delta"""
+    def failing(user_id):
+        raise RuntimeError('metrics unavailable')
+
+    monkeypatch.setattr(scorer.loan_metrics_engine, 'computeAllMetrics', failing)
+    result = scorer.scoreUser(1, FINANCIAL_DATA)
+
+    assert result.factor_scores['payment_history'] == scorer.LOAN_DEFAULTS['payment_history']
+    assert result.delta()['delta'] == 0.0
+
+
+def test_score_clamped_to_range():
+    """Test that the overall score stays within 0-100"""
+    weights = FinancialHealthScorer.WEIGHTS
+    high = ScoreResult({factor: 150.0 for factor in weights}, weights, FinancialHealthScorer.LOAN_DEFAULTS)
+    low = ScoreResult({factor: -10.0 for factor in weights}, weights, FinancialHealthScorer.LOAN_DEFAULTS)
+
+    assert high.overall_score == 100.0
+    assert low.overall_score == 0.0
+
+
+@pytest.fixture
+def client(scorer):
+    """Test client scoring against the test database"""
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app({'TESTING': True})
+    app.extensions['smartfin']['health_scorer'] = scorer
+    with app.app_context():
+        token = create_access_token(identity='1')
+    with app.test_client() as client:
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        yield client
+
+
+def test_full_score_endpoint(client, scorer, monkeypatch):
+    """Test POST /api/score/full returns all three views from one scoring pass"""
+    calls = count_metric_calls(scorer, monkeypatch)
+
+    response = client.post('/api/score/full', json=FINANCIAL_DATA)
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert calls == [1]
+    assert data['score']['overall_score'] == data['breakdown']['overall_score'] == data['delta']['score_with_loans']
+    assert len(data['breakdown']['factors']) == 8
+    assert client.post('/api/score/full', json={'income': 1000}).status_code == 400
+    assert client.post('/api/score/full', json={**FINANCIAL_DATA, 'age': 'old'}).status_code == 400
@@ -9,6 +9,7 @@ import sqlite3
 import tempfile
 from profile_service import ProfileService
 from goals_service import GoalsService
+from db_utils import init_goal_priority_rank
 
 
 def create_test_db():
@@ -61,6 +62,7 @@ def create_test_db():
             FOREIGN KEY (user_id) REFERENCES users_profile(user_id) ON DELETE CASCADE
         )
     ''')
+    init_goal_priority_rank(conn)
     
     conn.commit()
     conn.close()
@@ -12,6 +12,7 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from db_utils import create_loan_schema
 from loan_data_serializer import LoanDataSerializer
 from loan_history_service import LoanHistoryService
 from loan_metrics_engine import LoanMetricsEngine
@@ -63,6 +64,7 @@ class TestSerializerIntegration:
                 FOREIGN KEY (loan_id) REFERENCES loans(loan_id)
             )
         ''')
+        create_loan_schema(conn)
         
         conn.commit()
         conn.close()
@@ -0,0 +1,130 @@
+"""
+Unit tests for Structured_Logging
+Tests JSON formatting, level-based access log sampling, the queue listener's
+interval flushing, and the access records written by the Flask app
+"""
+
+import pytest
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structured_logging import (
+    BufferedFileHandler, BufferedStdoutHandler, FlushingQueueListener, JsonFormatter, SamplingFilter
+)
+
+
+def make_record(level=logging.INFO, msg='hello %s', args=('world',), **extra):
+    record = logging.LogRecord('smartfin.test', level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_emits_extra_fields():
+    """Test one JSON object per record, with extra= fields at top level"""
+    line = JsonFormatter().format(make_record(status=200, path='/api/loans', sampled=True))
+    entry = json.loads(line)
+
+    assert '\n' not in line
+    assert entry['level'] == 'INFO' and entry['logger'] == 'smartfin.test'
+    assert entry['message'] == 'hello world'
+    assert entry['status'] == 200 and entry['path'] == '/api/loans'
+    assert 'sampled' not in entry and 'args' not in entry
+
+
+def test_sampling_applies_only_to_sampled_levels():
+    """Test that sampled INFO records follow the rate and everything else is kept"""
+    drop_info = SamplingFilter({logging.INFO: 0.0})
+
+    assert not drop_info.filter(make_record(sampled=True))
+    assert drop_info.filter(make_record(logging.WARNING, sampled=True))
+    assert drop_info.filter(make_record())
+
+    half = SamplingFilter({logging.INFO: 0.5})
+    kept = sum(half.filter(make_record(sampled=True)) for _ in range(2000))
+    assert 800 < kept < 1200
+
+
+def test_listener_writes_and_flushes_on_interval(tmp_path):
+    """Test that queued records reach the file within the flush interval, without per-record flushes"""
+    log_path = tmp_path / 'app.log'
+    handler = BufferedFileHandler(str(log_path))
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = FlushingQueueListener(log_queue, handler, flush_interval=0.05)
+    logger = logging.getLogger('smartfin.test.listener')
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+
+    try:
+        for i in range(3):
+            logger.warning('record %d', i, extra={'index': i})
+
+        deadline = time.monotonic() + 5
+        while log_path.read_text().count('\n') < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        listener.stop()
+        handler.close()
+        logger.handlers.clear()
+
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [entry['index'] for entry in entries] == [0, 1, 2]
+    assert entries[0]['message'] == 'record 0'
+
+
+def test_console_handler_follows_replaced_stdout(monkeypatch):
+    """Test that the console handler writes to the current sys.stdout, not the one it was created with"""
+    handler = BufferedStdoutHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    first, second = io.StringIO(), io.StringIO()
+
+    monkeypatch.setattr(sys, 'stdout', first)
+    handler.handle(make_record())
+    first.close()
+    monkeypatch.setattr(sys, 'stdout', second)
+    handler.handle(make_record(args=('again',)))
+    handler.flush()
+
+    assert second.getvalue() == 'hello again\n'
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_requests_are_access_logged():
+    """Test that each request produces one access record with status and timing"""
+    from app import create_app
+
+    app = create_app({'TESTING': True})
+    handler = ListHandler()
+    access_logger = logging.getLogger('smartfin.access')
+    access_logger.addHandler(handler)
+    try:
+        with app.test_client() as client:
+            client.get('/api/db/pool-stats')
+            client.get('/api/no-such-endpoint')
+    finally:
+        access_logger.removeHandler(handler)
+
+    records = handler.records
+    assert [(r.levelno, r.status) for r in records] == [(logging.INFO, 200), (logging.WARNING, 404)]
+    assert records[0].path == '/api/db/pool-stats'
+    assert records[0].duration_ms >= 0 and records[0].sql_statements == 0
+    assert all(r.sampled for r in records)
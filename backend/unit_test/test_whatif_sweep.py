@@ -0,0 +1,110 @@
+"""
+Tests for the what-if sweep endpoint
+Covers grid shape, parity with /api/whatif, relative ranges and the grid cap
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+
+
+BASE = {
+    'income': 100000,
+    'expenses': 45000,
+    'emi': 10000,
+    'savings': 20000
+}
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    with create_app({'TESTING': True}).test_client() as client:
+        yield client
+
+
+def test_sweep_two_dimensional_grid(client):
+    """Test a savings x EMI sweep expressed as fractions of income"""
+    response = client.post('/api/whatif/sweep', json={
+        'base': BASE,
+        'parameters': [
+            {'field': 'savings', 'start': 0, 'stop': 0.4, 'step': 0.01, 'relative_to': 'income'},
+            {'field': 'emi', 'start': 0, 'stop': 0.5, 'step': 0.1, 'relative_to': 'income'}
+        ]
+    })
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['success'] is True
+    assert data['shape'] == [41, 6]
+    assert len(data['scores']) == 41 and all(len(row) == 6 for row in data['scores'])
+    assert data['axes'][0]['values'][-1] == pytest.approx(40000)
+    assert data['axes'][1]['values'] == pytest.approx([0, 10000, 20000, 30000, 40000, 50000])
+    flat = [score for row in data['scores'] for score in row]
+    assert data['best']['score'] == max(flat)
+    assert data['worst']['score'] == min(flat)
+    assert all(0 <= score <= 100 for score in flat)
+
+
+def test_sweep_matches_whatif(client):
+    """Test that each grid cell equals the /api/whatif score for that scenario"""
+    response = client.post('/api/whatif/sweep', json={
+        'base': BASE,
+        'parameters': [{'field': 'savings', 'values': [0, 35000]}]
+    })
+    data = json.loads(response.data)
+
+    whatif = json.loads(client.post('/api/whatif', json={
+        'current': {**BASE, 'savings': 0},
+        'modified': {**BASE, 'savings': 35000}
+    }).data)
+
+    assert data['scores'] == [whatif['current_score'], whatif['modified_score']]
+
+
+def test_sweep_grid_cap(client):
+    """Test that grids larger than WHATIF_SWEEP_MAX_POINTS are rejected"""
+    original = client.application.config['WHATIF_SWEEP_MAX_POINTS']
+    client.application.config['WHATIF_SWEEP_MAX_POINTS'] = 100
+    try:
+        response = client.post('/api/whatif/sweep', json={
+            'base': BASE,
+            'parameters': [
+                {'field': 'savings', 'start': 0, 'stop': 50000, 'step': 1000},
+                {'field': 'emi', 'start': 0, 'stop': 50000, 'step': 1000}
+            ]
+        })
+        huge = client.post('/api/whatif/sweep', json={
+            'base': BASE,
+            'parameters': [{'field': 'income', 'start': 0, 'stop': 1e15, 'step': 1}]
+        })
+    finally:
+        client.application.config['WHATIF_SWEEP_MAX_POINTS'] = original
+
+    assert response.status_code == 400
+    assert 'limit of 100 points' in json.loads(response.data)['error']
+    assert huge.status_code == 400
+
+
+@pytest.mark.parametrize('payload, message', [
+    ({'base': BASE, 'parameters': []}, 'non-empty list'),
+    ({'base': BASE, 'parameters': [{'field': 'rent', 'values': [1]}]}, 'Invalid sweep field'),
+    ({'base': BASE, 'parameters': [{'field': 'emi', 'start': 0, 'stop': 10}]}, 'missing step'),
+    ({'base': BASE, 'parameters': [{'field': 'emi', 'values': [-1, 2]}]}, 'non-negative'),
+    ({'base': BASE, 'parameters': [{'field': 'emi', 'values': [1]}, {'field': 'emi', 'values': [2]}]},
+     'Duplicate sweep field'),
+    ({'base': {'income': 1000}, 'parameters': [{'field': 'emi', 'values': [1]}]},
+     'Missing required field: savings')
+])
+def test_sweep_invalid_requests(client, payload, message):
+    """Test that malformed sweeps return 400 with a helpful error"""
+    response = client.post('/api/whatif/sweep', json=payload)
+
+    assert response.status_code == 400
+    assert message in json.loads(response.data)['error']
@@ -0,0 +1,276 @@
+"""
+Unit tests for Write_Queue
+Tests the single writer thread: concurrent service writes without lock
+errors, group commit of queued jobs, per-job rollback, request-scope sharing,
+nested writes, the inline (disabled) mode and the auth routes' writes
+"""
+
+import pytest
+import sqlite3
+import threading
+import time
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection_pool import close_thread_connections
+from goals_service import GoalsService
+from loan_history_service import LoanHistoryService
+from migrations import migrate
+from request_scope import begin_request, current_scope, end_request
+import write_queue
+from write_queue import WriteQueue, get_write_queue_stats, run_write
+
+
+LOAN_DATA = {
+    'loan_type': 'personal',
+    'loan_amount': 1000000.0,
+    'loan_tenure': 240,
+    'monthly_emi': 9650.22,
+    'interest_rate': 10.0,
+    'loan_start_date': '2024-01-15',
+    'loan_maturity_date': '2044-01-15'
+}
+
+GOAL_DATA = {'goal_type': 'long-term', 'target_amount': 5000.0, 'target_date': '2030-01-01', 'priority': 'medium'}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database built by the migration runner, with a scratch table"""
+    db_path = str(tmp_path / 'writes.db')
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE scratch (id INTEGER PRIMARY KEY, value TEXT)')
+    conn.commit()
+    conn.close()
+    write_queue.write_queue.reset_stats()
+    yield db_path
+    end_request()
+    close_thread_connections()
+
+
+def scratch_values(db_path):
+    conn = sqlite3.connect(db_path)
+    values = [row[0] for row in conn.execute('SELECT value FROM scratch ORDER BY id')]
+    conn.close()
+    return values
+
+
+def insert(value):
+    """Write job inserting one scratch row"""
+    def job(conn):
+        conn.execute('INSERT INTO scratch (value) VALUES (?)', (value,))
+        return value
+    return job
+
+
+def run_queued(queue, db_path, jobs):
+    """
+    Submit jobs from one thread each while the writer is held, then release it
+
+    Every job is queued before the writer takes its next batch, so they are
+    committed together. Returns each job's result or exception, in order.
+    """
+    held, release = threading.Event(), threading.Event()
+
+    def hold(conn):
+        held.set()
+        release.wait(5)
+
+    outcomes = [None] * len(jobs)
+
+    def submit(index, job):
+        try:
+            outcomes[index] = queue.submit(db_path, job)
+        except Exception as e:
+            outcomes[index] = e
+
+    blocker = threading.Thread(target=queue.submit, args=(db_path, hold))
+    blocker.start()
+    assert held.wait(5)
+
+    threads = [threading.Thread(target=submit, args=item) for item in enumerate(jobs)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while queue.stats()['queue_depth'] < len(jobs) and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    release.set()
+    for thread in [blocker] + threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_service_writes_never_lock(db_path):
+    """Test that parallel payments and goal updates all commit with no lock errors"""
+    loans = LoanHistoryService(db_path)
+    goals = GoalsService(db_path)
+    loan_ids = [loans.createLoan(1, LOAN_DATA)['loan_id'] for _ in range(8)]
+    goal_id = goals.create_goal(1, GOAL_DATA)['id']
+    errors = []
+
+    def writer(loan_id):
+        try:
+            for day in range(1, 21):
+                loans.recordPayment(loan_id, {'payment_date': f'2024-02-{day:02d}', 'payment_amount': 100.0},
+                                    user_id=1)
+                goals.update_goal(goal_id, 1, {'description': f'{loan_id} {day}'})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close_thread_connections()
+
+    threads = [threading.Thread(target=writer, args=(loan_id,)) for loan_id in loan_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+
+    assert errors == []
+    for loan_id in loan_ids:
+        assert len(loans.getPaymentHistory(loan_id)) == 20
+
+    stats = get_write_queue_stats()
+    assert stats['lock_errors'] == 0 and stats['failed_commits'] == 0
+    assert stats['jobs'] >= 8 * 40
+    assert stats['commits'] <= stats['jobs']
+
+
+def test_queued_jobs_share_one_commit(db_path):
+    """Test that jobs waiting behind a running batch are committed together"""
+    queue = WriteQueue(max_batch=64)
+    outcomes = run_queued(queue, db_path, [insert(f'row {i}') for i in range(10)])
+
+    assert sorted(outcomes) == sorted(f'row {i}' for i in range(10))
+    assert len(scratch_values(db_path)) == 10
+
+    stats = queue.stats()
+    assert stats['jobs'] == 11 and stats['commits'] == 2
+    assert stats['batch_size_histogram']['<=1'] == 1 and stats['batch_size_histogram']['<=16'] == 1
+    assert stats['max_queue_depth'] == 10
+
+
+def test_batch_size_is_capped(db_path):
+    """Test that no more than max_batch jobs share a commit"""
+    queue = WriteQueue(max_batch=4)
+    run_queued(queue, db_path, [insert(f'row {i}') for i in range(10)])
+
+    stats = queue.stats()
+    assert len(scratch_values(db_path)) == 10
+    assert stats['commits'] == 1 + 3
+    assert stats['batch_size_histogram']['<=4'] == 2 and stats['batch_size_histogram']['<=2'] == 1
+
+
+def test_failed_job_rolls_back_alone(db_path):
+    """Test that a job that raises undoes only its own changes"""
+    def failing(conn):
+        conn.execute("INSERT INTO scratch (value) VALUES ('failed')")
+        raise ValueError('rejected')
+
+    queue = WriteQueue()
+    outcomes = run_queued(queue, db_path, [insert('first'), failing, insert('last')])
+
+    assert isinstance(outcomes[1], ValueError)
+    assert sorted(scratch_values(db_path)) == ['first', 'last']
+    assert queue.stats()['failed_jobs'] == 1 and queue.stats()['commits'] == 2
+
+
+def test_service_errors_reach_the_caller(db_path):
+    """Test that ownership and validation errors raised inside a job propagate unchanged"""
+    loans = LoanHistoryService(db_path)
+    loan_id = loans.createLoan(1, LOAN_DATA)['loan_id']
+
+    with pytest.raises(ValueError, match='does not own'):
+        loans.recordPayment(loan_id, {'payment_date': '2024-02-15', 'payment_amount': 100.0}, user_id=2)
+    with pytest.raises(ValueError, match='Loan not found'):
+        loans.updateLoan('missing', 1, {'loan_type': 'home'})
+    assert loans.deleteLoan('missing', 1) is False
+    assert loans.getPaymentHistory(loan_id) == []
+
+
+def test_job_runs_in_request_scope(db_path):
+    """Test that a job sees the submitting request's scope and its statements are counted"""
+    loans = LoanHistoryService(db_path)
+
+    scope = begin_request('test')
+    seen = run_write(db_path, lambda conn: current_scope())
+    loans.createLoan(1, LOAN_DATA)
+    end_request()
+
+    assert seen is scope
+    # INSERT on the writer thread plus the read-back on the caller's connection
+    assert scope.sql_statements == 2
+
+
+def test_nested_write_joins_transaction(db_path):
+    """Test that a write issued from inside a job commits or rolls back with it"""
+    def outer(conn):
+        run_write(db_path, insert('inner'))
+        raise ValueError('outer failed')
+
+    with pytest.raises(ValueError):
+        run_write(db_path, outer)
+    assert scratch_values(db_path) == []
+
+    run_write(db_path, lambda conn: [insert('outer')(conn), run_write(db_path, insert('inner'))])
+    assert scratch_values(db_path) == ['outer', 'inner']
+    # The nested writes ran inside their outer jobs rather than as jobs of their own
+    assert get_write_queue_stats()['jobs'] == 2
+
+
+def test_disabled_queue_writes_inline(db_path, monkeypatch):
+    """Test that with the queue disabled writes run and commit on the calling thread"""
+    monkeypatch.setattr(write_queue, 'WRITE_QUEUE_ENABLED', False)
+    caller = threading.current_thread()
+
+    assert run_write(db_path, lambda conn: threading.current_thread()) is caller
+    with pytest.raises(ValueError):
+        run_write(db_path, lambda conn: [insert('rolled back')(conn), int('x')])
+    run_write(db_path, insert('kept'))
+
+    assert scratch_values(db_path) == ['kept']
+    assert get_write_queue_stats()['jobs'] == 0
+
+
+def test_stats_shape(db_path):
+    """Test that stats report counters, histogram and latency percentiles"""
+    run_write(db_path, insert('row'))
+    stats = get_write_queue_stats()
+
+    assert stats['jobs'] == 1 and stats['commits'] == 1 and stats['mean_batch_size'] == 1.0
+    assert stats['queue_depth'] == 0
+    for name in ('queue_wait_ms', 'write_latency_ms', 'commit_ms'):
+        assert set(stats[name]) == {'p50', 'p99', 'max'}
+    assert stats['write_latency_ms']['max'] >= stats['queue_wait_ms']['max']
+
+    write_queue.write_queue.reset_stats()
+    assert get_write_queue_stats()['jobs'] == 0
+
+
+def test_auth_routes_write_through_queue(db_path, monkeypatch):
+    """Test that the password reset routes commit their user and token writes on the writer"""
+    import app as app_module
+    from werkzeug.security import check_password_hash, generate_password_hash
+    monkeypatch.setattr(app_module, 'DB_PATH', db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO users (username, password_hash, created_at) VALUES ('a@example.com', ?, '2024-01-01')",
+                 (generate_password_hash('old-password'),))
+    conn.commit()
+    conn.close()
+
+    client = app_module.create_app({'TESTING': True}).test_client()
+    code = client.post('/forgot-password', json={'email': 'a@example.com'}).get_json()['reset_code']
+    response = client.post('/reset-password', json={'email': 'a@example.com', 'reset_code': code,
+                                                     'new_password': 'new-password'})
+
+    assert response.status_code == 200
+    conn = sqlite3.connect(db_path)
+    password_hash = conn.execute('SELECT password_hash FROM users').fetchone()[0]
+    used = conn.execute('SELECT used FROM password_reset_tokens').fetchall()
+    conn.close()
+    assert check_password_hash(password_hash, 'new-password') and used == [(1,)]
+    assert get_write_queue_stats()['jobs'] == 2
@@ -0,0 +1,329 @@
+"""
+Write_Queue - Single writer thread with group commit for SQLite writes
+Services and the auth routes hand their writes to one writer thread as jobs.
+The writer runs queued jobs back to back inside one BEGIN IMMEDIATE
+transaction (each in its own savepoint) and commits them together. Outside
+startup migrations and the misc/ maintenance scripts it is the only connection
+that writes, so request writes never contend for the file lock, and readers
+keep using their own pooled WAL connections, which see each commit as a new
+snapshot
+"""
+
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from connection_pool import PooledConnection, get_connection
+
+
+logger = logging.getLogger(__name__)
+
+# Set SQLITE_WRITE_QUEUE=0 to run each write on the caller's own connection instead
+WRITE_QUEUE_ENABLED = os.environ.get('SQLITE_WRITE_QUEUE', '1') != '0'
+
+# Jobs committed together at most
+WRITE_MAX_BATCH = int(os.environ.get('SQLITE_WRITE_MAX_BATCH', 64))
+
+# Commit batch-size histogram buckets (upper bounds, in jobs)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+# Latency samples kept for the percentiles
+LATENCY_SAMPLES = 2048
+
+T = TypeVar('T')
+
+# A write job: runs on the write connection, must not commit or roll back
+WriteJob = Callable[[PooledConnection], T]
+
+
+def _is_lock_error(error: BaseException) -> bool:
+    """Whether an exception is SQLite's "database is locked" / busy error"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/max in milliseconds of unsorted samples in seconds"""
+    if not samples:
+        return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    samples = sorted(samples)
+    return {
+        'p50': round(samples[len(samples) // 2] * 1000, 3),
+        'p99': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+        'max': round(samples[-1] * 1000, 3)
+    }
+
+
+class WriteQueue:
+    """
+    One writer thread that runs and group-commits write jobs
+
+    submit() is called by request threads and blocks until the job has been
+    committed (or has failed). The daemon writer thread (started on first use)
+    takes the oldest job plus every job queued behind it for the same
+    database, up to max_batch, and runs them in one transaction. A job that
+    raises is rolled back to its savepoint and gets its exception; the others
+    in the batch still commit. Jobs run in the submitting thread's context, so
+    request-scoped state (the identity map, statement counts) is shared.
+    """
+
+    def __init__(self, max_batch: int = WRITE_MAX_BATCH):
+        """
+        Initialize WriteQueue
+
+        Args:
+            max_batch: Jobs committed together at most
+        """
+        self.max_batch = max_batch
+        self._queue: Deque[Tuple[str, WriteJob, contextvars.Context, Future, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            'jobs': 0, 'failed_jobs': 0, 'commits': 0, 'failed_commits': 0,
+            'lock_errors': 0, 'max_queue_depth': 0
+        }
+        self._histogram = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+        self._histogram_overflow = 0
+        self._waits: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._commit_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def on_writer_thread(self) -> bool:
+        """Whether the caller is the writer thread itself (i.e. inside a job)"""
+        return self._thread is threading.current_thread()
+
+    def submit(self, db_path: str, job: WriteJob) -> T:
+        """
+        Run a write job on the writer thread and wait for its commit
+
+        Args:
+            db_path: Path to SQLite database
+            job: Called with the write connection; its return value is returned
+                once the transaction holding it has committed
+
+        Returns:
+            Whatever job returned
+
+        Raises:
+            Exception: Whatever job raised, or the error that failed the commit
+        """
+        if self.on_writer_thread:
+            # A job that calls another service write joins the running transaction
+            return _run_inline(db_path, job)
+
+        future: Future = Future()
+        with self._cond:
+            self._queue.append((db_path, job, contextvars.copy_context(), future, time.perf_counter()))
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], len(self._queue))
+            self._ensure_thread()
+            self._cond.notify()
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters, queue depth, commit batch sizes and write latency
+
+        Returns:
+            Dictionary with jobs, failed_jobs, commits, failed_commits,
+            lock_errors, queue_depth, max_queue_depth, mean_batch_size,
+            batch_size_histogram (jobs per commit, by upper bound), and p50/p99/max
+            of queue_wait_ms (submit to start), write_latency_ms (submit to
+            commit) and commit_ms (the COMMIT itself)
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['enabled'] = WRITE_QUEUE_ENABLED
+            stats['queue_depth'] = len(self._queue)
+            stats['max_batch'] = self.max_batch
+            histogram = {f'<={bound}': count for bound, count in self._histogram.items()}
+            histogram[f'>{BATCH_SIZE_BUCKETS[-1]}'] = self._histogram_overflow
+            stats['batch_size_histogram'] = histogram
+            waits, latencies, commit_times = list(self._waits), list(self._latencies), list(self._commit_times)
+
+        committed = stats['commits'] + stats['failed_commits']
+        stats['mean_batch_size'] = round(stats['jobs'] / committed, 3) if committed else 0.0
+        stats['queue_wait_ms'] = _percentiles(waits)
+        stats['write_latency_ms'] = _percentiles(latencies)
+        stats['commit_ms'] = _percentiles(commit_times)
+        return stats
+
+    def reset_stats(self) -> None:
+        """Reset all counters and latency samples"""
+        with self._cond:
+            for name in self._stats:
+                self._stats[name] = 0
+            self._histogram = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+            self._histogram_overflow = 0
+            self._waits.clear()
+            self._latencies.clear()
+            self._commit_times.clear()
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread if it is not running (caller holds the lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Tuple[str, WriteJob, contextvars.Context, Future, float]]:
+        """Wait for a job, then take it and the jobs queued behind it for the same database"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue)
+            db_path = self._queue[0][0]
+            batch = []
+            while self._queue and self._queue[0][0] == db_path and len(batch) < self.max_batch:
+                batch.append(self._queue.popleft())
+            return batch
+
+    def _record_batch(self, batch, started: float, failed_jobs: int, committed: bool,
+                      commit_seconds: float, lock_error: bool) -> None:
+        """Update the counters, batch-size histogram and latency samples"""
+        finished = time.perf_counter()
+        with self._cond:
+            self._stats['jobs'] += len(batch)
+            self._stats['failed_jobs'] += failed_jobs
+            self._stats['commits' if committed else 'failed_commits'] += 1
+            self._stats['lock_errors'] += int(lock_error)
+            for bound in BATCH_SIZE_BUCKETS:
+                if len(batch) <= bound:
+                    self._histogram[bound] += 1
+                    break
+            else:
+                self._histogram_overflow += 1
+            self._waits.extend(started - enqueued for *_, enqueued in batch)
+            self._latencies.extend(finished - enqueued for *_, enqueued in batch)
+            self._commit_times.append(commit_seconds)
+
+    def _run(self) -> None:
+        """Writer loop: one transaction and one commit per batch"""
+        while True:
+            batch = self._take_batch()
+            started = time.perf_counter()
+            try:
+                self._run_batch(batch, started)
+            except BaseException as e:
+                # Never leave a submitter waiting, whatever went wrong
+                logger.error(f"Write batch of {len(batch)} jobs failed: {str(e)}")
+                for *_, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch, started: float) -> None:
+        """Run a batch's jobs in savepoints of one transaction, commit, then resolve their futures"""
+        db_path = batch[0][0]
+        conn = get_connection(db_path)
+        results: List[Tuple[Future, bool, Any]] = []
+        commit_seconds = 0.0
+        try:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+            except sqlite3.Error as e:
+                self._record_batch(batch, started, len(batch), False, 0.0, _is_lock_error(e))
+                for *_, future, _ in batch:
+                    future.set_exception(e)
+                return
+
+            for _, job, context, future, _ in batch:
+                conn.execute('SAVEPOINT write_job')
+                try:
+                    result = context.run(job, conn)
+                except BaseException as e:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK TO write_job')
+                        conn.execute('RELEASE write_job')
+                    results.append((future, False, e))
+                else:
+                    conn.execute('RELEASE write_job')
+                    results.append((future, True, result))
+                if not conn.in_transaction:
+                    # SQLite itself rolled back (e.g. disk full): nothing has been kept
+                    raise sqlite3.OperationalError('Write transaction was rolled back by SQLite')
+
+            commit_started = time.perf_counter()
+            conn.commit()
+            commit_seconds = time.perf_counter() - commit_started
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self._record_batch(batch, started, len(batch), False, commit_seconds, _is_lock_error(e))
+            logger.error(f"Write batch of {len(batch)} jobs on {db_path} rolled back: {str(e)}")
+            for *_, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            conn.close()
+
+        failed = [value for _, ok, value in results if not ok]
+        self._record_batch(batch, started, len(failed), True, commit_seconds,
+                           any(_is_lock_error(error) for error in failed))
+        for future, ok, value in results:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+write_queue = WriteQueue()
+
+
+def _run_inline(db_path: str, job: WriteJob) -> T:
+    """Run a write job in its own transaction on the calling thread's connection"""
+    conn = get_connection(db_path)
+    try:
+        if conn.in_transaction:
+            # Called from inside another job: join its transaction
+            return job(conn)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = job(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
+
+def run_write(db_path: str, job: WriteJob) -> T:
+    """
+    Run a write job and return its result once it has been committed
+
+    The job receives the write connection and must not commit or roll back:
+    raising undoes exactly its own changes. Read-only checks that decide
+    whether to write belong in the job, so they see the rows they guard.
+
+    Args:
+        db_path: Path to SQLite database
+        job: Called with the write connection
+
+    Returns:
+        Whatever job returned
+
+    Raises:
+        Exception: Whatever job raised, or the error that failed the commit
+    """
+    if not WRITE_QUEUE_ENABLED:
+        return _run_inline(db_path, job)
+    return write_queue.submit(db_path, job)
+
+
+def get_write_queue_stats() -> Dict[str, Any]:
+    """Write queue statistics (see WriteQueue.stats)"""
+    return write_queue.stats()
+
+
+def _reset_after_fork() -> None:
+    """Give a forked child its own queue; the parent's writer thread does not exist there"""
+    global write_queue
+    write_queue = WriteQueue(write_queue.max_batch)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
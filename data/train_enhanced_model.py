@@ -10,8 +10,13 @@ from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 import joblib
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from compiled_model import compile_gradient_boosting
+
 # Scoring functions from the design document
 def calculate_savings_score(row):
     """Calculate savings score (30% -> 25% weight)"""
@@ -345,6 +350,11 @@ def save_model(model, metrics, feature_cols):
     
     joblib.dump(model_data, 'data/enhanced_model.pkl')
     print("   ✓ Model saved to data/enhanced_model.pkl")
+    
+    # Flat-array export loaded by the backend without sklearn unpickling
+    compiled = compile_gradient_boosting(model, model_data)
+    compiled.save('data/enhanced_model_compiled.npz')
+    print(f"   ✓ Compiled model saved to data/enhanced_model_compiled.npz ({compiled.n_nodes:,} nodes)")
 
 def main():
     """Main training process"""
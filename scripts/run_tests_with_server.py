@@ -17,7 +17,7 @@ from werkzeug.serving import make_server
 
 
 def start_server():
-    server = make_server('127.0.0.1', 5000, backend_app.app)
+    server = make_server('127.0.0.1', 5000, backend_app.create_app())
     server.serve_forever()
 
 